@@ -10,17 +10,42 @@ Components:
 - advanced_intelligence: Advanced AI intelligence system
 - user_profiling: User profiling and behavioral analysis
 - enhanced_ai_config: AI configuration management
+- prompt_budget: Token-budgeted prompt assembly and history fitting
+- message_features: One-pass message features shared by all analyzers
+- batch_analysis: Vectorized message features for backfills and periodic jobs
+- conversation_store: Normalized per-turn conversation history with cached windows
+- interaction_graph: Per-server sparse interaction graph for mood spread and influence
+
+Exports are resolved lazily on first attribute access, so importing any
+`ai.*` submodule does not pull in every provider client.
 """
 
-from .multi_provider_ai import (
-    MultiProviderAIManager,
-    AIProvider,
-    AIResponse,
-    ProviderStatus,
-)
-from .universal_ai_client import UniversalAIClient as UAIClient
-from .openrouter_client import OpenRouterClient
-from .user_profiling import UserProfileManager
+from typing import TYPE_CHECKING
+
+from utils.lazy_loader import lazy_exports
+
+if TYPE_CHECKING:
+    from .multi_provider_ai import (
+        MultiProviderAIManager,
+        AIProvider,
+        AIResponse,
+        ProviderStatus,
+    )
+    from .universal_ai_client import UniversalAIClient as UAIClient
+    from .openrouter_client import OpenRouterClient
+    from .user_profiling import UserProfileManager
+
+_EXPORTS = {
+    "MultiProviderAIManager": (".multi_provider_ai", "MultiProviderAIManager"),
+    "AIProvider": (".multi_provider_ai", "AIProvider"),
+    "AIResponse": (".multi_provider_ai", "AIResponse"),
+    "ProviderStatus": (".multi_provider_ai", "ProviderStatus"),
+    "UAIClient": (".universal_ai_client", "UniversalAIClient"),
+    "OpenRouterClient": (".openrouter_client", "OpenRouterClient"),
+    "UserProfileManager": (".user_profiling", "UserProfileManager"),
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
 
 __all__ = [
     "MultiProviderAIManager",
@@ -24,10 +24,17 @@ from enum import Enum
 import sqlite3
 from pathlib import Path
 import statistics
+import bisect
+import heapq
 import math
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
+from ai.batch_analysis import parse_timestamps
+from ai.interaction_graph import GraphSnapshot, get_interaction_graph
+from utils.storage_engine import get_storage
+from ai.message_features import extract_features
+
 logger = logging.getLogger("astra.advanced_intelligence")
 
 
@@ -483,7 +490,7 @@ class WellnessCompanion:
 
         # Analyze message sentiment
         sentiment = await self._analyze_message_sentiment(
-            message_data.get("content", "")
+            message_data.get("content", ""), message_data.get("message_id")
         )
         profile.message_sentiment_trend.append(sentiment)
 
@@ -583,43 +590,11 @@ class WellnessCompanion:
 
         return intervention
 
-    async def _analyze_message_sentiment(self, message: str) -> float:
+    async def _analyze_message_sentiment(
+        self, message: str, message_id: Optional[int] = None
+    ) -> float:
         """Analyze sentiment of a message (-1.0 to 1.0)"""
-        # Simplified sentiment analysis
-        positive_words = [
-            "happy",
-            "good",
-            "great",
-            "awesome",
-            "love",
-            "excited",
-            "wonderful",
-            "amazing",
-            "fantastic",
-        ]
-        negative_words = [
-            "sad",
-            "bad",
-            "terrible",
-            "hate",
-            "awful",
-            "horrible",
-            "depressed",
-            "frustrated",
-            "angry",
-        ]
-
-        message_lower = message.lower()
-        positive_count = sum(1 for word in positive_words if word in message_lower)
-        negative_count = sum(1 for word in negative_words if word in message_lower)
-
-        if positive_count + negative_count == 0:
-            return 0.0
-
-        sentiment = (positive_count - negative_count) / (
-            positive_count + negative_count
-        )
-        return max(-1.0, min(1.0, sentiment))
+        return extract_features(message, message_id).sentiment
 
     async def _get_wellness_profile(
         self, user_id: int, server_id: int
@@ -638,11 +613,45 @@ class WellnessCompanion:
         pass
 
 
+_DAY = 86400
+
+
+class _ServerMemoryIndex:
+    """Posting lists and day buckets over one server's memories"""
+
+    __slots__ = (
+        "order",
+        "by_tag",
+        "by_participant",
+        "by_day",
+    )
+
+    def __init__(self):
+        self.order: Dict[str, int] = {}  # memory_id -> insertion sequence
+        self.by_tag: Dict[str, Set[str]] = defaultdict(set)
+        self.by_participant: Dict[int, Set[str]] = defaultdict(set)
+        # day -> [(-importance, sequence, memory_id)], most important first
+        self.by_day: Dict[int, List[Tuple[float, int, str]]] = defaultdict(list)
+
+    def add(self, memory: "MemoryFragment"):
+        sequence = len(self.order)
+        self.order[memory.memory_id] = sequence
+        for tag in memory.tags:
+            self.by_tag[tag].add(memory.memory_id)
+        for participant in memory.participants:
+            self.by_participant[participant].add(memory.memory_id)
+        day = int(memory.created_at.timestamp() // _DAY)
+        bisect.insort(
+            self.by_day[day], (-memory.importance_score, sequence, memory.memory_id)
+        )
+
+
 class MemoryPalace:
     """Advanced memory architecture for complex community memories"""
 
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        self.storage = get_storage(db_path)
         self.memory_fragments: Dict[str, MemoryFragment] = {}
         self.memory_connections: Dict[str, List[str]] = defaultdict(list)
         self.importance_weights = {
@@ -652,6 +661,63 @@ class MemoryPalace:
             "uniqueness": 0.1,  # How unique/rare it is
         }
 
+        # Per-server indexes, built from the database on first use
+        self._indexes: Dict[int, _ServerMemoryIndex] = {}
+        self._load_locks: Dict[int, asyncio.Lock] = {}
+
+    async def _server_index(self, server_id: int) -> _ServerMemoryIndex:
+        """Index for a server, loading its stored memories the first time"""
+        index = self._indexes.get(server_id)
+        if index is not None:
+            return index
+
+        async with self._load_locks.setdefault(server_id, asyncio.Lock()):
+            if server_id in self._indexes:
+                return self._indexes[server_id]
+
+            index = _ServerMemoryIndex()
+            try:
+                rows = await self.storage.fetch_all(
+                    """
+                    SELECT memory_id, memory_type, content, emotional_weight,
+                           importance_score, participants, tags, created_at,
+                           last_accessed, access_count, connections
+                    FROM memory_fragments
+                    WHERE server_id = ?
+                    ORDER BY created_at, rowid
+                """,
+                    (server_id,),
+                )
+            except Exception as e:
+                logger.error(f"Failed to load memories for server {server_id}: {e}")
+                rows = []
+
+            for row in rows:
+                memory = MemoryFragment(
+                    memory_id=row[0],
+                    server_id=server_id,
+                    memory_type=row[1],
+                    content=json.loads(row[2]) if row[2] else {},
+                    emotional_weight=row[3] or 0.0,
+                    importance_score=row[4] or 0.0,
+                    participants=json.loads(row[5]) if row[5] else [],
+                    tags=json.loads(row[6]) if row[6] else [],
+                    created_at=datetime.fromisoformat(row[7]),
+                    last_accessed=datetime.fromisoformat(row[8]),
+                    access_count=row[9] or 0,
+                    connections=json.loads(row[10]) if row[10] else [],
+                )
+                self.memory_fragments[memory.memory_id] = memory
+                index.add(memory)
+                for connected_id in memory.connections:
+                    self.memory_connections[connected_id].append(memory.memory_id)
+                    self.memory_connections[memory.memory_id].append(connected_id)
+
+            self._indexes[server_id] = index
+            if rows:
+                logger.info(f"🧠 Loaded {len(rows)} memories for server {server_id}")
+            return index
+
     async def store_memory(
         self,
         server_id: int,
@@ -661,7 +727,10 @@ class MemoryPalace:
         emotional_weight: float = 0.0,
     ) -> str:
         """Store a new memory fragment"""
+        index = await self._server_index(server_id)
         memory_id = f"{server_id}_{memory_type}_{int(datetime.now().timestamp())}"
+        if memory_id in self.memory_fragments:
+            memory_id = f"{memory_id}_{len(index.order)}"
 
         memory = MemoryFragment(
             memory_id=memory_id,
@@ -689,6 +758,7 @@ class MemoryPalace:
             self.memory_connections[memory_id].append(connected_id)
 
         self.memory_fragments[memory_id] = memory
+        index.add(memory)
         await self._save_memory(memory)
 
         return memory_id
@@ -696,27 +766,83 @@ class MemoryPalace:
     async def recall_memories(
         self, server_id: int, context: Dict[str, Any], limit: int = 5
     ) -> List[MemoryFragment]:
-        """Recall relevant memories based on context"""
-        server_memories = [
-            m for m in self.memory_fragments.values() if m.server_id == server_id
-        ]
-
-        if not server_memories:
+        """Recall relevant memories based on context.
+
+        Only memories sharing a participant or tag with the context, plus
+        day buckets whose best possible score can still make the top
+        ``limit``, are scored; the result matches scoring every memory.
+        """
+        index = await self._server_index(server_id)
+        if not index.order or limit <= 0:
             return []
 
-        # Score memories based on relevance to current context
-        scored_memories = []
-        for memory in server_memories:
-            relevance_score = await self._calculate_relevance(memory, context)
-            memory.access_count += 1
-            memory.last_accessed = datetime.now(timezone.utc)
+        context_participants = set(context.get("participants", ()))
+        context_topics = set(context.get("topics", ()))
+        now = datetime.now(timezone.utc)
+        now_ts = now.timestamp()
 
-            scored_memories.append((memory, relevance_score))
+        # Min-heap of (score, -insertion order, memory_id) holding the best so far
+        heap: List[Tuple[float, int, str]] = []
+        scored: Set[str] = set()
 
-        # Sort by relevance and importance
-        scored_memories.sort(key=lambda x: x[1] * x[0].importance_score, reverse=True)
+        def consider(memory_id: str):
+            scored.add(memory_id)
+            memory = self.memory_fragments[memory_id]
+            relevance = self._relevance(
+                memory, context_participants, context_topics, now
+            )
+            entry = (
+                relevance * memory.importance_score,
+                -index.order[memory_id],
+                memory_id,
+            )
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        candidates: Set[str] = set()
+        for participant in context_participants:
+            candidates |= index.by_participant.get(participant, set())
+        for topic in context_topics:
+            candidates |= index.by_tag.get(topic, set())
+        for memory_id in candidates:
+            consider(memory_id)
+
+        # Memories without overlap score at most (recency + access weight) x
+        # importance; visit day buckets by that bound and stop once nothing
+        # left can enter the top ``limit``
+        def bound_factor(day: int) -> float:
+            days_old = max(0, int((now_ts - (day + 1) * _DAY) // _DAY))
+            return 0.2 * max(0, 1 - days_old / 30) + 0.1
+
+        buckets = sorted(
+            (
+                (bound_factor(day) * -bucket[0][0], day)
+                for day, bucket in index.by_day.items()
+            ),
+            reverse=True,
+        )
+        for bound, day in buckets:
+            if len(heap) == limit and bound < heap[0][0]:
+                break
+            factor = bound_factor(day)
+            for negative_importance, _, memory_id in index.by_day[day]:
+                if len(heap) == limit and -negative_importance * factor < heap[0][0]:
+                    break
+                if memory_id not in scored:
+                    consider(memory_id)
+
+        recalled = [
+            self.memory_fragments[memory_id]
+            for _, _, memory_id in sorted(heap, reverse=True)
+        ]
+        for memory in recalled:
+            memory.access_count += 1
+            memory.last_accessed = now
+        self._record_access(recalled)
 
-        return [memory for memory, score in scored_memories[:limit]]
+        return recalled
 
     async def _extract_tags(self, content: Dict[str, Any]) -> List[str]:
         """Extract relevant tags from memory content"""
@@ -779,60 +905,60 @@ class MemoryPalace:
         return min(1.0, score)
 
     async def _find_memory_connections(self, memory: MemoryFragment) -> List[str]:
-        """Find connections between memories"""
-        connections = []
-
-        for existing_id, existing_memory in self.memory_fragments.items():
-            if existing_memory.server_id != memory.server_id:
-                continue
-
-            # Check for participant overlap
-            participant_overlap = set(memory.participants) & set(
-                existing_memory.participants
-            )
-            if len(participant_overlap) >= 2:
-                connections.append(existing_id)
-                continue
-
-            # Check for tag overlap
-            tag_overlap = set(memory.tags) & set(existing_memory.tags)
-            if len(tag_overlap) >= 2:
-                connections.append(existing_id)
-                continue
-
-            # Check for temporal proximity (within 24 hours)
-            time_diff = abs(
-                (memory.created_at - existing_memory.created_at).total_seconds()
-            )
-            if time_diff < 86400:  # 24 hours
-                connections.append(existing_id)
+        """Find connections between memories (first five in insertion order)"""
+        index = await self._server_index(memory.server_id)
+
+        # Two or more shared participants, or two or more shared tags
+        participant_hits: Dict[str, int] = defaultdict(int)
+        for participant in set(memory.participants):
+            for memory_id in index.by_participant.get(participant, ()):
+                participant_hits[memory_id] += 1
+        tag_hits: Dict[str, int] = defaultdict(int)
+        for tag in set(memory.tags):
+            for memory_id in index.by_tag.get(tag, ()):
+                tag_hits[memory_id] += 1
+        connected = {
+            memory_id for memory_id, hits in participant_hits.items() if hits >= 2
+        }
+        connected.update(memory_id for memory_id, hits in tag_hits.items() if hits >= 2)
+
+        # Temporal proximity (within 24 hours) only needs the adjacent days
+        day = int(memory.created_at.timestamp() // _DAY)
+        for bucket in (day - 1, day, day + 1):
+            for _, _, memory_id in index.by_day.get(bucket, ()):
+                existing_memory = self.memory_fragments[memory_id]
+                time_diff = abs(
+                    (memory.created_at - existing_memory.created_at).total_seconds()
+                )
+                if time_diff < 86400:  # 24 hours
+                    connected.add(memory_id)
 
-        return connections[:5]  # Limit connections
+        connected.discard(memory.memory_id)
+        return heapq.nsmallest(5, connected, key=index.order.__getitem__)
 
-    async def _calculate_relevance(
-        self, memory: MemoryFragment, context: Dict[str, Any]
+    def _relevance(
+        self,
+        memory: MemoryFragment,
+        context_participants: Set[int],
+        context_topics: Set[str],
+        now: datetime,
     ) -> float:
-        """Calculate relevance of memory to current context"""
         relevance = 0.0
 
         # Check participant relevance
-        if "participants" in context:
-            context_participants = set(context["participants"])
-            memory_participants = set(memory.participants)
-            overlap = len(context_participants & memory_participants)
+        if context_participants and memory.participants:
+            overlap = len(context_participants.intersection(memory.participants))
             if overlap > 0:
-                relevance += 0.4 * (overlap / len(memory_participants))
+                relevance += 0.4 * (overlap / len(set(memory.participants)))
 
         # Check topic/tag relevance
-        if "topics" in context:
-            context_topics = set(context["topics"])
-            memory_tags = set(memory.tags)
-            overlap = len(context_topics & memory_tags)
+        if context_topics and memory.tags:
+            overlap = len(context_topics.intersection(memory.tags))
             if overlap > 0:
-                relevance += 0.3 * (overlap / len(memory_tags))
+                relevance += 0.3 * (overlap / len(set(memory.tags)))
 
         # Recency bonus
-        days_old = (datetime.now(timezone.utc) - memory.created_at).days
+        days_old = (now - memory.created_at).days
         recency_score = max(0, 1 - (days_old / 30))  # Decay over 30 days
         relevance += 0.2 * recency_score
 
@@ -842,10 +968,63 @@ class MemoryPalace:
 
         return min(1.0, relevance)
 
+    async def _calculate_relevance(
+        self, memory: MemoryFragment, context: Dict[str, Any]
+    ) -> float:
+        """Calculate relevance of memory to current context"""
+        return self._relevance(
+            memory,
+            set(context.get("participants", ())),
+            set(context.get("topics", ())),
+            datetime.now(timezone.utc),
+        )
+
     async def _save_memory(self, memory: MemoryFragment):
         """Save memory to database"""
-        # Implementation would save to database
-        pass
+        try:
+            await self.storage.execute(
+                """
+                INSERT OR REPLACE INTO memory_fragments
+                (memory_id, server_id, memory_type, content, emotional_weight,
+                 importance_score, participants, tags, created_at, last_accessed,
+                 access_count, connections)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    memory.memory_id,
+                    memory.server_id,
+                    memory.memory_type,
+                    json.dumps(memory.content, default=str),
+                    memory.emotional_weight,
+                    memory.importance_score,
+                    json.dumps(memory.participants),
+                    json.dumps(memory.tags),
+                    memory.created_at.isoformat(),
+                    memory.last_accessed.isoformat(),
+                    memory.access_count,
+                    json.dumps(memory.connections),
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Failed to save memory {memory.memory_id}: {e}")
+
+    def _record_access(self, memories: List[MemoryFragment]):
+        """Queue access counters of recalled memories (fire-and-forget)"""
+        if not memories:
+            return
+        try:
+            self.storage.submit_many(
+                """
+                UPDATE memory_fragments SET access_count = ?, last_accessed = ?
+                WHERE memory_id = ?
+            """,
+                [
+                    (m.access_count, m.last_accessed.isoformat(), m.memory_id)
+                    for m in memories
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Failed to record memory access: {e}")
 
 
 class MoodContagionSystem:
@@ -864,7 +1043,7 @@ class MoodContagionSystem:
 
         # Analyze message emotional impact
         message_sentiment = await self._analyze_message_sentiment(
-            message_data.get("content", "")
+            message_data.get("content", ""), message_data.get("message_id")
         )
         message_energy = await self._analyze_message_energy(
             message_data.get("content", "")
@@ -908,49 +1087,27 @@ class MoodContagionSystem:
         """Predict how an emotional event will spread through the community"""
         contagion_model = self.contagion_models.get(server_id, {})
 
-        # Get social graph
-        social_connections = await self._get_social_connections(server_id)
+        # Simulate mood spread over the interaction graph
+        social_graph = await self._get_social_graph(server_id)
+        waves = social_graph.spread(
+            initial_user_id, contagion_model.get("transmission_rate", 0.3)
+        )
 
-        # Simulate mood spread
-        affected_users = {initial_user_id: 1.0}  # user_id -> influence_received
+        total_affected = 1
         spread_waves = []
-
-        for wave in range(5):  # Model 5 waves of spread
-            new_affected = {}
-
-            for affected_user, current_influence in affected_users.items():
-                if current_influence < 0.1:  # Too weak to spread further
-                    continue
-
-                # Find connected users
-                connections = social_connections.get(affected_user, [])
-                for connected_user, connection_strength in connections:
-                    if connected_user not in affected_users:
-                        # Calculate transmitted influence
-                        transmission_rate = contagion_model.get(
-                            "transmission_rate", 0.3
-                        )
-                        transmitted_influence = (
-                            current_influence * connection_strength * transmission_rate
-                        )
-
-                        if transmitted_influence > 0.05:  # Minimum threshold
-                            new_affected[connected_user] = transmitted_influence
-
-            if new_affected:
-                affected_users.update(new_affected)
-                spread_waves.append(
-                    {
-                        "wave": wave + 1,
-                        "newly_affected": list(new_affected.keys()),
-                        "influence_levels": dict(new_affected),
-                    }
-                )
-            else:
-                break
+        for wave, (users, levels) in enumerate(waves, 1):
+            user_ids = users.tolist()
+            total_affected += len(user_ids)
+            spread_waves.append(
+                {
+                    "wave": wave,
+                    "newly_affected": user_ids,
+                    "influence_levels": dict(zip(user_ids, levels.tolist())),
+                }
+            )
 
         return {
-            "total_affected_users": len(affected_users),
+            "total_affected_users": total_affected,
             "spread_waves": spread_waves,
             "predicted_duration_hours": len(spread_waves) * 2,  # Rough estimate
             "peak_influence_time": f"{len(spread_waves)} hours",
@@ -1032,43 +1189,11 @@ class MoodContagionSystem:
         else:
             return MoodState.DEJECTED
 
-    async def _analyze_message_sentiment(self, message: str) -> float:
+    async def _analyze_message_sentiment(
+        self, message: str, message_id: Optional[int] = None
+    ) -> float:
         """Analyze message sentiment"""
-        # Reuse the sentiment analysis from WellnessCompanion
-        positive_words = [
-            "happy",
-            "good",
-            "great",
-            "awesome",
-            "love",
-            "excited",
-            "wonderful",
-            "amazing",
-            "fantastic",
-        ]
-        negative_words = [
-            "sad",
-            "bad",
-            "terrible",
-            "hate",
-            "awful",
-            "horrible",
-            "depressed",
-            "frustrated",
-            "angry",
-        ]
-
-        message_lower = message.lower()
-        positive_count = sum(1 for word in positive_words if word in message_lower)
-        negative_count = sum(1 for word in negative_words if word in message_lower)
-
-        if positive_count + negative_count == 0:
-            return 0.0
-
-        sentiment = (positive_count - negative_count) / (
-            positive_count + negative_count
-        )
-        return max(-1.0, min(1.0, sentiment))
+        return extract_features(message, message_id).sentiment
 
     async def _analyze_message_energy(self, message: str) -> float:
         """Analyze message energy level"""
@@ -1104,13 +1229,9 @@ class MoodContagionSystem:
 
     async def _get_user_influence(self, server_id: int, user_id: int) -> float:
         """Calculate user's influence on community mood"""
-        # Simplified influence calculation
-        # In a full implementation, this would consider:
-        # - User's role/permissions
-        # - How often their messages get reactions
-        # - How long they've been in the server
-        # - Their historical mood impact
-        return 0.5  # Default moderate influence
+        # Centrality in the interaction graph; moderate for unknown users
+        social_graph = await self._get_social_graph(server_id)
+        return social_graph.influence(user_id, default=0.5)
 
     async def _analyze_dominant_emotions(
         self, message_data: Dict[str, Any]
@@ -1172,17 +1293,9 @@ class MoodContagionSystem:
                 user_id
             ][-20:]
 
-    async def _get_social_connections(
-        self, server_id: int
-    ) -> Dict[int, List[Tuple[int, float]]]:
-        """Get social connection graph for the server"""
-        # Simplified social graph
-        # In a full implementation, this would analyze:
-        # - Who responds to whom
-        # - Who mentions whom
-        # - Reaction patterns
-        # - Temporal interaction patterns
-        return {}
+    async def _get_social_graph(self, server_id: int) -> GraphSnapshot:
+        """Get the server's interaction graph (replies, mentions, co-activity)"""
+        return await get_interaction_graph(server_id).snapshot()
 
 
 class CommunitySage:
@@ -1334,33 +1447,36 @@ class CommunitySage:
                     "Document what's working so you can preserve and replicate these elements."
                 )
 
-            # Look for resilience patterns
-            stress_events = [
-                d for d in historical_data if d.get("stress_level", 0) > 0.7
-            ]
-            if stress_events:
-                recovery_times = []
-                for event in stress_events:
-                    # Find how long it took to recover (simplified)
-                    event_time = datetime.fromisoformat(event["timestamp"])
-                    later_data = [
-                        d
-                        for d in historical_data
-                        if datetime.fromisoformat(d["timestamp"]) > event_time
-                        and datetime.fromisoformat(d["timestamp"])
-                        < event_time + timedelta(days=7)
-                    ]
-
-                    if (
-                        later_data
-                        and statistics.mean(
-                            [d.get("stress_level", 0) for d in later_data]
-                        )
-                        < 0.3
-                    ):
-                        recovery_times.append(True)
-
-                if len(recovery_times) >= len(stress_events) * 0.8:
+            # Look for resilience patterns: an event counts as recovered when
+            # the week after it averages low stress. Windows come from one
+            # sorted timestamp array instead of rescanning the history.
+            stress = np.array(
+                [d.get("stress_level", 0) for d in historical_data], dtype=np.float64
+            )
+            stress_events = np.flatnonzero(stress > 0.7)
+            if len(stress_events):
+                times = parse_timestamps([d.get("timestamp") for d in historical_data])
+                known = np.flatnonzero(~np.isnat(times))
+                order = known[np.argsort(times[known], kind="stable")]
+                sorted_times = times[order]
+                prefix = np.concatenate(([0.0], np.cumsum(stress[order])))
+
+                event_times = times[stress_events]
+                event_times = event_times[~np.isnat(event_times)]
+                lo = np.searchsorted(sorted_times, event_times, side="right")
+                hi = np.searchsorted(
+                    sorted_times, event_times + np.timedelta64(7, "D"), side="left"
+                )
+                counts = hi - lo
+                window_means = np.divide(
+                    prefix[hi] - prefix[lo],
+                    counts,
+                    out=np.ones(len(counts)),
+                    where=counts > 0,
+                )
+                recovered = np.count_nonzero((counts > 0) & (window_means < 0.3))
+
+                if recovered >= len(stress_events) * 0.8:
                     wisdom_insights.append(
                         "Your community has demonstrated remarkable resilience. "
                         "When challenges arise, you consistently support each other and bounce back stronger. "
@@ -1383,19 +1499,26 @@ class CommunitySage:
 
     def _group_by_month(self, data: List[Dict[str, Any]]) -> Dict[str, float]:
         """Group data by month for pattern analysis"""
-        monthly_data = defaultdict(list)
-
-        for item in data:
-            try:
-                timestamp = datetime.fromisoformat(item["timestamp"])
-                month_key = f"{timestamp.strftime('%B')} {timestamp.year}"
-                monthly_data[month_key].append(item.get("activity_score", 1))
-            except:
-                continue
+        times = parse_timestamps([item.get("timestamp") for item in data])
+        known = ~np.isnat(times)
+        if not known.any():
+            return {}
+
+        scores = np.array(
+            [item.get("activity_score", 1) for item in data], dtype=np.float64
+        )[known]
+        months, owners = np.unique(
+            times[known].astype("datetime64[M]"), return_inverse=True
+        )
+        totals = np.bincount(owners, weights=scores)
+        counts = np.bincount(owners)
 
-        return {
-            month: statistics.mean(scores) for month, scores in monthly_data.items()
-        }
+        monthly_activity = {}
+        for month, total, count in zip(months.tolist(), totals, counts):
+            monthly_activity[f"{month.strftime('%B')} {month.year}"] = float(
+                total / count
+            )
+        return monthly_activity
 
 
 class AdvancedIntelligenceEngine:
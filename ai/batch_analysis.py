@@ -0,0 +1,497 @@
+"""
+Batch Text Analysis for Astra Bot
+Vectorized message features (NumPy) for backfills, re-profiling and periodic jobs
+
+Benchmark:    python -m ai.batch_analysis --benchmark [--messages 100000]
+"""
+
+import argparse
+import logging
+import random
+import re
+import string
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from ai.message_features import SENTIMENT_LEXICON
+
+logger = logging.getLogger("astra.ai.batch_analysis")
+
+# Messages are processed in chunks so the code point buffer stays bounded
+DEFAULT_CHUNK_SIZE = 65536
+
+# Width of the fixed-size timestamp buffer ("YYYY-MM-DDTHH:MM:SS" is 19)
+_TIMESTAMP_WIDTH = 19
+
+# Code point ranges counted as emoji (same ranges as the message feature
+# extractor, inclusive)
+_EMOJI_RANGES = ((0x1F300, 0x1FAFF), (0x2600, 0x27BF), (0x2B50, 0x2B50))
+_EMOJI_FLOOR = min(low for low, _ in _EMOJI_RANGES)
+_CUSTOM_EMOJI_PATTERN = re.compile(r"<a?:\w+:\d+>")
+
+# Words are hashed straight from code points: h = sum(code * BASE**i) mod 2**64.
+# BASE is odd, so it has an inverse mod 2**64 and any word's hash can be cut
+# out of one prefix sum over the whole chunk.
+_HASH_MODULUS = 1 << 64
+_HASH_BASE = 1_000_003
+_HASH_BASE_INVERSE = pow(_HASH_BASE, -1, _HASH_MODULUS)
+
+# ASCII letters and digits make up words
+_WORD_CODES = np.zeros(129, dtype=bool)
+_WORD_CODES[[ord(c) for c in string.ascii_letters + string.digits]] = True
+
+
+def _word_hash(word: str) -> int:
+    return (
+        sum(ord(c) * pow(_HASH_BASE, i, _HASH_MODULUS) for i, c in enumerate(word))
+        % _HASH_MODULUS
+    )
+
+
+def _lexicon_hashes(words: Iterable[str]) -> Set[int]:
+    # Plural forms count too
+    return {_word_hash(form) for word in words for form in (word, word + "s")}
+
+
+def _build_lexicon():
+    positive = _lexicon_hashes(SENTIMENT_LEXICON["positive"])
+    negative = _lexicon_hashes(SENTIMENT_LEXICON["negative"]) - positive
+    hashes = np.array(sorted(positive | negative), dtype=np.uint64)
+    signs = np.array([1 if h in positive else -1 for h in hashes.tolist()], np.int8)
+    return hashes, signs
+
+
+# Sorted hashes of every lexicon word and +1/-1 for positive/negative
+_LEXICON_HASHES, _LEXICON_SIGNS = _build_lexicon()
+
+_powers = np.ones(0, dtype=np.uint64)
+_inverse_powers = np.ones(0, dtype=np.uint64)
+
+
+def _hash_powers(count: int):
+    """BASE**i and BASE**-i (mod 2**64) for i < count, cached across chunks"""
+    global _powers, _inverse_powers
+    if len(_powers) < count:
+        size = max(count, 2 * len(_powers))
+        _powers = np.cumprod(np.full(size, _HASH_BASE, dtype=np.uint64))
+        _powers *= np.uint64(_HASH_BASE_INVERSE)
+        _inverse_powers = np.cumprod(np.full(size, _HASH_BASE_INVERSE, dtype=np.uint64))
+        _inverse_powers *= np.uint64(_HASH_BASE)
+    return _powers[:count], _inverse_powers[:count]
+
+
+def column(batch: Any, name: str) -> List[Any]:
+    """A column of a batch as a Python list.
+
+    Accepts a mapping of columns, an Arrow ``RecordBatch``/``Table`` or a
+    pandas ``DataFrame``.
+    """
+    if hasattr(batch, "column") and hasattr(batch, "schema"):
+        values = batch.column(name)
+    else:
+        values = batch[name]
+    if hasattr(values, "to_pylist"):
+        return values.to_pylist()
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+@dataclass
+class BatchFeatures:
+    """Per-message feature arrays, all of length ``count``"""
+
+    lengths: np.ndarray  # int32, characters
+    questions: np.ndarray  # bool, contains "?"
+    emoji: np.ndarray  # int32, emoji count
+    positive: np.ndarray  # int32, positive word occurrences
+    negative: np.ndarray  # int32, negative word occurrences
+    sentiment: np.ndarray  # float32, -1.0 to 1.0
+    hours: np.ndarray  # int8, hour of day or -1 when unknown
+
+    @property
+    def count(self) -> int:
+        return len(self.lengths)
+
+    def take(self, index) -> "BatchFeatures":
+        """Features of a subset of messages (slice, mask or index array)"""
+        return BatchFeatures(
+            lengths=self.lengths[index],
+            questions=self.questions[index],
+            emoji=self.emoji[index],
+            positive=self.positive[index],
+            negative=self.negative[index],
+            sentiment=self.sentiment[index],
+            hours=self.hours[index],
+        )
+
+    def hour_histogram(self) -> np.ndarray:
+        """Messages per hour of day (24 buckets, unknown hours excluded)"""
+        hours = self.hours[self.hours >= 0]
+        return np.bincount(hours, minlength=24)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate statistics over every message in the batch"""
+        count = self.count
+        return {
+            "messages": count,
+            "avg_length": float(self.lengths.mean()) if count else 0.0,
+            "question_ratio": float(self.questions.mean()) if count else 0.0,
+            "emoji_per_message": float(self.emoji.mean()) if count else 0.0,
+            "avg_sentiment": float(self.sentiment.mean()) if count else 0.0,
+            "hour_histogram": self.hour_histogram().tolist(),
+        }
+
+
+@dataclass
+class GroupedFeatures:
+    """Per-key aggregates of a batch (e.g. one row per user)"""
+
+    keys: np.ndarray
+    counts: np.ndarray  # messages per key
+    hour_histograms: np.ndarray  # shape (len(keys), 24)
+    avg_length: np.ndarray
+    question_ratio: np.ndarray
+    emoji_per_message: np.ndarray
+    avg_sentiment: np.ndarray
+
+    def to_dict(self) -> Dict[Any, Dict[str, Any]]:
+        return {
+            key.item(): {
+                "messages": int(self.counts[i]),
+                "hour_histogram": self.hour_histograms[i].tolist(),
+                "avg_length": float(self.avg_length[i]),
+                "question_ratio": float(self.question_ratio[i]),
+                "emoji_per_message": float(self.emoji_per_message[i]),
+                "avg_sentiment": float(self.avg_sentiment[i]),
+            }
+            for i, key in enumerate(self.keys)
+        }
+
+
+# ===== Timestamps =====
+
+
+def parse_hours(timestamps: Sequence[Any]) -> np.ndarray:
+    """Hour of day of each timestamp as int8 (-1 when it cannot be parsed).
+
+    ISO strings are decoded straight from a fixed-width code point buffer;
+    numeric values are treated as Unix epoch seconds. Anything else falls
+    back to ``datetime.fromisoformat`` per value. Hours are the wall-clock
+    hour as stored, like ``datetime.fromisoformat(value).hour``.
+    """
+    count = len(timestamps)
+    if count == 0:
+        return np.empty(0, dtype=np.int8)
+
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind in "iuf":
+        return ((timestamps // 3600) % 24).astype(np.int8)
+    if isinstance(timestamps[0], (int, float)):
+        return ((np.asarray(timestamps, dtype=np.float64) // 3600) % 24).astype(np.int8)
+
+    # Non-strings are converted with str(); a datetime's "YYYY-MM-DD HH:MM:SS"
+    # decodes like an ISO string and anything else fails the checks below
+    text = np.asarray(timestamps, dtype=f"U{_TIMESTAMP_WIDTH}")
+    codes = text.view(np.uint32).reshape(count, _TIMESTAMP_WIDTH)
+
+    tens, ones = codes[:, 11].astype(np.int16) - 48, codes[:, 12].astype(np.int16) - 48
+    valid = (
+        (codes[:, 4] == ord("-"))
+        & ((codes[:, 10] == ord("T")) | (codes[:, 10] == ord(" ")))
+        & (codes[:, 13] == ord(":"))
+        & (tens >= 0)
+        & (tens <= 2)
+        & (ones >= 0)
+        & (ones <= 9)
+        & (tens * 10 + ones < 24)
+    )
+    hours = np.where(valid, tens * 10 + ones, -1).astype(np.int8)
+
+    # Dates without a time, datetime objects and other oddities
+    for i in np.flatnonzero(~valid):
+        value = timestamps[i]
+        try:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            hours[i] = value.hour
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return hours
+
+
+def parse_timestamps(timestamps: Sequence[Any]) -> np.ndarray:
+    """Timestamps as ``datetime64[s]`` (NaT when they cannot be parsed).
+
+    Timezone offsets are dropped, keeping the wall-clock time as stored.
+    """
+    parsed = np.empty(len(timestamps), dtype="datetime64[s]")
+    for i, value in enumerate(timestamps):
+        try:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            parsed[i] = np.datetime64(value.replace(tzinfo=None), "s")
+        except (TypeError, ValueError, AttributeError):
+            parsed[i] = np.datetime64("NaT")
+    return parsed
+
+
+# ===== Text =====
+
+
+def _analyze_text_chunk(texts: List[str]) -> Dict[str, np.ndarray]:
+    count = len(texts)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=count)
+
+    # One buffer of code points for the whole chunk; "\0" keeps words from
+    # running into the next message
+    blob = "\0".join(texts)
+    codes = np.frombuffer(
+        blob.encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32
+    )
+    # Message index of every code point (separators go to the message before)
+    owners = np.repeat(np.arange(count, dtype=np.int32), lengths + 1)[: len(codes)]
+
+    questions = np.bincount(owners[codes == 63], minlength=count) > 0
+
+    # Emoji are rare, so only code points past the lowest range are checked
+    candidates = np.flatnonzero(codes >= _EMOJI_FLOOR)
+    candidate_codes = codes[candidates]
+    emoji_mask = np.zeros(len(candidates), dtype=bool)
+    for low, high in _EMOJI_RANGES:
+        emoji_mask |= (candidate_codes >= low) & (candidate_codes <= high)
+    emoji = np.bincount(owners[candidates[emoji_mask]], minlength=count)
+    if "<" in blob:
+        custom = [m.start() for m in _CUSTOM_EMOJI_PATTERN.finditer(blob)]
+        emoji += np.bincount(owners[custom], minlength=count)
+
+    # Sentiment words without leaving NumPy: find ASCII word runs, hash each
+    # lower-cased run from a prefix sum of code * BASE**position, and look
+    # the hashes up in the sorted lexicon
+    is_word = np.zeros(len(codes) + 2, dtype=bool)
+    is_word[1:-1] = _WORD_CODES[np.minimum(codes, 128)]
+    word_starts = np.flatnonzero(is_word[1:] > is_word[:-1])
+    word_ends = np.flatnonzero(is_word[:-1] > is_word[1:])
+
+    powers, inverse_powers = _hash_powers(len(codes))
+    prefix = np.zeros(len(codes) + 1, dtype=np.uint64)
+    np.cumsum(np.multiply(codes | 32, powers, dtype=np.uint64), out=prefix[1:])
+    word_hashes = (prefix[word_ends] - prefix[word_starts]) * inverse_powers[
+        word_starts
+    ]
+
+    slots = np.searchsorted(_LEXICON_HASHES, word_hashes)
+    np.minimum(slots, len(_LEXICON_HASHES) - 1, out=slots)
+    matched = _LEXICON_HASHES[slots] == word_hashes
+    signs = _LEXICON_SIGNS[slots[matched]]
+    matched_owners = owners[word_starts[matched]]
+    positive = np.bincount(matched_owners[signs > 0], minlength=count)
+    negative = np.bincount(matched_owners[signs < 0], minlength=count)
+
+    return {
+        "lengths": lengths.astype(np.int32),
+        "questions": questions,
+        "emoji": emoji.astype(np.int32),
+        "positive": positive.astype(np.int32),
+        "negative": negative.astype(np.int32),
+    }
+
+
+def analyze_batch(
+    contents: Sequence[Optional[str]],
+    timestamps: Optional[Sequence[Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> BatchFeatures:
+    """Analyze many messages in one vectorized pass.
+
+    ``contents`` may contain ``None`` (treated as empty). When timestamps are
+    not given every hour is -1.
+    """
+    texts = [text or "" for text in contents]
+    count = len(texts)
+
+    parts = [
+        _analyze_text_chunk(texts[offset : offset + chunk_size])
+        for offset in range(0, count, chunk_size)
+    ]
+    if parts:
+        arrays = {
+            name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+        }
+    else:
+        arrays = {
+            "lengths": np.empty(0, dtype=np.int32),
+            "questions": np.empty(0, dtype=bool),
+            "emoji": np.empty(0, dtype=np.int32),
+            "positive": np.empty(0, dtype=np.int32),
+            "negative": np.empty(0, dtype=np.int32),
+        }
+
+    total = arrays["positive"] + arrays["negative"]
+    sentiment = np.divide(
+        arrays["positive"] - arrays["negative"],
+        total,
+        out=np.zeros(count, dtype=np.float32),
+        where=total > 0,
+        casting="unsafe",
+    )
+
+    if timestamps is None:
+        hours = np.full(count, -1, dtype=np.int8)
+    else:
+        hours = parse_hours(timestamps)
+
+    return BatchFeatures(sentiment=sentiment, hours=hours, **arrays)
+
+
+def analyze_column_batch(
+    batch: Any, content_column: str = "message_content", timestamp_column: str = None
+) -> BatchFeatures:
+    """``analyze_batch`` over the columns of an Arrow/pandas/dict batch"""
+    return analyze_batch(
+        column(batch, content_column),
+        column(batch, timestamp_column) if timestamp_column else None,
+    )
+
+
+def group_features(keys: Sequence[Any], features: BatchFeatures) -> GroupedFeatures:
+    """Aggregate per-message features by key (e.g. user ID) with bincounts"""
+    unique, owners = np.unique(np.asarray(keys), return_inverse=True)
+    groups = len(unique)
+    counts = np.bincount(owners, minlength=groups)
+    safe_counts = np.maximum(counts, 1)
+
+    known = features.hours >= 0
+    hour_histograms = np.bincount(
+        owners[known] * 24 + features.hours[known], minlength=groups * 24
+    ).reshape(groups, 24)
+
+    def mean_of(values: np.ndarray) -> np.ndarray:
+        return np.bincount(owners, weights=values, minlength=groups) / safe_counts
+
+    return GroupedFeatures(
+        keys=unique,
+        counts=counts,
+        hour_histograms=hour_histograms,
+        avg_length=mean_of(features.lengths),
+        question_ratio=mean_of(features.questions),
+        emoji_per_message=mean_of(features.emoji),
+        avg_sentiment=mean_of(features.sentiment),
+    )
+
+
+def analyze_grouped(
+    keys: Sequence[Any],
+    contents: Sequence[Optional[str]],
+    timestamps: Optional[Sequence[Any]] = None,
+) -> GroupedFeatures:
+    """Analyze a batch and aggregate it per key in one pass"""
+    return group_features(keys, analyze_batch(contents, timestamps))
+
+
+# ===== Benchmark =====
+
+_SAMPLE_MESSAGES = [
+    "hey everyone, good morning! 😊",
+    "does anyone know how to fix this python error?",
+    "that was an awesome match, great job team 🎉🔥",
+    "I hate when the server lags, it's terrible",
+    "what time is the event tonight?",
+    "lol that's hilarious 😂😂",
+    "just finished the new stellaris update, really good so far",
+    "ok",
+]
+
+
+def _per_message_baseline(contents: List[str], timestamps: List[str]) -> Dict[str, Any]:
+    """The per-row loop background jobs used before the batch API"""
+    hourly = [0] * 24
+    lengths, emoji, questions, sentiment = [], [], [], []
+    positive_words = SENTIMENT_LEXICON["positive"]
+    negative_words = SENTIMENT_LEXICON["negative"]
+    for text, timestamp in zip(contents, timestamps):
+        try:
+            hourly[datetime.fromisoformat(timestamp).hour] += 1
+        except ValueError:
+            pass
+        lengths.append(len(text))
+        emoji.append(len(re.findall(r"[😀-🙏]", text)))
+        questions.append("?" in text)
+        lowered = text.lower()
+        positive = sum(1 for word in positive_words if word in lowered)
+        negative = sum(1 for word in negative_words if word in lowered)
+        total = positive + negative
+        sentiment.append((positive - negative) / total if total else 0.0)
+    return {"hourly": hourly, "lengths": lengths, "emoji": emoji}
+
+
+def run_batch_benchmark(messages: int = 100_000, seed: int = 7) -> Dict[str, float]:
+    """Compare the per-message loop with ``analyze_batch`` on synthetic data"""
+    rng = random.Random(seed)
+    start_time = datetime(2024, 1, 1)
+    contents = [rng.choice(_SAMPLE_MESSAGES) for _ in range(messages)]
+    timestamps = [
+        (start_time + timedelta(seconds=rng.randrange(90 * 86400))).isoformat()
+        for _ in range(messages)
+    ]
+
+    start = time.perf_counter()
+    baseline = _per_message_baseline(contents, timestamps)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = analyze_batch(contents, timestamps)
+    batch_seconds = time.perf_counter() - start
+
+    assert features.hour_histogram().tolist() == baseline["hourly"]
+    assert features.lengths.tolist() == baseline["lengths"]
+
+    return {
+        "messages": messages,
+        "loop_seconds": loop_seconds,
+        "batch_seconds": batch_seconds,
+        "speedup": loop_seconds / batch_seconds if batch_seconds else 0.0,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Astra batch text analysis tools")
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Run the batch analysis benchmark"
+    )
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+
+    result = run_batch_benchmark(args.messages)
+    print(
+        f"📊 {result['messages']} messages: per-message loop "
+        f"{result['loop_seconds']:.2f}s, batch {result['batch_seconds']:.2f}s "
+        f"({result['speedup']:.1f}x)"
+    )
+    return 0
+
+
+__all__ = [
+    "BatchFeatures",
+    "GroupedFeatures",
+    "analyze_batch",
+    "analyze_column_batch",
+    "analyze_grouped",
+    "group_features",
+    "parse_hours",
+    "parse_timestamps",
+    "column",
+    "run_batch_benchmark",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,8 @@ from pathlib import Path
 import sqlite3
 import re
 
+from utils.storage_engine import get_storage
+
 logger = logging.getLogger("astra.personality_core")
 
 
@@ -444,6 +446,7 @@ class PersonalityCore:
         self.user_personalities: Dict[int, PersonalityTraits] = {}
 
         self._setup_database()
+        self.storage = get_storage(self.db_path)
         logger.info("AstraBot Personality Core initialized")
 
     def _setup_database(self):
@@ -611,24 +614,22 @@ class PersonalityCore:
         """Update interaction history in database"""
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO personality_interactions 
-                    (user_id, interaction_type, user_tone, topic_category, response_style, effectiveness_score, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        user_id,
-                        question_type,
-                        user_tone,
-                        topic_category,
-                        "adaptive",
-                        0.8,
-                        datetime.now(timezone.utc).isoformat(),
-                    ),
-                )
-                conn.commit()
+            await self.storage.execute(
+                """
+                INSERT OR REPLACE INTO personality_interactions 
+                (user_id, interaction_type, user_tone, topic_category, response_style, effectiveness_score, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    user_id,
+                    question_type,
+                    user_tone,
+                    topic_category,
+                    "adaptive",
+                    0.8,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
 
         except Exception as e:
             logger.error(f"Failed to update interaction history: {e}")
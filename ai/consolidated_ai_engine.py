@@ -59,16 +59,13 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
-# ML imports with fallbacks
-try:
-    import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+# ML availability - checked without importing scikit-learn/NumPy at startup
+import importlib.util
 
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
-    np = None
+ML_AVAILABLE = (
+    importlib.util.find_spec("sklearn") is not None
+    and importlib.util.find_spec("numpy") is not None
+)
 
 # AI Provider imports
 try:
@@ -101,6 +98,25 @@ try:
 except ImportError:
     PERSONALITY_EVOLUTION_AVAILABLE = False
 
+from utils.bounded_store import BoundedStore, get_store_stats
+from utils.retention import RetentionJob, retention_scheduler
+from utils.storage_engine import get_storage
+from ai.message_features import (
+    extract_features,
+    prefilter_pattern,
+    register_lexicon,
+)
+from ai.prompt_budget import (
+    PromptSection,
+    prompt_assembler,
+    estimate_message_tokens,
+    PRIORITY_CORE,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+    PRIORITY_OPTIONAL,
+)
+
 try:
     from ai.openrouter_client import OpenRouterClient
 
@@ -205,7 +221,7 @@ class EmotionalContext:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     """Comprehensive user profile with behavioral patterns"""
 
@@ -505,8 +521,31 @@ class AdvancedSentimentAnalyzer:
             "slightly": 0.6,
         }
 
-    def analyze_sentiment(self, text: str) -> Tuple[ConversationMood, float, float]:
+        # Keywords go through the shared lexicon engine; patterns compile once
+        register_lexicon(
+            "sentiment.moods",
+            {
+                mood.value: patterns["keywords"]
+                for mood, patterns in self.emotion_patterns.items()
+            },
+        )
+        register_lexicon(
+            "sentiment.modifiers",
+            {modifier: [modifier] for modifier in self.intensity_modifiers},
+        )
+        self._compiled_patterns = {
+            mood: [
+                prefilter_pattern(pattern, re.IGNORECASE)
+                for pattern in patterns["patterns"]
+            ]
+            for mood, patterns in self.emotion_patterns.items()
+        }
+
+    def analyze_sentiment(
+        self, text: str, message_id: Optional[int] = None
+    ) -> Tuple[ConversationMood, float, float]:
         """Analyze sentiment with mood, intensity, and confidence scores"""
+        features = extract_features(text, message_id)
         text_lower = text.lower()
         mood_scores = defaultdict(float)
 
@@ -515,23 +554,26 @@ class AdvancedSentimentAnalyzer:
             score = patterns["intensity_base"]
 
             # Keyword matching
-            keyword_matches = sum(
-                1 for keyword in patterns["keywords"] if keyword in text_lower
-            )
+            keyword_matches = features.count("sentiment.moods", mood.value)
             if keyword_matches > 0:
                 mood_scores[mood] += score * keyword_matches * 0.3
 
-            # Pattern matching
-            for pattern in patterns["patterns"]:
-                matches = len(re.findall(pattern, text, re.IGNORECASE))
+            # Pattern matching (skipped when a required literal is missing)
+            for literals, pattern in self._compiled_patterns[mood]:
+                if literals and not any(lit in text_lower for lit in literals):
+                    continue
+                if pattern is None:
+                    matches = sum(text_lower.count(lit) for lit in literals)
+                else:
+                    matches = len(pattern.findall(text))
                 if matches > 0:
                     mood_scores[mood] += score * matches * 0.2
 
         # Apply intensity modifiers
-        for modifier, multiplier in self.intensity_modifiers.items():
-            if modifier in text_lower:
-                for mood in mood_scores:
-                    mood_scores[mood] *= multiplier
+        for modifier in features.matched("sentiment.modifiers"):
+            multiplier = self.intensity_modifiers[modifier]
+            for mood in mood_scores:
+                mood_scores[mood] *= multiplier
 
         # Punctuation analysis
         exclamation_count = text.count("!")
@@ -700,7 +742,15 @@ class ConsolidatedAIEngine:
 
         # Conversation management (fallback system)
         self.conversations: Dict[int, ConversationContext] = {}
-        self.user_profiles: Dict[int, UserProfile] = {}
+        # Profiles are persisted with every saved conversation, so evicted
+        # ones reload from the database
+        self.user_profiles: BoundedStore = BoundedStore(
+            "engine.user_profiles", max_entries=5000, ttl=6 * 3600
+        )
+
+        # Prompt assembly bookkeeping for per-request metrics
+        self._last_prompt_assembly = None
+        self._last_history_dropped = 0
 
         # Performance tracking
         self.performance_metrics = {
@@ -715,6 +765,7 @@ class ConsolidatedAIEngine:
         self.db_path = Path("data/consolidated_ai.db")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._initialize_database()
+        self.storage = get_storage(self.db_path)
 
         # Thread pool for CPU-intensive operations
         self.thread_pool = ThreadPoolExecutor(max_workers=4)
@@ -1265,16 +1316,15 @@ class ConsolidatedAIEngine:
         if cached_profile:
             # Reconstruct profile from cache
             profile = UserProfile(**cached_profile)
-            self.user_profiles[user_id] = profile
+            self.user_profiles.put(user_id, profile, dirty=False)
             return profile
 
         if user_id not in self.user_profiles:
             # Try loading from database
             profile_data = await self._load_user_profile_from_db(user_id)
-            if profile_data:
-                self.user_profiles[user_id] = profile_data
-            else:
-                self.user_profiles[user_id] = UserProfile(user_id=user_id)
+            self.user_profiles.put(
+                user_id, profile_data or UserProfile(user_id=user_id), dirty=False
+            )
 
         profile = self.user_profiles[user_id]
 
@@ -1296,36 +1346,32 @@ class ConsolidatedAIEngine:
     async def _load_user_profile_from_db(self, user_id: int) -> Optional[UserProfile]:
         """Load user profile from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT display_name, total_interactions, preferred_topics,
-                           communication_style, emotional_baseline, engagement_score,
-                           interaction_frequency, conversation_success_rate, last_interaction
-                    FROM user_profiles WHERE user_id = ?
-                """,
-                    (user_id,),
+            row = await self.storage.fetch_one(
+                """
+                SELECT display_name, total_interactions, preferred_topics,
+                       communication_style, emotional_baseline, engagement_score,
+                       interaction_frequency, conversation_success_rate, last_interaction
+                FROM user_profiles WHERE user_id = ?
+            """,
+                (user_id,),
+            )
+            if row:
+                return UserProfile(
+                    user_id=user_id,
+                    display_name=row[0] or "",
+                    total_interactions=row[1] or 0,
+                    preferred_topics=json.loads(row[2]) if row[2] else {},
+                    communication_style=row[3] or "casual",
+                    emotional_baseline=row[4] or 0.5,
+                    engagement_score=row[5] or 0.5,
+                    interaction_frequency=row[6] or 0.0,
+                    conversation_success_rate=row[7] or 0.5,
+                    last_interaction=(
+                        datetime.fromisoformat(row[8])
+                        if row[8]
+                        else datetime.now(timezone.utc)
+                    ),
                 )
-
-                row = cursor.fetchone()
-                if row:
-                    return UserProfile(
-                        user_id=user_id,
-                        display_name=row[0] or "",
-                        total_interactions=row[1] or 0,
-                        preferred_topics=json.loads(row[2]) if row[2] else {},
-                        communication_style=row[3] or "casual",
-                        emotional_baseline=row[4] or 0.5,
-                        engagement_score=row[5] or 0.5,
-                        interaction_frequency=row[6] or 0.0,
-                        conversation_success_rate=row[7] or 0.5,
-                        last_interaction=(
-                            datetime.fromisoformat(row[8])
-                            if row[8]
-                            else datetime.now(timezone.utc)
-                        ),
-                    )
         except Exception as e:
             logger.warning(f"Failed to load user profile for {user_id}: {e}")
 
@@ -1379,6 +1425,7 @@ class ConsolidatedAIEngine:
         style = self.flow_engine.get_conversation_style(context, user_profile)
 
         # Build enhanced system prompt with context manager data, personality, and intelligence insights
+        assembly_start = time.perf_counter()
         system_prompt = self._build_enhanced_system_prompt(
             context,
             user_profile,
@@ -1387,10 +1434,21 @@ class ConsolidatedAIEngine:
             personality_context,
             intelligence_insights,
         )
+        assembled = self._last_prompt_assembly
 
         # Prepare messages
         messages = self._prepare_messages(context, system_prompt)
 
+        # Emit per-request prompt size and assembly time
+        prompt_assembler.metrics.record(
+            source="consolidated_engine",
+            prompt_tokens=estimate_message_tokens(messages),
+            assembly_ms=(time.perf_counter() - assembly_start) * 1000,
+            dropped_sections=len(assembled.dropped) if assembled else 0,
+            truncated_sections=len(assembled.truncated) if assembled else 0,
+            dropped_messages=self._last_history_dropped,
+        )
+
         # Try providers in order
         for provider in [self.active_provider] + [
             p for p in self.ai_providers.keys() if p != self.active_provider
@@ -1473,6 +1531,12 @@ class ConsolidatedAIEngine:
     ) -> str:
         """Build enhanced system prompt with context manager insights, personality evolution, and advanced intelligence"""
 
+        # Sections are budgeted by priority, so low-value guidance is dropped first
+        sections: List[PromptSection] = []
+
+        def add_section(name: str, text: str, priority: int = PRIORITY_NORMAL):
+            sections.append(PromptSection(name=name, content=text, priority=priority))
+
         # Base prompt with context awareness, personality evolution, and advanced intelligence
         base_prompt = """You are Astra, an intelligent AI assistant that naturally understands conversations and responds authentically. Your primary goal is to match the conversation's vibe, style, and flow perfectly.
 
@@ -1496,21 +1560,39 @@ Advanced capabilities:
 - Predictive engagement based on conversation patterns
 
 Always respond in a way that feels like a natural continuation of the conversation, matching the exact style and tone of the messages around you."""
+        sections.append(
+            PromptSection(
+                name="base",
+                content=base_prompt,
+                priority=PRIORITY_CORE,
+                truncatable=False,
+            )
+        )
 
         # Add personality evolution context if available
         if personality_context:
             personality_summary = personality_context.get("personality_summary", "")
             if personality_summary:
-                base_prompt += (
-                    f"\n\nCurrent personality for this server: {personality_summary}"
+                add_section(
+                    "personality",
+                    f"Current personality for this server: {personality_summary}",
+                    PRIORITY_HIGH,
                 )
 
             # Add formality level guidance
             formality_level = personality_context.get("formality_level", 0.5)
             if formality_level > 0.7:
-                base_prompt += "\n\nThis server prefers more formal communication. Use professional language and structured responses."
+                add_section(
+                    "formality",
+                    "This server prefers more formal communication. Use professional language and structured responses.",
+                    PRIORITY_NORMAL,
+                )
             elif formality_level < 0.3:
-                base_prompt += "\n\nThis server is very casual. Use relaxed, informal language and feel free to be more conversational."
+                add_section(
+                    "formality",
+                    "This server is very casual. Use relaxed, informal language and feel free to be more conversational.",
+                    PRIORITY_NORMAL,
+                )
 
             # Add humor style guidance
             humor_style = personality_context.get("humor_style", {})
@@ -1527,27 +1609,51 @@ Always respond in a way that feels like a natural continuation of the conversati
                         "witty": "This server appreciates clever, witty humor. Use intelligent wordplay and clever observations.",
                     }
                     if dominant_humor[0] in humor_guidance:
-                        base_prompt += f"\n\n{humor_guidance[dominant_humor[0]]}"
+                        add_section(
+                            "humor_style",
+                            f"{humor_guidance[dominant_humor[0]]}",
+                            PRIORITY_LOW,
+                        )
 
             # Add social energy guidance
             social_energy = personality_context.get("social_energy", 0.5)
             if social_energy > 0.7:
-                base_prompt += "\n\nThis server has high social energy. Be enthusiastic, upbeat, and match their excitement."
+                add_section(
+                    "social_energy",
+                    "This server has high social energy. Be enthusiastic, upbeat, and match their excitement.",
+                    PRIORITY_LOW,
+                )
             elif social_energy < 0.3:
-                base_prompt += "\n\nThis server prefers calmer interactions. Be thoughtful, measured, and gentle in your responses."
+                add_section(
+                    "social_energy",
+                    "This server prefers calmer interactions. Be thoughtful, measured, and gentle in your responses.",
+                    PRIORITY_LOW,
+                )
 
             # Add communication density guidance
             comm_density = personality_context.get("communication_density", 0.5)
             if comm_density > 0.7:
-                base_prompt += "\n\nThis server appreciates detailed, comprehensive responses. Provide thorough explanations and rich context."
+                add_section(
+                    "response_density",
+                    "This server appreciates detailed, comprehensive responses. Provide thorough explanations and rich context.",
+                    PRIORITY_NORMAL,
+                )
             elif comm_density < 0.3:
-                base_prompt += "\n\nThis server prefers brief, concise responses. Keep answers short and to the point."
+                add_section(
+                    "response_density",
+                    "This server prefers brief, concise responses. Keep answers short and to the point.",
+                    PRIORITY_NORMAL,
+                )
 
             # Add learned cultural elements
             preferred_emojis = personality_context.get("preferred_emojis", [])
             if preferred_emojis:
                 recent_emojis = " ".join(preferred_emojis[-5:])  # Last 5 emojis
-                base_prompt += f"\n\nThis server commonly uses these emojis: {recent_emojis}. Use them naturally when appropriate."
+                add_section(
+                    "server_emojis",
+                    f"This server commonly uses these emojis: {recent_emojis}. Use them naturally when appropriate.",
+                    PRIORITY_OPTIONAL,
+                )
 
             # Add user-specific relationship context
             user_relationship = personality_context.get("user_relationship")
@@ -1556,20 +1662,36 @@ Always respond in a way that feels like a natural continuation of the conversati
                     "relationship_strength", 0.1
                 )
                 if relationship_strength > 0.6:
-                    base_prompt += "\n\nYou have a strong relationship with this user. Feel comfortable being more personal and referencing shared experiences."
+                    add_section(
+                        "relationship",
+                        "You have a strong relationship with this user. Feel comfortable being more personal and referencing shared experiences.",
+                        PRIORITY_NORMAL,
+                    )
                 elif relationship_strength > 0.3:
-                    base_prompt += "\n\nYou're building a good relationship with this user. Show familiarity while continuing to learn about them."
+                    add_section(
+                        "relationship",
+                        "You're building a good relationship with this user. Show familiarity while continuing to learn about them.",
+                        PRIORITY_NORMAL,
+                    )
 
                 # Add personal interests if known
                 interests = user_relationship.get("interests", [])
                 if interests:
                     interests_str = ", ".join(interests[:3])  # Top 3 interests
-                    base_prompt += f"\n\nThis user is interested in: {interests_str}. Reference these interests when relevant."
+                    add_section(
+                        "user_interests",
+                        f"This user is interested in: {interests_str}. Reference these interests when relevant.",
+                        PRIORITY_LOW,
+                    )
 
                 # Add personal references
                 personal_refs = user_relationship.get("personal_references", [])
                 if personal_refs:
-                    base_prompt += f"\n\nYou have {len(personal_refs)} personal memories with this user. Draw on shared experiences when appropriate."
+                    add_section(
+                        "personal_memories",
+                        f"You have {len(personal_refs)} personal memories with this user. Draw on shared experiences when appropriate.",
+                        PRIORITY_OPTIONAL,
+                    )
 
         # Add context manager insights if available
         if message_context:
@@ -1587,8 +1709,10 @@ Always respond in a way that feels like a natural continuation of the conversati
             if hasattr(message_context, "tone"):
                 tone_key = message_context.tone.value
                 if tone_key in tone_guidance:
-                    base_prompt += (
-                        f"\n\nCurrent conversation tone: {tone_guidance[tone_key]}"
+                    add_section(
+                        "tone",
+                        f"Current conversation tone: {tone_guidance[tone_key]}",
+                        PRIORITY_HIGH,
                     )
 
             # Humor detection
@@ -1596,14 +1720,22 @@ Always respond in a way that feels like a natural continuation of the conversati
                 hasattr(message_context, "humor_score")
                 and message_context.humor_score > 0.3
             ):
-                base_prompt += f"\n\nHumor detected (score: {message_context.humor_score:.2f}). The user is being playful or funny. Respond with appropriate humor and wit."
+                add_section(
+                    "humor_detected",
+                    f"Humor detected (score: {message_context.humor_score:.2f}). The user is being playful or funny. Respond with appropriate humor and wit.",
+                    PRIORITY_NORMAL,
+                )
 
             # Emotional intensity
             if (
                 hasattr(message_context, "emotional_intensity")
                 and message_context.emotional_intensity > 0.7
             ):
-                base_prompt += f"\n\nHigh emotional intensity detected. The user has strong feelings about this topic. Be empathetic and understanding."
+                add_section(
+                    "emotional_intensity",
+                    f"High emotional intensity detected. The user has strong feelings about this topic. Be empathetic and understanding.",
+                    PRIORITY_HIGH,
+                )
 
             # Response triggers
             if hasattr(message_context, "response_triggers"):
@@ -1620,27 +1752,49 @@ Always respond in a way that feels like a natural continuation of the conversati
                         trigger.value if hasattr(trigger, "value") else str(trigger)
                     )
                     if trigger_key in trigger_guidance:
-                        base_prompt += f"\n\n{trigger_guidance[trigger_key]}"
+                        add_section(
+                            "response_trigger",
+                            f"{trigger_guidance[trigger_key]}",
+                            PRIORITY_NORMAL,
+                        )
 
         # User familiarity and preferences
         if user_profile.total_interactions > 0:
             if user_profile.total_interactions > 20:
-                base_prompt += f"\n\nYou've had {user_profile.total_interactions} interactions with this user. Build on your shared conversation history naturally."
+                add_section(
+                    "familiarity",
+                    f"You've had {user_profile.total_interactions} interactions with this user. Build on your shared conversation history naturally.",
+                    PRIORITY_LOW,
+                )
             elif user_profile.total_interactions > 5:
-                base_prompt += "\n\nYou're becoming familiar with this user. Reference past conversations when relevant."
+                add_section(
+                    "familiarity",
+                    "You're becoming familiar with this user. Reference past conversations when relevant.",
+                    PRIORITY_LOW,
+                )
 
             # Communication style preferences
             if user_profile.communication_style == "casual":
-                base_prompt += "\n\nThis user prefers casual, relaxed conversation."
+                add_section(
+                    "user_style",
+                    "This user prefers casual, relaxed conversation.",
+                    PRIORITY_NORMAL,
+                )
             elif user_profile.communication_style == "formal":
-                base_prompt += (
-                    "\n\nThis user appreciates more structured, professional responses."
+                add_section(
+                    "user_style",
+                    "This user appreciates more structured, professional responses.",
+                    PRIORITY_NORMAL,
                 )
 
         # Topic awareness
         if context.active_topics:
             topics_str = ", ".join(context.active_topics)
-            base_prompt += f"\n\nCurrent conversation topics: {topics_str}. Stay relevant and engaged with these topics."
+            add_section(
+                "topics",
+                f"Current conversation topics: {topics_str}. Stay relevant and engaged with these topics.",
+                PRIORITY_LOW,
+            )
 
         # Response style guidance based on message context
         if message_context and hasattr(message_context, "suggested_response_style"):
@@ -1656,36 +1810,64 @@ Always respond in a way that feels like a natural continuation of the conversati
 
             style_key = message_context.suggested_response_style
             if style_key in style_guidance:
-                base_prompt += f"\n\n{style_guidance[style_key]}"
+                add_section(
+                    "response_style", f"{style_guidance[style_key]}", PRIORITY_NORMAL
+                )
 
         # Add advanced intelligence insights if available
         if intelligence_insights:
             # Add wellness alerts if any
             wellness_alerts = intelligence_insights.get("wellness_alerts", [])
             if wellness_alerts:
-                base_prompt += "\n\nWellness Notice: Be extra caring and supportive - the advanced intelligence system has detected this user may benefit from additional support."
+                add_section(
+                    "wellness",
+                    "Wellness Notice: Be extra caring and supportive - the advanced intelligence system has detected this user may benefit from additional support.",
+                    PRIORITY_HIGH,
+                )
 
             # Add mood context
             mood_changes = intelligence_insights.get("mood_changes", {})
             if mood_changes:
                 current_mood = mood_changes.get("new_mood", "")
                 if current_mood:
-                    base_prompt += f"\n\nCommunity Mood: The overall community mood is currently {current_mood}. Adjust your response to complement and enhance the positive atmosphere."
+                    add_section(
+                        "community_mood",
+                        f"Community Mood: The overall community mood is currently {current_mood}. Adjust your response to complement and enhance the positive atmosphere.",
+                        PRIORITY_OPTIONAL,
+                    )
 
             # Add predictions if relevant
             predictions = intelligence_insights.get("predictions", [])
             for prediction in predictions[:1]:  # Only use the most relevant prediction
                 if hasattr(prediction, "suggested_actions"):
-                    base_prompt += f"\n\nCommunity Insight: {prediction.description} Consider this context in your response."
+                    add_section(
+                        "community_insight",
+                        f"Community Insight: {prediction.description} Consider this context in your response.",
+                        PRIORITY_OPTIONAL,
+                    )
 
             # Add sage insights
             sage_insights = intelligence_insights.get("sage_insights", [])
             if sage_insights:
-                base_prompt += f"\n\nSage Wisdom Available: You have access to deep community insights. If appropriate, subtly incorporate wisdom about community dynamics and growth."
+                add_section(
+                    "sage_wisdom",
+                    f"Sage Wisdom Available: You have access to deep community insights. If appropriate, subtly incorporate wisdom about community dynamics and growth.",
+                    PRIORITY_OPTIONAL,
+                )
 
-        base_prompt += "\n\nRespond naturally and authentically. No need for forced personality traits - just be helpful, engaging, and appropriate to the conversation context."
+        add_section(
+            "closing",
+            "Respond naturally and authentically. No need for forced personality traits - just be helpful, engaging, and appropriate to the conversation context.",
+            PRIORITY_CORE,
+        )
 
-        return base_prompt
+        # Fit everything into the system prompt token budget
+        assembled = prompt_assembler.assemble(
+            sections, budget=self.config.get("system_prompt_token_budget")
+        )
+        self._last_prompt_assembly = assembled
+
+        return assembled.text
 
     def _post_process_response_enhanced(
         self,
@@ -1842,18 +2024,21 @@ Key principles:
         """Prepare messages for AI provider with intelligent truncation"""
         messages = [{"role": "system", "content": system_prompt}]
 
-        # Add important messages first
-        for msg in context.important_messages[-3:]:  # Last 3 important messages
-            messages.append({"role": msg["role"], "content": msg["content"]})
+        # Important messages first, then recent history without duplicates
+        important = context.important_messages[-3:]  # Last 3 important messages
+        history = list(important)
+        for msg in list(context.messages)[-8:]:  # Last 8 messages
+            if msg not in important:
+                history.append(msg)
 
-        # Add recent conversation history
-        recent_messages = list(context.messages)[-8:]  # Last 8 messages
+        # Drop or summarize lowest-value turns to stay within the history budget
+        fitted = prompt_assembler.fit_history(
+            history, budget=self.config.get("history_token_budget")
+        )
+        self._last_history_dropped = fitted.dropped_count
 
-        for msg in recent_messages:
-            if msg not in [
-                m for m in context.important_messages[-3:]
-            ]:  # Avoid duplicates
-                messages.append({"role": msg["role"], "content": msg["content"]})
+        for msg in fitted.messages:
+            messages.append({"role": msg["role"], "content": msg["content"]})
 
         return messages
 
@@ -1962,70 +2147,67 @@ Key principles:
     ):
         """Save conversation to database asynchronously"""
         try:
+            # Snapshot everything on the loop; the writer thread only sees plain rows
+            conversation_row = (
+                context.user_id,
+                context.guild_id,
+                context.channel_id,
+                message,
+                response,
+                mood.value,
+                intensity,
+                confidence,
+                json.dumps(topics),
+                engagement_delta,
+                response_time,
+                self.active_provider.value if self.active_provider else "unknown",
+            )
+            profile_row = None
+            user_profile = self.user_profiles.peek(context.user_id)
+            if user_profile:
+                profile_row = (
+                    user_profile.user_id,
+                    user_profile.display_name,
+                    user_profile.total_interactions,
+                    json.dumps(user_profile.preferred_topics),
+                    user_profile.communication_style,
+                    user_profile.emotional_baseline,
+                    user_profile.engagement_score,
+                    user_profile.interaction_frequency,
+                    user_profile.conversation_success_rate,
+                    user_profile.last_interaction.isoformat(),
+                    datetime.now(timezone.utc).isoformat(),
+                )
 
-            def save_to_db():
-                with sqlite3.connect(self.db_path) as conn:
-                    # Save conversation
+            def save_to_db(conn):
+                # Save conversation
+                conn.execute(
+                    """
+                    INSERT INTO conversations 
+                    (user_id, guild_id, channel_id, message_content, response_content,
+                     mood, intensity, confidence, topics, engagement_score, 
+                     response_time_ms, provider)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    conversation_row,
+                )
+
+                # Update user profile
+                if profile_row:
                     conn.execute(
                         """
-                        INSERT INTO conversations 
-                        (user_id, guild_id, channel_id, message_content, response_content,
-                         mood, intensity, confidence, topics, engagement_score, 
-                         response_time_ms, provider)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        INSERT OR REPLACE INTO user_profiles
+                        (user_id, display_name, total_interactions, preferred_topics,
+                         communication_style, emotional_baseline, engagement_score,
+                         interaction_frequency, conversation_success_rate, 
+                         last_interaction, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
-                        (
-                            context.user_id,
-                            context.guild_id,
-                            context.channel_id,
-                            message,
-                            response,
-                            mood.value,
-                            intensity,
-                            confidence,
-                            json.dumps(topics),
-                            engagement_delta,
-                            response_time,
-                            (
-                                self.active_provider.value
-                                if self.active_provider
-                                else "unknown"
-                            ),
-                        ),
+                        profile_row,
                     )
 
-                    # Update user profile
-                    user_profile = self.user_profiles.get(context.user_id)
-                    if user_profile:
-                        conn.execute(
-                            """
-                            INSERT OR REPLACE INTO user_profiles
-                            (user_id, display_name, total_interactions, preferred_topics,
-                             communication_style, emotional_baseline, engagement_score,
-                             interaction_frequency, conversation_success_rate, 
-                             last_interaction, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                            (
-                                user_profile.user_id,
-                                user_profile.display_name,
-                                user_profile.total_interactions,
-                                json.dumps(user_profile.preferred_topics),
-                                user_profile.communication_style,
-                                user_profile.emotional_baseline,
-                                user_profile.engagement_score,
-                                user_profile.interaction_frequency,
-                                user_profile.conversation_success_rate,
-                                user_profile.last_interaction.isoformat(),
-                                datetime.now(timezone.utc).isoformat(),
-                            ),
-                        )
-
-                    conn.commit()
-
-            # Run database operation in thread pool
-            # Run database operation in thread pool
-            await asyncio.get_event_loop().run_in_executor(self.thread_pool, save_to_db)
+            # Single writer commits this together with other pending writes
+            await self.storage.transaction(save_to_db)
 
         except Exception as e:
             logger.error(f"Failed to save conversation: {e}")
@@ -2050,6 +2232,8 @@ Key principles:
                 "provider_usage": dict(self.performance_metrics["provider_usage"]),
             },
             "cache_performance": cache_stats,
+            "prompt_assembly": prompt_assembler.get_stats(),
+            "state_stores": get_store_stats(),
             "conversation_stats": {
                 "active_conversations": len(self.conversations),
                 "total_users": len(self.user_profiles),
@@ -2063,33 +2247,33 @@ Key principles:
     async def cleanup_old_data(self, days_to_keep: int = 30):
         """Clean up old conversation data to maintain performance"""
         try:
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
-
-            def cleanup_db():
-                with sqlite3.connect(self.db_path) as conn:
-                    # Clean old conversations
-                    conn.execute(
-                        """
-                        DELETE FROM conversations 
-                        WHERE created_at < ?
-                    """,
-                        (cutoff_date.isoformat(),),
-                    )
-
-                    # Clean old performance metrics
-                    conn.execute(
-                        """
-                        DELETE FROM performance_metrics 
-                        WHERE timestamp < ?
-                    """,
-                        (cutoff_date.isoformat(),),
-                    )
-
-                    # Vacuum database to reclaim space
-                    conn.execute("VACUUM")
-                    conn.commit()
-
-            await asyncio.get_event_loop().run_in_executor(self.thread_pool, cleanup_db)
+            cutoff = (
+                datetime.now(timezone.utc) - timedelta(days=days_to_keep)
+            ).isoformat()
+
+            # Chunked deletes through the writer instead of one long
+            # DELETE + VACUUM that locks the file; the closing incremental
+            # vacuum (auto_vacuum is switched to INCREMENTAL on the first run)
+            # returns the freed pages to the filesystem
+            await retention_scheduler.run_jobs(
+                [
+                    RetentionJob(
+                        name="consolidated_ai.conversations",
+                        db_path=self.db_path,
+                        table="conversations",
+                        where="created_at < ?",
+                        params=(cutoff,),
+                    ),
+                    RetentionJob(
+                        name="consolidated_ai.performance_metrics",
+                        db_path=self.db_path,
+                        table="performance_metrics",
+                        where="timestamp < ?",
+                        params=(cutoff,),
+                        incremental_vacuum_pages=2000,
+                    ),
+                ]
+            )
             logger.info(f"Cleaned up data older than {days_to_keep} days")
 
         except Exception as e:
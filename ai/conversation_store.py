@@ -0,0 +1,405 @@
+"""
+Conversation Turn Store for Astra Bot
+One row per turn with cached rolling windows per active conversation
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.bounded_store import BoundedStore
+from utils.retention import RetentionJob, retention_scheduler
+from utils.storage_engine import get_storage
+from utils.write_buffer import BufferedWriter
+
+logger = logging.getLogger("astra.conversation_store")
+
+DEFAULT_DB_PATH = Path("data/conversation_turns.db")
+
+# Older versions kept per-channel "conversation_contexts" blobs in the main
+# database's key-value row (guild_settings, guild_id 0)
+LEGACY_DB_PATH = Path("data/astra.db")
+LEGACY_CONTEXT_PREFIX = "conversation_contexts_"
+
+# A conversation is one user in one channel (guild/channel 0 for DMs)
+ConversationKey = Tuple[int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL DEFAULT 0,
+    channel_id INTEGER NOT NULL DEFAULT 0,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_conversation_turns_window
+    ON conversation_turns (user_id, guild_id, channel_id, ts);
+CREATE INDEX IF NOT EXISTS idx_conversation_turns_ts
+    ON conversation_turns (ts);
+CREATE TABLE IF NOT EXISTS conversation_store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def conversation_key(
+    user_id: int, guild_id: Optional[int] = None, channel_id: Optional[int] = None
+) -> ConversationKey:
+    return (int(user_id), int(guild_id or 0), int(channel_id or 0))
+
+
+def _to_epoch(timestamp: Union[None, float, str, datetime]) -> float:
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return time.time()
+    if timestamp.tzinfo is None:
+        # Naive timestamps in this codebase come from datetime.now()
+        return timestamp.timestamp()
+    return timestamp.astimezone(timezone.utc).timestamp()
+
+
+def _turn_identity(role: str, content: str, ts: float) -> Tuple[str, str, float]:
+    # Millisecond precision survives the ISO timestamp round trip
+    return (role, content, round(ts, 3))
+
+
+def _legacy_turns(blob: Dict[str, Any]) -> List[Tuple]:
+    """(user_id, guild_id, channel_id, role, content, ts) rows of a legacy blob.
+
+    Blobs are per channel; bot messages belong to the user who spoke last.
+    """
+    rows = []
+    last_user = None
+    for msg in blob.get("messages", []):
+        if not isinstance(msg, dict) or not msg.get("content"):
+            continue
+        author = msg.get("user_id")
+        role = msg.get("role")
+        if role not in ("user", "assistant"):
+            is_bot = author in (None, "bot") or msg.get("username") == "Bot"
+            role = "assistant" if is_bot else "user"
+        if role == "user" and isinstance(author, int):
+            last_user = author
+        if last_user is None:
+            continue
+        key = conversation_key(
+            last_user,
+            msg.get("guild_id", blob.get("guild_id")),
+            msg.get("channel_id", blob.get("channel_id")),
+        )
+        rows.append((*key, role, msg["content"], _to_epoch(msg.get("timestamp"))))
+    return rows
+
+
+def _turn(role: str, content: str, ts: float) -> Dict[str, Any]:
+    return {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+    }
+
+
+class ConversationStore:
+    """Normalized conversation history with an in-memory window per conversation.
+
+    Appends go to the window (when it is cached) and to a buffered
+    ``executemany`` writer. Reading a window that is not cached is a single
+    range read on the (user_id, guild_id, channel_id, ts) index.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path] = DEFAULT_DB_PATH,
+        window_size: int = 20,
+        max_windows: int = 2000,
+        window_ttl: float = 3600,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.window_size = window_size
+        self._setup_database()
+
+        self.storage = get_storage(self.db_path)
+        self.writer = BufferedWriter(
+            self.storage,
+            """
+            INSERT INTO conversation_turns
+            (user_id, guild_id, channel_id, role, content, ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            name="conversation turns",
+        )
+        # Windows mirror the database, so evicting one loses nothing
+        self.windows = BoundedStore(
+            "conversation.windows", max_entries=max_windows, ttl=window_ttl
+        )
+
+        self.stats = {"appends": 0, "window_hits": 0, "window_reads": 0}
+
+    def _setup_database(self):
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executescript(_SCHEMA)
+                self._migrate_legacy_contexts(conn)
+        except Exception as e:
+            logger.error(f"❌ Conversation store setup error: {e}")
+
+    def _migrate_legacy_contexts(self, conn: sqlite3.Connection):
+        """Copy the old conversation_contexts blobs into turns (once)"""
+        done = conn.execute(
+            "SELECT 1 FROM conversation_store_meta WHERE key = 'legacy_migrated'"
+        ).fetchone()
+        if done:
+            return
+
+        rows = []
+        if (
+            LEGACY_DB_PATH.exists()
+            and LEGACY_DB_PATH.resolve() != self.db_path.resolve()
+        ):
+            with sqlite3.connect(LEGACY_DB_PATH) as legacy:
+                try:
+                    row = legacy.execute(
+                        "SELECT settings FROM guild_settings WHERE guild_id = 0"
+                    ).fetchone()
+                except sqlite3.OperationalError:
+                    row = None
+            settings = json.loads(row[0]) if row and row[0] else {}
+            seen = set()
+            for name, blob in settings.items():
+                if not name.startswith(LEGACY_CONTEXT_PREFIX) or not isinstance(
+                    blob, dict
+                ):
+                    continue
+                for turn in _legacy_turns(blob):
+                    # The same message can sit in more than one blob
+                    if turn not in seen:
+                        seen.add(turn)
+                        rows.append(turn)
+
+        conn.executemany(
+            """
+            INSERT INTO conversation_turns
+            (user_id, guild_id, channel_id, role, content, ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            sorted(rows, key=lambda row: row[5]),
+        )
+        conn.execute(
+            "INSERT INTO conversation_store_meta (key, value) VALUES (?, ?)",
+            ("legacy_migrated", str(time.time())),
+        )
+        conn.commit()
+        if rows:
+            logger.info(f"📦 Migrated {len(rows)} legacy conversation turns")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    async def append(
+        self,
+        user_id: int,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        role: str,
+        content: str,
+        timestamp: Union[None, float, str, datetime] = None,
+    ):
+        """Append one turn to a conversation"""
+        await self.append_many(
+            user_id, guild_id, channel_id, [(role, content, timestamp)]
+        )
+
+    async def append_many(
+        self,
+        user_id: int,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        turns: Iterable[Tuple[str, str, Any]],
+    ):
+        """Append (role, content, timestamp) turns to a conversation in order"""
+        key = conversation_key(user_id, guild_id, channel_id)
+        window = self.windows.peek(key)
+        for role, content, timestamp in turns:
+            ts = _to_epoch(timestamp)
+            await self.writer.add((*key, role, content or "", ts))
+            if window is not None:
+                window.append(_turn(role, content or "", ts))
+            self.stats["appends"] += 1
+
+    async def append_missing(
+        self,
+        user_id: int,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        turns: Iterable[Tuple[str, str, Any]],
+    ) -> int:
+        """Append the turns the conversation's window does not have yet.
+
+        A turn is already there when its role, content and timestamp all
+        match, so a user repeating the same message is still recorded. Turns
+        without a timestamp can only be matched on role and content.
+        Returns how many turns were appended.
+        """
+        window = await self.window(user_id, guild_id, channel_id)
+        seen = {
+            _turn_identity(turn["role"], turn["content"], _to_epoch(turn["timestamp"]))
+            for turn in window
+        }
+        seen_untimed = {(turn["role"], turn["content"]) for turn in window}
+        missing = []
+        for role, content, timestamp in turns:
+            content = content or ""
+            if timestamp is None:
+                if (role, content) in seen_untimed:
+                    continue
+                seen_untimed.add((role, content))
+                missing.append((role, content, None))
+                continue
+            ts = _to_epoch(timestamp)
+            identity = _turn_identity(role, content, ts)
+            if identity not in seen:
+                seen.add(identity)
+                missing.append((role, content, ts))
+        await self.append_many(user_id, guild_id, channel_id, missing)
+        return len(missing)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def window(
+        self,
+        user_id: int,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Most recent turns of a conversation, oldest first"""
+        key = conversation_key(user_id, guild_id, channel_id)
+        window = self.windows.get(key)
+        if window is None:
+            window = await self._read_window(key)
+            self.windows.put(key, window, dirty=False)
+        else:
+            self.stats["window_hits"] += 1
+
+        turns = list(window)
+        return turns[-limit:] if limit else turns
+
+    async def _read_window(self, key: ConversationKey) -> deque:
+        # Turns still in the write buffer must reach the table first
+        if self.writer.pending:
+            await self.writer.flush()
+
+        self.stats["window_reads"] += 1
+        rows = await self.storage.fetch_all(
+            """
+            SELECT role, content, ts FROM conversation_turns
+            WHERE user_id = ? AND guild_id = ? AND channel_id = ?
+            ORDER BY ts DESC
+            LIMIT ?
+            """,
+            (*key, self.window_size),
+        )
+        return deque(
+            (_turn(role, content, ts) for role, content, ts in reversed(rows)),
+            maxlen=self.window_size,
+        )
+
+    async def clear(
+        self,
+        user_id: int,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+    ):
+        """Forget a conversation's history"""
+        key = conversation_key(user_id, guild_id, channel_id)
+        await self.writer.flush()
+        self.windows.pop(key, None)
+        await self.storage.execute(
+            """
+            DELETE FROM conversation_turns
+            WHERE user_id = ? AND guild_id = ? AND channel_id = ?
+            """,
+            key,
+        )
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def cleanup_old_turns(self, days_to_keep: int = 30):
+        """Delete turns older than ``days_to_keep`` in throttled batches"""
+        await self.writer.flush()
+        await retention_scheduler.run_job(
+            RetentionJob(
+                name="conversation_store.turns",
+                db_path=self.db_path,
+                table="conversation_turns",
+                where="ts < ?",
+                params=lambda: (time.time() - days_to_keep * 86400,),
+            )
+        )
+
+    async def close(self):
+        """Write buffered turns and retire this store (the next lookup opens a new one)"""
+        if _stores.get(self.db_path) is self:
+            del _stores[self.db_path]
+        await self.writer.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "writer": self.writer.get_stats(),
+            "windows": self.windows.get_stats(),
+        }
+
+
+_stores: Dict[Path, ConversationStore] = {}
+
+
+def get_conversation_store(
+    db_path: Union[str, Path] = DEFAULT_DB_PATH,
+) -> ConversationStore:
+    """Shared store for a database file"""
+    path = Path(db_path)
+    if path not in _stores:
+        _stores[path] = ConversationStore(path)
+    return _stores[path]
+
+
+async def cleanup_conversation_stores(days_to_keep: int = 30):
+    """Run the turn retention job of every open store"""
+    for store in list(_stores.values()):
+        await store.cleanup_old_turns(days_to_keep)
+
+
+async def close_conversation_stores():
+    """Flush and close every open store (on unload or shutdown)"""
+    for store in list(_stores.values()):
+        await store.close()
+
+
+__all__ = [
+    "ConversationStore",
+    "cleanup_conversation_stores",
+    "close_conversation_stores",
+    "conversation_key",
+    "get_conversation_store",
+]
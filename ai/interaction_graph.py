@@ -0,0 +1,396 @@
+"""
+Interaction Graph for Astra Bot
+Per-server sparse user graph from replies, mentions and co-activity with CSR snapshots
+"""
+
+import asyncio
+import logging
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("astra.interaction_graph")
+
+# Edge weight added per interaction
+REPLY_WEIGHT = 3.0
+MENTION_WEIGHT = 2.0
+CO_ACTIVITY_WEIGHT = 0.5
+
+# Speaking in the same channel within this many seconds counts as co-activity
+CO_ACTIVITY_WINDOW = 300
+CO_ACTIVITY_PEERS = 5
+
+# Accumulated weight at which a connection has strength 0.5
+HALF_STRENGTH_WEIGHT = 5.0
+
+# Old interactions fade with this half-life; edges below MIN_WEIGHT are dropped
+WEIGHT_HALF_LIFE = 14 * 86400
+MIN_WEIGHT = 0.1
+
+
+@dataclass
+class GraphSnapshot:
+    """Immutable CSR view of a server's interaction graph.
+
+    Row ``i`` of the adjacency lists the neighbours of ``users[i]`` in
+    ``indices[indptr[i]:indptr[i + 1]]`` with connection strengths in
+    ``strength`` (0-1). The graph is undirected, so every edge is stored in
+    both rows.
+    """
+
+    users: np.ndarray
+    index: Dict[int, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    strength: np.ndarray
+    centrality: np.ndarray
+    centrality_percentile: np.ndarray
+    built_at: float
+
+    @property
+    def num_users(self) -> int:
+        return len(self.users)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def neighbors(self, user_id: int) -> List[Tuple[int, float]]:
+        """Connected users and connection strengths"""
+        row = self.index.get(user_id)
+        if row is None:
+            return []
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return list(
+            zip(
+                self.users[self.indices[start:end]].tolist(),
+                self.strength[start:end].tolist(),
+            )
+        )
+
+    def influence(self, user_id: int, default: float = 0.5) -> float:
+        """Centrality percentile of a user mapped into 0.1-1.0"""
+        row = self.index.get(user_id)
+        if row is None or self.indptr[row] == self.indptr[row + 1]:
+            return default
+        return 0.1 + 0.9 * float(self.centrality_percentile[row])
+
+    def spread(
+        self,
+        user_id: int,
+        transmission_rate: float = 0.3,
+        waves: int = 5,
+        min_influence: float = 0.1,
+        min_transmitted: float = 0.05,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Simulate waves of influence spreading from one user.
+
+        Each wave is a sparse matrix-vector product restricted to the rows
+        of the previous wave: users with at least ``min_influence`` pass
+        ``influence * strength * transmission_rate`` to every neighbour, and
+        unaffected neighbours receiving more than ``min_transmitted`` in
+        total join the next wave. Returns (user ids, influence) per wave.
+        """
+        start = self.index.get(user_id)
+        if start is None:
+            return []
+
+        n = self.num_users
+        influence = np.zeros(n)
+        influence[start] = 1.0
+        affected = np.zeros(n, dtype=bool)
+        affected[start] = True
+        frontier = np.array([start])
+
+        result = []
+        for _ in range(waves):
+            frontier = frontier[influence[frontier] >= min_influence]
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+
+            # Edge positions of every frontier row, concatenated
+            offsets = np.cumsum(counts) - counts
+            positions = np.arange(total) + np.repeat(starts - offsets, counts)
+            received = (
+                np.bincount(
+                    self.indices[positions],
+                    weights=np.repeat(influence[frontier], counts)
+                    * self.strength[positions],
+                    minlength=n,
+                )
+                * transmission_rate
+            )
+
+            newly = np.flatnonzero((received > min_transmitted) & ~affected)
+            if not newly.size:
+                break
+            levels = np.minimum(received[newly], 1.0)
+            influence[newly] = levels
+            affected[newly] = True
+            result.append((self.users[newly], levels))
+            frontier = newly
+
+        return result
+
+
+def _empty_snapshot() -> GraphSnapshot:
+    return GraphSnapshot(
+        users=np.zeros(0, dtype=np.int64),
+        index={},
+        indptr=np.zeros(1, dtype=np.int64),
+        indices=np.zeros(0, dtype=np.int64),
+        strength=np.zeros(0),
+        centrality=np.zeros(0),
+        centrality_percentile=np.zeros(0),
+        # Never built, so the first interactions are picked up immediately
+        built_at=float("-inf"),
+    )
+
+
+def _pagerank(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    strength: np.ndarray,
+    damping: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """Weighted PageRank by power iteration over a CSR adjacency"""
+    n = len(indptr) - 1
+    if n == 0:
+        return np.zeros(0)
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    out_weight = np.bincount(rows, weights=strength, minlength=n)
+    dangling = out_weight == 0
+    transition = strength / out_weight[rows] if len(rows) else strength
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        updated = (
+            damping
+            * (
+                np.bincount(indices, weights=rank[rows] * transition, minlength=n)
+                + rank[dangling].sum() / n
+            )
+            + (1 - damping) / n
+        )
+        converged = np.abs(updated - rank).sum() < tol
+        rank = updated
+        if converged:
+            break
+    return rank
+
+
+class InteractionGraph:
+    """Incrementally maintained interaction graph for one server.
+
+    Recording an interaction only appends to compact pending arrays.
+    ``snapshot()`` periodically folds them into coalesced, decayed edge
+    arrays and builds a CSR snapshot (with centrality) in a worker thread;
+    readers always use the latest snapshot.
+    """
+
+    def __init__(self, server_id: int, refresh_interval: float = 60.0):
+        self.server_id = server_id
+        self.refresh_interval = refresh_interval
+
+        self._index: Dict[int, int] = {}
+        self._users: List[int] = []
+
+        # Interactions since the last snapshot, as dense user indexes
+        self._pending_src = array("q")
+        self._pending_dst = array("q")
+        self._pending_weight = array("d")
+
+        # Coalesced upper-triangle edges (src < dst)
+        self._src = np.zeros(0, dtype=np.int64)
+        self._dst = np.zeros(0, dtype=np.int64)
+        self._weight = np.zeros(0)
+        self._decayed_at = time.time()
+
+        self._recent_speakers: Dict[int, deque] = {}
+        self._snapshot: GraphSnapshot = _empty_snapshot()
+        self._dirty = False
+        self._build_lock: Optional[asyncio.Lock] = None
+
+        self.stats = {"interactions": 0, "snapshots": 0, "build_time_ms": 0.0}
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _node(self, user_id: int) -> int:
+        node = self._index.get(user_id)
+        if node is None:
+            node = self._index[user_id] = len(self._users)
+            self._users.append(user_id)
+        return node
+
+    def record_interaction(self, user_id: int, other_id: int, weight: float):
+        """Strengthen the connection between two users"""
+        if user_id == other_id:
+            return
+        self._pending_src.append(self._node(user_id))
+        self._pending_dst.append(self._node(other_id))
+        self._pending_weight.append(weight)
+        self._dirty = True
+        self.stats["interactions"] += 1
+
+    def record_message(
+        self,
+        user_id: int,
+        channel_id: Optional[int] = None,
+        reply_to: Optional[int] = None,
+        mentions: Iterable[int] = (),
+        timestamp: Optional[float] = None,
+    ):
+        """Record the interactions implied by one message"""
+        if reply_to is not None:
+            self.record_interaction(user_id, reply_to, REPLY_WEIGHT)
+        for mentioned in set(mentions):
+            if mentioned != reply_to:
+                self.record_interaction(user_id, mentioned, MENTION_WEIGHT)
+
+        if channel_id is None:
+            return
+        now = time.time() if timestamp is None else timestamp
+        speakers = self._recent_speakers.get(channel_id)
+        if speakers is None:
+            speakers = self._recent_speakers[channel_id] = deque(maxlen=50)
+
+        peers = set()
+        for speaker, spoke_at in reversed(speakers):
+            if now - spoke_at > CO_ACTIVITY_WINDOW or len(peers) >= CO_ACTIVITY_PEERS:
+                break
+            if speaker != user_id:
+                peers.add(speaker)
+        for peer in peers:
+            self.record_interaction(user_id, peer, CO_ACTIVITY_WEIGHT)
+        speakers.append((user_id, now))
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def _needs_refresh(self, force: bool) -> bool:
+        if not self._dirty:
+            return False
+        return (
+            force or time.monotonic() - self._snapshot.built_at >= self.refresh_interval
+        )
+
+    async def snapshot(self, force: bool = False) -> GraphSnapshot:
+        """Latest CSR snapshot, rebuilt when stale and interactions are pending"""
+        if self._needs_refresh(force):
+            if self._build_lock is None:
+                self._build_lock = asyncio.Lock()
+            async with self._build_lock:
+                if self._needs_refresh(force):
+                    pending = (
+                        np.frombuffer(self._pending_src, dtype=np.int64).copy(),
+                        np.frombuffer(self._pending_dst, dtype=np.int64).copy(),
+                        np.frombuffer(self._pending_weight).copy(),
+                    )
+                    users = np.array(self._users, dtype=np.int64)
+                    self._pending_src = array("q")
+                    self._pending_dst = array("q")
+                    self._pending_weight = array("d")
+                    self._dirty = False
+
+                    start = time.perf_counter()
+                    self._snapshot = await asyncio.to_thread(
+                        self._build, users, *pending
+                    )
+                    self.stats["snapshots"] += 1
+                    self.stats["build_time_ms"] = round(
+                        (time.perf_counter() - start) * 1000, 2
+                    )
+                    logger.debug(
+                        f"🕸️ Interaction graph for {self.server_id}: "
+                        f"{self._snapshot.num_users} users, "
+                        f"{self._snapshot.num_edges} edges "
+                        f"({self.stats['build_time_ms']}ms)"
+                    )
+        return self._snapshot
+
+    def _build(
+        self,
+        users: np.ndarray,
+        pending_src: np.ndarray,
+        pending_dst: np.ndarray,
+        pending_weight: np.ndarray,
+    ) -> GraphSnapshot:
+        n = len(users)
+        now = time.time()
+        decay = 0.5 ** ((now - self._decayed_at) / WEIGHT_HALF_LIFE)
+        self._decayed_at = now
+
+        # Coalesce old (decayed) and new edges on a (low, high) key
+        low = np.concatenate([self._src, np.minimum(pending_src, pending_dst)])
+        high = np.concatenate([self._dst, np.maximum(pending_src, pending_dst)])
+        weight = np.concatenate([self._weight * decay, pending_weight])
+        keys, inverse = np.unique(low * n + high, return_inverse=True)
+        weight = np.bincount(inverse, weights=weight, minlength=len(keys))
+        keep = weight >= MIN_WEIGHT
+        keys, weight = keys[keep], weight[keep]
+        self._src, self._dst, self._weight = keys // n, keys % n, weight
+
+        # Symmetric CSR
+        rows = np.concatenate([self._src, self._dst])
+        cols = np.concatenate([self._dst, self._src])
+        both = np.concatenate([weight, weight])
+        order = np.argsort(rows * n + cols)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        indices = cols[order]
+        strength = both[order] / (both[order] + HALF_STRENGTH_WEIGHT)
+
+        centrality = _pagerank(indptr, indices, strength)
+        percentile = np.empty(n)
+        percentile[np.argsort(centrality, kind="stable")] = (
+            np.arange(n) / (n - 1) if n > 1 else 1.0
+        )
+
+        return GraphSnapshot(
+            users=users,
+            index={int(user): i for i, user in enumerate(users.tolist())},
+            indptr=indptr,
+            indices=indices,
+            strength=strength,
+            centrality=centrality,
+            centrality_percentile=percentile,
+            built_at=time.monotonic(),
+        )
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self.stats,
+            "users": len(self._users),
+            "edges": self._snapshot.num_edges,
+            "pending": len(self._pending_weight),
+        }
+
+
+_graphs: Dict[int, InteractionGraph] = {}
+
+
+def get_interaction_graph(server_id: int) -> InteractionGraph:
+    """Shared interaction graph for a server"""
+    graph = _graphs.get(server_id)
+    if graph is None:
+        graph = _graphs[server_id] = InteractionGraph(server_id)
+    return graph
+
+
+__all__ = [
+    "GraphSnapshot",
+    "InteractionGraph",
+    "get_interaction_graph",
+]
@@ -0,0 +1,677 @@
+"""
+Message Feature Extraction for Astra Bot
+One-pass tokenizer and compiled lexicon index shared by every message analyzer
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("astra.ai.message_features")
+
+# Words keep inner apostrophes and hyphens ("don't", "mind-blowing")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*")
+_MENTION_PATTERN = re.compile(r"<@[!&]?\d+>|@(?:everyone|here)\b")
+_LINK_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_EMOJI_PATTERN = re.compile(r"<a?:\w+:\d+>|[\U0001F300-\U0001FAFF☀-➿⭐❤]")
+_CAPS_WORD_PATTERN = re.compile(r"\b[A-Z]{2,}\b")
+
+# Longest phrase (in words) looked up in the lexicon index
+MAX_NGRAM = 4
+
+# ===== Shared lexicons =====
+
+SENTIMENT_LEXICON = {
+    "positive": [
+        "good",
+        "great",
+        "awesome",
+        "amazing",
+        "excellent",
+        "fantastic",
+        "love",
+        "like",
+        "happy",
+        "excited",
+        "wonderful",
+        "perfect",
+        "brilliant",
+        "outstanding",
+    ],
+    "negative": [
+        "bad",
+        "terrible",
+        "awful",
+        "hate",
+        "dislike",
+        "sad",
+        "angry",
+        "frustrated",
+        "confused",
+        "difficult",
+        "problem",
+        "issue",
+        "wrong",
+        "error",
+        "horrible",
+        "depressed",
+    ],
+}
+
+TOPIC_LEXICON = {
+    "gaming": [
+        "game",
+        "gaming",
+        "play",
+        "player",
+        "level",
+        "achievement",
+        "strategy",
+        "multiplayer",
+        "campaign",
+        "mod",
+        "dlc",
+        "steam",
+        "pc gaming",
+        "console",
+        "mobile game",
+        "esports",
+    ],
+    "technology": [
+        "ai",
+        "artificial intelligence",
+        "machine learning",
+        "robot",
+        "tech",
+        "computer",
+        "software",
+        "programming",
+        "algorithm",
+        "quantum",
+        "coding",
+        "development",
+        "app",
+        "digital",
+        "internet",
+        "web",
+    ],
+    "entertainment": [
+        "movie",
+        "film",
+        "tv show",
+        "series",
+        "music",
+        "song",
+        "album",
+        "artist",
+        "book",
+        "novel",
+        "anime",
+        "manga",
+        "podcast",
+        "streaming",
+        "netflix",
+        "youtube",
+        "video",
+        "content",
+    ],
+    "lifestyle": [
+        "food",
+        "cooking",
+        "recipe",
+        "travel",
+        "vacation",
+        "hobby",
+        "fitness",
+        "workout",
+        "health",
+        "wellness",
+        "fashion",
+        "style",
+        "photography",
+        "art",
+        "craft",
+        "diy",
+        "home",
+        "garden",
+    ],
+    "social": [
+        "friend",
+        "community",
+        "together",
+        "team",
+        "group",
+        "chat",
+        "talk",
+        "conversation",
+        "discuss",
+        "share",
+        "opinion",
+        "thoughts",
+        "relationship",
+        "family",
+        "social media",
+        "dating",
+    ],
+    "education": [
+        "learn",
+        "study",
+        "school",
+        "college",
+        "university",
+        "course",
+        "class",
+        "teacher",
+        "student",
+        "education",
+        "knowledge",
+        "skill",
+        "training",
+        "tutorial",
+        "exam",
+        "homework",
+        "research",
+        "academic",
+    ],
+    "business": [
+        "work",
+        "job",
+        "career",
+        "business",
+        "company",
+        "office",
+        "project",
+        "meeting",
+        "team",
+        "management",
+        "startup",
+        "entrepreneur",
+        "finance",
+        "money",
+        "investment",
+        "marketing",
+        "sales",
+        "productivity",
+    ],
+    "science": [
+        "science",
+        "research",
+        "discovery",
+        "experiment",
+        "theory",
+        "physics",
+        "chemistry",
+        "biology",
+        "mathematics",
+        "scientific method",
+        "data",
+        "analysis",
+        "statistics",
+        "innovation",
+    ],
+    "space": [
+        "space",
+        "cosmos",
+        "universe",
+        "galaxy",
+        "star",
+        "planet",
+        "astronomy",
+        "nebula",
+        "black hole",
+        "spacecraft",
+        "rocket",
+        "nasa",
+        "spacex",
+        "astrology",
+        "satellite",
+    ],
+    "stellaris": [
+        "stellaris",
+        "empire",
+        "species",
+        "galactic",
+        "federation",
+        "ethics",
+        "ascension",
+        "hyperlane",
+        "paradox",
+        "strategy",
+        "expansion",
+        "diplomacy",
+        "4x game",
+        "grand strategy",
+    ],
+    "help": [
+        "help",
+        "assistance",
+        "support",
+        "explain",
+        "how to",
+        "tutorial",
+        "guide",
+        "confused",
+        "problem",
+        "issue",
+        "stuck",
+        "error",
+        "question",
+        "advice",
+        "tip",
+        "suggestion",
+    ],
+}
+
+TONE_LEXICON = {
+    "excited": ["awesome", "amazing", "wow", "cool", "fantastic", "love"],
+    "formal": ["please", "could you", "would you", "i would like", "kindly"],
+    "casual": ["hey", "hi", "yo", "sup", "what's up", "wassup", "lol", "haha"],
+    "casual_marker": ["hey", "yo", "sup"],
+    "serious": ["analyze", "explain", "describe", "define", "elaborate", "discuss"],
+    "uncertain": ["not sure", "confused", "don't understand", "unclear"],
+}
+
+HUMOR_PATTERNS = {
+    "sarcasm": [
+        r"oh (really|sure|great|wonderful)",
+        r"wow.*so",
+        r"thanks (a lot|so much)",
+        r"(perfect|fantastic|amazing).*\.",
+        r"because that's exactly what",
+    ],
+    "jokes": [
+        r"why did",
+        r"knock knock",
+        r"what do you call",
+        r"walks into a bar",
+        r"pun intended",
+    ],
+    "playful": [
+        r"haha|hehe|lol|lmao|rofl",
+        r"😂|🤣|😆|😄|😁",
+        r"that's funny",
+        r"made me laugh",
+        r"good one",
+    ],
+    "wordplay": [
+        r"pun|punny",
+        r"play on words",
+        r"clever.*word",
+        r"double meaning",
+    ],
+    "memes": [
+        r"among us|sus|impostor",
+        r"poggers|pog|pogchamp",
+        r"based|cringe",
+        r"big brain|galaxy brain",
+        r"this is the way",
+        r"stonks|hodl",
+    ],
+}
+
+HUMOR_INDICATORS = ["!", "?!", "lol", "haha", "😂", "🤣", "😆", "xd", "lmao"]
+
+_REGEX_META = re.compile(r"[\\.^$*+?{}\[\]()|]")
+
+
+def prefilter_pattern(
+    pattern: str, flags: int = 0
+) -> Tuple[Tuple[str, ...], Optional[re.Pattern]]:
+    """Split a regex into literals to look for and a compiled regex to confirm.
+
+    Plain ``a|b|c`` alternations need no regex at all (``None`` is returned
+    instead). Other patterns get the longest literal they cannot match
+    without as a cheap ``in`` pre-check, so the regex only runs on text that
+    might match. Literals are lower-cased for ``re.IGNORECASE`` patterns and
+    must then be checked against lower-cased text.
+    """
+    fold = str.lower if flags & re.IGNORECASE else str
+    branches = pattern.split("|")
+    if not any(_REGEX_META.search(branch) for branch in branches):
+        return tuple(fold(branch) for branch in branches), None
+
+    # Drop escapes, groups, classes and optional atoms; what is left between
+    # the remaining metacharacters must appear literally in any match
+    required = re.sub(r"\\.|\([^()]*\)|\[[^\]]*\]", "(", pattern)
+    required = re.sub(r".(?:[*?]|\{[0,][^}]*\})|\{[^}]*\}", "(", required)
+    if "|" in required:
+        return (), re.compile(pattern, flags)
+    literal = max(_REGEX_META.split(required), key=len)
+    return ((fold(literal),) if literal else ()), re.compile(pattern, flags)
+
+
+_HUMOR_CHECKS = [
+    (humor_type, *prefilter_pattern(pattern))
+    for humor_type, patterns in HUMOR_PATTERNS.items()
+    for pattern in patterns
+]
+
+
+def _normalize(text: str) -> str:
+    return text.lower().replace("’", "'")
+
+
+@dataclass(slots=True)
+class MessageFeatures:
+    """Everything the analyzers read from one message, computed in one pass.
+
+    Records are memoized and shared between analyzers - treat them as
+    read-only.
+    """
+
+    length: int = 0
+    tokens: Tuple[str, ...] = ()
+    positive: int = 0
+    negative: int = 0
+    sentiment: float = 0.0  # -1.0 to 1.0
+    topics: Tuple[str, ...] = ()
+    tone: str = "neutral"
+    humor_score: float = 0.0
+    humor_type: str = "general"
+    is_humorous: bool = False
+    caps_ratio: float = 0.0
+    caps_words: int = 0
+    exclamations: int = 0
+    questions: int = 0
+    mentions: int = 0
+    links: int = 0
+    emoji: int = 0
+    # lexicon -> category -> number of distinct terms matched
+    hits: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def count(self, lexicon: str, category: str) -> int:
+        """Distinct terms of a lexicon category found in the message"""
+        return self.hits.get(lexicon, {}).get(category, 0)
+
+    def matched(self, lexicon: str) -> List[str]:
+        """Categories of a lexicon with at least one hit, in definition order"""
+        return list(self.hits.get(lexicon, ()))
+
+
+class LexiconEngine:
+    """Compiled term index over every registered lexicon.
+
+    All lexicons share one ``term -> [(lexicon, category)]`` dict, so a
+    message is tokenized once and each word/phrase costs one dict lookup no
+    matter how many analyzers or keywords exist. Terms are matched on word
+    boundaries (with a plural fallback), phrases of up to ``MAX_NGRAM`` words
+    as n-grams, suffixes such as ``'ll`` against contractions, and terms with
+    no word characters (emoji) by substring.
+    """
+
+    def __init__(self, memo_size: int = 4096):
+        self.memo_size = memo_size
+        self._lock = threading.RLock()
+        self._lexicons: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self._index: Dict[str, List[Tuple[str, str]]] = {}
+        self._suffix_index: Dict[str, List[Tuple[str, str]]] = {}
+        self._symbol_terms: List[Tuple[str, List[Tuple[str, str]]]] = []
+        # First word of every multi-word phrase -> longest phrase starting with it
+        self._phrase_heads: Dict[str, int] = {}
+        self._memo: "OrderedDict[Any, Tuple[str, MessageFeatures]]" = OrderedDict()
+
+        self.stats = {
+            "extractions": 0,
+            "memo_hits": 0,
+            "extract_time_ms": 0.0,
+        }
+
+        self.register_lexicon("sentiment", SENTIMENT_LEXICON)
+        self.register_lexicon("topics", TOPIC_LEXICON)
+        self.register_lexicon("tone", TONE_LEXICON)
+
+    # ------------------------------------------------------------------
+    # Lexicons
+    # ------------------------------------------------------------------
+
+    def register_lexicon(self, name: str, categories: Dict[str, Iterable[str]]):
+        """Add (or replace) a named lexicon of ``category -> terms``"""
+        normalized = {
+            str(category): tuple(_normalize(term) for term in terms)
+            for category, terms in categories.items()
+        }
+        with self._lock:
+            if self._lexicons.get(name) == normalized:
+                return
+            self._lexicons[name] = normalized
+            self._rebuild_index()
+            self._memo.clear()
+
+    def _rebuild_index(self):
+        index: Dict[str, List[Tuple[str, str]]] = {}
+        suffix_index: Dict[str, List[Tuple[str, str]]] = {}
+        symbol_terms: Dict[str, List[Tuple[str, str]]] = {}
+        phrase_heads: Dict[str, int] = {}
+
+        for lexicon, categories in self._lexicons.items():
+            for category, terms in categories.items():
+                tag = (lexicon, category)
+                for term in terms:
+                    words = _WORD_PATTERN.findall(term)
+                    if term.startswith("'") and len(words) == 1:
+                        target, key = suffix_index, term
+                    elif len(words) <= MAX_NGRAM:
+                        target, key = index, " ".join(words)
+                        if len(words) > 1:
+                            phrase_heads[words[0]] = max(
+                                phrase_heads.get(words[0], 0), len(words)
+                            )
+                    elif words:
+                        continue
+                    else:
+                        target, key = symbol_terms, term
+                    tags = target.setdefault(key, [])
+                    if tag not in tags:
+                        tags.append(tag)
+
+        self._index = index
+        self._suffix_index = suffix_index
+        self._symbol_terms = list(symbol_terms.items())
+        self._phrase_heads = phrase_heads
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    def extract(self, text: str, message_id: Optional[int] = None) -> MessageFeatures:
+        """Features of a message, memoized by message ID (or by text)"""
+        text = text or ""
+        key = ("id", message_id) if message_id is not None else ("text", text)
+
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None and cached[0] == text:
+                self._memo.move_to_end(key)
+                self.stats["memo_hits"] += 1
+                return cached[1]
+            # Same text seen earlier without an ID (edited messages miss above)
+            if message_id is not None and ("text", text) in self._memo:
+                features = self._memo[("text", text)][1]
+                self._memo[key] = (text, features)
+                self.stats["memo_hits"] += 1
+                return features
+
+        start = time.perf_counter()
+        features = self._compute(text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._memo[key] = (text, features)
+            if message_id is not None:
+                # Helpers that only see the text still hit the memo
+                self._memo[("text", text)] = (text, features)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+            self.stats["extractions"] += 1
+            self.stats["extract_time_ms"] += elapsed_ms
+
+        return features
+
+    def _match_terms(
+        self, text_lower: str, tokens: List[str]
+    ) -> Dict[str, Dict[str, int]]:
+        index = self._index
+        phrase_heads = self._phrase_heads
+        matched = set()
+
+        for i, token in enumerate(tokens):
+            if token in index:
+                matched.add(token)
+            elif len(token) > 3 and token.endswith("s") and token[:-1] in index:
+                matched.add(token[:-1])
+
+            if "'" in token:
+                suffix = token[token.index("'") :]
+                if suffix in self._suffix_index:
+                    matched.add(suffix)
+
+            # Phrases are only assembled from words that can start one
+            longest = phrase_heads.get(token)
+            if longest:
+                for n in range(2, min(longest, len(tokens) - i) + 1):
+                    phrase = " ".join(tokens[i : i + n])
+                    if phrase in index:
+                        matched.add(phrase)
+
+        counts: Dict[str, Dict[str, int]] = {}
+        for term in matched:
+            for lexicon, category in index.get(term) or self._suffix_index[term]:
+                categories = counts.setdefault(lexicon, {})
+                categories[category] = categories.get(category, 0) + 1
+
+        for term, tags in self._symbol_terms:
+            if term in text_lower:
+                for lexicon, category in tags:
+                    categories = counts.setdefault(lexicon, {})
+                    categories[category] = categories.get(category, 0) + 1
+
+        # Report categories in the order the lexicon defines them
+        return {
+            lexicon: {
+                category: categories[category]
+                for category in self._lexicons[lexicon]
+                if category in categories
+            }
+            for lexicon, categories in counts.items()
+        }
+
+    def _compute(self, text: str) -> MessageFeatures:
+        text_lower = _normalize(text)
+        tokens = _WORD_PATTERN.findall(text_lower)
+
+        with self._lock:
+            hits = self._match_terms(text_lower, tokens)
+
+        features = MessageFeatures(
+            length=len(text),
+            tokens=tuple(tokens),
+            hits=hits,
+            exclamations=text.count("!"),
+            questions=text.count("?"),
+            caps_ratio=sum(map(str.isupper, text)) / max(1, len(text)),
+            caps_words=len(_CAPS_WORD_PATTERN.findall(text)),
+            mentions=len(_MENTION_PATTERN.findall(text)),
+            links=len(_LINK_PATTERN.findall(text_lower)),
+            emoji=len(_EMOJI_PATTERN.findall(text)),
+        )
+
+        features.positive = features.count("sentiment", "positive")
+        features.negative = features.count("sentiment", "negative")
+        total = features.positive + features.negative
+        if total:
+            features.sentiment = (features.positive - features.negative) / total
+
+        features.topics = tuple(features.matched("topics"))
+        features.tone = self._classify_tone(features)
+        self._score_humor(text_lower, features)
+        return features
+
+    @staticmethod
+    def _classify_tone(features: MessageFeatures) -> str:
+        if features.count("tone", "excited") or features.exclamations >= 2:
+            return "excited"
+        if features.count("tone", "formal") and not features.count(
+            "tone", "casual_marker"
+        ):
+            return "formal"
+        if features.count("tone", "casual"):
+            return "casual"
+        if features.count("tone", "serious"):
+            return "serious"
+        if features.questions >= 2 or features.count("tone", "uncertain"):
+            return "uncertain"
+        return "neutral"
+
+    @staticmethod
+    def _score_humor(text_lower: str, features: MessageFeatures):
+        humor_score = 0.0
+        humor_type = None
+
+        for pattern_type, literals, pattern in _HUMOR_CHECKS:
+            if literals and not any(literal in text_lower for literal in literals):
+                continue
+            if pattern is None or pattern.search(text_lower):
+                humor_score += 0.3
+                humor_type = humor_type or pattern_type
+
+        for indicator in HUMOR_INDICATORS:
+            if indicator in text_lower:
+                humor_score += 0.1
+
+        if features.exclamations > 1:
+            humor_score += min(0.2, features.exclamations * 0.05)
+        if features.emoji:
+            humor_score += min(0.3, features.emoji * 0.1)
+        # Partial caps reads as playful
+        if 0.3 < features.caps_ratio < 0.8:
+            humor_score += 0.1
+
+        features.humor_score = min(1.0, humor_score)
+        features.humor_type = humor_type or "general"
+        features.is_humorous = features.humor_score > 0.2
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get extraction and memo statistics"""
+        with self._lock:
+            extractions = self.stats["extractions"]
+            lookups = extractions + self.stats["memo_hits"]
+            return {
+                **self.stats,
+                "avg_extract_ms": (
+                    self.stats["extract_time_ms"] / extractions if extractions else 0.0
+                ),
+                "memo_hit_rate": self.stats["memo_hits"] / lookups if lookups else 0.0,
+                "memo_size": len(self._memo),
+                "lexicons": len(self._lexicons),
+                "indexed_terms": len(self._index)
+                + len(self._suffix_index)
+                + len(self._symbol_terms),
+            }
+
+
+# Global lexicon engine instance
+lexicon_engine = LexiconEngine()
+
+
+def extract_features(text: str, message_id: Optional[int] = None) -> MessageFeatures:
+    """Extract (or reuse) the features of a message"""
+    return lexicon_engine.extract(text, message_id)
+
+
+def register_lexicon(name: str, categories: Dict[str, Iterable[str]]):
+    """Register an analyzer's own keyword lists with the shared engine"""
+    lexicon_engine.register_lexicon(name, categories)
+
+
+__all__ = [
+    "MessageFeatures",
+    "LexiconEngine",
+    "lexicon_engine",
+    "extract_features",
+    "register_lexicon",
+    "prefilter_pattern",
+]
@@ -3,63 +3,93 @@ Machine Learning Utilities for Astra Bot
 Implements user behavior analysis and predictive engagement
 """
 
-import numpy as np
-import pandas as pd
 from typing import Dict, List, Tuple, Optional, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-import sqlite3
+from functools import lru_cache
+import importlib.util
 import json
 import logging
-import re
 from pathlib import Path
 from collections import defaultdict, Counter
 import asyncio
 
-# Optional ML dependencies - graceful fallback if not available
-try:
-    from sklearn.cluster import KMeans
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.decomposition import PCA
-    import joblib
+from utils.storage_engine import get_storage
 
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+# Optional ML dependencies - NumPy and scikit-learn are imported on first use
+# (clustering / model loading) instead of at import time, keeping them off the
+# bot's startup path. Availability is checked without importing.
+ML_AVAILABLE = (
+    importlib.util.find_spec("sklearn") is not None
+    and importlib.util.find_spec("joblib") is not None
+)
 
-    # Create mock classes for type hints
-    class KMeans:
-        def __init__(self, *args, **kwargs):
-            pass
 
-        def fit_predict(self, X):
-            return [0] * len(X)
+class _FallbackKMeans:
+    def __init__(self, *args, **kwargs):
+        pass
 
-    class StandardScaler:
-        def __init__(self):
-            pass
+    def fit_predict(self, X):
+        return [0] * len(X)
 
-        def fit_transform(self, X):
-            return X
 
-        def transform(self, X):
-            return X
+class _FallbackStandardScaler:
+    def __init__(self):
+        pass
 
-    class PCA:
-        def __init__(self, *args, **kwargs):
-            pass
+    def fit_transform(self, X):
+        return X
 
-        def fit_transform(self, X):
-            return X
+    def transform(self, X):
+        return X
 
-    class joblib:
-        @staticmethod
-        def dump(*args, **kwargs):
-            pass
 
-        @staticmethod
-        def load(*args, **kwargs):
-            return None
+class _FallbackPCA:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def fit_transform(self, X):
+        return X
+
+
+class _FallbackJoblib:
+    @staticmethod
+    def dump(*args, **kwargs):
+        pass
+
+    @staticmethod
+    def load(*args, **kwargs):
+        return None
+
+
+@lru_cache(maxsize=None)
+def _ml_backend() -> Dict[str, Any]:
+    """Import scikit-learn components once, falling back to no-op stand-ins"""
+    try:
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.decomposition import PCA
+        import joblib
+
+        return {
+            "KMeans": KMeans,
+            "StandardScaler": StandardScaler,
+            "PCA": PCA,
+            "joblib": joblib,
+        }
+    except ImportError:
+        return {
+            "KMeans": _FallbackKMeans,
+            "StandardScaler": _FallbackStandardScaler,
+            "PCA": _FallbackPCA,
+            "joblib": _FallbackJoblib,
+        }
+
+
+def _mean(values) -> float:
+    """Arithmetic mean of a non-empty sequence (avoids importing NumPy)"""
+    values = list(values)
+    return sum(values) / len(values)
 
 
 logger = logging.getLogger("astra.ml")
@@ -85,8 +115,9 @@ class MLUserAnalyzer:
 
     def __init__(self, db_path: str = "data/ai_conversations.db"):
         self.db_path = Path(db_path)
+        self.storage = get_storage(self.db_path)
         self.user_profiles: Dict[int, UserBehaviorProfile] = {}
-        self.scaler = StandardScaler()
+        self.scaler = None
         self.kmeans_model = None
         self.pca_model = None
         self.model_path = Path("data/ml_models")
@@ -103,6 +134,7 @@ class MLUserAnalyzer:
             pca_path = self.model_path / "pca.joblib"
 
             if all(path.exists() for path in [scaler_path, kmeans_path, pca_path]):
+                joblib = _ml_backend()["joblib"]
                 self.scaler = joblib.load(scaler_path)
                 self.kmeans_model = joblib.load(kmeans_path)
                 self.pca_model = joblib.load(pca_path)
@@ -117,9 +149,10 @@ class MLUserAnalyzer:
 
     def _create_initial_models(self):
         """Create initial ML models with default parameters"""
-        self.scaler = StandardScaler()
-        self.kmeans_model = KMeans(n_clusters=5, random_state=42, n_init=10)
-        self.pca_model = PCA(n_components=0.95)  # Keep 95% of variance
+        backend = _ml_backend()
+        self.scaler = backend["StandardScaler"]()
+        self.kmeans_model = backend["KMeans"](n_clusters=5, random_state=42, n_init=10)
+        self.pca_model = backend["PCA"](n_components=0.95)  # Keep 95% of variance
 
     async def analyze_user_behavior(self, user_id: int) -> UserBehaviorProfile:
         """Analyze user behavior and create/update profile"""
@@ -144,23 +177,7 @@ class MLUserAnalyzer:
             # Extract features
             features = self._extract_behavioral_features(user_data)
 
-            # Create behavior profile
-            profile = UserBehaviorProfile(
-                user_id=user_id,
-                activity_patterns=features["activity_patterns"],
-                topic_preferences=features["topic_preferences"],
-                communication_patterns=features["communication_patterns"],
-                engagement_responsiveness=features["engagement_responsiveness"],
-                optimal_engagement_times=features["optimal_engagement_times"],
-                conversation_style_cluster=features.get("cluster", 0),
-                sentiment_baseline=features["sentiment_baseline"],
-                interaction_frequency=features["interaction_frequency"],
-            )
-
-            # Store profile
-            self.user_profiles[user_id] = profile
-
-            return profile
+            return self._store_profile(user_id, features)
 
         except Exception as e:
             logger.error(f"User behavior analysis error for {user_id}: {e}")
@@ -176,82 +193,180 @@ class MLUserAnalyzer:
                 interaction_frequency=0.0,
             )
 
-    async def _get_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Get user conversation data from database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                # Get conversations
-                cursor.execute(
-                    """
-                    SELECT message_content, ai_response, mood, topics, engagement_score, 
-                           timestamp, response_time, feedback_score
-                    FROM conversations 
-                    WHERE user_id = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT 1000
-                """,
-                    (user_id,),
+    def _store_profile(
+        self, user_id: int, features: Dict[str, Any]
+    ) -> UserBehaviorProfile:
+        """Create a behavior profile from extracted features and cache it"""
+        profile = UserBehaviorProfile(
+            user_id=user_id,
+            activity_patterns=features["activity_patterns"],
+            topic_preferences=features["topic_preferences"],
+            communication_patterns=features["communication_patterns"],
+            engagement_responsiveness=features["engagement_responsiveness"],
+            optimal_engagement_times=features["optimal_engagement_times"],
+            conversation_style_cluster=features.get("cluster", 0),
+            sentiment_baseline=features["sentiment_baseline"],
+            interaction_frequency=features["interaction_frequency"],
+        )
+        self.user_profiles[user_id] = profile
+        return profile
+
+    async def analyze_users_bulk(
+        self, user_ids: List[int]
+    ) -> Dict[int, UserBehaviorProfile]:
+        """Re-profile many users with one query and one vectorized text pass.
+
+        Uses the same 1000 most recent conversations per user as
+        ``analyze_user_behavior``; users without conversations are skipped.
+        """
+        if not user_ids:
+            return {}
+
+        def query_bulk_data(conn):
+            placeholders = ",".join("?" * len(user_ids))
+            conversations = conn.execute(
+                f"""
+                SELECT user_id, message_content, ai_response, mood, topics,
+                       engagement_score, timestamp, response_time, feedback_score
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY user_id ORDER BY timestamp DESC
+                    ) AS recent_rank
+                    FROM conversations
+                    WHERE user_id IN ({placeholders})
                 )
+                WHERE recent_rank <= 1000
+                ORDER BY user_id, timestamp DESC
+            """,
+                list(user_ids),
+            ).fetchall()
+            profiles = conn.execute(
+                f"""
+                SELECT user_id, name, interaction_count, preferred_topics,
+                       communication_style, response_preferences, mood_history,
+                       engagement_patterns, last_seen, conversation_topics
+                FROM user_profiles
+                WHERE user_id IN ({placeholders})
+            """,
+                list(user_ids),
+            ).fetchall()
+            return conversations, profiles
+
+        try:
+            rows, profile_rows = await self.storage.read(query_bulk_data)
+        except Exception as e:
+            logger.error(f"Bulk user data query error: {e}")
+            return {}
+
+        from ai.batch_analysis import analyze_batch
+
+        profiles_by_user = {row[0]: row[1:] for row in profile_rows}
+        batch = analyze_batch([row[1] for row in rows], [row[6] for row in rows])
+
+        results = {}
+        start = 0
+        while start < len(rows):
+            user_id = rows[start][0]
+            end = start
+            while end < len(rows) and rows[end][0] == user_id:
+                end += 1
 
-                conversations = cursor.fetchall()
-
-                if not conversations:
-                    return None
-
-                # Get user profile
-                cursor.execute(
-                    """
-                    SELECT name, interaction_count, preferred_topics, communication_style,
-                           response_preferences, mood_history, engagement_patterns, 
-                           last_seen, conversation_topics
-                    FROM user_profiles 
-                    WHERE user_id = ?
-                """,
-                    (user_id,),
+            user_data = {
+                "conversations": [row[1:] for row in rows[start:end]],
+                "profile": profiles_by_user.get(user_id),
+                "user_id": user_id,
+            }
+            try:
+                features = self._extract_behavioral_features(
+                    user_data, batch.take(slice(start, end))
                 )
+                results[user_id] = self._store_profile(user_id, features)
+            except Exception as e:
+                logger.error(f"User behavior analysis error for {user_id}: {e}")
+            start = end
 
-                profile_data = cursor.fetchone()
+        logger.info(f"✅ Re-profiled {len(results)} users from {len(rows)} messages")
+        return results
 
-                return {
-                    "conversations": conversations,
-                    "profile": profile_data,
-                    "user_id": user_id,
-                }
+    async def _get_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get user conversation data from database"""
+
+        def query_user_data(conn):
+            cursor = conn.cursor()
+
+            # Get conversations
+            cursor.execute(
+                """
+                SELECT message_content, ai_response, mood, topics, engagement_score, 
+                       timestamp, response_time, feedback_score
+                FROM conversations 
+                WHERE user_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT 1000
+            """,
+                (user_id,),
+            )
 
+            conversations = cursor.fetchall()
+
+            if not conversations:
+                return None
+
+            # Get user profile
+            cursor.execute(
+                """
+                SELECT name, interaction_count, preferred_topics, communication_style,
+                       response_preferences, mood_history, engagement_patterns, 
+                       last_seen, conversation_topics
+                FROM user_profiles 
+                WHERE user_id = ?
+            """,
+                (user_id,),
+            )
+
+            profile_data = cursor.fetchone()
+
+            return {
+                "conversations": conversations,
+                "profile": profile_data,
+                "user_id": user_id,
+            }
+
+        try:
+            return await self.storage.read(query_user_data)
         except Exception as e:
             logger.error(f"Database query error for user {user_id}: {e}")
             return None
 
-    def _extract_behavioral_features(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract behavioral features from user data"""
+    def _extract_behavioral_features(
+        self, user_data: Dict[str, Any], batch: Any = None
+    ) -> Dict[str, Any]:
+        """Extract behavioral features from user data.
+
+        ``batch`` may carry precomputed ``BatchFeatures`` for the
+        conversations (see ``analyze_users_bulk``).
+        """
         conversations = user_data["conversations"]
         profile = user_data["profile"]
 
+        if batch is None:
+            from ai.batch_analysis import analyze_batch
+
+            batch = analyze_batch(
+                [conv[0] for conv in conversations],  # message_content
+                [conv[5] for conv in conversations],  # timestamp
+            )
+
         features = {}
 
         # Activity patterns (hour of day distribution)
-        hourly_activity = defaultdict(int)
-        for conv in conversations:
-            timestamp_str = conv[5]  # timestamp column
-            try:
-                timestamp = datetime.fromisoformat(timestamp_str)
-                hourly_activity[timestamp.hour] += 1
-            except:
-                continue
-
-        total_messages = sum(hourly_activity.values())
+        hourly_activity = batch.hour_histogram().tolist()
+        total_messages = sum(hourly_activity)
         features["activity_patterns"] = {
             str(hour): (count / total_messages if total_messages > 0 else 0.0)
-            for hour, count in hourly_activity.items()
+            for hour, count in enumerate(hourly_activity)
         }
 
-        # Fill missing hours
-        for hour in range(24):
-            if str(hour) not in features["activity_patterns"]:
-                features["activity_patterns"][str(hour)] = 0.0
-
         # Topic preferences
         topic_engagement = defaultdict(list)
         for conv in conversations:
@@ -266,45 +381,39 @@ class MLUserAnalyzer:
                 continue
 
         features["topic_preferences"] = {
-            topic: np.mean(scores) for topic, scores in topic_engagement.items()
+            topic: _mean(scores) for topic, scores in topic_engagement.items()
         }
 
         # Communication patterns
-        message_lengths = []
-        emoji_usage = 0
-        question_count = 0
-
-        for conv in conversations:
-            message = conv[0]  # message_content
-            if message:
-                message_lengths.append(len(message))
-                emoji_usage += len(re.findall(r"[😀-🙏]", message))
-                if "?" in message:
-                    question_count += 1
+        message_lengths = batch.lengths[batch.lengths > 0]
 
         features["communication_patterns"] = {
-            "avg_message_length": np.mean(message_lengths) if message_lengths else 0.0,
+            "avg_message_length": (
+                float(message_lengths.mean()) if len(message_lengths) else 0.0
+            ),
             "emoji_per_message": (
-                emoji_usage / len(conversations) if conversations else 0.0
+                int(batch.emoji.sum()) / len(conversations) if conversations else 0.0
             ),
             "question_ratio": (
-                question_count / len(conversations) if conversations else 0.0
+                int(batch.questions.sum()) / len(conversations)
+                if conversations
+                else 0.0
             ),
         }
 
         # Engagement responsiveness
         engagement_scores = [conv[4] for conv in conversations if conv[4] is not None]
         features["engagement_responsiveness"] = (
-            np.mean(engagement_scores) if engagement_scores else 0.5
+            _mean(engagement_scores) if engagement_scores else 0.5
         )
 
-        # Optimal engagement times
+        # Optimal engagement times (top 3 active hours)
         optimal_hours = sorted(
-            hourly_activity.items(), key=lambda x: x[1], reverse=True
-        )[
-            :3
-        ]  # Top 3 hours
-        features["optimal_engagement_times"] = [hour for hour, _ in optimal_hours]
+            (hour for hour, count in enumerate(hourly_activity) if count > 0),
+            key=lambda hour: hourly_activity[hour],
+            reverse=True,
+        )[:3]
+        features["optimal_engagement_times"] = optimal_hours
 
         # Sentiment baseline
         mood_scores = []
@@ -322,7 +431,7 @@ class MLUserAnalyzer:
             if mood in mood_mapping:
                 mood_scores.append(mood_mapping[mood])
 
-        features["sentiment_baseline"] = np.mean(mood_scores) if mood_scores else 0.5
+        features["sentiment_baseline"] = _mean(mood_scores) if mood_scores else 0.5
 
         # Interaction frequency (messages per day)
         if conversations:
@@ -388,6 +497,8 @@ class MLUserAnalyzer:
                 user_ids.append(user_id)
 
             # Convert to numpy array
+            import numpy as np
+
             X = np.array(feature_matrix)
 
             # Scale features
@@ -399,7 +510,7 @@ class MLUserAnalyzer:
 
             # Perform clustering
             n_clusters = min(5, len(eligible_users) // 2)  # Adjust cluster count
-            self.kmeans_model = KMeans(
+            self.kmeans_model = _ml_backend()["KMeans"](
                 n_clusters=n_clusters, random_state=42, n_init=10
             )
             cluster_labels = self.kmeans_model.fit_predict(X_scaled)
@@ -425,6 +536,7 @@ class MLUserAnalyzer:
     async def _save_models(self):
         """Save ML models to disk"""
         try:
+            joblib = _ml_backend()["joblib"]
             joblib.dump(self.scaler, self.model_path / "scaler.joblib")
             if self.kmeans_model:
                 joblib.dump(self.kmeans_model, self.model_path / "kmeans.joblib")
@@ -587,7 +699,7 @@ class MLUserAnalyzer:
                 engagement_scores.append(profile.engagement_responsiveness)
 
             # Calculate statistics
-            avg_engagement = np.mean(engagement_scores) if engagement_scores else 0.0
+            avg_engagement = _mean(engagement_scores) if engagement_scores else 0.0
 
             # Most active hours across all users
             hourly_totals = defaultdict(float)
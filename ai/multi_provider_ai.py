@@ -331,7 +331,11 @@ Remember: You're not just responding - you're engaging as a conscious, evolving
                 continue
 
             try:
-                logger.info(f"Attempting generation with {provider.value}")
+                logger.info(
+                    "Attempting generation with %s",
+                    provider.value,
+                    extra={"sample_rate": 0.1},
+                )
                 start_time = time.time()
 
                 # Generate response based on provider type (using enhanced prompt)
@@ -16,6 +16,7 @@ from ai.bot_personality_core import (
     initialize_personality_core,
     enhance_ai_response_with_personality,
 )
+from ai.message_features import extract_features
 
 logger = logging.getLogger("astra.personality_integration")
 
@@ -70,77 +71,7 @@ class AIIdentityHandler:
 
     def _detect_user_tone(self, message: str) -> str:
         """Detect user's tone from their message"""
-
-        message_lower = message.lower()
-
-        # Excited/enthusiastic tone
-        if (
-            any(
-                indicator in message_lower
-                for indicator in [
-                    "awesome",
-                    "amazing",
-                    "wow",
-                    "cool",
-                    "fantastic",
-                    "love",
-                ]
-            )
-            or message.count("!") >= 2
-        ):
-            return "excited"
-
-        # Formal/professional tone
-        if any(
-            indicator in message_lower
-            for indicator in [
-                "please",
-                "could you",
-                "would you",
-                "i would like",
-                "kindly",
-            ]
-        ) and not any(casual in message_lower for casual in ["hey", "yo", "sup"]):
-            return "formal"
-
-        # Casual tone
-        if any(
-            indicator in message_lower
-            for indicator in [
-                "hey",
-                "hi",
-                "yo",
-                "sup",
-                "what's up",
-                "wassup",
-                "lol",
-                "haha",
-            ]
-        ):
-            return "casual"
-
-        # Serious/academic tone
-        if any(
-            indicator in message_lower
-            for indicator in [
-                "analyze",
-                "explain",
-                "describe",
-                "define",
-                "elaborate",
-                "discuss",
-            ]
-        ):
-            return "serious"
-
-        # Uncertain/questioning tone
-        if message.count("?") >= 2 or any(
-            indicator in message_lower
-            for indicator in ["not sure", "confused", "don't understand", "unclear"]
-        ):
-            return "uncertain"
-
-        return "neutral"
+        return extract_features(message).tone
 
     def _determine_topic_category(self, message: str, channel_context: str) -> str:
         """Determine topic category from message and context"""
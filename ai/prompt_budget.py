@@ -0,0 +1,399 @@
+"""
+Token-Budgeted Prompt Assembly for Astra Bot
+Cheap local token estimation, priority-based section budgeting and history fitting
+"""
+
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("astra.ai.prompt_budget")
+
+# Pre-compiled tokenizer approximation: words, numbers, runs of punctuation and
+# single non-ASCII symbols (emoji, box drawing) each cost roughly one token.
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]", re.UNICODE)
+
+# Long words are split into several BPE pieces; ~4 chars per piece is typical
+_CHARS_PER_WORD_PIECE = 4
+
+# Per-message overhead of chat formats (role markers and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Section priorities - lower value is more important and is budgeted first
+PRIORITY_CORE = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_LOW = 3
+PRIORITY_OPTIONAL = 4
+
+
+@lru_cache(maxsize=2048)
+def _estimate_tokens_cached(text: str) -> int:
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if len(piece) > _CHARS_PER_WORD_PIECE * 2:
+            tokens += -(-len(piece) // _CHARS_PER_WORD_PIECE)
+        else:
+            tokens += 1
+    return tokens
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the token count of text without a provider tokenizer.
+
+    Counts words, numbers and symbols, splitting long words into ~4 character
+    pieces. Within ~10-15% of BPE tokenizers for English chat text.
+    """
+    if not text:
+        return 0
+    # Static prompt blocks repeat on every request, so those hit the cache
+    if len(text) <= 8192:
+        return _estimate_tokens_cached(text)
+    return _estimate_tokens_cached.__wrapped__(text)
+
+
+def estimate_message_tokens(messages: Sequence[Dict[str, Any]]) -> int:
+    """Estimate tokens for a list of chat messages including format overhead"""
+    return sum(
+        estimate_tokens(str(msg.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+        for msg in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "…") -> str:
+    """Truncate text at a word boundary so it fits within max_tokens"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # Binary search over a word-boundary prefix length
+    words = text.split(" ")
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(" ".join(words[:mid])) + 1 <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+
+    if low == 0:
+        return ""
+    return " ".join(words[:low]).rstrip() + marker
+
+
+@dataclass
+class PromptSection:
+    """A named piece of a system prompt with a budgeting priority"""
+
+    name: str
+    content: str
+    priority: int = PRIORITY_NORMAL
+    # Whether the section may be cut short instead of dropped entirely
+    truncatable: bool = True
+    # Never cut below this many tokens - drop the section instead
+    min_tokens: int = 8
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.content)
+
+
+@dataclass
+class AssembledPrompt:
+    """Result of a prompt assembly pass"""
+
+    text: str
+    tokens: int
+    budget: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    assembly_ms: float = 0.0
+
+
+@dataclass
+class FittedHistory:
+    """Conversation history trimmed to a token budget"""
+
+    messages: List[Dict[str, Any]]
+    tokens: int
+    dropped_count: int = 0
+    summarized: bool = False
+
+
+class PromptAssemblyMetrics:
+    """Rolling per-request prompt token and assembly time metrics"""
+
+    def __init__(self, window: int = 1000):
+        self.total_requests = 0
+        self.total_prompt_tokens = 0
+        self.total_dropped_sections = 0
+        self.total_truncated_sections = 0
+        self.total_dropped_messages = 0
+        self.max_prompt_tokens = 0
+        self.prompt_tokens = deque(maxlen=window)
+        self.assembly_times_ms = deque(maxlen=window)
+        self.by_source: Dict[str, Dict[str, float]] = {}
+
+    def record(
+        self,
+        source: str,
+        prompt_tokens: int,
+        assembly_ms: float,
+        dropped_sections: int = 0,
+        truncated_sections: int = 0,
+        dropped_messages: int = 0,
+    ):
+        """Record one assembled request"""
+        self.total_requests += 1
+        self.total_prompt_tokens += prompt_tokens
+        self.total_dropped_sections += dropped_sections
+        self.total_truncated_sections += truncated_sections
+        self.total_dropped_messages += dropped_messages
+        self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+        self.prompt_tokens.append(prompt_tokens)
+        self.assembly_times_ms.append(assembly_ms)
+
+        source_stats = self.by_source.setdefault(
+            source, {"requests": 0, "prompt_tokens": 0, "assembly_ms": 0.0}
+        )
+        source_stats["requests"] += 1
+        source_stats["prompt_tokens"] += prompt_tokens
+        source_stats["assembly_ms"] += assembly_ms
+
+        logger.debug(
+            f"📏 Prompt assembled [{source}]: {prompt_tokens} tokens in {assembly_ms:.2f}ms"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get summary statistics"""
+        recent_tokens = sorted(self.prompt_tokens)
+        recent_times = list(self.assembly_times_ms)
+        count = len(recent_tokens)
+
+        return {
+            "total_requests": self.total_requests,
+            "total_prompt_tokens": self.total_prompt_tokens,
+            "avg_prompt_tokens": (sum(recent_tokens) / count) if count else 0.0,
+            "p95_prompt_tokens": (
+                recent_tokens[min(count - 1, int(count * 0.95))] if count else 0
+            ),
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "avg_assembly_ms": (
+                (sum(recent_times) / len(recent_times)) if recent_times else 0.0
+            ),
+            "dropped_sections": self.total_dropped_sections,
+            "truncated_sections": self.total_truncated_sections,
+            "dropped_history_messages": self.total_dropped_messages,
+            "by_source": {
+                source: {
+                    "requests": stats["requests"],
+                    "avg_prompt_tokens": stats["prompt_tokens"]
+                    / max(1, stats["requests"]),
+                    "avg_assembly_ms": stats["assembly_ms"] / max(1, stats["requests"]),
+                }
+                for source, stats in self.by_source.items()
+            },
+        }
+
+
+class PromptAssembler:
+    """Allocates a token budget across prompt sections and conversation history"""
+
+    def __init__(
+        self,
+        system_budget: int = 1200,
+        history_budget: int = 1500,
+        summary_budget: int = 60,
+    ):
+        self.system_budget = system_budget
+        self.history_budget = history_budget
+        self.summary_budget = summary_budget
+        self.metrics = PromptAssemblyMetrics()
+
+    def assemble(
+        self,
+        sections: List[PromptSection],
+        budget: Optional[int] = None,
+        separator: str = "\n\n",
+    ) -> AssembledPrompt:
+        """Assemble sections into one prompt within budget.
+
+        Sections are granted budget in priority order (ties keep insertion
+        order); a section that does not fit is truncated if allowed, otherwise
+        dropped. Core sections are always kept, even past the budget. Output
+        keeps the original section order.
+        """
+        start = time.perf_counter()
+        budget = budget or self.system_budget
+        separator_tokens = estimate_tokens(separator)
+
+        ranked = sorted(range(len(sections)), key=lambda i: sections[i].priority)
+        granted: Dict[int, str] = {}
+        truncated: List[str] = []
+        dropped: List[str] = []
+        remaining = budget
+
+        for index in ranked:
+            section = sections[index]
+            if not section.content:
+                continue
+
+            joint = separator_tokens if granted else 0
+            cost = section.tokens + joint
+            if cost <= remaining or section.priority == PRIORITY_CORE:
+                granted[index] = section.content
+                remaining -= cost
+                continue
+
+            available = remaining - joint
+            if section.truncatable and available >= section.min_tokens:
+                granted[index] = truncate_to_tokens(section.content, available)
+                remaining -= estimate_tokens(granted[index]) + joint
+                truncated.append(section.name)
+            else:
+                dropped.append(section.name)
+
+        ordered = [granted[i] for i in sorted(granted)]
+        text = separator.join(ordered)
+
+        return AssembledPrompt(
+            text=text,
+            tokens=estimate_tokens(text),
+            budget=budget,
+            included=[sections[i].name for i in sorted(granted)],
+            truncated=truncated,
+            dropped=dropped,
+            assembly_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    def fit_history(
+        self,
+        messages: List[Dict[str, Any]],
+        budget: Optional[int] = None,
+        keep_last: int = 2,
+    ) -> FittedHistory:
+        """Trim conversation history to budget, dropping lowest-value turns first.
+
+        The newest `keep_last` turns are always kept (truncated if needed).
+        Older turns are ranked by their `importance_score` (when present) and
+        recency; the cheapest-to-lose turns are removed and replaced by a
+        one-line summary so the model still knows earlier context existed.
+        """
+        budget = budget or self.history_budget
+        if not messages:
+            return FittedHistory(messages=[], tokens=0)
+
+        costs = [
+            estimate_tokens(str(msg.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+            for msg in messages
+        ]
+        total = sum(costs)
+        if total <= budget:
+            return FittedHistory(messages=list(messages), tokens=total)
+
+        count = len(messages)
+        protected = set(range(max(0, count - keep_last), count))
+
+        # Lowest value first: low importance, then oldest
+        candidates = sorted(
+            (i for i in range(count) if i not in protected),
+            key=lambda i: (float(messages[i].get("importance_score", 0.0)), i),
+        )
+
+        removed = set()
+        summary_reserve = self.summary_budget
+        for index in candidates:
+            if total + (summary_reserve if removed else 0) <= budget:
+                break
+            removed.add(index)
+            total -= costs[index]
+
+        kept = [dict(messages[i]) for i in range(count) if i not in removed]
+
+        # Protected turns alone may still exceed budget - truncate oldest first
+        if total > budget:
+            for msg in kept:
+                if total <= budget:
+                    break
+                content = str(msg.get("content", ""))
+                current = estimate_tokens(content)
+                allowed = max(0, current - (total - budget))
+                msg["content"] = truncate_to_tokens(content, allowed)
+                total -= current - estimate_tokens(msg["content"])
+
+        summarized = False
+        if removed and total + summary_reserve <= budget:
+            summary = self._summarize_dropped(
+                [messages[i] for i in sorted(removed)], summary_reserve
+            )
+            if summary:
+                kept.insert(0, {"role": "system", "content": summary})
+                total += estimate_tokens(summary) + MESSAGE_OVERHEAD_TOKENS
+                summarized = True
+
+        return FittedHistory(
+            messages=kept,
+            tokens=total,
+            dropped_count=len(removed),
+            summarized=summarized,
+        )
+
+    def _summarize_dropped(self, dropped: List[Dict[str, Any]], max_tokens: int) -> str:
+        """Extractive summary of dropped turns - first clause of each user turn"""
+        snippets = []
+        for msg in dropped:
+            if msg.get("role") != "user":
+                continue
+            content = str(msg.get("content", "")).strip()
+            if not content:
+                continue
+            first_clause = re.split(r"[.!?\n]", content, maxsplit=1)[0].strip()
+            if first_clause:
+                snippets.append(first_clause[:80])
+
+        if not snippets:
+            return f"[{len(dropped)} earlier messages omitted]"
+
+        header = f"[Earlier in this conversation ({len(dropped)} messages omitted): "
+        body = truncate_to_tokens(
+            "; ".join(snippets), max_tokens - estimate_tokens(header) - 1
+        )
+        return (
+            f"{header}{body}]" if body else f"[{len(dropped)} earlier messages omitted]"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get assembly metrics and configured budgets"""
+        return {
+            "system_budget": self.system_budget,
+            "history_budget": self.history_budget,
+            **self.metrics.get_stats(),
+        }
+
+
+# Global assembler instance
+prompt_assembler = PromptAssembler()
+
+
+__all__ = [
+    "PromptSection",
+    "AssembledPrompt",
+    "FittedHistory",
+    "PromptAssembler",
+    "PromptAssemblyMetrics",
+    "prompt_assembler",
+    "estimate_tokens",
+    "estimate_message_tokens",
+    "truncate_to_tokens",
+    "PRIORITY_CORE",
+    "PRIORITY_HIGH",
+    "PRIORITY_NORMAL",
+    "PRIORITY_LOW",
+    "PRIORITY_OPTIONAL",
+]
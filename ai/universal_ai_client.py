@@ -48,6 +48,18 @@ except ImportError:
     PERFORMANCE_OPTIMIZER_AVAILABLE = False
     logging.warning("AI Response Optimizer not available - using standard performance")
 
+from ai.conversation_store import get_conversation_store
+from ai.prompt_budget import (
+    PromptSection,
+    prompt_assembler,
+    estimate_tokens,
+    truncate_to_tokens,
+    PRIORITY_CORE,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+)
+
 # Import model mapping
 try:
     from ai.model_mapping import normalize_model_id, get_model_display_name
@@ -99,10 +111,14 @@ class ConversationContext:
     topics: List[str] = None
     conversation_stage: str = "ongoing"  # greeting, ongoing, closing
     last_interaction: Optional[datetime] = None
+    # Turns added since the last save, appended to the turn store on save
+    pending_turns: List[Dict[str, Any]] = None
 
     def __post_init__(self):
         if self.message_history is None:
             self.message_history = []
+        if self.pending_turns is None:
+            self.pending_turns = []
         if self.user_profile is None:
             self.user_profile = {}
         if self.emotional_context is None:
@@ -199,11 +215,13 @@ class UniversalAIClient:
         self.enable_topic_tracking = kwargs.get("enable_topic_tracking", True)
         self.enable_memory_system = kwargs.get("enable_memory_system", True)
 
-        # Memory for conversation contexts
+        # Memory for conversation contexts, backed by the normalized turn store
         self.conversation_contexts: Dict[str, ConversationContext] = {}
 
-        # Long-term memory system
+        # Long-term memory system; the word index maps each word of a fact to
+        # the positions of the facts containing it
         self.user_memories: Dict[int, Dict[str, Any]] = {}
+        self._memory_word_index: Dict[int, Dict[str, List[int]]] = {}
         self.important_facts: Dict[str, List[Dict[str, Any]]] = {}
 
         # Last performance log time for periodic reporting
@@ -217,6 +235,7 @@ class UniversalAIClient:
             "timeout_fallbacks": 0,
             "ultra_fast_patterns": 0,
             "ai_responses": 0,
+            "prompt_tokens": 0,
         }
         self._personality_cache = {}
         self._performance_mode = kwargs.get(
@@ -248,6 +267,11 @@ class UniversalAIClient:
         key_data = f"{message}:{user_id}:{guild_id}:{self._performance_mode}"
         return hashlib.md5(key_data.encode()).hexdigest()
 
+    @property
+    def conversation_store(self):
+        """Shared turn store (looked up each time, so a closed store is replaced)"""
+        return get_conversation_store()
+
     def _cleanup_cache(self) -> None:
         """🚀 ULTRA-FAST: Clean up old cache entries for maximum performance"""
         if not self._cache_enabled or len(self._response_cache) <= self._max_cache_size:
@@ -467,6 +491,12 @@ class UniversalAIClient:
 
         user_memory["last_updated"] = datetime.now().isoformat()
 
+        word_index: Dict[str, List[int]] = {}
+        for position, fact in enumerate(user_memory["facts"]):
+            for word in set(fact["content"].lower().split()):
+                word_index.setdefault(word, []).append(position)
+        self._memory_word_index[user_id] = word_index
+
     def _get_relevant_memories(
         self, user_id: int, current_message: str
     ) -> List[Dict[str, Any]]:
@@ -482,13 +512,16 @@ class UniversalAIClient:
             if fact["confidence"] > 0.6:
                 relevant_facts.append(fact)
 
-        # Find contextually relevant facts
-        message_words = set(current_message.lower().split())
-        for fact in user_memory["facts"]:
-            fact_words = set(fact["content"].lower().split())
-            if len(message_words.intersection(fact_words)) > 1:  # Shared words
-                if fact not in relevant_facts:
-                    relevant_facts.append(fact)
+        # Find contextually relevant facts (more than one shared word)
+        shared_words: Dict[int, int] = {}
+        word_index = self._memory_word_index.get(user_id, {})
+        for word in set(current_message.lower().split()):
+            for position in word_index.get(word, ()):
+                shared_words[position] = shared_words.get(position, 0) + 1
+        for position in sorted(shared_words):
+            fact = user_memory["facts"][position]
+            if shared_words[position] > 1 and fact not in relevant_facts:
+                relevant_facts.append(fact)
 
         return relevant_facts[:5]  # Return top 5 relevant facts
 
@@ -525,6 +558,16 @@ class UniversalAIClient:
 
         return self.conversation_contexts[context_key]
 
+    def _add_turn(self, context: ConversationContext, role: str, content: str):
+        """Add a turn to the in-memory history and queue it for the turn store"""
+        turn = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        context.message_history.append(turn)
+        context.pending_turns.append(turn)
+
     async def load_conversation_context_from_db(
         self,
         user_id: int,
@@ -532,68 +575,37 @@ class UniversalAIClient:
         channel_id: Optional[int] = None,
         db_connection=None,
     ) -> Optional[ConversationContext]:
-        """Load conversation context from database storage"""
-        try:
-            if not db_connection:
-                # Try to import the database connection if available
-                try:
-                    from utils.database import db
-
-                    db_connection = db
-                except ImportError:
-                    logger.warning(
-                        "Database connection not available for context loading"
-                    )
-                    return None
+        """Load conversation context from the turn store.
 
-            # Load from database using the same key format as the main bot
-            context_db_key = (
-                f"message_context_{guild_id if guild_id else 'dm'}_{channel_id}"
-            )
-            db_context = await db_connection.get(
-                "conversation_contexts", context_db_key, {}
+        Active conversations are served from the store's cached window;
+        others cost one indexed range read. ``db_connection`` is accepted for
+        compatibility and no longer used.
+        """
+        try:
+            recent_messages = await self.conversation_store.window(
+                user_id, guild_id, channel_id
             )
-
-            if not db_context or not db_context.get("messages"):
+            if not recent_messages:
                 return None
 
-            # Convert database context to ConversationContext
-            recent_messages = db_context.get("messages", [])[-20:]  # Last 20 messages
-
-            # Build message history in the format expected by AI
-            message_history = []
-            for msg in recent_messages:
-                role = "assistant" if msg.get("user_id") == "bot" else "user"
-                message_history.append(
-                    {
-                        "role": role,
-                        "content": msg.get("content", ""),
-                        "timestamp": msg.get("timestamp", ""),
-                    }
+            context_key = self._get_context_key(user_id, guild_id, channel_id)
+            context = self.conversation_contexts.get(context_key)
+            if context is None:
+                context = ConversationContext(
+                    user_id=user_id, guild_id=guild_id, channel_id=channel_id
                 )
+                self.conversation_contexts[context_key] = context
 
-            # Create conversation context
-            context = ConversationContext(
-                user_id=user_id,
-                guild_id=guild_id,
-                channel_id=channel_id,
-                message_history=message_history,
-                last_interaction=datetime.fromisoformat(
-                    db_context.get("last_activity", datetime.now().isoformat())
-                ),
+            context.message_history = recent_messages
+            context.last_interaction = datetime.fromisoformat(
+                recent_messages[-1]["timestamp"]
             )
 
             # Extract topics from recent messages
             if self.enable_topic_tracking:
-                all_content = " ".join(
-                    [msg.get("content", "") for msg in recent_messages]
-                )
+                all_content = " ".join(msg["content"] for msg in recent_messages)
                 context.topics = self._extract_topics(all_content)
 
-            # Store in memory cache
-            context_key = self._get_context_key(user_id, guild_id, channel_id)
-            self.conversation_contexts[context_key] = context
-
             return context
 
         except Exception as e:
@@ -603,89 +615,30 @@ class UniversalAIClient:
     async def save_conversation_context_to_db(
         self, context: ConversationContext, db_connection=None
     ):
-        """Save conversation context to database storage"""
+        """Append the context's new turns to the turn store"""
         try:
-            if not db_connection:
-                try:
-                    from utils.database import db
-
-                    db_connection = db
-                except ImportError:
-                    logger.warning(
-                        "Database connection not available for context saving"
-                    )
-                    return
-
-            # Convert ConversationContext to database format
-            context_db_key = f"message_context_{context.guild_id if context.guild_id else 'dm'}_{context.channel_id}"
-
-            # Get existing context or create new
-            existing_context = await db_connection.get(
-                "conversation_contexts", context_db_key, {"messages": []}
-            )
-
-            # Add recent interactions to database format
-            for msg in context.message_history[-5:]:  # Last 5 messages for performance
-                db_message = {
-                    "user_id": context.user_id if msg.get("role") == "user" else "bot",
-                    "username": "Bot" if msg.get("role") == "assistant" else "User",
-                    "content": msg.get("content", ""),
-                    "timestamp": msg.get("timestamp", datetime.now().isoformat()),
-                    "channel_id": context.channel_id,
-                    "guild_id": context.guild_id,
-                }
-
-                # Check if message already exists (avoid duplicates)
-                if not any(
-                    existing_msg.get("content") == db_message["content"]
-                    and existing_msg.get("timestamp") == db_message["timestamp"]
-                    for existing_msg in existing_context["messages"]
-                ):
-                    existing_context["messages"].append(db_message)
-
-            # Update metadata
-            existing_context.update(
-                {
-                    "last_activity": (
-                        context.last_interaction.isoformat()
-                        if context.last_interaction
-                        else datetime.now().isoformat()
-                    ),
-                    "channel_id": context.channel_id,
-                    "guild_id": context.guild_id,
-                    "topics": context.topics if context.topics else [],
-                    "conversation_stage": context.conversation_stage,
-                }
-            )
-
-            # Keep only recent messages
-            if len(existing_context["messages"]) > 50:
-                existing_context["messages"] = existing_context["messages"][-50:]
-
-            # Save to database
-            await db_connection.set(
-                "conversation_contexts", context_db_key, existing_context
-            )
+            pending, context.pending_turns = context.pending_turns, []
+            if pending:
+                await self.conversation_store.append_many(
+                    context.user_id,
+                    context.guild_id,
+                    context.channel_id,
+                    [
+                        (msg["role"], msg["content"], msg["timestamp"])
+                        for msg in pending
+                    ],
+                )
 
         except Exception as e:
             logger.error(f"Error saving conversation context to database: {e}")
 
     async def store_conversation_context_to_db(self, conversation_context: list):
-        """Store conversation context from list format to database"""
+        """Store conversation context from list format to the turn store"""
         try:
             # Extract context info from the conversation list
             if not conversation_context:
                 return
 
-            # Get database connection
-            try:
-                from utils.database import db
-
-                db_connection = db
-            except ImportError:
-                logger.warning("Database connection not available for context storing")
-                return
-
             # Extract identifiers from context (look for user info in messages)
             guild_id = None
             channel_id = None
@@ -701,58 +654,26 @@ class UniversalAIClient:
                     if "user_id" in msg:
                         user_id = msg["user_id"]
 
-            # Create database key
-            context_db_key = (
-                f"conversation_context_{guild_id or 'dm'}_{channel_id or 'unknown'}"
-            )
-
-            # Get existing context or create new
-            existing_context = await db_connection.get(
-                "conversation_contexts", context_db_key, {"messages": []}
-            )
-
-            # Add conversation messages to database format
-            for msg in conversation_context[-10:]:  # Last 10 messages for performance
-                if isinstance(msg, dict) and "content" in msg:
-                    db_message = {
-                        "user_id": user_id if msg.get("role") == "user" else "bot",
-                        "username": "User" if msg.get("role") == "user" else "Bot",
-                        "content": msg.get("content", ""),
-                        "timestamp": msg.get("timestamp", datetime.now().isoformat()),
-                        "channel_id": channel_id,
-                        "guild_id": guild_id,
-                        "role": msg.get("role", "unknown"),
-                    }
-
-                    # Check if message already exists (avoid duplicates)
-                    if not any(
-                        existing_msg.get("content") == db_message["content"]
-                        and existing_msg.get("timestamp") == db_message["timestamp"]
-                        for existing_msg in existing_context["messages"]
-                    ):
-                        existing_context["messages"].append(db_message)
+            if user_id is None:
+                logger.debug("Skipping conversation context without a user ID")
+                return
 
-            # Update metadata
-            existing_context.update(
-                {
-                    "last_activity": datetime.now().isoformat(),
-                    "channel_id": channel_id,
-                    "guild_id": guild_id,
-                    "message_count": len(existing_context["messages"]),
-                }
+            # Turns the conversation already has (same role, content and
+            # timestamp) are skipped
+            turns = [
+                (msg.get("role", "user"), msg["content"], msg.get("timestamp"))
+                for msg in conversation_context[-10:]  # Last 10 messages
+                if isinstance(msg, dict) and "content" in msg
+            ]
+            stored = await self.conversation_store.append_missing(
+                user_id, guild_id, channel_id, turns
             )
 
-            # Keep only recent messages
-            if len(existing_context["messages"]) > 50:
-                existing_context["messages"] = existing_context["messages"][-50:]
-
-            # Save to database
-            await db_connection.set(
-                "conversation_contexts", context_db_key, existing_context
+            logger.debug(
+                f"Stored {stored} conversation turns for {guild_id or 'dm'}:"
+                f"{channel_id}:{user_id}"
             )
 
-            logger.debug(f"Stored conversation context to database: {context_db_key}")
-
         except Exception as e:
             logger.error(f"Error storing conversation context to database: {e}")
 
@@ -1022,19 +943,33 @@ class UniversalAIClient:
         self, context: ConversationContext, current_message: str
     ) -> List[Dict[str, str]]:
         """Build enhanced context messages with conversation history and analysis"""
+        assembly_start = time.perf_counter()
         messages = []
 
         # Add system message with rich context
         system_prompt = self._build_enhanced_system_prompt(context, current_message)
         messages.append({"role": "system", "content": system_prompt})
 
-        # Add recent conversation history (sliding window)
+        # Add recent conversation history (sliding window) within the token window
         recent_messages = context.message_history[-self.max_context_messages :]
-        for msg in recent_messages:
+        history_budget = max(
+            256, self.context_window_tokens - estimate_tokens(system_prompt)
+        )
+        fitted = prompt_assembler.fit_history(recent_messages, budget=history_budget)
+        for msg in fitted.messages:
             messages.append(
                 {"role": msg.get("role", "user"), "content": msg.get("content", "")}
             )
 
+        prompt_tokens = estimate_tokens(system_prompt) + fitted.tokens
+        self._performance_stats["prompt_tokens"] += prompt_tokens
+        prompt_assembler.metrics.record(
+            source="universal_client",
+            prompt_tokens=prompt_tokens,
+            assembly_ms=(time.perf_counter() - assembly_start) * 1000,
+            dropped_messages=fitted.dropped_count,
+        )
+
         return messages
 
     def _build_enhanced_system_prompt(
@@ -1192,8 +1127,12 @@ Be natural, engaging, and context-aware in your responses."""
         self, context: ConversationContext, current_message: str
     ) -> str:
         """Build a detailed system prompt (original version for when detail is needed) WITH personality traits"""
-        prompt_parts = [
-            """You are Astra, an advanced AI assistant for Discord with comprehensive capabilities across moderation, security, community management, and intelligent engagement.
+        sections = [
+            PromptSection(
+                name="identity",
+                priority=PRIORITY_CORE,
+                truncatable=False,
+                content="""You are Astra, an advanced AI assistant for Discord with comprehensive capabilities across moderation, security, community management, and intelligent engagement.
 
 ═══════════════════════════════════════════════════════════════
 CORE IDENTITY & CAPABILITIES
@@ -1377,41 +1316,63 @@ WHEN DISCUSSING APPEALS:
 • Encourage respectful, detailed appeal reasoning
 
 You possess emotional intelligence and adapt your responses based on the user's emotional state, conversation history, and communication patterns.""",
+            ),
         ]
 
         # 🎭 INJECT PERSONALITY TRAITS - Detailed version
         personality_instruction = self._build_personality_instruction(context)
         if personality_instruction:
-            prompt_parts.append(f"\n{personality_instruction}")
+            sections.append(
+                PromptSection(
+                    "personality", f"\n{personality_instruction}", PRIORITY_HIGH
+                )
+            )
 
-        # Add memory-based user context
+        # Add memory-based user context (each memory capped so one long fact can't dominate)
         if context.user_id and self.enable_memory_system:
             relevant_memories = self._get_relevant_memories(
                 context.user_id, current_message
             )
-            if relevant_memories:
-                prompt_parts.append("\nWhat you remember about this user:")
-                for memory in relevant_memories[:2]:  # Top 2 most relevant
-                    if memory["type"] in ["name", "occupation", "interests"]:
-                        prompt_parts.append(f"- {memory['content']}")
+            memory_lines = [
+                f"- {truncate_to_tokens(memory['content'], 40)}"
+                for memory in relevant_memories[:2]  # Top 2 most relevant
+                if memory["type"] in ["name", "occupation", "interests"]
+            ]
+            if memory_lines:
+                sections.append(
+                    PromptSection(
+                        "memories",
+                        "\n".join(
+                            ["\nWhat you remember about this user:"] + memory_lines
+                        ),
+                        PRIORITY_NORMAL,
+                    )
+                )
 
         # Add user context
         if context.user_profile:
             name = context.user_profile.get("name", "")
             if name:
-                prompt_parts.append(f"You're talking with {name}.")
+                sections.append(
+                    PromptSection(
+                        "user_name", f"You're talking with {name}.", PRIORITY_HIGH
+                    )
+                )
 
             interaction_count = context.user_profile.get("interaction_count", 0)
+            relationship = None
             if interaction_count > 20:
-                prompt_parts.append(
+                relationship = (
                     "You have a well-established relationship with this user."
                 )
             elif interaction_count > 10:
-                prompt_parts.append(
-                    "You're developing a good relationship with this user."
-                )
+                relationship = "You're developing a good relationship with this user."
             elif interaction_count > 3:
-                prompt_parts.append("You're getting to know this user better.")
+                relationship = "You're getting to know this user better."
+            if relationship:
+                sections.append(
+                    PromptSection("relationship", relationship, PRIORITY_LOW)
+                )
 
         # Add emotional context
         if context.emotional_context:
@@ -1425,18 +1386,33 @@ You possess emotional intelligence and adapt your responses based on the user's
                     "anxious": "The user seems worried. Be reassuring.",
                 }
                 if emotion in emotion_guidance:
-                    prompt_parts.append(emotion_guidance[emotion])
+                    sections.append(
+                        PromptSection(
+                            "emotion", emotion_guidance[emotion], PRIORITY_HIGH
+                        )
+                    )
 
         # Add topics
         if context.topics:
             recent_topics = context.topics[-2:]
             topics_str = ", ".join(recent_topics)
-            prompt_parts.append(f"Recent topics: {topics_str}")
+            sections.append(
+                PromptSection("topics", f"Recent topics: {topics_str}", PRIORITY_LOW)
+            )
 
         # Add guidelines
-        prompt_parts.append("Respond naturally and be helpful.")
+        sections.append(
+            PromptSection(
+                "guidelines",
+                "Respond naturally and be helpful.",
+                PRIORITY_CORE,
+                truncatable=False,
+            )
+        )
 
-        return "\n".join(prompt_parts)
+        # The static identity block is always kept; dynamic context shares what's left
+        budget = sections[0].tokens + self.context_window_tokens // 8
+        return prompt_assembler.assemble(sections, budget=budget, separator="\n").text
 
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for the current provider"""
@@ -1670,13 +1646,7 @@ You possess emotional intelligence and adapt your responses based on the user's
                 conversation_context.conversation_stage = "ongoing"
 
             # Add current message to history
-            conversation_context.message_history.append(
-                {
-                    "role": "user",
-                    "content": message,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            )
+            self._add_turn(conversation_context, "user", message)
 
             # 🚀 ULTRA-FAST: Trim history for maximum performance
             if len(conversation_context.message_history) > self.max_context_messages:
@@ -1784,12 +1754,8 @@ Be natural, helpful, and context-aware."""
 
                     # Store conversation history if context exists
                     if conversation_context:
-                        conversation_context.message_history.append(
-                            {
-                                "role": "assistant",
-                                "content": ai_response.content,
-                                "timestamp": datetime.now(timezone.utc).isoformat(),
-                            }
+                        self._add_turn(
+                            conversation_context, "assistant", ai_response.content
                         )
                         await self.save_conversation_context_to_db(conversation_context)
 
@@ -1917,13 +1883,7 @@ Be natural, helpful, and context-aware."""
 
                 # Add response to conversation history
                 if conversation_context:
-                    conversation_context.message_history.append(
-                        {
-                            "role": "assistant",
-                            "content": content,
-                            "timestamp": datetime.now().isoformat(),
-                        }
-                    )
+                    self._add_turn(conversation_context, "assistant", content)
 
                     # Extract and store important facts for memory system
                     if self.enable_memory_system and user_id is not None:
@@ -2125,6 +2085,7 @@ Be natural, helpful, and context-aware."""
         context_key = self._get_context_key(user_id, guild_id, channel_id)
         if context_key in self.conversation_contexts:
             del self.conversation_contexts[context_key]
+        await self.conversation_store.clear(user_id, guild_id, channel_id)
 
     async def get_context_summary(
         self,
@@ -16,8 +16,165 @@ from enum import Enum
 import sqlite3
 from pathlib import Path
 
+from ai.message_features import (
+    HUMOR_INDICATORS,
+    HUMOR_PATTERNS,
+    TOPIC_LEXICON,
+    extract_features,
+    register_lexicon,
+)
+from utils.bounded_store import BoundedStore
+from utils.storage_engine import get_storage
+from utils.write_buffer import BufferedWriter
+
 logger = logging.getLogger("astra.universal_context")
 
+_REPEATED_EXCLAMATION = re.compile(r"!{2,}")
+_REPEATED_PUNCTUATION = re.compile(r"[!?]{2,}")
+
+
+def _compile_any(patterns: List[str]) -> re.Pattern:
+    """One regex that matches wherever any of ``patterns`` would"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+# Tone keyword lists, matched by the shared lexicon engine
+CONTEXT_TONE_LEXICON = {
+    "technical": [
+        "function",
+        "algorithm",
+        "code",
+        "syntax",
+        "error",
+        "debug",
+        "compile",
+        "api",
+        "database",
+        "server",
+        "framework",
+        "library",
+        "repository",
+        "implementation",
+        "configuration",
+        "deployment",
+        "optimization",
+        "architecture",
+        "protocol",
+        "interface",
+        "documentation",
+        "version",
+    ],
+    "excitement": [
+        "wow",
+        "awesome",
+        "amazing",
+        "incredible",
+        "fantastic",
+        "epic",
+        "stellar",
+        "omg",
+        "lol",
+        "lmao",
+        "rofl",
+        "😍",
+        "🤩",
+        "🔥",
+        "⚡",
+        "💯",
+        "🚀",
+        "🌟",
+        "✨",
+    ],
+    "emotional": [
+        "love",
+        "hate",
+        "feel",
+        "emotion",
+        "heart",
+        "soul",
+        "pain",
+        "joy",
+        "sad",
+        "happy",
+        "angry",
+        "frustrated",
+        "wonderful",
+        "terrible",
+        "devastating",
+        "beautiful",
+        "ugly",
+        "amazing",
+        "❤️",
+        "💔",
+        "😢",
+        "😭",
+        "😡",
+        "😤",
+        "😔",
+        "🥺",
+        "😊",
+        "😀",
+        "😃",
+    ],
+    "casual": [
+        "lol",
+        "haha",
+        "yeah",
+        "nah",
+        "gonna",
+        "wanna",
+        "sup",
+        "hey",
+        "yo",
+        "dude",
+        "bro",
+        "man",
+        "tbh",
+        "ngl",
+        "imo",
+        "btw",
+        "rn",
+        "omg",
+        "'ll",
+        "'re",
+        "'ve",
+        "'d",
+        "isn't",
+        "won't",
+        "can't",
+        "don't",
+    ],
+    "formal": [
+        "therefore",
+        "however",
+        "furthermore",
+        "nevertheless",
+        "consequently",
+        "additionally",
+        "specifically",
+        "particularly",
+        "regarding",
+        "concerning",
+        "implementation",
+        "consideration",
+        "evaluation",
+        "assessment",
+        "analysis",
+    ],
+    "high_emotion": [
+        "amazing",
+        "incredible",
+        "fantastic",
+        "terrible",
+        "awful",
+        "love",
+        "hate",
+        "excited",
+        "furious",
+        "devastated",
+    ],
+}
+
 
 class ConversationTone(Enum):
     """Conversation tone detection"""
@@ -70,7 +227,7 @@ class MessageContext:
     timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
 
-@dataclass
+@dataclass(slots=True)
 class UserConversationState:
     """Track user's conversation state"""
 
@@ -91,305 +248,25 @@ class HumorDetector:
     """Advanced humor detection with multiple patterns"""
 
     def __init__(self):
-        self.humor_patterns = {
-            "sarcasm": [
-                r"oh (really|sure|great|wonderful)",
-                r"wow.*so.*",
-                r"thanks (a lot|so much)",
-                r"(perfect|fantastic|amazing).*\.",
-                r"because that's exactly what",
-            ],
-            "jokes": [
-                r"why did.*",
-                r"knock knock",
-                r"what do you call.*",
-                r".*walks into a bar",
-                r"pun intended",
-            ],
-            "playful": [
-                r"haha|hehe|lol|lmao|rofl",
-                r"😂|🤣|😆|😄|😁",
-                r"that's funny",
-                r"made me laugh",
-                r"good one",
-            ],
-            "wordplay": [
-                r"pun|punny",
-                r"play on words",
-                r"clever.*word",
-                r"double meaning",
-            ],
-            "memes": [
-                r"among us|sus|impostor",
-                r"poggers|pog|pogchamp",
-                r"based|cringe",
-                r"big brain|galaxy brain",
-                r"this is the way",
-                r"stonks|hodl",
-            ],
-        }
-
-        self.humor_indicators = [
-            "!",
-            "?!",
-            "lol",
-            "haha",
-            "😂",
-            "🤣",
-            "😆",
-            "xd",
-            "lmao",
-        ]
+        self.humor_patterns = HUMOR_PATTERNS
+        self.humor_indicators = HUMOR_INDICATORS
 
-    def detect_humor(self, text: str) -> Tuple[bool, float, str]:
+    def detect_humor(
+        self, text: str, message_id: Optional[int] = None
+    ) -> Tuple[bool, float, str]:
         """
         Detect humor in text
         Returns: (is_humorous, humor_score, humor_type)
         """
-        text_lower = text.lower()
-        humor_score = 0.0
-        humor_types = []
-
-        # Check patterns
-        for humor_type, patterns in self.humor_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    humor_score += 0.3
-                    humor_types.append(humor_type)
-
-        # Check indicators
-        for indicator in self.humor_indicators:
-            if indicator in text_lower:
-                humor_score += 0.1
-
-        # Punctuation analysis
-        exclamation_count = text.count("!")
-        if exclamation_count > 1:
-            humor_score += min(0.2, exclamation_count * 0.05)
-
-        # Emoji analysis
-        emoji_count = len(re.findall(r"[😀-🙏]", text))
-        if emoji_count > 0:
-            humor_score += min(0.3, emoji_count * 0.1)
-
-        # Caps analysis (playful caps)
-        caps_ratio = sum(1 for c in text if c.isupper()) / max(1, len(text))
-        if 0.3 < caps_ratio < 0.8:  # Partial caps (playful)
-            humor_score += 0.1
-
-        humor_score = min(1.0, humor_score)
-        main_humor_type = humor_types[0] if humor_types else "general"
-
-        return humor_score > 0.2, humor_score, main_humor_type
+        features = extract_features(text, message_id)
+        return features.is_humorous, features.humor_score, features.humor_type
 
 
 class ConversationAnalyzer:
     """Analyze conversation context and determine response strategies"""
 
     def __init__(self):
-        self.topic_keywords = {
-            "gaming": [
-                "game",
-                "gaming",
-                "play",
-                "player",
-                "level",
-                "achievement",
-                "strategy",
-                "multiplayer",
-                "campaign",
-                "mod",
-                "dlc",
-                "steam",
-                "pc gaming",
-                "console",
-                "mobile game",
-                "esports",
-            ],
-            "technology": [
-                "ai",
-                "artificial intelligence",
-                "machine learning",
-                "robot",
-                "tech",
-                "computer",
-                "software",
-                "programming",
-                "algorithm",
-                "quantum",
-                "coding",
-                "development",
-                "app",
-                "digital",
-                "internet",
-                "web",
-            ],
-            "entertainment": [
-                "movie",
-                "film",
-                "tv show",
-                "series",
-                "music",
-                "song",
-                "album",
-                "artist",
-                "book",
-                "novel",
-                "anime",
-                "manga",
-                "podcast",
-                "streaming",
-                "netflix",
-                "youtube",
-                "video",
-                "content",
-            ],
-            "lifestyle": [
-                "food",
-                "cooking",
-                "recipe",
-                "travel",
-                "vacation",
-                "hobby",
-                "fitness",
-                "workout",
-                "health",
-                "wellness",
-                "fashion",
-                "style",
-                "photography",
-                "art",
-                "craft",
-                "diy",
-                "home",
-                "garden",
-            ],
-            "social": [
-                "friend",
-                "community",
-                "together",
-                "team",
-                "group",
-                "chat",
-                "talk",
-                "conversation",
-                "discuss",
-                "share",
-                "opinion",
-                "thoughts",
-                "relationship",
-                "family",
-                "social media",
-                "dating",
-            ],
-            "education": [
-                "learn",
-                "study",
-                "school",
-                "college",
-                "university",
-                "course",
-                "class",
-                "teacher",
-                "student",
-                "education",
-                "knowledge",
-                "skill",
-                "training",
-                "tutorial",
-                "exam",
-                "homework",
-                "research",
-                "academic",
-            ],
-            "business": [
-                "work",
-                "job",
-                "career",
-                "business",
-                "company",
-                "office",
-                "project",
-                "meeting",
-                "team",
-                "management",
-                "startup",
-                "entrepreneur",
-                "finance",
-                "money",
-                "investment",
-                "marketing",
-                "sales",
-                "productivity",
-            ],
-            "science": [
-                "science",
-                "research",
-                "discovery",
-                "experiment",
-                "theory",
-                "physics",
-                "chemistry",
-                "biology",
-                "mathematics",
-                "scientific method",
-                "data",
-                "analysis",
-                "statistics",
-                "innovation",
-            ],
-            "space": [
-                "space",
-                "cosmos",
-                "universe",
-                "galaxy",
-                "star",
-                "planet",
-                "astronomy",
-                "nebula",
-                "black hole",
-                "spacecraft",
-                "rocket",
-                "nasa",
-                "spacex",
-                "astrology",
-                "satellite",
-            ],
-            "stellaris": [
-                "stellaris",
-                "empire",
-                "species",
-                "galactic",
-                "federation",
-                "ethics",
-                "ascension",
-                "hyperlane",
-                "paradox",
-                "strategy",
-                "expansion",
-                "diplomacy",
-                "4x game",
-                "grand strategy",
-            ],
-            "help": [
-                "help",
-                "assistance",
-                "support",
-                "explain",
-                "how to",
-                "tutorial",
-                "guide",
-                "confused",
-                "problem",
-                "issue",
-                "stuck",
-                "error",
-                "question",
-                "advice",
-                "tip",
-                "suggestion",
-            ],
-        }
+        self.topic_keywords = TOPIC_LEXICON
 
         self.greeting_patterns = [
             r"^(hi|hello|hey|good morning|good evening|sup|what\'s up)",
@@ -473,19 +350,50 @@ class ConversationAnalyzer:
             ],
         }
 
+        # Keyword lists are matched by the shared lexicon engine; only true
+        # patterns are left as (pre-compiled) regexes
+        register_lexicon("context.tone", CONTEXT_TONE_LEXICON)
+        self._question_regexes = [re.compile(p) for p in self.question_patterns]
+
+        # Trigger checks only ask whether any pattern of a set matches, so
+        # each set is folded into a single alternation
+        self._pattern_sets = {
+            name: _compile_any(getattr(self, f"{name}_patterns"))
+            for name in (
+                "question",
+                "greeting",
+                "celebration",
+                "bot_mention",
+                "conversation_starter",
+                "opinion",
+                "story",
+                "collaborative",
+                "reaction_worthy",
+            )
+        }
+        self._pattern_sets["emotion"] = _compile_any(
+            [p for patterns in self.emotion_patterns.values() for p in patterns]
+        )
+
     def analyze_message(
-        self, text: str, user_id: int, channel_context: Dict = None
+        self,
+        text: str,
+        user_id: int,
+        channel_context: Dict = None,
+        message_id: Optional[int] = None,
     ) -> MessageContext:
         """Analyze a message and return context information"""
         context = MessageContext(user_id=user_id, content=text)
 
+        # Tokenize once; every detector below reuses the memoized features
+        features = extract_features(text, message_id)
+
         # Detect tone
         context.tone = self._detect_tone(text)
 
         # Detect humor
-        is_humorous, humor_score, humor_type = HumorDetector().detect_humor(text)
-        context.humor_score = humor_score
-        if is_humorous:
+        context.humor_score = features.humor_score
+        if features.is_humorous:
             context.response_triggers.append(ResponseTrigger.HUMOR_DETECTED)
 
         # Extract topics
@@ -507,8 +415,9 @@ class ConversationAnalyzer:
 
     def _detect_tone(self, text: str) -> ConversationTone:
         """Enhanced systematic tone detection based on multiple linguistic indicators"""
+        features = extract_features(text)
         text_lower = text.lower()
-        text_len = len(text)
+        text_len = features.length
 
         # Initialize tone scoring system
         tone_scores = {
@@ -522,119 +431,35 @@ class ConversationAnalyzer:
         }
 
         # 1. Humor Detection (highest priority)
-        is_humorous, _, _ = HumorDetector().detect_humor(text)
-        if is_humorous:
+        if features.is_humorous:
             tone_scores[ConversationTone.HUMOROUS] += 5
 
         # 2. Question Patterns
         question_indicators = 0
-        for pattern in self.question_patterns:
-            question_indicators += len(re.findall(pattern, text_lower))
+        for pattern in self._question_regexes:
+            question_indicators += len(pattern.findall(text_lower))
         tone_scores[ConversationTone.QUESTIONING] += min(question_indicators * 2, 5)
 
         # 3. Technical Content Analysis
-        tech_indicators = [
-            "function",
-            "algorithm",
-            "code",
-            "syntax",
-            "error",
-            "debug",
-            "compile",
-            "api",
-            "database",
-            "server",
-            "framework",
-            "library",
-            "repository",
-            "implementation",
-            "configuration",
-            "deployment",
-            "optimization",
-            "architecture",
-            "protocol",
-            "interface",
-            "documentation",
-            "version",
-        ]
-        tech_score = sum(1 for word in tech_indicators if word in text_lower)
+        tech_score = features.count("context.tone", "technical")
         tone_scores[ConversationTone.TECHNICAL] += min(tech_score, 5)
 
         # 4. Excitement Indicators
-        excitement_patterns = [
-            r"\b(wow|awesome|amazing|incredible|fantastic|epic|stellar)\b",
-            r"[!]{2,}",
-            r"[A-Z]{3,}",
-            r"😍|🤩|🔥|⚡|💯|🚀|🌟|✨",
-            r"\b(omg|lol|lmao|rofl)\b",
-        ]
-        excitement_score = sum(
-            len(re.findall(pattern, text_lower)) for pattern in excitement_patterns
+        excitement_score = features.count("context.tone", "excitement") + len(
+            _REPEATED_EXCLAMATION.findall(text)
         )
         tone_scores[ConversationTone.EXCITED] += min(excitement_score * 2, 5)
 
         # 5. Emotional Content
-        emotional_indicators = [
-            r"\b(love|hate|feel|emotion|heart|soul|pain|joy|sad|happy|angry|frustrated)\b",
-            r"❤️|💔|😢|😭|😡|😤|😔|🥺|😊|😀|😃",
-            r"\b(wonderful|terrible|devastating|beautiful|ugly|amazing)\b",
-        ]
-        emotional_score = sum(
-            len(re.findall(pattern, text_lower)) for pattern in emotional_indicators
-        )
+        emotional_score = features.count("context.tone", "emotional")
         tone_scores[ConversationTone.EMOTIONAL] += min(emotional_score * 2, 5)
 
         # 6. Casual vs Formal Language Analysis
-        casual_indicators = [
-            "lol",
-            "haha",
-            "yeah",
-            "nah",
-            "gonna",
-            "wanna",
-            "sup",
-            "hey",
-            "yo",
-            "dude",
-            "bro",
-            "man",
-            "tbh",
-            "ngl",
-            "imo",
-            "btw",
-            "rn",
-            "omg",
-            "'ll",
-            "'re",
-            "'ve",
-            "'d",
-            "isn't",
-            "won't",
-            "can't",
-            "don't",
-        ]
-        casual_score = sum(1 for word in casual_indicators if word in text_lower)
+        casual_score = features.count("context.tone", "casual")
         tone_scores[ConversationTone.CASUAL] += min(casual_score, 5)
 
         # 7. Formal/Serious Language Indicators
-        formal_indicators = [
-            "therefore",
-            "however",
-            "furthermore",
-            "nevertheless",
-            "consequently",
-            "additionally",
-            "specifically",
-            "particularly",
-            "regarding",
-            "concerning",
-            "implementation",
-            "consideration",
-            "evaluation",
-            "assessment",
-            "analysis",
-        ]
-        formal_score = sum(1 for word in formal_indicators if word in text_lower)
+        formal_score = features.count("context.tone", "formal")
 
         # Long, structured messages tend to be more serious
         if text_len > 150 and formal_score > 0:
@@ -644,16 +469,15 @@ class ConversationAnalyzer:
 
         # 8. Contextual Adjustments
         # Multiple punctuation suggests excitement or emotion
-        if len(re.findall(r"[!?]{2,}", text)) > 0:
+        if _REPEATED_PUNCTUATION.search(text):
             tone_scores[ConversationTone.EXCITED] += 2
 
         # All caps words suggest emphasis/excitement
-        caps_words = len(re.findall(r"\b[A-Z]{2,}\b", text))
-        if caps_words > 0:
-            tone_scores[ConversationTone.EXCITED] += caps_words
+        if features.caps_words > 0:
+            tone_scores[ConversationTone.EXCITED] += features.caps_words
 
         # Short messages with minimal punctuation tend to be casual
-        if text_len < 50 and not any(char in text for char in "!?"):
+        if text_len < 50 and not (features.exclamations or features.questions):
             tone_scores[ConversationTone.CASUAL] += 2
 
         # Return the tone with the highest score
@@ -667,49 +491,25 @@ class ConversationAnalyzer:
 
     def _extract_topics(self, text: str) -> List[str]:
         """Extract topics from the message"""
-        text_lower = text.lower()
-        found_topics = []
-
-        for topic, keywords in self.topic_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                found_topics.append(topic)
-
-        return found_topics
+        return list(extract_features(text).topics)
 
     def _detect_emotional_intensity(self, text: str) -> float:
         """Detect emotional intensity (0.0 to 1.0)"""
+        features = extract_features(text)
         intensity = 0.5  # baseline
 
         # Punctuation indicators
-        exclamation_count = text.count("!")
-        intensity += min(0.3, exclamation_count * 0.1)
+        intensity += min(0.3, features.exclamations * 0.1)
 
-        question_count = text.count("?")
-        if question_count > 1:
+        if features.questions > 1:
             intensity += 0.1
 
         # Caps analysis
-        caps_ratio = sum(1 for c in text if c.isupper()) / max(1, len(text))
-        if caps_ratio > 0.5:
+        if features.caps_ratio > 0.5:
             intensity += 0.2
 
         # Emotional words
-        high_emotion_words = [
-            "amazing",
-            "incredible",
-            "fantastic",
-            "terrible",
-            "awful",
-            "love",
-            "hate",
-            "excited",
-            "furious",
-            "devastated",
-        ]
-
-        for word in high_emotion_words:
-            if word in text.lower():
-                intensity += 0.15
+        intensity += 0.15 * features.count("context.tone", "high_emotion")
 
         return min(1.0, intensity)
 
@@ -719,7 +519,7 @@ class ConversationAnalyzer:
         triggers = []
 
         # Questions
-        if any(re.search(pattern, text_lower) for pattern in self.question_patterns):
+        if self._pattern_sets["question"].search(text_lower):
             triggers.append(ResponseTrigger.QUESTION_ASKED)
 
         # Help requests
@@ -728,42 +528,35 @@ class ConversationAnalyzer:
             triggers.append(ResponseTrigger.HELP_NEEDED)
 
         # Greetings
-        if any(re.search(pattern, text_lower) for pattern in self.greeting_patterns):
+        if self._pattern_sets["greeting"].search(text_lower):
             triggers.append(ResponseTrigger.GREETING)
 
         # Celebrations
-        if any(re.search(pattern, text_lower) for pattern in self.celebration_patterns):
+        if self._pattern_sets["celebration"].search(text_lower):
             triggers.append(ResponseTrigger.CELEBRATION)
 
         # Bot mentions - NEW
-        if any(re.search(pattern, text_lower) for pattern in self.bot_mention_patterns):
+        if self._pattern_sets["bot_mention"].search(text_lower):
             triggers.append(ResponseTrigger.BOT_MENTIONED)
 
         # Conversation starters - NEW
-        if any(
-            re.search(pattern, text_lower)
-            for pattern in self.conversation_starter_patterns
-        ):
+        if self._pattern_sets["conversation_starter"].search(text_lower):
             triggers.append(ResponseTrigger.CONVERSATION_STARTER)
 
         # Opinion sharing - NEW
-        if any(re.search(pattern, text_lower) for pattern in self.opinion_patterns):
+        if self._pattern_sets["opinion"].search(text_lower):
             triggers.append(ResponseTrigger.OPINION_SHARING)
 
         # Story telling - NEW
-        if any(re.search(pattern, text_lower) for pattern in self.story_patterns):
+        if self._pattern_sets["story"].search(text_lower):
             triggers.append(ResponseTrigger.STORY_TELLING)
 
         # Collaborative discussion - NEW
-        if any(
-            re.search(pattern, text_lower) for pattern in self.collaborative_patterns
-        ):
+        if self._pattern_sets["collaborative"].search(text_lower):
             triggers.append(ResponseTrigger.COLLABORATIVE_DISCUSSION)
 
         # Reaction worthy content - NEW
-        if any(
-            re.search(pattern, text_lower) for pattern in self.reaction_worthy_patterns
-        ):
+        if self._pattern_sets["reaction_worthy"].search(text_lower):
             triggers.append(ResponseTrigger.REACTION_WORTHY)
 
         # Topic matches
@@ -771,18 +564,14 @@ class ConversationAnalyzer:
             triggers.append(ResponseTrigger.TOPIC_MATCH)
 
         # Emotional support
-        for emotion_patterns in self.emotion_patterns.values():
-            if any(re.search(pattern, text_lower) for pattern in emotion_patterns):
-                triggers.append(ResponseTrigger.EMOTIONAL_SUPPORT)
-                break
+        if self._pattern_sets["emotion"].search(text_lower):
+            triggers.append(ResponseTrigger.EMOTIONAL_SUPPORT)
 
         # Conversation flow detection - NEW
         # Detect if this message seems to be continuing an ongoing conversation
         if (
             len(text) > 20  # Substantial message
-            and not any(
-                re.search(pattern, text_lower) for pattern in self.greeting_patterns
-            )  # Not a greeting
+            and not self._pattern_sets["greeting"].search(text_lower)  # Not a greeting
             and (text.count(".") > 0 or text.count(",") > 1)
         ):  # Has sentence structure
             triggers.append(ResponseTrigger.CONVERSATION_FLOW)
@@ -942,8 +731,14 @@ class UniversalContextManager:
         self.analyzer = ConversationAnalyzer()
         self.humor_detector = HumorDetector()
 
-        # User state tracking
-        self.user_states: Dict[int, UserConversationState] = {}
+        # User state tracking: bounded, idle states are written back to
+        # user_conversation_states and reloaded on the user's next message
+        self.user_states: BoundedStore = BoundedStore(
+            "context.user_states",
+            max_entries=5000,
+            ttl=6 * 3600,
+            write_back=self._persist_user_state,
+        )
         self.channel_contexts: Dict[int, Dict[str, Any]] = {}
 
         # Response rate limiting
@@ -967,6 +762,20 @@ class UniversalContextManager:
         self.db_path = Path("data/context_manager.db")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._setup_database()
+        self.storage = get_storage(self.db_path)
+
+        # Analyzed messages are buffered and written in batches so analysis
+        # never waits on a commit
+        self.context_writer = BufferedWriter(
+            self.storage,
+            """
+            INSERT INTO message_contexts
+            (user_id, channel_id, guild_id, content, tone, humor_score,
+             emotional_intensity, topics, response_triggers, response_probability, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            name="message contexts",
+        )
 
         logger.info("Universal Context Manager initialized")
 
@@ -1033,17 +842,22 @@ class UniversalContextManager:
         channel_id: int = None,
         guild_id: int = None,
         user_display_name: str = None,
+        message_id: Optional[int] = None,
     ) -> MessageContext:
         """Analyze a message and return context"""
 
         # Get or create user state
         if user_id not in self.user_states:
-            self.user_states[user_id] = UserConversationState(user_id=user_id)
+            self.user_states.put(
+                user_id, await self._load_user_state(user_id), dirty=False
+            )
 
         user_state = self.user_states[user_id]
 
         # Analyze the message
-        context = self.analyzer.analyze_message(message_content, user_id)
+        context = self.analyzer.analyze_message(
+            message_content, user_id, message_id=message_id
+        )
 
         # Update user state
         user_state.recent_messages.append(
@@ -1057,6 +871,7 @@ class UniversalContextManager:
 
         # Update user patterns
         await self._update_user_patterns(user_state, context)
+        self.user_states.mark_dirty(user_id)
 
         # Store context in database
         await self._store_context(context, channel_id, guild_id)
@@ -1244,21 +1059,64 @@ class UniversalContextManager:
         if channel_id:
             self.channel_last_response[channel_id] = current_time
 
-        # Update database
+        # Update database (the row may still be in the write buffer)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    UPDATE message_contexts 
-                    SET bot_responded = 1 
-                    WHERE user_id = ? AND content = ? AND timestamp = ?
-                """,
-                    (context.user_id, context.content, context.timestamp.isoformat()),
-                )
-                conn.commit()
+            await self.context_writer.flush()
+            await self.storage.execute(
+                """
+                UPDATE message_contexts 
+                SET bot_responded = 1 
+                WHERE user_id = ? AND content = ? AND timestamp = ?
+            """,
+                (context.user_id, context.content, context.timestamp.isoformat()),
+            )
         except Exception as e:
             logger.error(f"Error marking response in database: {e}")
 
+    async def _load_user_state(self, user_id: int) -> UserConversationState:
+        """Restore a state written back on eviction, or start a new one"""
+        state = UserConversationState(user_id=user_id)
+        try:
+            row = await self.storage.fetch_one(
+                """
+                SELECT humor_frequency, typical_response_length, preferred_topics,
+                       engagement_level, conversation_quality, last_interaction
+                FROM user_conversation_states WHERE user_id = ?
+            """,
+                (user_id,),
+            )
+            if row:
+                state.humor_frequency = row[0] or 0.0
+                state.typical_response_length = row[1] or 50
+                state.preferred_topics = json.loads(row[2]) if row[2] else {}
+                state.engagement_level = row[3] if row[3] is not None else 0.5
+                state.conversation_quality = row[4] if row[4] is not None else 0.5
+                if row[5]:
+                    state.last_interaction = datetime.fromisoformat(row[5])
+        except Exception as e:
+            logger.warning(f"Failed to load conversation state for {user_id}: {e}")
+        return state
+
+    def _persist_user_state(self, user_id: int, state: UserConversationState):
+        """Write back an evicted state (queued on the storage writer)"""
+        self.storage.submit(
+            """
+            INSERT OR REPLACE INTO user_conversation_states
+            (user_id, humor_frequency, typical_response_length, preferred_topics,
+             engagement_level, conversation_quality, last_interaction, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+            (
+                user_id,
+                state.humor_frequency,
+                state.typical_response_length,
+                json.dumps(state.preferred_topics),
+                state.engagement_level,
+                state.conversation_quality,
+                state.last_interaction.isoformat(),
+            ),
+        )
+
     async def _update_user_patterns(
         self, user_state: UserConversationState, context: MessageContext
     ):
@@ -1295,91 +1153,92 @@ class UniversalContextManager:
     async def _store_context(
         self, context: MessageContext, channel_id: int = None, guild_id: int = None
     ):
-        """Store context in database"""
+        """Queue context for the buffered database writer"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    INSERT INTO message_contexts 
-                    (user_id, channel_id, guild_id, content, tone, humor_score, 
-                     emotional_intensity, topics, response_triggers, response_probability, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        context.user_id,
-                        channel_id or 0,  # Use 0 as default if channel_id is None
-                        guild_id,
-                        context.content,
-                        context.tone.value,
-                        context.humor_score,
-                        context.emotional_intensity,
-                        json.dumps(context.topics),
-                        json.dumps(
-                            [trigger.value for trigger in context.response_triggers]
-                        ),
-                        context.response_probability,
-                        context.timestamp.isoformat(),
+            await self.context_writer.add(
+                (
+                    context.user_id,
+                    channel_id or 0,  # Use 0 as default if channel_id is None
+                    guild_id,
+                    context.content,
+                    context.tone.value,
+                    context.humor_score,
+                    context.emotional_intensity,
+                    json.dumps(context.topics),
+                    json.dumps(
+                        [trigger.value for trigger in context.response_triggers]
                     ),
+                    context.response_probability,
+                    context.timestamp.isoformat(),
                 )
-                conn.commit()
+            )
         except Exception as e:
             logger.error(f"Error storing context: {e}")
 
+    async def close(self):
+        """Write any buffered contexts and user states before shutdown"""
+        await self.context_writer.close()
+        await self.user_states.flush()
+
     async def get_analytics(self) -> Dict[str, Any]:
         """Get analytics about conversation patterns"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
 
-                # Response rate
-                cursor.execute("SELECT COUNT(*) FROM message_contexts")
-                total_messages = cursor.fetchone()[0]
+        def query_stats(conn):
+            cursor = conn.cursor()
 
-                cursor.execute(
-                    "SELECT COUNT(*) FROM message_contexts WHERE bot_responded = 1"
-                )
-                responded_messages = cursor.fetchone()[0]
+            # Response rate
+            cursor.execute("SELECT COUNT(*) FROM message_contexts")
+            total_messages = cursor.fetchone()[0]
 
-                response_rate = (
-                    (responded_messages / total_messages * 100)
-                    if total_messages > 0
-                    else 0
-                )
+            cursor.execute(
+                "SELECT COUNT(*) FROM message_contexts WHERE bot_responded = 1"
+            )
+            responded_messages = cursor.fetchone()[0]
 
-                # Top topics
-                cursor.execute(
-                    """
-                    SELECT topics, COUNT(*) as count 
-                    FROM message_contexts 
-                    WHERE topics != '[]' 
-                    GROUP BY topics 
-                    ORDER BY count DESC 
-                    LIMIT 10
+            # Top topics
+            cursor.execute(
                 """
-                )
-                top_topics = cursor.fetchall()
+                SELECT topics, COUNT(*) as count 
+                FROM message_contexts 
+                WHERE topics != '[]' 
+                GROUP BY topics 
+                ORDER BY count DESC 
+                LIMIT 10
+            """
+            )
+            top_topics = cursor.fetchall()
 
-                # Humor statistics
-                cursor.execute(
-                    "SELECT AVG(humor_score) FROM message_contexts WHERE humor_score > 0"
-                )
-                avg_humor_score = cursor.fetchone()[0] or 0
-
-                return {
-                    "total_messages_analyzed": total_messages,
-                    "total_responses_sent": responded_messages,
-                    "response_rate_percent": round(response_rate, 2),
-                    "average_humor_score": round(avg_humor_score, 3),
-                    "active_users": len(self.user_states),
-                    "top_topics": top_topics,
-                    "users_with_high_engagement": len(
-                        [
-                            u
-                            for u in self.user_states.values()
-                            if u.engagement_level > 0.7
-                        ]
-                    ),
-                }
+            # Humor statistics
+            cursor.execute(
+                "SELECT AVG(humor_score) FROM message_contexts WHERE humor_score > 0"
+            )
+            avg_humor_score = cursor.fetchone()[0] or 0
+
+            return total_messages, responded_messages, top_topics, avg_humor_score
+
+        try:
+            await self.context_writer.flush()
+            total_messages, responded_messages, top_topics, avg_humor_score = (
+                await self.storage.read(query_stats)
+            )
+
+            response_rate = (
+                (responded_messages / total_messages * 100) if total_messages > 0 else 0
+            )
+
+            return {
+                "total_messages_analyzed": total_messages,
+                "total_responses_sent": responded_messages,
+                "response_rate_percent": round(response_rate, 2),
+                "average_humor_score": round(avg_humor_score, 3),
+                "active_users": len(self.user_states),
+                "top_topics": top_topics,
+                "users_with_high_engagement": len(
+                    [u for u in self.user_states.values() if u.engagement_level > 0.7]
+                ),
+                "write_buffer": self.context_writer.get_stats(),
+                "user_state_store": self.user_states.get_stats(),
+            }
 
         except Exception as e:
             logger.error(f"Error getting analytics: {e}")
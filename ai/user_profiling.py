@@ -9,11 +9,72 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
-import re
 from collections import Counter, defaultdict
 
-
-@dataclass
+from ai.message_features import extract_features, register_lexicon
+from utils.bounded_store import BoundedStore
+from utils.storage_engine import get_storage
+
+# Topic keywords, matched by the shared lexicon engine
+PROFILE_TOPIC_LEXICON = {
+    "space": [
+        "space",
+        "universe",
+        "cosmos",
+        "galaxy",
+        "star",
+        "planet",
+        "asteroid",
+        "nebula",
+    ],
+    "stellaris": [
+        "stellaris",
+        "empire",
+        "colony",
+        "fleet",
+        "technology",
+        "research",
+    ],
+    "science": ["science", "research", "experiment", "theory", "discovery"],
+    "technology": [
+        "tech",
+        "technology",
+        "computer",
+        "software",
+        "AI",
+        "machine",
+    ],
+    "gaming": ["game", "gaming", "play", "player", "level", "achievement"],
+    "programming": [
+        "code",
+        "programming",
+        "python",
+        "javascript",
+        "debug",
+        "function",
+    ],
+    "personal": ["i", "me", "my", "myself", "feel", "think", "believe"],
+    "questions": [
+        "how",
+        "what",
+        "why",
+        "when",
+        "where",
+        "can you",
+        "could you",
+    ],
+    "emotions": [
+        "happy",
+        "sad",
+        "excited",
+        "frustrated",
+        "confused",
+        "amazing",
+    ],
+}
+
+
+@dataclass(slots=True)
 class UserPersonality:
     """User personality profile"""
 
@@ -56,8 +117,13 @@ class UserProfileManager:
 
     def __init__(self, db_path: str = "data/user_profiles.db"):
         self.db_path = db_path
-        self.profiles: Dict[int, UserPersonality] = {}
+        # Profiles are saved on every update, so evicted ones simply reload
+        self.profiles: BoundedStore = BoundedStore(
+            "profiling.profiles", max_entries=5000, ttl=6 * 3600
+        )
         self._setup_database()
+        self.storage = get_storage(self.db_path)
+        register_lexicon("profile.topics", PROFILE_TOPIC_LEXICON)
 
     def _setup_database(self):
         """Initialize the user profiles database"""
@@ -118,31 +184,29 @@ class UserProfileManager:
     ) -> UserPersonality:
         """Load user profile from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT username, profile_data FROM user_profiles WHERE user_id = ?",
-                    (user_id,),
-                )
-                result = cursor.fetchone()
-
-                if result:
-                    stored_username, profile_json = result
-                    profile_data = json.loads(profile_json)
-                    profile = UserPersonality(**profile_data)
-
-                    # Update username if provided and different
-                    if username and username != stored_username:
-                        profile.username = username
-                        await self._save_profile_to_db(profile)
-
-                    return profile
-                else:
-                    # Create new profile
-                    profile = UserPersonality(
-                        user_id=user_id, username=username or f"User{user_id}"
-                    )
+            result = await self.storage.fetch_one(
+                "SELECT username, profile_data FROM user_profiles WHERE user_id = ?",
+                (user_id,),
+            )
+
+            if result:
+                stored_username, profile_json = result
+                profile_data = json.loads(profile_json)
+                profile = UserPersonality(**profile_data)
+
+                # Update username if provided and different
+                if username and username != stored_username:
+                    profile.username = username
                     await self._save_profile_to_db(profile)
-                    return profile
+
+                return profile
+            else:
+                # Create new profile
+                profile = UserPersonality(
+                    user_id=user_id, username=username or f"User{user_id}"
+                )
+                await self._save_profile_to_db(profile)
+                return profile
 
         except Exception as e:
             print(f"Error loading profile for {user_id}: {e}")
@@ -153,15 +217,14 @@ class UserProfileManager:
     async def _save_profile_to_db(self, profile: UserPersonality):
         """Save user profile to database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                profile_json = json.dumps(asdict(profile))
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO user_profiles (user_id, username, profile_data, last_updated)
-                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                """,
-                    (profile.user_id, profile.username, profile_json),
-                )
+            profile_json = json.dumps(asdict(profile))
+            await self.storage.execute(
+                """
+                INSERT OR REPLACE INTO user_profiles (user_id, username, profile_data, last_updated)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+                (profile.user_id, profile.username, profile_json),
+            )
 
         except Exception as e:
             print(f"Error saving profile for {profile.user_id}: {e}")
@@ -170,10 +233,11 @@ class UserProfileManager:
         self, user_id: int, message: str, username: str = None
     ) -> Dict[str, Any]:
         """Analyze a message and extract personality insights"""
+        features = extract_features(message)
         analysis = {
-            "length": len(message),
+            "length": features.length,
             "word_count": len(message.split()),
-            "contains_emoji": bool(re.search(r"[😀-🿿]|[👀-👿]|[💀-💿]", message)),
+            "contains_emoji": features.emoji > 0,
             "hour": datetime.now(timezone.utc).hour,
             "topics": await self._extract_topics(message),
             "sentiment": await self._analyze_sentiment(message),
@@ -191,111 +255,12 @@ class UserProfileManager:
 
     async def _extract_topics(self, message: str) -> List[str]:
         """Extract topics from message"""
-        message_lower = message.lower()
-        topics = []
-
-        topic_keywords = {
-            "space": [
-                "space",
-                "universe",
-                "cosmos",
-                "galaxy",
-                "star",
-                "planet",
-                "asteroid",
-                "nebula",
-            ],
-            "stellaris": [
-                "stellaris",
-                "empire",
-                "colony",
-                "fleet",
-                "technology",
-                "research",
-            ],
-            "science": ["science", "research", "experiment", "theory", "discovery"],
-            "technology": [
-                "tech",
-                "technology",
-                "computer",
-                "software",
-                "AI",
-                "machine",
-            ],
-            "gaming": ["game", "gaming", "play", "player", "level", "achievement"],
-            "programming": [
-                "code",
-                "programming",
-                "python",
-                "javascript",
-                "debug",
-                "function",
-            ],
-            "personal": ["i", "me", "my", "myself", "feel", "think", "believe"],
-            "questions": [
-                "how",
-                "what",
-                "why",
-                "when",
-                "where",
-                "can you",
-                "could you",
-            ],
-            "emotions": [
-                "happy",
-                "sad",
-                "excited",
-                "frustrated",
-                "confused",
-                "amazing",
-            ],
-        }
-
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
-                topics.append(topic)
-
-        return topics
+        return extract_features(message).matched("profile.topics")
 
     async def _analyze_sentiment(self, message: str) -> float:
         """Basic sentiment analysis (positive = 1.0, negative = -1.0, neutral = 0.0)"""
-        positive_words = [
-            "good",
-            "great",
-            "awesome",
-            "amazing",
-            "excellent",
-            "fantastic",
-            "love",
-            "like",
-            "happy",
-            "excited",
-            "wonderful",
-            "perfect",
-            "brilliant",
-            "outstanding",
-        ]
-
-        negative_words = [
-            "bad",
-            "terrible",
-            "awful",
-            "hate",
-            "dislike",
-            "sad",
-            "angry",
-            "frustrated",
-            "confused",
-            "difficult",
-            "problem",
-            "issue",
-            "wrong",
-            "error",
-        ]
-
-        message_lower = message.lower()
-        positive_count = sum(1 for word in positive_words if word in message_lower)
-        negative_count = sum(1 for word in negative_words if word in message_lower)
+        features = extract_features(message)
+        positive_count, negative_count = features.positive, features.negative
 
         if positive_count == negative_count:
             return 0.0
@@ -393,23 +358,22 @@ class UserProfileManager:
     ):
         """Store conversation data for learning"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    INSERT INTO conversation_history 
-                    (user_id, message_content, message_length, contains_emoji, hour_sent, topics, sentiment)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        user_id,
-                        message[:500],  # Truncate for storage
-                        analysis["length"],
-                        analysis["contains_emoji"],
-                        analysis["hour"],
-                        ",".join(analysis["topics"]),
-                        analysis["sentiment"],
-                    ),
-                )
+            await self.storage.execute(
+                """
+                INSERT INTO conversation_history 
+                (user_id, message_content, message_length, contains_emoji, hour_sent, topics, sentiment)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    user_id,
+                    message[:500],  # Truncate for storage
+                    analysis["length"],
+                    analysis["contains_emoji"],
+                    analysis["hour"],
+                    ",".join(analysis["topics"]),
+                    analysis["sentiment"],
+                ),
+            )
         except Exception as e:
             print(f"Error storing conversation: {e}")
 
@@ -78,9 +78,11 @@ from config.unified_config import unified_config, BotConfig
 from logger.enhanced_logger import setup_enhanced_logger, log_performance
 from utils.database import db
 from utils.enhanced_error_handler import ErrorHandler
+from utils.member_stats import member_stats
 from utils.permissions import PermissionLevel, has_permission
 
 # Performance optimization imports
+from utils.startup_profiler import startup_profiler, enable_from_environment
 from utils.command_optimizer import auto_optimize_commands
 from utils.discord_data_reporter import (
     initialize_discord_reporter,
@@ -170,6 +172,45 @@ class BotStats:
         self.uptime_seconds = self.get_uptime().total_seconds()
 
 
+# Extension dependency graph: extension -> extensions that must finish loading first.
+# Cogs resolve each other via get_cog() at runtime, so edges only keep the
+# ordering where one system layers on another; everything else loads concurrently.
+EXTENSION_DEPENDENCIES: Dict[str, tuple] = {
+    # Core utilities (no dependencies) - NEXUS provides enhanced userinfo/uptime/stats
+    "cogs.high_performance_coordinator": (),  # 🚀 CONCURRENT message processing system
+    "cogs.admin_optimized": (),  # Optimized consolidated admin system
+    "cogs.bot_status": (),
+    "cogs.bot_setup_enhanced": (),  # Consolidated setup system
+    "cogs.nexus": (),  # Advanced diagnostic interface with enhanced commands
+    "cogs.security_manager": (),  # 🛡️ UNIFIED security system (replaces all old security cogs)
+    "cogs.personality_manager": (),  # 🧠 Advanced personality management system
+    "cogs.welcome_dm_system": (),  # 🌟 Personalized welcome DM system with AI
+    "cogs.ai_announcements": (),  # 🔊 AI-powered announcement system with Q&A
+    # Moderation systems (load before AI features)
+    "cogs.comprehensive_moderation": ("cogs.security_manager",),
+    # AI and enhanced features (depend on core)
+    "cogs.advanced_ai": ("cogs.personality_manager",),
+    "cogs.ai_companion": (
+        "cogs.security_manager",
+        "cogs.comprehensive_moderation",
+    ),  # Sophisticated AI buddy and companion features
+    "cogs.enhanced_server_management": (
+        "cogs.ai_companion",
+    ),  # Enhanced server management with AI companion
+    # Analytics and specialized features
+    "cogs.analytics": (),
+    "cogs.roles": (),
+    # Game-specific and optional features
+    "cogs.quiz": (),
+    "cogs.space": (),
+    # Utility features (help now handled by NEXUS)
+    "cogs.notion": (),
+}
+
+# Upper bound on extensions whose setup runs at the same time
+MAX_CONCURRENT_EXTENSION_LOADS = 6
+
+
 @auto_optimize_commands
 class AstraBot(commands.Bot):
     """Enhanced Astra Discord Bot with comprehensive features and monitoring"""
@@ -178,10 +219,17 @@ class AstraBot(commands.Bot):
         # Load configuration
         self.config: BotConfig = unified_config.bot_config
 
-        # Set up enhanced logging
+        # Set up enhanced logging (queued; "astra.*" loggers share the pipeline)
+        logging_config = unified_config.get_logging_config()
         self.logger = setup_enhanced_logger(
             name="Astra",
             log_level="DEBUG" if getattr(self.config, "debug", False) else "INFO",
+            max_bytes=logging_config.max_file_size,
+            backup_count=logging_config.backup_count,
+            json_format=logging_config.json_format,
+            rate_limit=logging_config.rate_limit_per_second,
+            rate_limit_burst=logging_config.rate_limit_burst,
+            route_loggers=("astra",),
         )
 
         self.logger.info("=" * 80)
@@ -197,8 +245,12 @@ class AstraBot(commands.Bot):
         intents.message_content = True  # Required for message processing
         intents.members = True  # Required for welcome system
         intents.guild_reactions = True  # Required for role selection
+        # Heavy on large servers; online counts report "unavailable" without it.
+        # Privileged: set bot.presence_intent only once "Presence Intent" is
+        # enabled in the Developer Portal, or the gateway refuses the connection.
+        intents.presences = self.config.presence_intent
+        member_stats.presences_enabled = intents.presences
         # 🚀 Performance: Disable heavy intents
-        intents.presences = False  # Heavy on large servers
         intents.voice_states = False  # Not needed unless voice features
         intents.guild_typing = False  # Not needed for most bots
         intents.dm_reactions = False  # Rarely needed
@@ -246,6 +298,7 @@ class AstraBot(commands.Bot):
         self.loaded_extensions: Dict[str, datetime] = {}
         self.failed_extensions: Dict[str, str] = {}
         self.extension_health: Dict[str, bool] = {}
+        self.extension_load_times: Dict[str, float] = {}
 
         # Cache and performance
         self._command_cache: Dict[str, Any] = {}
@@ -326,13 +379,16 @@ class AstraBot(commands.Bot):
         self.logger.info("🔧 Running enhanced setup hook...")
 
         # Initialize HTTP session with advanced configuration
-        await self._setup_http_session()
+        with startup_profiler.phase("setup:http_session"):
+            await self._setup_http_session()
 
         # Initialize database connections
-        await self._initialize_database()
+        with startup_profiler.phase("setup:database"):
+            await self._initialize_database()
 
         # Load extensions with dependency management
-        await self._load_extensions_with_dependencies()
+        with startup_profiler.phase("setup:extensions"):
+            await self._load_extensions_with_dependencies()
 
         # Start background tasks
         self._start_background_tasks()
@@ -344,10 +400,18 @@ class AstraBot(commands.Bot):
         self.tree.error(self._handle_app_command_error)
 
         # Initialize AI engine and context manager
-        await self._initialize_ai_systems()
+        with startup_profiler.phase("setup:ai_systems"):
+            await self._initialize_ai_systems()
+
+        # Probe providers in the background so startup never waits on an LLM call
+        self.create_task(self._warm_up_ai_providers(), name="ai_warmup")
 
         self.logger.info("✅ Enhanced setup hook completed successfully")
 
+        if startup_profiler.enabled:
+            startup_profiler.uninstall()
+            startup_profiler.write_report()
+
     async def _setup_http_session(self):
         """🚀 OPTIMIZED HTTP session with performance tuning"""
         # 🚀 High-performance connector settings
@@ -424,24 +488,30 @@ class AstraBot(commands.Bot):
                     "📝 To enable AI: Set MISTRAL_API_KEY, GOOGLE_API_KEY, or GROQ_API_KEY"
                 )
 
-            # Test AI functionality with a quick call
-            try:
-                test_response = await self.ai_manager.generate_response(
-                    "Hello! Test connection.", max_tokens=20, temperature=0.1
-                )
-                if test_response and test_response.success:
-                    self.logger.info(
-                        f"✅ AI test successful with {test_response.provider.title()}"
-                    )
-                else:
-                    self.logger.warning("⚠️ AI test response failed")
-            except Exception as test_error:
-                self.logger.warning(f"⚠️ AI test failed: {test_error}")
-
         except Exception as e:
             self.logger.error(f"❌ AI initialization error: {e}")
             self.logger.info("🔄 Bot will continue with basic functionality")
 
+    async def _warm_up_ai_providers(self):
+        """Background warm-up: test AI functionality with a quick call"""
+        if not getattr(self, "ai_manager", None):
+            return
+
+        try:
+            start = time.perf_counter()
+            test_response = await self.ai_manager.generate_response(
+                "Hello! Test connection.", max_tokens=20, temperature=0.1
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if test_response and test_response.success:
+                self.logger.info(
+                    f"✅ AI warm-up successful with {test_response.provider.title()} ({elapsed_ms:.0f}ms)"
+                )
+            else:
+                self.logger.warning("⚠️ AI warm-up response failed")
+        except Exception as test_error:
+            self.logger.warning(f"⚠️ AI warm-up failed: {test_error}")
+
     async def _initialize_database(self):
         """Initialize database connections and create tables"""
         try:
@@ -482,68 +552,57 @@ class AstraBot(commands.Bot):
             # Don't raise as permissions can fallback to basic checks
 
     async def _load_extensions_with_dependencies(self):
-        """Load extensions with proper dependency management and error recovery"""
-
-        # Extension loading order with dependencies - OPTIMIZED
-        extension_groups = [
-            # Core utilities (no dependencies) - NEXUS provides enhanced userinfo/uptime/stats
-            [
-                "cogs.high_performance_coordinator",  # 🚀 CONCURRENT message processing system
-                "cogs.admin_optimized",  # Optimized consolidated admin system
-                "cogs.bot_status",
-                "cogs.bot_setup_enhanced",  # Consolidated setup system
-                "cogs.nexus",  # Advanced diagnostic interface with enhanced commands
-                "cogs.security_manager",  # 🛡️ UNIFIED security system (replaces all old security cogs)
-                "cogs.personality_manager",  # 🧠 Advanced personality management system
-                "cogs.welcome_dm_system",  # 🌟 Personalized welcome DM system with AI
-                "cogs.ai_announcements",  # 🔊 AI-powered announcement system with Q&A
-            ],
-            # Moderation systems (load before AI features)
-            [
-                "cogs.comprehensive_moderation",  # 🛡️ COMPLETE moderation system with 21 commands + auto-moderation
-            ],
-            # AI and enhanced features (depend on core)
-            [
-                "cogs.advanced_ai",
-                "cogs.enhanced_server_management",  # Enhanced server management with AI companion
-                "cogs.ai_companion",  # Sophisticated AI buddy and companion features
-            ],
-            # Analytics and specialized features
-            ["cogs.analytics", "cogs.roles"],
-            # Game-specific and optional features
-            ["cogs.quiz", "cogs.space"],
-            # Utility features (help now handled by NEXUS)
-            ["cogs.notion"],
-        ]
+        """Load extensions concurrently along the declared dependency graph"""
+        load_start = time.perf_counter()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTENSION_LOADS)
+        finished: Dict[str, asyncio.Event] = {
+            extension: asyncio.Event() for extension in EXTENSION_DEPENDENCIES
+        }
 
-        total_loaded = 0
-        total_failed = 0
+        async def load_one(extension: str):
+            try:
+                # Wait for declared dependencies (loaded or failed) before starting
+                for dependency in EXTENSION_DEPENDENCIES[extension]:
+                    await finished[dependency].wait()
+                    if not self.extension_health.get(dependency):
+                        self.logger.warning(
+                            f"⚠️ Loading {extension} although dependency {dependency} failed"
+                        )
 
-        for group in extension_groups:
-            self.logger.info(f"📦 Loading extension group: {', '.join(group)}")
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        await self.load_extension(extension)
+                        self.loaded_extensions[extension] = datetime.now(timezone.utc)
+                        self.extension_health[extension] = True
+                        self.logger.info(f"✅ Loaded {extension}")
 
-            for extension in group:
-                try:
-                    await self.load_extension(extension)
-                    self.loaded_extensions[extension] = datetime.now(timezone.utc)
-                    self.extension_health[extension] = True
-                    total_loaded += 1
-                    self.logger.info(f"✅ Loaded {extension}")
+                    except Exception as e:
+                        error_msg = str(e)
+                        self.failed_extensions[extension] = error_msg
+                        self.extension_health[extension] = False
+                        self.logger.error(f"❌ Failed to load {extension}: {error_msg}")
 
-                except Exception as e:
-                    error_msg = str(e)
-                    self.failed_extensions[extension] = error_msg
-                    self.extension_health[extension] = False
-                    total_failed += 1
-                    self.logger.error(f"❌ Failed to load {extension}: {error_msg}")
+                        # Log detailed traceback for debugging
+                        self.logger.debug(
+                            f"Traceback for {extension}:\n{traceback.format_exc()}"
+                        )
+                    finally:
+                        elapsed = time.perf_counter() - start
+                        self.extension_load_times[extension] = elapsed * 1000
+                        startup_profiler.record_init(f"extension:{extension}", elapsed)
+            finally:
+                finished[extension].set()
 
-                    # Log detailed traceback for debugging
-                    self.logger.debug(
-                        f"Traceback for {extension}:\n{traceback.format_exc()}"
-                    )
+        self.logger.info(
+            f"📦 Loading {len(EXTENSION_DEPENDENCIES)} extensions "
+            f"(up to {MAX_CONCURRENT_EXTENSION_LOADS} concurrently)"
+        )
+        await asyncio.gather(*(load_one(ext) for ext in EXTENSION_DEPENDENCIES))
 
-            # Extension group completed - optimized loading without delay
-            pass
+        total_loaded = len(self.loaded_extensions)
+        total_failed = len(self.failed_extensions)
+        wall_ms = (time.perf_counter() - load_start) * 1000
 
         # Summary
         self.logger.info("=" * 60)
@@ -551,8 +610,9 @@ class AstraBot(commands.Bot):
         self.logger.info(f"   ✅ Loaded: {total_loaded}")
         self.logger.info(f"   ❌ Failed: {total_failed}")
         self.logger.info(
-            f"   📊 Success Rate: {(total_loaded/(total_loaded+total_failed))*100:.1f}%"
+            f"   📊 Success Rate: {(total_loaded/max(1, total_loaded+total_failed))*100:.1f}%"
         )
+        self._log_extension_timing_report(wall_ms)
 
         if self.failed_extensions:
             self.logger.warning("Failed extensions:")
@@ -561,6 +621,18 @@ class AstraBot(commands.Bot):
 
         self.logger.info("=" * 60)
 
+    def _log_extension_timing_report(self, wall_ms: float):
+        """Log per-extension startup timings, slowest first"""
+        serial_ms = sum(self.extension_load_times.values())
+        self.logger.info(
+            f"   ⏱️ Wall time: {wall_ms:.0f}ms (serial sum {serial_ms:.0f}ms)"
+        )
+        for extension, elapsed_ms in sorted(
+            self.extension_load_times.items(), key=lambda item: item[1], reverse=True
+        ):
+            status = "✅" if self.extension_health.get(extension) else "❌"
+            self.logger.info(f"      {status} {extension}: {elapsed_ms:.0f}ms")
+
     def _start_background_tasks(self):
         """Start minimal background tasks"""
         # Only start essential tasks to prevent crashes
@@ -638,9 +710,7 @@ class AstraBot(commands.Bot):
 
             # Calculate statistics
             total_members = sum(guild.member_count or 0 for guild in self.guilds)
-            unique_members = len(
-                set(member.id for guild in self.guilds for member in guild.members)
-            )
+            unique_members = member_stats.unique_members(self.guilds)
 
             # System information
             process = psutil.Process()
@@ -723,6 +793,7 @@ class AstraBot(commands.Bot):
             self.stats.guilds_left += 1
 
             self.logger.info(f"👋 Left guild: {guild.name} (ID: {guild.id})")
+            member_stats.forget_guild(guild.id)
 
             # Automatic guild leave event capture
             reporter = get_discord_reporter()
@@ -801,13 +872,20 @@ class AstraBot(commands.Bot):
         @self.event
         async def on_member_join(member):
             """Lightweight member join event - expensive operations moved to welcome system"""
+            member_stats.member_joined(member)
             self.logger.info(f"👋 Member joined: {member} in {member.guild.name}")
 
         @self.event
         async def on_member_remove(member):
             """Lightweight member leave event"""
+            member_stats.member_left(member)
             self.logger.info(f"👋 Member left: {member} from {member.guild.name}")
 
+        @self.event
+        async def on_presence_update(before, after):
+            """🚀 Performance: Keep online counts current without member scans"""
+            member_stats.presence_updated(before, after)
+
         @self.event
         async def on_voice_state_update(member, before, after):
             """🚀 Performance: Lightweight voice state tracking"""
@@ -1229,10 +1307,16 @@ class AstraBot(commands.Bot):
                 "loaded": True,
                 "healthy": self.extension_health.get(ext_name, False),
                 "loaded_at": self.loaded_extensions[ext_name].isoformat(),
+                "load_time_ms": self.extension_load_times.get(ext_name),
             }
 
         for ext_name, error in self.failed_extensions.items():
-            status[ext_name] = {"loaded": False, "healthy": False, "error": error}
+            status[ext_name] = {
+                "loaded": False,
+                "healthy": False,
+                "error": error,
+                "load_time_ms": self.extension_load_times.get(ext_name),
+            }
 
         return status
 
@@ -1295,6 +1379,29 @@ class AstraBot(commands.Bot):
             except Exception as e:
                 self.logger.error(f"❌ Error cleaning up Discord reporter: {e}")
 
+            # Persist any debounced configuration changes
+            try:
+                await asyncio.to_thread(unified_config.flush)
+            except Exception as e:
+                self.logger.error(f"❌ Error flushing configuration: {e}")
+
+            # Unload extensions now, so cog_unload flushes reach the storage
+            # engine before it closes (super().close() would unload them later)
+            for extension in tuple(self.extensions):
+                try:
+                    await self.unload_extension(extension)
+                except Exception as e:
+                    self.logger.error(f"❌ Error unloading {extension}: {e}")
+
+            # Drain queued database writes and close storage handles
+            try:
+                from utils.storage_engine import storage_engine
+
+                await storage_engine.aclose()
+                self.logger.info("✅ Storage engine closed")
+            except Exception as e:
+                self.logger.error(f"❌ Error closing storage engine: {e}")
+
             # Close HTTP session
             if self.session and not self.session.closed:
                 await self.session.close()
@@ -1495,6 +1602,9 @@ async def main():
 
 if __name__ == "__main__":
     try:
+        # Honour ASTRA_PROFILE_STARTUP when run directly (imports above are not covered)
+        enable_from_environment()
+
         # 🚀 PERFORMANCE: Optimize garbage collection
         gc.set_threshold(700, 10, 10)
 
@@ -21,6 +21,7 @@ import os
 from typing import Optional, List, Literal, Dict, Any
 
 from config.unified_config import unified_config
+from logger.log_reader import LogReader
 from utils.command_optimizer import ResponseCache
 from utils.command_optimizer import auto_optimize_commands
 
@@ -452,8 +453,22 @@ class OptimizedAdmin(commands.GroupCog, name="admin"):
             await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="logs", description="📋 View recent bot logs")
-    @app_commands.describe(lines="Number of log lines to show (default: 50, max: 200)")
-    async def logs_command(self, interaction: discord.Interaction, lines: int = 50):
+    @app_commands.describe(
+        lines="Number of log lines to show (default: 50, max: 200)",
+        level="Only show records at or above this level",
+        logger="Only show records from this logger (e.g. astra.ai_companion)",
+        search="Only show records containing this text",
+    )
+    async def logs_command(
+        self,
+        interaction: discord.Interaction,
+        lines: int = 50,
+        level: Optional[
+            Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+        ] = None,
+        logger: Optional[str] = None,
+        search: Optional[str] = None,
+    ):
         """View recent bot logs (Admin only)"""
         if not await self.is_admin_or_owner(interaction):
             await interaction.response.send_message(
@@ -482,12 +497,21 @@ class OptimizedAdmin(commands.GroupCog, name="admin"):
                 )
                 return
 
-            # Read last N lines efficiently
-            with open(log_file, "r", encoding="utf-8") as f:
-                log_lines = f.readlines()
-
-            recent_logs = log_lines[-lines:] if len(log_lines) > lines else log_lines
-            log_content = "".join(recent_logs)
+            # Read backwards from the end (and rotated files) off the event loop
+            reader = LogReader(log_file)
+            filtered = bool(level or logger or search)
+            if filtered:
+                recent_logs = await reader.search(
+                    level=level, logger_name=logger, contains=search, limit=lines
+                )
+            else:
+                recent_logs = await reader.tail(lines)
+            if not recent_logs:
+                await interaction.followup.send(
+                    "📭 No matching log records found.", ephemeral=True
+                )
+                return
+            log_content = "\n".join(recent_logs)
 
             # Truncate if too long for Discord
             if len(log_content) > 1900:
@@ -500,7 +524,13 @@ class OptimizedAdmin(commands.GroupCog, name="admin"):
                 color=0x00BFFF,
                 timestamp=datetime.now(timezone.utc),
             )
-            embed.set_footer(text=f"Last {len(recent_logs)} lines from {log_file}")
+            embed.set_footer(
+                text=(
+                    f"Last {len(recent_logs)} matching records from {log_file}"
+                    if filtered
+                    else f"Last {len(recent_logs)} lines from {log_file}"
+                )
+            )
 
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -64,6 +64,7 @@ except ImportError as e:
 
 # New personality system
 from utils.astra_personality import get_astra_personality_core
+from ai.conversation_store import cleanup_conversation_stores, close_conversation_stores
 
 
 class AdvancedAICog(commands.Cog):
@@ -2180,15 +2181,22 @@ class AdvancedAICog(commands.Cog):
                         user_id
                     ][-self.max_history_length * 2 :]
 
+            # Expire old turns through the retention scheduler
+            await cleanup_conversation_stores()
+
             self.logger.debug("Conversation cleanup completed")
 
         except Exception as e:
             self.logger.error(f"Conversation cleanup task error: {e}")
 
-    def cog_unload(self):
+    async def cog_unload(self):
         """Clean up when cog is unloaded"""
         try:
             self.conversation_cleanup_task.cancel()
+            if CONTEXT_MANAGER_AVAILABLE and get_context_manager():
+                # Wait for the final flush of buffered message contexts
+                await get_context_manager().close()
+            await close_conversation_stores()
             self.logger.info("Advanced AI Cog unloaded")
         except:
             pass
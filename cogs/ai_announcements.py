@@ -18,13 +18,14 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 
 from utils.database import db
+from utils.dm_fanout import DMFanout, FanoutJob, JobProgress, RateLimited
 from config.unified_config import unified_config
 
 
@@ -77,15 +78,16 @@ class AIAnnouncements(commands.Cog):
         # Question tracking for context
         self.announcement_questions: Dict[str, List[Dict]] = {}
 
-        # Rate limiting for DM sending
-        self.dm_queue: Dict[int, List[Tuple]] = {}
-        self.dm_rate_limit = 1.0  # Seconds between DMs
+        # Durable DM delivery, paced and resumed across restarts
+        self.dm_fanout = DMFanout(
+            self._send_announcement_dm, on_progress=self._on_dm_progress
+        )
+        self._dm_embeds: Dict[str, discord.Embed] = {}
 
         # Initialize database
         self._init_database()
 
         # Start background tasks
-        self.process_dm_queue_task.start()
         self.cleanup_old_data_task.start()
 
         self.logger.info("✅ AI Announcements system initialized")
@@ -455,21 +457,16 @@ Provide a detailed, accurate answer based on ALL the announcement information ab
 
             if delivery in ["dm", "both"]:
                 # Queue DMs to all members
-                members = [m for m in interaction.guild.members if not m.bot]
+                members = [m.id for m in interaction.guild.members if not m.bot]
                 announcement.dm_sent = 0
                 announcement.dm_failed = 0
 
-                # Add to queue
-                if interaction.guild_id not in self.dm_queue:
-                    self.dm_queue[interaction.guild_id] = []
-
-                for member in members:
-                    self.dm_queue[interaction.guild_id].append(
-                        (member, embed, announcement_id)
-                    )
+                queued = await self.dm_fanout.enqueue(
+                    announcement_id, interaction.guild_id, members, embed.to_dict()
+                )
 
                 sent_messages.append(
-                    f"📬 Queued DMs for {len(members)} members (sending in background)"
+                    f"📬 Queued DMs for {queued} members (sending in background)"
                 )
 
             # Show analysis
@@ -863,19 +860,15 @@ Provide a detailed, accurate answer based on ALL the announcement information ab
 
             # Handle DMs if requested
             if send_to_all:
-                members = [m for m in interaction.guild.members if not m.bot]
+                members = [m.id for m in interaction.guild.members if not m.bot]
                 announcement.dm_sent = 0
                 announcement.dm_failed = 0
 
-                if interaction.guild_id not in self.dm_queue:
-                    self.dm_queue[interaction.guild_id] = []
-
-                for member in members:
-                    self.dm_queue[interaction.guild_id].append(
-                        (member, embed, announcement_id)
-                    )
+                queued = await self.dm_fanout.enqueue(
+                    announcement_id, interaction.guild_id, members, embed.to_dict()
+                )
 
-                sent_messages.append(f"📬 Queued DMs for {len(members)} members")
+                sent_messages.append(f"📬 Queued DMs for {queued} members")
 
             # Show analysis
             analysis_embed = discord.Embed(
@@ -1191,65 +1184,52 @@ Provide a detailed, accurate answer based on ALL the announcement information ab
     # BACKGROUND TASKS
     # ============================================================================
 
-    @tasks.loop(seconds=1.5)
-    async def process_dm_queue_task(self):
-        """Process DM queue with optimized rate limiting"""
-        if not self.dm_queue:
-            return
-
-        try:
-            guilds_to_process = list(self.dm_queue.keys())
-
-            for guild_id in guilds_to_process:
-                if guild_id not in self.dm_queue:
-                    continue
-
-                queue = self.dm_queue[guild_id]
-
-                if not queue:
-                    del self.dm_queue[guild_id]
-                    continue
-
-                # Process one DM per guild per iteration
-                member, embed, announcement_id = queue.pop(0)
-
-                try:
-                    await member.send(embed=embed)
-
-                    # Update stats atomically
-                    if announcement_id in self.announcements:
-                        announcement = self.announcements[announcement_id]
-                        announcement.dm_sent += 1
-                        await self._update_announcement_stats(announcement)
-
-                    self.logger.debug(
-                        f"✅ DM sent to {member.display_name} ({len(queue)} remaining in queue)"
-                    )
-
-                except discord.errors.Forbidden:
-                    # User has DMs disabled
-                    if announcement_id in self.announcements:
-                        announcement = self.announcements[announcement_id]
-                        announcement.dm_failed += 1
-                        await self._update_announcement_stats(announcement)
-                    self.logger.debug(f"Cannot DM {member.display_name} (DMs disabled)")
-
-                except Exception as e:
-                    if announcement_id in self.announcements:
-                        announcement = self.announcements[announcement_id]
-                        announcement.dm_failed += 1
-                        await self._update_announcement_stats(announcement)
-                    self.logger.error(f"❌ DM error for {member.display_name}: {e}")
+    async def _send_announcement_dm(self, job: FanoutJob, user_id: int) -> bool:
+        """Deliver one queued announcement DM (called by the fan-out engine)"""
+        await self.bot.wait_until_ready()
 
-                # Small delay between DMs (rate limiting)
-                await asyncio.sleep(self.dm_rate_limit)
+        embed = self._dm_embeds.get(job.job_id)
+        if embed is None:
+            embed = self._dm_embeds[job.job_id] = discord.Embed.from_dict(job.payload)
 
-        except Exception as e:
-            self.logger.error(f"Error in DM queue processing: {e}")
+        try:
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            await user.send(embed=embed)
+            return True
+        except (discord.errors.Forbidden, discord.errors.NotFound):
+            # User has DMs disabled or no longer exists
+            self.logger.debug("Cannot DM user %s (DMs disabled)", user_id)
+            return False
+        except discord.errors.HTTPException as e:
+            if e.status == 429:
+                retry_after = getattr(e, "retry_after", None) or float(
+                    e.response.headers.get("Retry-After", 1.0)
+                )
+                raise RateLimited(retry_after)
+            raise
+
+    async def _on_dm_progress(self, progress: List[JobProgress]):
+        """Write DM counters of announcements, batched by the fan-out engine"""
+        for job in progress:
+            announcement = self.announcements.get(job.job_id)
+            if announcement is not None:
+                announcement.dm_sent = job.sent
+                announcement.dm_failed = job.failed
+            if job.done:
+                self._dm_embeds.pop(job.job_id, None)
+                self.logger.info(
+                    f"📬 Announcement {job.job_id} DMs finished: "
+                    f"{job.sent} sent, {job.failed} failed"
+                )
 
-    @process_dm_queue_task.before_loop
-    async def before_dm_queue(self):
-        await self.bot.wait_until_ready()
+            try:
+                await self.db.execute(
+                    "UPDATE announcements SET dm_sent = ?, dm_failed = ? "
+                    "WHERE announcement_id = ?",
+                    (job.sent, job.failed, job.job_id),
+                )
+            except Exception as e:
+                self.logger.error(f"Error updating DM stats: {e}")
 
     @tasks.loop(hours=24)
     async def cleanup_old_data_task(self):
@@ -1311,10 +1291,14 @@ Provide a detailed, accurate answer based on ALL the announcement information ab
 
                     break
 
-    def cog_unload(self):
+    async def cog_load(self):
+        """Resume DM deliveries left unfinished by the last run"""
+        await self.dm_fanout.start()
+
+    async def cog_unload(self):
         """Cleanup when cog is unloaded"""
-        self.process_dm_queue_task.cancel()
         self.cleanup_old_data_task.cancel()
+        await self.dm_fanout.stop()
 
 
 async def setup(bot):
@@ -31,12 +31,14 @@ from discord.ext import commands, tasks
 from discord import app_commands
 
 # Core AI and personality components
+from ai.interaction_graph import get_interaction_graph
 from utils.database import db
 from utils.astra_personality import AstraPersonalityCore
+from utils.bounded_store import BoundedStore
 from config.unified_config import unified_config
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonalityDimensions:
     """Astra's multi-dimensional personality traits"""
 
@@ -62,7 +64,7 @@ class PersonalityDimensions:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextualModifiers:
     """Context-specific personality adjustments"""
 
@@ -73,7 +75,7 @@ class ContextualModifiers:
     interaction_history: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonalityProfile:
     """Complete personality profile for a user interaction"""
 
@@ -143,8 +145,16 @@ class AstraAICompanion(commands.Cog):
         )
 
         # Personality management (key format: "user_id_guild_id")
-        self.user_profiles: Dict[str, PersonalityProfile] = {}
-        self.conversation_contexts: Dict[int, List[Dict]] = {}
+        # Both are bounded; evicted profiles are written back to the database
+        self.user_profiles: BoundedStore = BoundedStore(
+            "companion.profiles",
+            max_entries=5000,
+            ttl=6 * 3600,
+            write_back=self._save_personality_profile,
+        )
+        self.conversation_contexts: BoundedStore = BoundedStore(
+            "companion.contexts", max_entries=5000, ttl=3600
+        )
         self.last_responses = {}
 
         # Performance tracking
@@ -374,9 +384,11 @@ class AstraAICompanion(commands.Cog):
 
         return parts
 
-    def cog_unload(self):
+    async def cog_unload(self):
         """Cleanup when cog is unloaded"""
         self.personality_sync_task.cancel()
+        # Write dirty profiles back before the cog goes away
+        await self.user_profiles.flush()
 
     async def get_personality_profile(
         self, user_id: int, guild_id: int
@@ -404,10 +416,30 @@ class AstraAICompanion(commands.Cog):
                     base_personality=self.PERSONALITY_PRESETS["balanced"]
                 )
 
-            self.user_profiles[profile_key] = profile
+            self.user_profiles.put(profile_key, profile, dirty=False)
 
+        # Callers adjust the returned profile in place
+        self.user_profiles.mark_dirty(profile_key)
         return self.user_profiles[profile_key]
 
+    async def _save_personality_profile(
+        self, profile_key: str, profile: PersonalityProfile
+    ):
+        """Persist one personality profile"""
+        profile_data = {
+            "base_personality": profile.base_personality.to_dict(),
+            "modifiers": {
+                "user_mood": profile.modifiers.user_mood,
+                "conversation_tone": profile.modifiers.conversation_tone,
+                "time_of_day": profile.modifiers.time_of_day,
+                "channel_type": profile.modifiers.channel_type,
+                "interaction_history": profile.modifiers.interaction_history,
+            },
+            "user_preferences": profile.user_preferences,
+            "updated_at": datetime.now().isoformat(),
+        }
+        await self.db.set("user_profiles", profile_key, profile_data)
+
     def calculate_personality_vector(
         self, profile: PersonalityProfile, context: Dict[str, Any]
     ) -> PersonalityDimensions:
@@ -2024,6 +2056,9 @@ class AstraAICompanion(commands.Cog):
         if message.author.bot:
             return
 
+        if message.guild:
+            self._record_interactions(message)
+
         # Quick admin command check first (high priority)
         admin_handled = await self._process_natural_admin_commands(message)
         if admin_handled:
@@ -2088,12 +2123,28 @@ class AstraAICompanion(commands.Cog):
         # Respond with enhanced triggers
         if should_respond:
             self.logger.info(
-                f"💬 Natural conversation with {message.author.display_name} "
-                f"{'in DM' if is_dm else f'in {message.guild.name}'}"
+                "💬 Natural conversation with %s %s",
+                message.author.display_name,
+                "in DM" if is_dm else f"in {message.guild.name}",
             )
             # Use asyncio.create_task for non-blocking response
             asyncio.create_task(self.handle_companion_interaction(message))
 
+    def _record_interactions(self, message: discord.Message):
+        """Feed the server interaction graph used for mood spread and influence"""
+        reply_to = None
+        resolved = message.reference.resolved if message.reference else None
+        if isinstance(resolved, discord.Message) and not resolved.author.bot:
+            reply_to = resolved.author.id
+
+        get_interaction_graph(message.guild.id).record_message(
+            message.author.id,
+            channel_id=message.channel.id,
+            reply_to=reply_to,
+            mentions=[member.id for member in message.mentions if not member.bot],
+            timestamp=message.created_at.timestamp(),
+        )
+
     async def handle_companion_interaction(self, message: discord.Message):
         """Enhanced companion interaction with optimized performance and error handling"""
         try:
@@ -2241,23 +2292,11 @@ class AstraAICompanion(commands.Cog):
     async def personality_sync_task(self):
         """Sync personality profiles to database"""
         try:
-            for profile_key, profile in self.user_profiles.items():
-                profile_data = {
-                    "base_personality": profile.base_personality.to_dict(),
-                    "modifiers": {
-                        "user_mood": profile.modifiers.user_mood,
-                        "conversation_tone": profile.modifiers.conversation_tone,
-                        "time_of_day": profile.modifiers.time_of_day,
-                        "channel_type": profile.modifiers.channel_type,
-                        "interaction_history": profile.modifiers.interaction_history,
-                    },
-                    "user_preferences": profile.user_preferences,
-                    "updated_at": datetime.now().isoformat(),
-                }
-
-                await self.db.set("user_profiles", profile_key, profile_data)
+            # Only profiles touched since the last sync need writing
+            changed = len(self.user_profiles.dirty_items())
+            await self.user_profiles.flush()
 
-            self.logger.info(f"Synced {len(self.user_profiles)} personality profiles")
+            self.logger.info(f"Synced {changed} personality profiles")
 
         except Exception as e:
             self.logger.error(f"Error syncing personality profiles: {e}")
@@ -31,6 +31,10 @@ import sqlite3
 from pathlib import Path
 from functools import wraps
 
+from utils.retention import RetentionJob, retention_scheduler
+from utils.storage_engine import get_storage
+from utils.join_stream import join_stream
+
 logger = logging.getLogger("astra.comprehensive_moderation")
 
 
@@ -202,6 +206,7 @@ class ComprehensiveModeration(commands.Cog):
 
         # Initialize database
         self._init_database()
+        self.storage = get_storage(self.db_path)
 
         # Start cleanup task
         self.cleanup_expired_actions.start()
@@ -782,19 +787,11 @@ class ComprehensiveModeration(commands.Cog):
         if not config.raid_protection_enabled:
             return
 
-        # Track recent joins
-        if not hasattr(self, "_recent_joins"):
-            self._recent_joins = defaultdict(lambda: deque(maxlen=20))
-
-        now = datetime.now(timezone.utc)
-        self._recent_joins[guild_id].append(now)
-
-        # Check for raid (10+ joins in 60 seconds)
-        recent = [
-            t for t in self._recent_joins[guild_id] if now - t <= timedelta(seconds=60)
-        ]
+        # Shared join stream: each join is counted once across cogs
+        signal = join_stream.observe(member)
 
-        if len(recent) >= 10:
+        # Check for raid (10+ joins in 60 seconds), acting once per burst
+        if signal.joins >= 10 and signal.burst.claim("verification"):
             # RAID DETECTED
             try:
                 # Enable verification level
@@ -808,10 +805,20 @@ class ComprehensiveModeration(commands.Cog):
                     if channel:
                         embed = discord.Embed(
                             title="🚨 RAID DETECTED",
-                            description=f"**{len(recent)} members** joined in the last 60 seconds.\n\n**Action:** Verification level increased.",
+                            description=f"**{signal.joins} members** joined in the last {join_stream.window} seconds "
+                            f"({signal.young_accounts} accounts under a day old).\n\n**Action:** Verification level increased.",
                             color=0xFF0000,
                             timestamp=datetime.now(timezone.utc),
                         )
+                        if len(signal.similar_names) >= 2:
+                            embed.add_field(
+                                name="👥 Similar Names",
+                                value=", ".join(
+                                    f"`{name}`"
+                                    for name in [member.name, *signal.similar_names[:9]]
+                                ),
+                                inline=False,
+                            )
                         await channel.send(embed=embed, content="@here")
 
             except Exception as e:
@@ -1825,12 +1832,10 @@ class ComprehensiveModeration(commands.Cog):
                 pass
 
             # Update case as inactive
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    "UPDATE moderation_cases SET active = 0 WHERE case_id = ? AND guild_id = ?",
-                    (quarantine_case.case_id, interaction.guild_id),
-                )
-                conn.commit()
+            await self.storage.execute(
+                "UPDATE moderation_cases SET active = 0 WHERE case_id = ? AND guild_id = ?",
+                (quarantine_case.case_id, interaction.guild_id),
+            )
 
             # Calculate quarantine duration
             duration = datetime.now(timezone.utc) - quarantine_case.timestamp
@@ -1901,22 +1906,20 @@ class ComprehensiveModeration(commands.Cog):
             cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
 
             # Query recent moderation cases
-            with sqlite3.connect(self.db_path) as conn:
-                query = """
-                    SELECT user_id, violation, severity, COUNT(*) as count
-                    FROM moderation_cases
-                    WHERE guild_id = ? AND timestamp >= ?
-                """
-                params = [interaction.guild_id, cutoff_time.isoformat()]
+            query = """
+                SELECT user_id, violation, severity, COUNT(*) as count
+                FROM moderation_cases
+                WHERE guild_id = ? AND timestamp >= ?
+            """
+            params = [interaction.guild_id, cutoff_time.isoformat()]
 
-                if target:
-                    query += " AND user_id = ?"
-                    params.append(target.id)
+            if target:
+                query += " AND user_id = ?"
+                params.append(target.id)
 
-                query += " GROUP BY user_id, violation ORDER BY count DESC LIMIT 10"
+            query += " GROUP BY user_id, violation ORDER BY count DESC LIMIT 10"
 
-                cursor = conn.execute(query, params)
-                threats = cursor.fetchall()
+            threats = await self.storage.fetch_all(query, params)
 
             # Create embed
             embed = discord.Embed(
@@ -1964,12 +1967,11 @@ class ComprehensiveModeration(commands.Cog):
                 )
 
             # Get total stats
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT COUNT(*) FROM moderation_cases WHERE guild_id = ? AND timestamp >= ?",
-                    (interaction.guild_id, cutoff_time.isoformat()),
-                )
-                total_actions = cursor.fetchone()[0]
+            row = await self.storage.fetch_one(
+                "SELECT COUNT(*) FROM moderation_cases WHERE guild_id = ? AND timestamp >= ?",
+                (interaction.guild_id, cutoff_time.isoformat()),
+            )
+            total_actions = row[0]
 
             embed.add_field(
                 name="📊 Scan Statistics",
@@ -2309,22 +2311,20 @@ class ComprehensiveModeration(commands.Cog):
             cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
 
             # Query logs
-            with sqlite3.connect(self.db_path) as conn:
-                query = """
-                    SELECT case_id, user_id, moderator_id, action, violation, reason, timestamp
-                    FROM moderation_cases
-                    WHERE guild_id = ? AND timestamp >= ?
-                """
-                params = [interaction.guild_id, cutoff_time.isoformat()]
+            query = """
+                SELECT case_id, user_id, moderator_id, action, violation, reason, timestamp
+                FROM moderation_cases
+                WHERE guild_id = ? AND timestamp >= ?
+            """
+            params = [interaction.guild_id, cutoff_time.isoformat()]
 
-                if action_type:
-                    query += " AND action = ?"
-                    params.append(action_type)
+            if action_type:
+                query += " AND action = ?"
+                params.append(action_type)
 
-                query += " ORDER BY timestamp DESC LIMIT 20"
+            query += " ORDER BY timestamp DESC LIMIT 20"
 
-                cursor = conn.execute(query, params)
-                logs = cursor.fetchall()
+            logs = await self.storage.fetch_all(query, params)
 
             # Create embed
             embed = discord.Embed(
@@ -2396,17 +2396,15 @@ class ComprehensiveModeration(commands.Cog):
                 )
 
             # Add statistics
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    """
-                    SELECT action, COUNT(*) as count
-                    FROM moderation_cases
-                    WHERE guild_id = ? AND timestamp >= ?
-                    GROUP BY action
-                    """,
-                    (interaction.guild_id, cutoff_time.isoformat()),
-                )
-                stats = cursor.fetchall()
+            stats = await self.storage.fetch_all(
+                """
+                SELECT action, COUNT(*) as count
+                FROM moderation_cases
+                WHERE guild_id = ? AND timestamp >= ?
+                GROUP BY action
+                """,
+                (interaction.guild_id, cutoff_time.isoformat()),
+            )
 
             if stats:
                 stats_str = " | ".join(
@@ -2455,18 +2453,16 @@ class ComprehensiveModeration(commands.Cog):
                 return
 
             # Get current trust score
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT trust_score, last_updated FROM user_trust_scores WHERE guild_id = ? AND user_id = ?",
-                    (interaction.guild_id, user.id),
-                )
-                row = cursor.fetchone()
+            row = await self.storage.fetch_one(
+                "SELECT trust_score, last_updated FROM user_trust_scores WHERE guild_id = ? AND user_id = ?",
+                (interaction.guild_id, user.id),
+            )
 
-                if row:
-                    current_score, last_updated = row
-                else:
-                    current_score = 100.0
-                    last_updated = None
+            if row:
+                current_score, last_updated = row
+            else:
+                current_score = 100.0
+                last_updated = None
 
             # Modify if new score provided
             if new_score is not None:
@@ -2476,21 +2472,19 @@ class ComprehensiveModeration(commands.Cog):
                     )
                     return
 
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO user_trust_scores 
-                        (guild_id, user_id, trust_score, last_updated)
-                        VALUES (?, ?, ?, ?)
-                        """,
-                        (
-                            interaction.guild_id,
-                            user.id,
-                            new_score,
-                            datetime.now(timezone.utc).isoformat(),
-                        ),
-                    )
-                    conn.commit()
+                await self.storage.execute(
+                    """
+                    INSERT OR REPLACE INTO user_trust_scores 
+                    (guild_id, user_id, trust_score, last_updated)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (
+                        interaction.guild_id,
+                        user.id,
+                        new_score,
+                        datetime.now(timezone.utc).isoformat(),
+                    ),
+                )
 
                 # Create modification embed
                 embed = discord.Embed(
@@ -2748,28 +2742,26 @@ class ComprehensiveModeration(commands.Cog):
                 return
 
             # Check for recent appeals (cooldown)
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    """SELECT created_at FROM case_appeals 
-                    WHERE guild_id = ? AND user_id = ? 
-                    ORDER BY created_at DESC LIMIT 1""",
-                    (interaction.guild_id, case.user_id),
-                )
-                last_appeal = cursor.fetchone()
-
-                if last_appeal:
-                    last_appeal_time = datetime.fromisoformat(last_appeal[0])
-                    cooldown = timedelta(hours=config.appeal_cooldown_hours)
-                    if datetime.now(timezone.utc) - last_appeal_time < cooldown:
-                        remaining = cooldown - (
-                            datetime.now(timezone.utc) - last_appeal_time
-                        )
-                        hours = int(remaining.total_seconds() / 3600)
-                        await interaction.followup.send(
-                            f"❌ Appeal cooldown active. Try again in {hours} hours.",
-                            ephemeral=True,
-                        )
-                        return
+            last_appeal = await self.storage.fetch_one(
+                """SELECT created_at FROM case_appeals 
+                WHERE guild_id = ? AND user_id = ? 
+                ORDER BY created_at DESC LIMIT 1""",
+                (interaction.guild_id, case.user_id),
+            )
+
+            if last_appeal:
+                last_appeal_time = datetime.fromisoformat(last_appeal[0])
+                cooldown = timedelta(hours=config.appeal_cooldown_hours)
+                if datetime.now(timezone.utc) - last_appeal_time < cooldown:
+                    remaining = cooldown - (
+                        datetime.now(timezone.utc) - last_appeal_time
+                    )
+                    hours = int(remaining.total_seconds() / 3600)
+                    await interaction.followup.send(
+                        f"❌ Appeal cooldown active. Try again in {hours} hours.",
+                        ephemeral=True,
+                    )
+                    return
 
             # Check if user has 4+ violations for multi-admin requirement
             user_cases = await self.get_user_cases(interaction.guild_id, case.user_id)
@@ -2777,7 +2769,7 @@ class ComprehensiveModeration(commands.Cog):
             requires_multi_admin = violation_count >= 4
 
             # Create appeal
-            with sqlite3.connect(self.db_path) as conn:
+            def create_appeal(conn):
                 cursor = conn.execute(
                     """INSERT INTO case_appeals 
                     (case_id, guild_id, user_id, reason, status, created_at, requires_multi_admin, admin_approvals, admin_denials)
@@ -2807,7 +2799,9 @@ class ComprehensiveModeration(commands.Cog):
                         case_id,
                     ),
                 )
-                conn.commit()
+                return appeal_id
+
+            appeal_id = await self.storage.transaction(create_appeal)
 
             # Create response embed
             embed = discord.Embed(
@@ -2922,14 +2916,12 @@ class ComprehensiveModeration(commands.Cog):
 
         try:
             # Get appeal details
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    """SELECT case_id, guild_id, user_id, reason as appeal_reason, status, 
-                    requires_multi_admin, admin_approvals, admin_denials
-                    FROM case_appeals WHERE appeal_id = ? AND guild_id = ?""",
-                    (appeal_id, interaction.guild_id),
-                )
-                appeal = cursor.fetchone()
+            appeal = await self.storage.fetch_one(
+                """SELECT case_id, guild_id, user_id, reason as appeal_reason, status, 
+                requires_multi_admin, admin_approvals, admin_denials
+                FROM case_appeals WHERE appeal_id = ? AND guild_id = ?""",
+                (appeal_id, interaction.guild_id),
+            )
 
             if not appeal:
                 await interaction.followup.send(
@@ -2993,7 +2985,7 @@ class ComprehensiveModeration(commands.Cog):
                 final_decision = decision + "d"
 
             # Update database
-            with sqlite3.connect(self.db_path) as conn:
+            def record_review(conn):
                 if final_decision:
                     # Final decision made
                     conn.execute(
@@ -3042,7 +3034,7 @@ class ComprehensiveModeration(commands.Cog):
                         ),
                     )
 
-                conn.commit()
+            await self.storage.transaction(record_review)
 
             # Create response embed
             user = interaction.guild.get_member(
@@ -3179,27 +3171,24 @@ class ComprehensiveModeration(commands.Cog):
         await interaction.response.defer()
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                if status:
-                    cursor = conn.execute(
-                        """SELECT appeal_id, case_id, user_id, reason, status, created_at, 
-                        requires_multi_admin, admin_approvals, admin_denials
-                        FROM case_appeals 
-                        WHERE guild_id = ? AND status LIKE ?
-                        ORDER BY created_at DESC LIMIT 20""",
-                        (interaction.guild_id, f"%{status}%"),
-                    )
-                else:
-                    cursor = conn.execute(
-                        """SELECT appeal_id, case_id, user_id, reason, status, created_at,
-                        requires_multi_admin, admin_approvals, admin_denials
-                        FROM case_appeals 
-                        WHERE guild_id = ?
-                        ORDER BY created_at DESC LIMIT 20""",
-                        (interaction.guild_id,),
-                    )
-
-                appeals = cursor.fetchall()
+            if status:
+                appeals = await self.storage.fetch_all(
+                    """SELECT appeal_id, case_id, user_id, reason, status, created_at, 
+                    requires_multi_admin, admin_approvals, admin_denials
+                    FROM case_appeals 
+                    WHERE guild_id = ? AND status LIKE ?
+                    ORDER BY created_at DESC LIMIT 20""",
+                    (interaction.guild_id, f"%{status}%"),
+                )
+            else:
+                appeals = await self.storage.fetch_all(
+                    """SELECT appeal_id, case_id, user_id, reason, status, created_at,
+                    requires_multi_admin, admin_approvals, admin_denials
+                    FROM case_appeals 
+                    WHERE guild_id = ?
+                    ORDER BY created_at DESC LIMIT 20""",
+                    (interaction.guild_id,),
+                )
 
             if not appeals:
                 await interaction.followup.send(
@@ -3344,19 +3333,17 @@ class ComprehensiveModeration(commands.Cog):
         if guild_id in self.configs:
             return self.configs[guild_id]
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT config_json FROM moderation_configs WHERE guild_id = ?",
-                (guild_id,),
-            )
-            row = cursor.fetchone()
+        row = await self.storage.fetch_one(
+            "SELECT config_json FROM moderation_configs WHERE guild_id = ?",
+            (guild_id,),
+        )
 
-            if row:
-                config_dict = json.loads(row[0])
-                config = ModerationConfig(**config_dict)
-            else:
-                config = ModerationConfig(guild_id=guild_id)
-                await self.save_config(config)
+        if row:
+            config_dict = json.loads(row[0])
+            config = ModerationConfig(**config_dict)
+        else:
+            config = ModerationConfig(guild_id=guild_id)
+            await self.save_config(config)
 
         self.configs[guild_id] = config
         return config
@@ -3366,12 +3353,10 @@ class ComprehensiveModeration(commands.Cog):
         config_dict = asdict(config)
         config_json = json.dumps(config_dict)
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO moderation_configs (guild_id, config_json) VALUES (?, ?)",
-                (config.guild_id, config_json),
-            )
-            conn.commit()
+        await self.storage.execute(
+            "INSERT OR REPLACE INTO moderation_configs (guild_id, config_json) VALUES (?, ?)",
+            (config.guild_id, config_json),
+        )
 
         self.configs[config.guild_id] = config
 
@@ -3389,20 +3374,8 @@ class ComprehensiveModeration(commands.Cog):
         notes: str = "",
     ) -> ModerationCase:
         """Create a new moderation case"""
-        # Get the highest case_id for this guild from the database
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT MAX(case_id) FROM moderation_cases WHERE guild_id = ?",
-                (guild_id,),
-            )
-            max_case_id = cursor.fetchone()[0]
-            case_id = (max_case_id or 0) + 1
-
-            # Update in-memory counter
-            self.case_counter[guild_id] = case_id
-
         case = ModerationCase(
-            case_id=case_id,
+            case_id=0,
             guild_id=guild_id,
             user_id=user_id,
             moderator_id=moderator_id,
@@ -3415,13 +3388,21 @@ class ComprehensiveModeration(commands.Cog):
             evidence=evidence or [],
         )
 
-        with sqlite3.connect(self.db_path) as conn:
+        def insert_case(conn) -> int:
+            # Allocate the next case_id and insert in one writer transaction,
+            # so concurrent cases in the same guild never share an id
+            max_case_id = conn.execute(
+                "SELECT MAX(case_id) FROM moderation_cases WHERE guild_id = ?",
+                (guild_id,),
+            ).fetchone()[0]
+            case_id = (max_case_id or 0) + 1
+
             conn.execute(
                 """INSERT INTO moderation_cases
                 (case_id, guild_id, user_id, moderator_id, action, violation, reason, timestamp, expires_at, active, severity, evidence_json, notes, appealed, appeal_status)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                 (
-                    case.case_id,
+                    case_id,
                     case.guild_id,
                     case.user_id,
                     case.moderator_id,
@@ -3438,87 +3419,72 @@ class ComprehensiveModeration(commands.Cog):
                     None,
                 ),
             )
-            conn.commit()
+            return case_id
+
+        case.case_id = await self.storage.transaction(insert_case)
+
+        # Update in-memory counter
+        self.case_counter[guild_id] = case.case_id
 
         return case
 
+    @staticmethod
+    def _row_to_case(row) -> ModerationCase:
+        """Build a ModerationCase from a moderation_cases row"""
+        return ModerationCase(
+            case_id=row[0],
+            guild_id=row[1],
+            user_id=row[2],
+            moderator_id=row[3],
+            action=ActionType(row[4]),
+            violation=ViolationType(row[5]),
+            reason=row[6],
+            timestamp=datetime.fromisoformat(row[7]),
+            expires_at=datetime.fromisoformat(row[8]) if row[8] else None,
+            active=bool(row[9]),
+            severity=SeverityLevel(row[10]),
+            evidence=json.loads(row[11]) if row[11] else [],
+            notes=row[12] or "",
+            appealed=bool(row[13]),
+            appeal_status=row[14],
+        )
+
     async def get_case(self, guild_id: int, case_id: int) -> Optional[ModerationCase]:
         """Get a specific case"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT * FROM moderation_cases WHERE guild_id = ? AND case_id = ?",
-                (guild_id, case_id),
-            )
-            row = cursor.fetchone()
-
-            if not row:
-                return None
-
-            return ModerationCase(
-                case_id=row[0],
-                guild_id=row[1],
-                user_id=row[2],
-                moderator_id=row[3],
-                action=ActionType(row[4]),
-                violation=ViolationType(row[5]),
-                reason=row[6],
-                timestamp=datetime.fromisoformat(row[7]),
-                expires_at=datetime.fromisoformat(row[8]) if row[8] else None,
-                active=bool(row[9]),
-                severity=SeverityLevel(row[10]),
-                evidence=json.loads(row[11]) if row[11] else [],
-                notes=row[12] or "",
-                appealed=bool(row[13]),
-                appeal_status=row[14],
-            )
+        row = await self.storage.fetch_one(
+            "SELECT * FROM moderation_cases WHERE guild_id = ? AND case_id = ?",
+            (guild_id, case_id),
+        )
+
+        if not row:
+            return None
+
+        return self._row_to_case(row)
 
     async def get_user_cases(
         self, guild_id: int, user_id: int, limit: int = 10
     ) -> List[ModerationCase]:
         """Get user's moderation cases"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """SELECT * FROM moderation_cases 
-                WHERE guild_id = ? AND user_id = ? 
-                ORDER BY timestamp DESC LIMIT ?""",
-                (guild_id, user_id, limit),
-            )
-
-            cases = []
-            for row in cursor.fetchall():
-                cases.append(
-                    ModerationCase(
-                        case_id=row[0],
-                        guild_id=row[1],
-                        user_id=row[2],
-                        moderator_id=row[3],
-                        action=ActionType(row[4]),
-                        violation=ViolationType(row[5]),
-                        reason=row[6],
-                        timestamp=datetime.fromisoformat(row[7]),
-                        expires_at=datetime.fromisoformat(row[8]) if row[8] else None,
-                        active=bool(row[9]),
-                        severity=SeverityLevel(row[10]),
-                        evidence=json.loads(row[11]) if row[11] else [],
-                        notes=row[12] or "",
-                        appealed=bool(row[13]),
-                        appeal_status=row[14],
-                    )
-                )
+        rows = await self.storage.fetch_all(
+            """SELECT * FROM moderation_cases 
+            WHERE guild_id = ? AND user_id = ? 
+            ORDER BY timestamp DESC LIMIT ?""",
+            (guild_id, user_id, limit),
+        )
 
-            return cases
+        return [self._row_to_case(row) for row in rows]
 
     async def increment_violation_count(
         self, guild_id: int, user_id: int, violation_type: str
     ) -> int:
         """Increment violation count and return new count"""
-        with sqlite3.connect(self.db_path) as conn:
+
+        def increment(conn) -> int:
             # Get current counts
-            cursor = conn.execute(
+            row = conn.execute(
                 f"SELECT {violation_type}_count FROM user_warnings WHERE guild_id = ? AND user_id = ?",
                 (guild_id, user_id),
-            )
-            row = cursor.fetchone()
+            ).fetchone()
 
             if row:
                 new_count = row[0] + 1
@@ -3540,23 +3506,22 @@ class ComprehensiveModeration(commands.Cog):
                     (guild_id, user_id, datetime.now(timezone.utc).isoformat()),
                 )
 
-            conn.commit()
             return new_count
 
+        return await self.storage.transaction(increment)
+
     async def get_user_violation_counts(
         self, guild_id: int, user_id: int
     ) -> Dict[str, int]:
         """Get user's violation counts"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT warning_count, timeout_count, kick_count FROM user_warnings WHERE guild_id = ? AND user_id = ?",
-                (guild_id, user_id),
-            )
-            row = cursor.fetchone()
+        row = await self.storage.fetch_one(
+            "SELECT warning_count, timeout_count, kick_count FROM user_warnings WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id),
+        )
 
-            if row:
-                return {"warning": row[0], "timeout": row[1], "kick": row[2]}
-            return {"warning": 0, "timeout": 0, "kick": 0}
+        if row:
+            return {"warning": row[0], "timeout": row[1], "kick": row[2]}
+        return {"warning": 0, "timeout": 0, "kick": 0}
 
     async def get_moderation_stats(
         self, guild_id: int, days: int = 7
@@ -3564,16 +3529,17 @@ class ComprehensiveModeration(commands.Cog):
         """Get moderation statistics"""
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
-        with sqlite3.connect(self.db_path) as conn:
-            stats = {}
-            for action in ["warn", "timeout", "kick", "ban"]:
-                cursor = conn.execute(
-                    "SELECT COUNT(*) FROM moderation_cases WHERE guild_id = ? AND action = ? AND timestamp >= ?",
-                    (guild_id, action, cutoff.isoformat()),
-                )
-                stats[f"{action}s"] = cursor.fetchone()[0]
+        rows = await self.storage.fetch_all(
+            """SELECT action, COUNT(*) FROM moderation_cases
+            WHERE guild_id = ? AND timestamp >= ? GROUP BY action""",
+            (guild_id, cutoff.isoformat()),
+        )
+        counts = dict(rows)
 
-            return stats
+        return {
+            f"{action}s": counts.get(action, 0)
+            for action in ["warn", "timeout", "kick", "ban"]
+        }
 
     async def log_moderation_action(self, guild: discord.Guild, embed: discord.Embed):
         """Log moderation action to mod log channel"""
@@ -3590,15 +3556,17 @@ class ComprehensiveModeration(commands.Cog):
     @tasks.loop(minutes=5)
     async def cleanup_expired_actions(self):
         """Cleanup expired timeouts and mutes"""
-        now = datetime.now(timezone.utc)
-
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """UPDATE moderation_cases SET active = 0 
-                WHERE active = 1 AND expires_at IS NOT NULL AND expires_at <= ?""",
-                (now.isoformat(),),
+        await retention_scheduler.run_job(
+            RetentionJob(
+                name="moderation.expired_actions",
+                db_path=self.db_path,
+                table="moderation_cases",
+                where="active = 1 AND expires_at IS NOT NULL AND expires_at <= ?",
+                params=lambda: (datetime.now(timezone.utc).isoformat(),),
+                set_clause="active = 0",
+                time_budget=2.0,
             )
-            conn.commit()
+        )
 
     @cleanup_expired_actions.before_loop
     async def before_cleanup(self):
@@ -21,6 +21,7 @@ import re
 
 from config.unified_config import unified_config
 from utils.permissions import has_permission, PermissionLevel, check_user_permission
+from utils.member_stats import ONLINE_UNAVAILABLE, format_online, member_stats
 
 try:
     from ai.multi_provider_ai import MultiProviderAIManager
@@ -431,20 +432,15 @@ JSON:
     ):
         """Analyze overall community health"""
         # Calculate metrics
-        active_members = len(
-            [
-                m
-                for m in guild.members
-                if not m.bot and m.status != discord.Status.offline
-            ]
-        )
-        member_ratio = (
-            active_members / guild.member_count if guild.member_count > 0 else 0
-        )
+        stats = member_stats.stats(guild)
+        active_members = stats.online_humans
+        member_ratio = stats.online_human_ratio
 
         # Health indicators
         health_indicators = []
-        if member_ratio > 0.3:
+        if member_ratio is None:
+            health_indicators.append("⚪ Member activity unavailable")
+        elif member_ratio > 0.3:
             health_indicators.append("✅ High member activity")
         elif member_ratio > 0.1:
             health_indicators.append("🟡 Moderate member activity")
@@ -459,15 +455,15 @@ JSON:
         embed = discord.Embed(
             title="🏥 Community Health Report",
             description=f"Comprehensive health analysis for **{guild.name}**",
-            color=0x00FF7F if member_ratio > 0.2 else 0xFFD700,
+            color=0x00FF7F if member_ratio and member_ratio > 0.2 else 0xFFD700,
             timestamp=datetime.now(timezone.utc),
         )
 
         embed.add_field(
             name="📊 Key Metrics",
             value=f"**Total Members:** {guild.member_count:,}\n"
-            f"**Active Members:** {active_members:,}\n"
-            f"**Activity Ratio:** {member_ratio:.1%}\n"
+            f"**Active Members:** {format_online(active_members)}\n"
+            f"**Activity Ratio:** {ONLINE_UNAVAILABLE if member_ratio is None else f'{member_ratio:.1%}'}\n"
             f"**Health Score:** {health.engagement_score}/100",
             inline=True,
         )
@@ -491,14 +487,17 @@ JSON:
         await interaction.followup.send(embed=embed)
 
     async def _generate_health_recommendations(
-        self, guild: discord.Guild, health: CommunityHealth, member_ratio: float
+        self,
+        guild: discord.Guild,
+        health: CommunityHealth,
+        member_ratio: Optional[float],
     ) -> str:
         """Generate AI-powered health recommendations"""
         prompt = f"""As Astra, analyze this Discord community and provide 3 specific recommendations to improve community health.
 
 Community: {guild.name}
 Members: {guild.member_count}
-Active ratio: {member_ratio:.1%}
+Active ratio: {ONLINE_UNAVAILABLE if member_ratio is None else f"{member_ratio:.1%}"}
 Health score: {health.engagement_score}/100
 
 Provide 3 bullet points with actionable recommendations (under 200 chars total)."""
@@ -526,8 +525,9 @@ Provide 3 bullet points with actionable recommendations (under 200 chars total).
         """Analyze community engagement patterns"""
         # Calculate engagement metrics
         total_members = guild.member_count
-        online_members = len([m for m in guild.members if m.status != discord.Status.offline])
-        active_ratio = online_members / total_members if total_members > 0 else 0
+        stats = member_stats.stats(guild)
+        online_members = stats.online
+        active_ratio = stats.online_ratio
 
         # Channel activity (simplified)
         text_channels = len(guild.text_channels)
@@ -543,8 +543,8 @@ Provide 3 bullet points with actionable recommendations (under 200 chars total).
         embed.add_field(
             name="👥 Member Engagement",
             value=f"• Total Members: **{total_members}**\n"
-                  f"• Online Now: **{online_members}**\n"
-                  f"• Activity Rate: **{active_ratio:.1%}**\n"
+                  f"• Online Now: **{format_online(online_members)}**\n"
+                  f"• Activity Rate: **{ONLINE_UNAVAILABLE if active_ratio is None else f'{active_ratio:.1%}'}**\n"
                   f"• Engagement Score: **{health.engagement_score}/100**",
             inline=True,
         )
@@ -558,7 +558,7 @@ Provide 3 bullet points with actionable recommendations (under 200 chars total).
         )
 
         # Engagement recommendations
-        if active_ratio < 0.3:
+        if active_ratio is not None and active_ratio < 0.3:
             embed.add_field(
                 name="🚀 Engagement Boost",
                 value="• Schedule interactive events\n• Create discussion prompts\n• Add reaction roles\n• Host voice activities",
@@ -588,7 +588,11 @@ Provide 3 bullet points with actionable recommendations (under 200 chars total).
 
         # Basic trend indicators
         member_growth = "Stable" if guild.member_count > 10 else "Small Community"
-        activity_trend = "Active" if len([m for m in guild.members if m.status != discord.Status.offline]) > guild.member_count * 0.2 else "Quiet"
+        online_members = member_stats.stats(guild).online
+        if online_members is None:
+            activity_trend = "Unavailable"
+        else:
+            activity_trend = "Active" if online_members > guild.member_count * 0.2 else "Quiet"
         
         embed.add_field(
             name="📊 Growth Trends",
@@ -640,7 +644,7 @@ Provide 3 bullet points with actionable recommendations (under 200 chars total).
         try:
             # Gather comprehensive data for AI analysis
             total_members = guild.member_count
-            online_members = len([m for m in guild.members if m.status != discord.Status.offline])
+            online_members = member_stats.stats(guild).online
             text_channels = len(guild.text_channels)
             voice_channels = len(guild.voice_channels)
             roles_count = len(guild.roles) - 1  # Exclude @everyone
@@ -650,7 +654,7 @@ Provide 3 bullet points with actionable recommendations (under 200 chars total).
 
 Server: {guild.name}
 Members: {total_members}
-Online: {online_members}
+Online: {format_online(online_members)}
 Text Channels: {text_channels}
 Voice Channels: {voice_channels}
 Roles: {roles_count}
@@ -690,7 +694,7 @@ Provide 4 key insights with specific recommendations (each under 100 chars):
             embed.add_field(
                 name="📊 Current Metrics",
                 value=f"• Health Score: **{health.engagement_score}/100**\n"
-                      f"• Activity Rate: **{(online_members/total_members)*100:.1f}%**\n"
+                      f"• Activity Rate: **{ONLINE_UNAVAILABLE if online_members is None else f'{(online_members/total_members)*100:.1f}%'}**\n"
                       f"• Channel Diversity: **{text_channels + voice_channels}**\n"
                       f"• Role Structure: **{roles_count} roles**",
                 inline=True,
@@ -1212,20 +1216,12 @@ Example tone: Friendly, welcoming, helpful, and enthusiastic about the community
     ):
         """Update community health metrics"""
         # Calculate engagement metrics
-        active_members = len(
-            [
-                m
-                for m in guild.members
-                if not m.bot and m.status != discord.Status.offline
-            ]
-        )
-        activity_ratio = (
-            active_members / guild.member_count if guild.member_count > 0 else 0
-        )
+        activity_ratio = member_stats.stats(guild).online_human_ratio
 
-        # Update engagement score
-        base_score = min(100, activity_ratio * 200)  # Scale activity ratio
-        health.engagement_score = int(base_score)
+        # Update engagement score (kept as is when online counts are unavailable)
+        if activity_ratio is not None:
+            base_score = min(100, activity_ratio * 200)  # Scale activity ratio
+            health.engagement_score = int(base_score)
         health.last_assessment = time.time()
 
     async def _suggest_community_improvements(
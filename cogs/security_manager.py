@@ -97,10 +97,16 @@ class SecurityEvent:
 
 
 from utils.permissions import has_permission, PermissionLevel, check_user_permission
+from utils.lockdown_executor import LockdownExecutor, LockdownRecord, LockdownResult
+from utils.join_stream import AGE_LABELS, JoinBurst, JoinSignal, SuspiciousJoin
+from utils.join_stream import join_stream
 from config.unified_config import unified_config
 
 logger = logging.getLogger("astra.security.manager")
 
+# A long burst gets a follow-up alert at most this often (seconds)
+JOIN_ALERT_MAX_DELAY = 60.0
+
 # Owner ID for critical security controls
 OWNER_ID = 1115739214148026469
 
@@ -204,6 +210,11 @@ class SecurityManager(commands.Cog):
         self.lockdown_timestamp = 0
         self.lockdown_level = 0  # 0=none, 1=partial, 2=full, 3=emergency
         self.lockdown_channels_affected = set()
+        self.lockdown_apply_seconds = 0.0
+
+        # Concurrent overwrite changes, recorded per guild for an exact unlock
+        self.lockdown_executor = LockdownExecutor()
+        self.lockdown_records: Dict[int, LockdownRecord] = {}
 
         # Real-time threat monitoring
         self.active_threats = {}
@@ -212,6 +223,9 @@ class SecurityManager(commands.Cog):
         # User profile management
         self.user_profiles = {}
 
+        # One pending aggregated join alert per burst
+        self._join_alert_tasks: Set[asyncio.Task] = set()
+
         # Performance optimization features
         self.batch_operations = []
         self.batch_timer = None
@@ -248,6 +262,8 @@ class SecurityManager(commands.Cog):
         self.cleanup_cache.cancel()
         self.threat_monitoring.cancel()
         self.performance_optimizer.cancel()
+        for task in self._join_alert_tasks:
+            task.cancel()
 
         # Cleanup resources
         await self._cleanup_resources()
@@ -425,89 +441,85 @@ class SecurityManager(commands.Cog):
         except Exception as e:
             self.logger.error(f"Graduated lockdown execution error: {e}")
 
+    async def _apply_lockdown(
+        self,
+        guild: discord.Guild,
+        channels: List[discord.abc.GuildChannel],
+        updates: Dict[str, Optional[bool]],
+        reason: str,
+        target: Optional[Any] = None,
+        only_unset: bool = False,
+    ) -> LockdownResult:
+        """Lock channels through the executor and record the changes for unlock"""
+        record = self.lockdown_records.setdefault(guild.id, LockdownRecord(guild.id))
+        result = await self.lockdown_executor.lock(
+            channels,
+            target or guild.default_role,
+            updates,
+            reason,
+            record=record,
+            only_unset=only_unset,
+        )
+        self.lockdown_channels_affected.update(record.channel_ids)
+        self.lockdown_apply_seconds = result.elapsed
+        return result
+
     async def _partial_lockdown(
         self, guild: discord.Guild, threat_data: Dict[str, Any]
     ):
         """Partial lockdown - restrict new/untrusted users"""
-        channels_affected = 0
-        for channel in guild.text_channels:
-            try:
-                overwrites = channel.overwrites_for(guild.default_role)
-                # Only restrict if no existing restrictions
-                if overwrites.send_messages is None:
-                    overwrites.send_messages = False
-                    await channel.set_permissions(
-                        guild.default_role,
-                        overwrite=overwrites,
-                        reason=f"Partial lockdown: {threat_data.get('type', 'threat')}",
-                    )
-                    channels_affected += 1
-                    self.lockdown_channels_affected.add(channel.id)
-            except Exception as e:
-                self.logger.warning(
-                    f"Failed to partially lock channel {channel.name}: {e}"
-                )
+        # Only restrict where there are no existing restrictions
+        result = await self._apply_lockdown(
+            guild,
+            guild.text_channels,
+            {"send_messages": False},
+            reason=f"Partial lockdown: {threat_data.get('type', 'threat')}",
+            only_unset=True,
+        )
 
         self.logger.warning(
-            f"🟡 Partial lockdown activated: {channels_affected} channels restricted"
+            f"🟡 Partial lockdown activated: {result.channels} channels restricted "
+            f"in {result.elapsed:.1f}s"
         )
 
     async def _full_lockdown(self, guild: discord.Guild, threat_data: Dict[str, Any]):
         """Full lockdown - lock most channels except essential"""
         essential_channels = {"rules", "announcements", "welcome", "general"}
-        channels_affected = 0
 
-        for channel in guild.text_channels:
-            # Skip essential channels
-            if any(
+        # Skip essential channels
+        channels = [
+            channel
+            for channel in guild.text_channels
+            if not any(
                 essential in channel.name.lower() for essential in essential_channels
-            ):
-                continue
-
-            try:
-                overwrites = channel.overwrites_for(guild.default_role)
-                overwrites.send_messages = False
-                overwrites.add_reactions = False
-                await channel.set_permissions(
-                    guild.default_role,
-                    overwrite=overwrites,
-                    reason=f"Full lockdown: {threat_data.get('type', 'threat')}",
-                )
-                channels_affected += 1
-                self.lockdown_channels_affected.add(channel.id)
-            except Exception as e:
-                self.logger.warning(f"Failed to fully lock channel {channel.name}: {e}")
+            )
+        ]
+        result = await self._apply_lockdown(
+            guild,
+            channels,
+            {"send_messages": False, "add_reactions": False},
+            reason=f"Full lockdown: {threat_data.get('type', 'threat')}",
+        )
 
         self.logger.error(
-            f"🔴 Full lockdown activated: {channels_affected} channels locked"
+            f"🔴 Full lockdown activated: {result.channels} channels locked "
+            f"in {result.elapsed:.1f}s"
         )
 
     async def _emergency_lockdown(
         self, guild: discord.Guild, threat_data: Dict[str, Any]
     ):
         """Emergency lockdown - complete server lockdown"""
-        channels_affected = 0
-
-        for channel in guild.text_channels:
-            try:
-                overwrites = channel.overwrites_for(guild.default_role)
-                overwrites.send_messages = False
-                overwrites.add_reactions = False
-                overwrites.attach_files = False
-                await channel.set_permissions(
-                    guild.default_role,
-                    overwrite=overwrites,
-                    reason=f"Emergency lockdown: {threat_data.get('type', 'critical threat')}",
-                )
-                channels_affected += 1
-                self.lockdown_channels_affected.add(channel.id)
-            except Exception as e:
-                self.logger.warning(
-                    f"Failed to emergency lock channel {channel.name}: {e}"
-                )
+        result = await self._apply_lockdown(
+            guild,
+            guild.text_channels,
+            {"send_messages": False, "add_reactions": False, "attach_files": False},
+            reason=f"Emergency lockdown: {threat_data.get('type', 'critical threat')}",
+        )
 
         self.logger.critical(
-            f"🚨 Emergency lockdown activated: {channels_affected} channels locked"
+            f"🚨 Emergency lockdown activated: {result.channels} channels locked "
+            f"in {result.elapsed:.1f}s"
         )
 
     async def _process_batch_operations(self):
@@ -532,21 +544,21 @@ class SecurityManager(commands.Cog):
             # Add more batch operation types as needed
 
     async def _batch_update_permissions(self, operations: List[Dict[str, Any]]):
-        """Batch update channel permissions"""
-        for op in operations:
-            try:
-                channel = op["channel"]
-                target = op["target"]
-                overwrite = op["overwrite"]
-                reason = op["reason"]
+        """Batch update channel permissions (concurrently, paced by the executor)"""
 
-                await channel.set_permissions(
-                    target, overwrite=overwrite, reason=reason
+        errors = await asyncio.gather(
+            *(
+                self.lockdown_executor.run(
+                    lambda op=op: op["channel"].set_permissions(
+                        op["target"], overwrite=op["overwrite"], reason=op["reason"]
+                    ),
+                    op["channel"].name,
                 )
-                await asyncio.sleep(0.1)  # Rate limit protection
-
-            except Exception as e:
-                self.logger.warning(f"Batch permission update failed: {e}")
+                for op in operations
+            )
+        )
+        for error in filter(None, errors):
+            self.logger.warning(f"Batch permission update failed: {error}")
 
     async def _batch_update_roles(self, operations: List[Dict[str, Any]]):
         """Batch update user roles"""
@@ -747,30 +759,26 @@ class SecurityManager(commands.Cog):
             if not guild_settings.get("security_enabled", True):
                 return
 
-            # Check for suspicious account patterns
-            await self.analyze_member_join_security(member)
+            # Check for suspicious account patterns and join bursts
+            await self.analyze_member_join_security(member, join_stream.observe(member))
 
         except Exception as e:
             self.logger.error(f"Error analyzing member join security for {member}: {e}")
 
-    async def analyze_member_join_security(self, member: discord.Member):
+    async def analyze_member_join_security(
+        self, member: discord.Member, signal: Optional[JoinSignal] = None
+    ):
         """Analyze new member joins for security threats"""
-        # Get user profile to start tracking
-        profile = await self.security_system.get_user_profile(
-            member.id, member.guild.id
-        )
-        profile.join_timestamp = time.time()
-
-        # Check account age
-        account_age = (datetime.now(timezone.utc) - member.created_at).total_seconds()
+        signal = signal or join_stream.observe(member)
+        burst = signal.burst
 
         suspicion_reasons = []
         trust_penalty = 0
 
         # Very new account (< 24 hours)
-        if account_age < 86400:
+        if signal.is_young:
             suspicion_reasons.append(
-                f"Account created {account_age/3600:.1f} hours ago"
+                f"Account created {signal.account_age/3600:.1f} hours ago"
             )
             trust_penalty += 20
 
@@ -796,16 +804,80 @@ class SecurityManager(commands.Cog):
                 trust_penalty += 10
                 break
 
+        # Several recent joins with near-identical names
+        if len(signal.similar_names) >= 2:
+            suspicion_reasons.append(
+                f"Name similar to {len(signal.similar_names)} recent joins"
+            )
+            trust_penalty += 10
+
         # Apply trust score penalties
         if trust_penalty > 0:
+            profile = await self.get_user_profile(member.id)
             profile.trust_score = max(0, profile.trust_score - trust_penalty)
-            # Profile is automatically saved since it's a reference to the stored object
 
-            # Notify moderators of suspicious join
-            if suspicion_reasons:
-                await self.notify_moderators_suspicious_join(
-                    member, suspicion_reasons, trust_penalty
+            # Queue for the burst's aggregated moderator alert
+            burst.suspicious.append(
+                SuspiciousJoin(member, suspicion_reasons, trust_penalty)
+            )
+            self._schedule_join_alert(member.guild, burst)
+
+        # Raid: lock down once per burst, when the join stream crosses the threshold
+        settings = self.get_guild_settings(member.guild.id)
+        threshold = settings.get("raid_detection_threshold", 5)
+        if signal.looks_like_raid(threshold) and burst.claim("lockdown"):
+            self.logger.warning(
+                f"🚨 Join raid in {member.guild.name}: {signal.joins} joins in "
+                f"{join_stream.window}s, {signal.young_accounts} new accounts"
+            )
+            self._schedule_join_alert(member.guild, burst)
+            if not self.lockdown_active:
+                await self._initiate_smart_lockdown(
+                    member.guild,
+                    {
+                        "type": ViolationType.RAID.value,
+                        "level": 4 if signal.joins >= threshold * 4 else 3,
+                        "guild_id": member.guild.id,
+                        "joins": signal.joins,
+                    },
+                )
+                burst.actions.add(f"lockdown_level_{self.lockdown_level}")
+
+    def _schedule_join_alert(self, guild: discord.Guild, burst: JoinBurst):
+        if burst.claim("alert"):
+            task = asyncio.create_task(self._send_join_alerts(guild, burst))
+            self._join_alert_tasks.add(task)
+            task.add_done_callback(self._join_alert_tasks.discard)
+
+    async def _send_join_alerts(self, guild: discord.Guild, burst: JoinBurst):
+        """Send one alert when the burst goes quiet (long bursts get follow-ups)"""
+        first = True
+        opened = time.time()
+        while True:
+            now = time.time()
+            wait = (
+                min(
+                    burst.last_join + join_stream.quiet_period,
+                    opened + JOIN_ALERT_MAX_DELAY,
                 )
+                - now
+            )
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            suspicious = burst.take_suspicious()
+            if suspicious or first:
+                try:
+                    await self.notify_moderators_suspicious_join(
+                        guild, burst, suspicious
+                    )
+                except Exception as e:
+                    self.logger.error(f"Error sending join alert: {e}")
+            if burst.is_quiet(now, join_stream.quiet_period):
+                return
+            first = False
+            opened = now
 
     async def notify_moderators_violation(
         self,
@@ -887,48 +959,76 @@ class SecurityManager(commands.Cog):
             self.logger.error(f"Error sending moderation notification: {e}")
 
     async def notify_moderators_suspicious_join(
-        self, member: discord.Member, reasons: List[str], trust_penalty: int
+        self,
+        guild: discord.Guild,
+        burst: JoinBurst,
+        suspicious: List[SuspiciousJoin],
     ):
-        """Notify moderators of suspicious account joins"""
+        """Notify moderators of a join burst's suspicious accounts in one message"""
         # Find moderation channel
         mod_channel = None
         for channel_name in ["mod-log", "security-log", "admin-log"]:
-            mod_channel = discord.utils.get(
-                member.guild.text_channels, name=channel_name
-            )
+            mod_channel = discord.utils.get(guild.text_channels, name=channel_name)
             if mod_channel:
                 break
 
         if not mod_channel:
             return
 
+        raid = "lockdown" in burst.actions
+        duration = max(burst.last_join - burst.started_at, 1)
         embed = discord.Embed(
-            title="🚨 Suspicious Account Join",
-            description=f"**Member:** {member.mention} ({member})\n**ID:** {member.id}",
-            color=0xFFA500,
+            title="🚨 Join Raid Detected" if raid else "🚨 Suspicious Account Joins",
+            description=f"**Joins:** {burst.joins} in {duration/60:.1f} minutes "
+            f"(peak {burst.peak_rate} per {join_stream.window}s)\n"
+            f"**Suspicious:** {len(suspicious)}",
+            color=0xFF0000 if raid else 0xFFA500,
             timestamp=datetime.now(timezone.utc),
         )
 
-        embed.add_field(
-            name="⚠️ Suspicion Reasons",
-            value="\n".join(f"• {reason}" for reason in reasons),
-            inline=False,
-        )
+        if suspicious:
+            lines = [
+                f"• {join.member.mention} (`{join.member.id}`) -{join.trust_penalty}: "
+                f"{', '.join(join.reasons)}"
+                for join in suspicious[:10]
+            ]
+            if len(suspicious) > 10:
+                lines.append(f"...and {len(suspicious) - 10} more")
+            embed.add_field(
+                name="⚠️ Suspicious Members", value="\n".join(lines)[:1024], inline=False
+            )
 
         embed.add_field(
-            name="📊 Trust Impact",
-            value=f"Trust Score Penalty: -{trust_penalty} points",
+            name="📅 Account Ages",
+            value="\n".join(
+                f"**{label}:** {count}"
+                for label, count in zip(AGE_LABELS, burst.age_histogram)
+                if count
+            ),
             inline=True,
         )
 
-        embed.add_field(
-            name="📅 Account Info",
-            value=f"**Created:** {member.created_at.strftime('%Y-%m-%d %H:%M UTC')}\n"
-            f"**Age:** {(datetime.now(timezone.utc) - member.created_at).days} days",
-            inline=True,
-        )
+        if len(burst.largest_group) >= 3:
+            embed.add_field(
+                name="👥 Similar Names",
+                value=", ".join(f"`{name}`" for name in burst.largest_group),
+                inline=True,
+            )
 
-        embed.set_thumbnail(url=member.display_avatar.url)
+        if raid:
+            levels = [a for a in burst.actions if a.startswith("lockdown_level_")]
+            embed.add_field(
+                name="🔒 Response",
+                value=(
+                    f"Graduated lockdown level {levels[0].rsplit('_', 1)[1]} activated"
+                    if levels
+                    else "Lockdown already active"
+                ),
+                inline=False,
+            )
+
+        if len(suspicious) == 1:
+            embed.set_thumbnail(url=suspicious[0].member.display_avatar.url)
         embed.set_footer(text="🛡️ Astra Security - Automated Threat Detection")
 
         await mod_channel.send(embed=embed)
@@ -1196,6 +1296,7 @@ class SecurityManager(commands.Cog):
             f"🔒 **Level {self.lockdown_level} ({level_name})**\n"
             f"Duration: {duration_str}\n"
             f"Channels: {len(self.lockdown_channels_affected)}\n"
+            f"Applied in: {self.lockdown_apply_seconds:.1f}s\n"
             f"Reason: {self.lockdown_reason[:20]}..."
         )
 
@@ -1782,25 +1883,13 @@ class SecurityManager(commands.Cog):
             self.lockdown_timestamp = time.time()
 
             # Lock channels (same as emergency but with different messaging)
-            locked_channels = []
-
-            for channel in guild.text_channels:
-                try:
-                    overwrites = channel.overwrites_for(guild.default_role)
-                    overwrites.send_messages = False
-                    overwrites.add_reactions = False
-                    overwrites.attach_files = False
-
-                    await channel.set_permissions(
-                        guild.default_role,
-                        overwrite=overwrites,
-                        reason=f"🔒 Manual lockdown: {reason}",
-                    )
-                    locked_channels.append(channel.id)
-                except:
-                    pass
-
-            self.lockdown_channels = locked_channels
+            result = await self._apply_lockdown(
+                guild,
+                guild.text_channels,
+                {"send_messages": False, "add_reactions": False, "attach_files": False},
+                reason=f"🔒 Manual lockdown: {reason}",
+            )
+            locked_count = result.channels + result.skipped
 
             # Send notification to general channel
             general_channel_id = 1399956514176897178
@@ -1808,12 +1897,15 @@ class SecurityManager(commands.Cog):
 
             if general_channel:
                 try:
-                    # Allow bot to send message
-                    bot_overwrites = general_channel.overwrites_for(guild.me)
-                    bot_overwrites.send_messages = True
-                    await general_channel.set_permissions(
-                        guild.me, overwrite=bot_overwrites
+                    # Allow bot to send message (reverted by unlock)
+                    await self._apply_lockdown(
+                        guild,
+                        [general_channel],
+                        {"send_messages": True},
+                        reason="Maintenance broadcast permission",
+                        target=guild.me,
                     )
+                    self.lockdown_apply_seconds = result.elapsed
 
                     # Create maintenance notification
                     maintenance_embed = discord.Embed(
@@ -1860,7 +1952,8 @@ class SecurityManager(commands.Cog):
 
             response_embed.add_field(
                 name="📊 Lockdown Status",
-                value=f"**Channels Locked:** {len(locked_channels)}\n"
+                value=f"**Channels Locked:** {locked_count}\n"
+                f"**Time to Full Lockdown:** {result.elapsed:.1f}s\n"
                 f"**Type:** Manual/Planned\n"
                 f"**Community Notified:** ✅",
                 inline=True,
@@ -1918,82 +2011,64 @@ class SecurityManager(commands.Cog):
             self.lockdown_reason = reason
             self.lockdown_timestamp = time.time()
 
-            # Track locked channels for restoration
-            locked_channels = []
-            locked_voice_channels = []
-
-            # PHASE 1: Lock ALL text channels
+            # PHASE 1 + 2: Lock ALL text and voice channels at once; every
+            # change is recorded so the unlock restores the exact previous state
             self.logger.critical(
-                f"🚨 EMERGENCY LOCKDOWN PHASE 1: Locking all text channels..."
+                f"🚨 EMERGENCY LOCKDOWN PHASE 1: Locking all text and voice channels..."
             )
-            for channel in guild.text_channels:
-                try:
-                    # Store current permissions before locking
-                    overwrites = channel.overwrites_for(guild.default_role)
-
-                    # Remove all messaging permissions
-                    overwrites.send_messages = False
-                    overwrites.add_reactions = False
-                    overwrites.attach_files = False
-                    overwrites.embed_links = False
-                    overwrites.use_external_emojis = False
-                    overwrites.mention_everyone = False
-                    overwrites.create_public_threads = False
-                    overwrites.create_private_threads = False
-                    overwrites.send_messages_in_threads = False
-
-                    await channel.set_permissions(
-                        guild.default_role,
-                        overwrite=overwrites,
-                        reason=f"🚨 EMERGENCY LOCKDOWN: {reason}",
-                    )
-                    locked_channels.append(channel.id)
-
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed to lock text channel {channel.name}: {e}"
-                    )
-
-            # PHASE 2: Lock ALL voice channels
-            self.logger.critical(
-                f"🚨 EMERGENCY LOCKDOWN PHASE 2: Locking all voice channels..."
+            lockdown_reason = f"🚨 EMERGENCY LOCKDOWN: {reason}"
+            text_result, voice_result = await asyncio.gather(
+                self._apply_lockdown(
+                    guild,
+                    guild.text_channels,
+                    {
+                        "send_messages": False,
+                        "add_reactions": False,
+                        "attach_files": False,
+                        "embed_links": False,
+                        "use_external_emojis": False,
+                        "mention_everyone": False,
+                        "create_public_threads": False,
+                        "create_private_threads": False,
+                        "send_messages_in_threads": False,
+                    },
+                    reason=lockdown_reason,
+                ),
+                self._apply_lockdown(
+                    guild,
+                    guild.voice_channels,
+                    {
+                        "connect": False,
+                        "speak": False,
+                        "stream": False,
+                        "use_voice_activation": False,
+                        "priority_speaker": False,
+                    },
+                    reason=lockdown_reason,
+                ),
             )
-            for channel in guild.voice_channels:
-                try:
-                    # Store current permissions before locking
-                    overwrites = channel.overwrites_for(guild.default_role)
-
-                    # Remove voice permissions
-                    overwrites.connect = False
-                    overwrites.speak = False
-                    overwrites.stream = False
-                    overwrites.use_voice_activation = False
-                    overwrites.priority_speaker = False
-
-                    await channel.set_permissions(
-                        guild.default_role,
-                        overwrite=overwrites,
-                        reason=f"🚨 EMERGENCY LOCKDOWN: {reason}",
-                    )
-                    locked_voice_channels.append(channel.id)
-
-                    # Disconnect all users from voice channel
-                    for member in channel.members:
-                        try:
-                            await member.move_to(
-                                None,
-                                reason="Emergency lockdown - voice channels secured",
-                            )
-                        except:
-                            pass
+            lockdown_seconds = max(text_result.elapsed, voice_result.elapsed)
+            self.lockdown_apply_seconds = lockdown_seconds
+            locked_text = text_result.channels + text_result.skipped
+            locked_voice = voice_result.channels + voice_result.skipped
 
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed to lock voice channel {channel.name}: {e}"
+            # Disconnect all users from voice channels
+            self.logger.critical(
+                f"🚨 EMERGENCY LOCKDOWN PHASE 2: Disconnecting voice members..."
+            )
+            await asyncio.gather(
+                *(
+                    self.lockdown_executor.run(
+                        lambda member=member: member.move_to(
+                            None,
+                            reason="Emergency lockdown - voice channels secured",
+                        ),
+                        str(member),
                     )
-
-            # Store locked channels for restoration
-            self.lockdown_channels = locked_channels + locked_voice_channels
+                    for channel in guild.voice_channels
+                    for member in channel.members
+                )
+            )
 
             # PHASE 3: Send emergency broadcast to general channel
             self.logger.critical(
@@ -2007,14 +2082,14 @@ class SecurityManager(commands.Cog):
             if general_channel:
                 try:
                     # Temporarily allow bot to send in general channel
-                    bot_overwrites = general_channel.overwrites_for(guild.me)
-                    bot_overwrites.send_messages = True
-                    bot_overwrites.mention_everyone = True
-                    await general_channel.set_permissions(
-                        guild.me,
-                        overwrite=bot_overwrites,
+                    await self._apply_lockdown(
+                        guild,
+                        [general_channel],
+                        {"send_messages": True, "mention_everyone": True},
                         reason="Emergency broadcast permission",
+                        target=guild.me,
                     )
+                    self.lockdown_apply_seconds = lockdown_seconds
 
                     # Create emergency broadcast embed
                     emergency_embed = discord.Embed(
@@ -2075,9 +2150,10 @@ class SecurityManager(commands.Cog):
 
             response_embed.add_field(
                 name="🔒 Lockdown Statistics",
-                value=f"**Text Channels Locked:** {len(locked_channels)}\n"
-                f"**Voice Channels Secured:** {len(locked_voice_channels)}\n"
-                f"**Total Channels Affected:** {len(locked_channels) + len(locked_voice_channels)}\n"
+                value=f"**Text Channels Locked:** {locked_text}\n"
+                f"**Voice Channels Secured:** {locked_voice}\n"
+                f"**Total Channels Affected:** {locked_text + locked_voice}\n"
+                f"**Time to Full Lockdown:** {lockdown_seconds:.1f}s\n"
                 f"**Emergency Broadcast:** {'✅ Sent' if general_channel else '❌ Failed'}",
                 inline=True,
             )
@@ -2104,8 +2180,9 @@ class SecurityManager(commands.Cog):
             self.logger.critical(
                 f"🚨 COMPLETE SERVER EMERGENCY LOCKDOWN activated by {interaction.user} ({interaction.user.id})\n"
                 f"   Reason: {reason}\n"
-                f"   Text channels locked: {len(locked_channels)}\n"
-                f"   Voice channels secured: {len(locked_voice_channels)}\n"
+                f"   Text channels locked: {locked_text}\n"
+                f"   Voice channels secured: {locked_voice}\n"
+                f"   Time to full lockdown: {lockdown_seconds:.1f}s\n"
                 f"   Emergency broadcast: {'Success' if general_channel else 'Failed'}"
             )
 
@@ -2132,7 +2209,11 @@ class SecurityManager(commands.Cog):
             return
 
         try:
-            if not self.lockdown_active:
+            # A record left behind by a partly failed unlock can be retried
+            if (
+                not self.lockdown_active
+                and interaction.guild_id not in self.lockdown_records
+            ):
                 await interaction.response.send_message(
                     "ℹ️ No emergency lockdown is currently active.", ephemeral=True
                 )
@@ -2157,51 +2238,23 @@ class SecurityManager(commands.Cog):
                 f"🔓 EMERGENCY UNLOCK PHASE 1: Restoring channel permissions..."
             )
 
-            restored_text = 0
-            restored_voice = 0
-
-            # Get all locked channels
-            locked_channels = getattr(self, "lockdown_channels", [])
-
-            for channel_id in locked_channels:
-                channel = guild.get_channel(channel_id)
-                if channel:
-                    try:
-                        # Reset permissions to default (None = inherit from category/server)
-                        overwrites = channel.overwrites_for(guild.default_role)
-
-                        if isinstance(channel, discord.TextChannel):
-                            # Restore text channel permissions
-                            overwrites.send_messages = None
-                            overwrites.add_reactions = None
-                            overwrites.attach_files = None
-                            overwrites.embed_links = None
-                            overwrites.use_external_emojis = None
-                            overwrites.mention_everyone = None
-                            overwrites.create_public_threads = None
-                            overwrites.create_private_threads = None
-                            overwrites.send_messages_in_threads = None
-                            restored_text += 1
-
-                        elif isinstance(channel, discord.VoiceChannel):
-                            # Restore voice channel permissions
-                            overwrites.connect = None
-                            overwrites.speak = None
-                            overwrites.stream = None
-                            overwrites.use_voice_activation = None
-                            overwrites.priority_speaker = None
-                            restored_voice += 1
-
-                        await channel.set_permissions(
-                            guild.default_role,
-                            overwrite=overwrites,
-                            reason=f"🔓 Emergency lockdown lifted - server restored",
-                        )
-
-                    except Exception as e:
-                        self.logger.error(
-                            f"Failed to restore channel {channel.name}: {e}"
-                        )
+            # Revert exactly what the lockdown changed; keys it did not touch and
+            # overwrites that already existed before it are left as they were
+            record = self.lockdown_records.get(guild.id)
+            restored_text = restored_voice = 0
+            if record is not None:
+                result = await self.lockdown_executor.unlock(
+                    guild, record, "🔓 Emergency lockdown lifted - server restored"
+                )
+                restored_text = result.count(discord.TextChannel)
+                restored_voice = result.count(discord.VoiceChannel)
+                if len(record):
+                    self.logger.error(
+                        f"⚠️ {len(record)} overwrite(s) could not be restored; "
+                        f"run /emergency_unlock again to retry"
+                    )
+                else:
+                    del self.lockdown_records[guild.id]
 
             # PHASE 2: Send "all clear" broadcast to general channel
             self.logger.info(
@@ -2265,7 +2318,8 @@ class SecurityManager(commands.Cog):
             self.lockdown_active = False
             self.lockdown_reason = ""
             self.lockdown_timestamp = 0
-            self.lockdown_channels = []
+            self.lockdown_level = 0
+            self.lockdown_channels_affected = set()
 
             # PHASE 4: Create admin response embed
             response_embed = discord.Embed(
@@ -12,7 +12,7 @@ import logging
 import sqlite3
 import json
 import time
-from typing import Dict, Optional, List, Any
+from typing import Dict, Iterable, Optional, List, Any, Sequence, Set, Tuple
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -20,8 +20,13 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 
+from utils.storage_engine import get_storage
+
 logger = logging.getLogger("astra.welcome_dm_system")
 
+# Bulk runs commit delivery rows and progress together every N users
+BULK_CHECKPOINT_EVERY = 20
+
 
 class WelcomeDMSystem(commands.Cog):
     """
@@ -53,8 +58,13 @@ class WelcomeDMSystem(commands.Cog):
         self.enabled = True
         self.bulk_operation_running = False
 
+        # Users with a welcome_dms row, so duplicate checks never hit disk
+        self.welcomed_users: Set[int] = set()
+        self.opted_out_users: Set[int] = set()
+
         # Initialize database
         self._init_database()
+        self.storage = get_storage(self.db_path)
 
         # Import AI client
         try:
@@ -93,7 +103,6 @@ class WelcomeDMSystem(commands.Cog):
                 CREATE TABLE IF NOT EXISTS welcome_dms (
                     user_id INTEGER PRIMARY KEY,
                     first_dm_sent_at TEXT,
-                    servers_welcomed TEXT DEFAULT '[]',
                     total_servers INTEGER DEFAULT 0,
                     last_dm_timestamp TEXT,
                     opt_out INTEGER DEFAULT 0,
@@ -104,6 +113,26 @@ class WelcomeDMSystem(commands.Cog):
                 """
             )
 
+            # One row per (user, guild) welcome; the primary key covers lookups
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS welcome_dm_deliveries (
+                    user_id INTEGER NOT NULL,
+                    guild_id INTEGER NOT NULL,
+                    sent_at TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    PRIMARY KEY (user_id, guild_id)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_welcome_dm_deliveries_status
+                ON welcome_dm_deliveries (status, user_id)
+                """
+            )
+            self._migrate_servers_welcomed(conn)
+
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS bulk_operation_log (
@@ -119,9 +148,49 @@ class WelcomeDMSystem(commands.Cog):
                 """
             )
 
+            # Nothing is running yet, so a "running" operation was cut short
+            conn.execute(
+                "UPDATE bulk_operation_log SET status = 'interrupted' "
+                "WHERE status = 'running'"
+            )
+
             conn.commit()
 
-        logger.info("✅ Welcome DM database initialized")
+            for user_id, opt_out in conn.execute(
+                "SELECT user_id, opt_out FROM welcome_dms"
+            ):
+                self.welcomed_users.add(user_id)
+                if opt_out == 1:
+                    self.opted_out_users.add(user_id)
+
+        logger.info(
+            f"✅ Welcome DM database initialized "
+            f"({len(self.welcomed_users):,} users already welcomed)"
+        )
+
+    def _migrate_servers_welcomed(self, conn: sqlite3.Connection):
+        """Move guild ids from the old servers_welcomed JSON column into rows"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(welcome_dms)")}
+        if "servers_welcomed" not in columns:
+            return
+
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO welcome_dm_deliveries (user_id, guild_id, sent_at, status)
+            SELECT w.user_id,
+                   CAST(g.value AS INTEGER),
+                   COALESCE(w.last_dm_timestamp, w.first_dm_sent_at, ''),
+                   COALESCE(w.delivery_status, 'delivered')
+            FROM welcome_dms AS w, json_each(w.servers_welcomed) AS g
+            WHERE w.servers_welcomed NOT IN ('', '[]')
+            """
+        )
+        if cursor.rowcount:
+            logger.info(f"📦 Migrated {cursor.rowcount} welcome DM deliveries")
+        conn.execute(
+            "UPDATE welcome_dms SET servers_welcomed = '[]' "
+            "WHERE servers_welcomed NOT IN ('', '[]')"
+        )
 
     async def _get_ai_client(self):
         """Lazy load AI client"""
@@ -149,91 +218,33 @@ class WelcomeDMSystem(commands.Cog):
 
     def _has_received_dm(self, user_id: int) -> bool:
         """Check if user has already received a welcome DM"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT user_id, opt_out FROM welcome_dms WHERE user_id = ?",
-                (user_id,),
-            )
-            result = cursor.fetchone()
-
-            if result:
-                # Check if user opted out
-                if result[1] == 1:
-                    logger.info(f"User {user_id} has opted out of welcome DMs")
-                    return True
-                logger.info(f"User {user_id} already received welcome DM")
-                self.stats["duplicate_prevented"] += 1
-                return True
-
-            return False
-
-    def _log_dm_sent(
+        if user_id in self.opted_out_users:
+            logger.info(f"User {user_id} has opted out of welcome DMs")
+            return True
+        if user_id in self.welcomed_users:
+            logger.info(f"User {user_id} already received welcome DM")
+            self.stats["duplicate_prevented"] += 1
+            return True
+        return False
+
+    async def _log_dm_sent(
         self,
         user_id: int,
         guild_id: int,
         success: bool,
         status: str,
         message_preview: str = "",
+        log_buffer: Optional[List[Tuple]] = None,
     ):
-        """Log DM delivery to database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT servers_welcomed, total_servers FROM welcome_dms WHERE user_id = ?",
-                (user_id,),
+        """Log DM delivery to database (or to ``log_buffer`` for a bulk checkpoint)"""
+        self.welcomed_users.add(user_id)
+        row = (user_id, guild_id, status, message_preview)
+        if log_buffer is not None:
+            log_buffer.append(row)
+        else:
+            await self.storage.transaction(
+                lambda conn: self._write_dm_logs(conn, [row])
             )
-            result = cursor.fetchone()
-
-            if result:
-                # Update existing record
-                servers = json.loads(result[0])
-                servers.append(guild_id)
-                total = result[1] + 1
-
-                conn.execute(
-                    """
-                    UPDATE welcome_dms
-                    SET servers_welcomed = ?,
-                        total_servers = ?,
-                        last_dm_timestamp = ?,
-                        delivery_status = ?,
-                        message_preview = ?
-                    WHERE user_id = ?
-                    """,
-                    (
-                        json.dumps(servers),
-                        total,
-                        datetime.now(timezone.utc).isoformat(),
-                        status,
-                        message_preview[:200],
-                        user_id,
-                    ),
-                )
-            else:
-                # Insert new record
-                conn.execute(
-                    """
-                    INSERT INTO welcome_dms (
-                        user_id,
-                        first_dm_sent_at,
-                        servers_welcomed,
-                        total_servers,
-                        last_dm_timestamp,
-                        delivery_status,
-                        message_preview
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        user_id,
-                        datetime.now(timezone.utc).isoformat(),
-                        json.dumps([guild_id]),
-                        1,
-                        datetime.now(timezone.utc).isoformat(),
-                        status,
-                        message_preview[:200],
-                    ),
-                )
-
-            conn.commit()
 
         # Update statistics
         if success:
@@ -241,6 +252,49 @@ class WelcomeDMSystem(commands.Cog):
         else:
             self.stats["failed"] += 1
 
+    def _write_dm_logs(self, conn: sqlite3.Connection, rows: Sequence[Tuple]):
+        """Record (user_id, guild_id, status, preview) deliveries on an open connection.
+
+        ``total_servers`` only grows when a (user, guild) delivery is new, so
+        re-sending to the same guild does not count it twice.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        for user_id, guild_id, status, preview in rows:
+            new_server = conn.execute(
+                """
+                INSERT OR IGNORE INTO welcome_dm_deliveries (
+                    user_id, guild_id, sent_at, status
+                ) VALUES (?, ?, ?, ?)
+                """,
+                (user_id, guild_id, now, status),
+            ).rowcount
+            if not new_server:
+                conn.execute(
+                    """
+                    UPDATE welcome_dm_deliveries SET sent_at = ?, status = ?
+                    WHERE user_id = ? AND guild_id = ?
+                    """,
+                    (now, status, user_id, guild_id),
+                )
+            conn.execute(
+                """
+                INSERT INTO welcome_dms (
+                    user_id,
+                    first_dm_sent_at,
+                    total_servers,
+                    last_dm_timestamp,
+                    delivery_status,
+                    message_preview
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    total_servers = total_servers + excluded.total_servers,
+                    last_dm_timestamp = excluded.last_dm_timestamp,
+                    delivery_status = excluded.delivery_status,
+                    message_preview = excluded.message_preview
+                """,
+                (user_id, now, new_server, now, status, preview[:200]),
+            )
+
     async def generate_welcome_message(
         self, user: discord.User, guild: discord.Guild, context: Dict[str, Any]
     ) -> str:
@@ -385,16 +439,24 @@ Generate ONLY the message text, no explanations or notes."""
         return message
 
     async def send_welcome_dm(
-        self, user: discord.User, guild: discord.Guild
+        self,
+        user: discord.User,
+        guild: discord.Guild,
+        log_buffer: Optional[List[Tuple]] = None,
     ) -> Dict[str, Any]:
         """
         Send welcome DM to a user
 
+        Args:
+            log_buffer: Bulk runs pass a list here. They filter out welcomed
+                users up front, so the duplicate check is skipped and the
+                delivery row is buffered for the next checkpoint.
+
         Returns:
             Dictionary with status and details
         """
         # Check if already sent
-        if self._has_received_dm(user.id):
+        if log_buffer is None and self._has_received_dm(user.id):
             return {
                 "success": False,
                 "status": "duplicate",
@@ -413,12 +475,7 @@ Generate ONLY the message text, no explanations or notes."""
         account_age = (datetime.now(timezone.utc) - user.created_at).days
 
         # Check if user has been welcomed before
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT total_servers FROM welcome_dms WHERE user_id = ?", (user.id,)
-            )
-            result = cursor.fetchone()
-            is_returning = result is not None and result[0] > 0
+        is_returning = user.id in self.welcomed_users
 
         context = {
             "account_age_days": account_age,
@@ -453,8 +510,13 @@ Generate ONLY the message text, no explanations or notes."""
             await user.send(embed=embed)
 
             # Log success
-            self._log_dm_sent(
-                user.id, guild.id, True, "delivered", message_content[:200]
+            await self._log_dm_sent(
+                user.id,
+                guild.id,
+                True,
+                "delivered",
+                message_content[:200],
+                log_buffer=log_buffer,
             )
 
             logger.info(f"✅ Welcome DM sent to {user.name} ({user.id})")
@@ -468,7 +530,9 @@ Generate ONLY the message text, no explanations or notes."""
 
         except discord.Forbidden:
             # User has DMs disabled
-            self._log_dm_sent(user.id, guild.id, False, "dms_disabled")
+            await self._log_dm_sent(
+                user.id, guild.id, False, "dms_disabled", log_buffer=log_buffer
+            )
             self.stats["dms_disabled"] += 1
             logger.warning(f"⚠️ Cannot send DM to {user.name} - DMs disabled")
 
@@ -480,7 +544,9 @@ Generate ONLY the message text, no explanations or notes."""
 
         except discord.HTTPException as e:
             # Other Discord API error
-            self._log_dm_sent(user.id, guild.id, False, f"error: {str(e)}")
+            await self._log_dm_sent(
+                user.id, guild.id, False, f"error: {str(e)}", log_buffer=log_buffer
+            )
             logger.error(f"❌ Discord API error sending DM to {user.name}: {e}")
 
             return {
@@ -491,7 +557,9 @@ Generate ONLY the message text, no explanations or notes."""
 
         except Exception as e:
             # Unexpected error
-            self._log_dm_sent(user.id, guild.id, False, f"error: {str(e)}")
+            await self._log_dm_sent(
+                user.id, guild.id, False, f"error: {str(e)}", log_buffer=log_buffer
+            )
             logger.error(f"❌ Unexpected error sending welcome DM to {user.name}: {e}")
 
             return {
@@ -618,22 +686,17 @@ Generate ONLY the message text, no explanations or notes."""
             return
 
         # Get database stats
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM welcome_dms")
-            total_users = cursor.fetchone()[0]
-
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM welcome_dms WHERE delivery_status = 'delivered'"
-            )
-            successful = cursor.fetchone()[0]
-
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM welcome_dms WHERE delivery_status = 'dms_disabled'"
-            )
-            dms_disabled = cursor.fetchone()[0]
-
-            cursor = conn.execute("SELECT COUNT(*) FROM welcome_dms WHERE opt_out = 1")
-            opted_out = cursor.fetchone()[0]
+        total_users, successful, dms_disabled, opted_out = await self.storage.fetch_one(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM welcome_dms),
+                (SELECT COUNT(DISTINCT user_id) FROM welcome_dm_deliveries
+                 WHERE status = 'delivered'),
+                (SELECT COUNT(DISTINCT user_id) FROM welcome_dm_deliveries
+                 WHERE status = 'dms_disabled'),
+                (SELECT COUNT(*) FROM welcome_dms WHERE opt_out = 1)
+            """
+        )
 
         # Calculate success rate
         success_rate = (successful / total_users * 100) if total_users > 0 else 0
@@ -746,9 +809,101 @@ Generate ONLY the message text, no explanations or notes."""
     # BULK DM OPERATION
     # ============================================================================
 
+    def _build_membership_index(
+        self,
+    ) -> Tuple[Dict[int, List[discord.Guild]], Dict[int, int]]:
+        """
+        One pass over every member cache
+
+        Returns:
+            (user id -> guilds shared with the bot, guild id -> human members)
+        """
+        user_guilds: Dict[int, List[discord.Guild]] = {}
+        human_counts: Dict[int, int] = {}
+        for guild in self.bot.guilds:
+            humans = 0
+            for member in guild.members:
+                if member.bot:
+                    continue
+                humans += 1
+                user_guilds.setdefault(member.id, []).append(guild)
+            human_counts[guild.id] = humans
+        return user_guilds, human_counts
+
+    def _already_welcomed(self, user_ids: Iterable[int]) -> Set[int]:
+        """Users with a welcome_dms row (welcomed or opted out)"""
+        return self.welcomed_users.intersection(user_ids)
+
+    async def _latest_unfinished_operation(self) -> Optional[Dict[str, Any]]:
+        """Most recent bulk operation that was interrupted before completing"""
+        result = await self.storage.fetch_one(
+            """
+            SELECT operation_id, total_users, successful, failed, metadata
+            FROM bulk_operation_log
+            WHERE status = 'interrupted'
+            ORDER BY started_at DESC
+            LIMIT 1
+            """
+        )
+
+        if not result:
+            return None
+        metadata = json.loads(result[4] or "{}")
+        return {
+            "operation_id": result[0],
+            "total_users": result[1] or 0,
+            "successful": result[2] or 0,
+            "failed": result[3] or 0,
+            "processed": metadata.get("processed", 0),
+            "dms_disabled": metadata.get("dms_disabled", 0),
+            "is_test": metadata.get("is_test", False),
+        }
+
+    async def _checkpoint_bulk_operation(
+        self,
+        operation_id: str,
+        log_buffer: List[Tuple],
+        progress: Dict[str, Any],
+        status: str = "running",
+    ):
+        """Write buffered deliveries and the operation's progress in one transaction"""
+        rows = list(log_buffer)
+        params = (
+            progress["successful"],
+            progress["failed"],
+            status,
+            datetime.now(timezone.utc).isoformat() if status == "completed" else None,
+            json.dumps(
+                {
+                    "processed": progress["processed"],
+                    "dms_disabled": progress["dms_disabled"],
+                    "is_test": progress["is_test"],
+                }
+            ),
+            operation_id,
+        )
+
+        def checkpoint(conn: sqlite3.Connection):
+            self._write_dm_logs(conn, rows)
+            conn.execute(
+                """
+                UPDATE bulk_operation_log
+                SET successful = ?,
+                    failed = ?,
+                    status = ?,
+                    completed_at = ?,
+                    metadata = ?
+                WHERE operation_id = ?
+                """,
+                params,
+            )
+
+        await self.storage.transaction(checkpoint)
+        del log_buffer[: len(rows)]
+
     @app_commands.command(name="welcome_dm_bulk")
     @app_commands.describe(
-        mode="Choose operation mode: preview, test_sample, or full_send",
+        mode="Choose operation mode: preview, test_sample, full_send, or resume",
         sample_size="For test_sample mode: number of users to test (default: 10)",
     )
     async def bulk_welcome_dms(
@@ -764,6 +919,7 @@ Generate ONLY the message text, no explanations or notes."""
         - preview: See statistics without sending
         - test_sample: Send to a small sample for testing
         - full_send: Send to all eligible users (requires confirmation)
+        - resume: Continue the last interrupted operation
         """
         # Check if user is bot owner
         logger.info(
@@ -792,35 +948,24 @@ Generate ONLY the message text, no explanations or notes."""
             return
 
         # Gather all users across all guilds
-        all_users = set()
-        guild_stats = []
-
-        for guild in self.bot.guilds:
-            guild_members = [m for m in guild.members if not m.bot]
-            all_users.update([m.id for m in guild_members])
-            guild_stats.append(
-                {
-                    "name": guild.name,
-                    "total_members": guild.member_count,
-                    "non_bot_members": len(guild_members),
-                }
-            )
+        user_guilds, human_counts = self._build_membership_index()
+        all_users = user_guilds.keys()
+        guild_stats = [
+            {
+                "name": guild.name,
+                "total_members": guild.member_count,
+                "non_bot_members": human_counts[guild.id],
+            }
+            for guild in self.bot.guilds
+        ]
 
-        # Filter out users who already received DMs
+        # Filter out users who already received DMs or opted out
+        welcomed = self._already_welcomed(all_users)
         eligible_users = []
-        with sqlite3.connect(self.db_path) as conn:
-            for user_id in all_users:
-                cursor = conn.execute(
-                    "SELECT user_id, opt_out FROM welcome_dms WHERE user_id = ?",
-                    (user_id,),
-                )
-                result = cursor.fetchone()
-
-                # User is eligible if they haven't received a DM and haven't opted out
-                if not result or result[1] == 0:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        eligible_users.append(user)
+        for user_id in sorted(all_users - welcomed):
+            user = self.bot.get_user(user_id)
+            if user:
+                eligible_users.append(user)
 
         # Create statistics embed
         stats_embed = discord.Embed(
@@ -909,6 +1054,7 @@ Generate ONLY the message text, no explanations or notes."""
                     interaction.user,
                     test_users,
                     f"test_sample_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}",
+                    user_guilds,
                     is_test=True,
                 )
             )
@@ -981,6 +1127,7 @@ Generate ONLY the message text, no explanations or notes."""
                         interaction.user,
                         eligible_users,
                         f"bulk_full_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}",
+                        user_guilds,
                         is_test=False,
                     )
                 )
@@ -991,55 +1138,133 @@ Generate ONLY the message text, no explanations or notes."""
                     delete_after=10,
                 )
 
+        # RESUME MODE
+        elif mode == "resume":
+            resumed = await self._latest_unfinished_operation()
+            if resumed is None:
+                await interaction.followup.send(
+                    "✅ No interrupted bulk operation to resume.", ephemeral=True
+                )
+                return
+
+            # Users handled before the interruption now have welcome_dms rows
+            remaining = eligible_users
+            if resumed["is_test"]:
+                remaining = remaining[
+                    : max(0, resumed["total_users"] - resumed["processed"])
+                ]
+
+            await interaction.followup.send(
+                f"🔁 Resuming `{resumed['operation_id']}`: {resumed['processed']:,} "
+                f"already processed, {len(remaining):,} remaining.",
+                ephemeral=True,
+            )
+
+            asyncio.create_task(
+                self._run_bulk_operation(
+                    interaction.user,
+                    remaining,
+                    resumed["operation_id"],
+                    user_guilds,
+                    is_test=resumed["is_test"],
+                    resumed=resumed,
+                )
+            )
+
         else:
             await interaction.followup.send(
-                f"❌ Invalid mode: `{mode}`. Use: preview, test_sample, or full_send",
+                f"❌ Invalid mode: `{mode}`. Use: preview, test_sample, full_send, or resume",
                 ephemeral=True,
             )
 
-    async def _run_bulk_operation(
+    async def _run_bulk_operation(self, *args, **kwargs):
+        """Run a bulk DM operation; see _execute_bulk_operation for the arguments"""
+        self.bulk_operation_running = True
+        try:
+            await self._execute_bulk_operation(*args, **kwargs)
+        finally:
+            # Any failure must not leave later bulk runs locked out
+            self.bulk_operation_running = False
+
+    async def _execute_bulk_operation(
         self,
         initiator: discord.User,
         users: List[discord.User],
         operation_id: str,
+        user_guilds: Dict[int, List[discord.Guild]],
         is_test: bool = False,
+        resumed: Optional[Dict[str, Any]] = None,
     ):
         """
         Execute bulk DM operation with progress tracking
 
+        Deliveries are buffered and written together with the operation's
+        progress every BULK_CHECKPOINT_EVERY users, so an interrupted run
+        can be resumed where its last checkpoint left off.
+
         Args:
             initiator: User who started the operation
             users: List of users to send DMs to
             operation_id: Unique identifier for this operation
+            user_guilds: Membership index from _build_membership_index
             is_test: Whether this is a test operation
+            resumed: Progress of the interrupted operation being continued
         """
-        self.bulk_operation_running = True
         start_time = time.time()
 
+        progress = {
+            "processed": 0,
+            "successful": 0,
+            "failed": 0,
+            "dms_disabled": 0,
+            "is_test": is_test,
+        }
+        if resumed is not None:
+            for key in ("processed", "successful", "failed", "dms_disabled"):
+                progress[key] = resumed[key]
+        already_processed = progress["processed"]
+        total_users = already_processed + len(users)
+
         # Log operation start
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
+        if resumed is None:
+            await self.storage.execute(
                 """
                 INSERT INTO bulk_operation_log (
-                    operation_id, started_at, total_users, status
-                ) VALUES (?, ?, ?, ?)
+                    operation_id, started_at, total_users, status, metadata
+                ) VALUES (?, ?, ?, ?, ?)
                 """,
                 (
                     operation_id,
                     datetime.now(timezone.utc).isoformat(),
-                    len(users),
+                    total_users,
                     "running",
+                    json.dumps({"processed": 0, "is_test": is_test}),
                 ),
             )
-            conn.commit()
+        else:
+            await self.storage.execute(
+                """
+                UPDATE bulk_operation_log
+                SET total_users = ?, status = 'running'
+                WHERE operation_id = ?
+                """,
+                (total_users, operation_id),
+            )
 
-        logger.info(f"🚀 Starting bulk operation {operation_id} - {len(users)} users")
+        logger.info(
+            f"🚀 {'Resuming' if resumed else 'Starting'} bulk operation "
+            f"{operation_id} - {len(users)} users"
+        )
 
         # Send initial progress message to initiator
         try:
             progress_embed = discord.Embed(
-                title="📤 Bulk Welcome DM Operation Started",
-                description=f"**Operation ID:** `{operation_id}`\n**Target Users:** {len(users):,}\n**Mode:** {'Test Sample' if is_test else 'Full Send'}",
+                title=(
+                    "🔁 Bulk Welcome DM Operation Resumed"
+                    if resumed
+                    else "📤 Bulk Welcome DM Operation Started"
+                ),
+                description=f"**Operation ID:** `{operation_id}`\n**Target Users:** {total_users:,}\n**Mode:** {'Test Sample' if is_test else 'Full Send'}",
                 color=0x00FFD4,
                 timestamp=datetime.now(timezone.utc),
             )
@@ -1048,44 +1273,54 @@ Generate ONLY the message text, no explanations or notes."""
             pass
 
         # Process users
-        successful = 0
-        failed = 0
-        dms_disabled = 0
+        log_buffer: List[Tuple] = []
 
-        for idx, user in enumerate(users, 1):
-            try:
-                # Get random guild where this user is a member for context
-                user_guild = None
-                for guild in self.bot.guilds:
-                    if guild.get_member(user.id):
-                        user_guild = guild
-                        break
-
-                # Send DM
-                result = await self.send_welcome_dm(user, user_guild)
-
-                if result["success"]:
-                    successful += 1
-                elif result["status"] == "dms_disabled":
-                    dms_disabled += 1
-                    failed += 1
-                else:
-                    failed += 1
+        try:
+            for user in users:
+                try:
+                    # First shared guild gives the message its context
+                    guilds = user_guilds.get(user.id)
+                    user_guild = guilds[0] if guilds else None
+
+                    # Send DM
+                    result = await self.send_welcome_dm(
+                        user, user_guild, log_buffer=log_buffer
+                    )
+
+                    if result["success"]:
+                        progress["successful"] += 1
+                    elif result["status"] == "dms_disabled":
+                        progress["dms_disabled"] += 1
+                        progress["failed"] += 1
+                    else:
+                        progress["failed"] += 1
+
+                except Exception as e:
+                    logger.error(f"Error in bulk operation for user {user.id}: {e}")
+                    progress["failed"] += 1
+
+                progress["processed"] += 1
+                idx = progress["processed"]
+
+                if idx % BULK_CHECKPOINT_EVERY == 0:
+                    await self._checkpoint_bulk_operation(
+                        operation_id, log_buffer, progress
+                    )
 
                 # Send progress update every 100 users
                 if idx % 100 == 0:
-                    progress = (idx / len(users)) * 100
+                    percent = (idx / total_users) * 100
                     elapsed = time.time() - start_time
-                    avg_time_per_dm = elapsed / idx
-                    remaining = (len(users) - idx) * avg_time_per_dm
+                    avg_time_per_dm = elapsed / (idx - already_processed)
+                    remaining = (total_users - idx) * avg_time_per_dm
 
                     try:
                         progress_msg = (
                             f"📊 **Progress Update**\n"
-                            f"Processed: {idx:,}/{len(users):,} ({progress:.1f}%)\n"
-                            f"✅ Successful: {successful:,}\n"
-                            f"❌ Failed: {failed:,}\n"
-                            f"🚫 DMs Disabled: {dms_disabled:,}\n"
+                            f"Processed: {idx:,}/{total_users:,} ({percent:.1f}%)\n"
+                            f"✅ Successful: {progress['successful']:,}\n"
+                            f"❌ Failed: {progress['failed']:,}\n"
+                            f"🚫 DMs Disabled: {progress['dms_disabled']:,}\n"
                             f"⏱️ Remaining: ~{int(remaining/60)} minutes"
                         )
                         await initiator.send(progress_msg)
@@ -1095,34 +1330,24 @@ Generate ONLY the message text, no explanations or notes."""
                 # Rate limiting
                 await asyncio.sleep(1.2)
 
-            except Exception as e:
-                logger.error(f"Error in bulk operation for user {user.id}: {e}")
-                failed += 1
+        except asyncio.CancelledError:
+            # Keep what was sent so far; the run can be resumed
+            await self._checkpoint_bulk_operation(
+                operation_id, log_buffer, progress, status="interrupted"
+            )
+            raise
 
         # Operation complete
         end_time = time.time()
         duration = end_time - start_time
+        successful = progress["successful"]
+        failed = progress["failed"]
+        dms_disabled = progress["dms_disabled"]
 
         # Update database
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                UPDATE bulk_operation_log
-                SET completed_at = ?,
-                    successful = ?,
-                    failed = ?,
-                    status = ?
-                WHERE operation_id = ?
-                """,
-                (
-                    datetime.now(timezone.utc).isoformat(),
-                    successful,
-                    failed,
-                    "completed",
-                    operation_id,
-                ),
-            )
-            conn.commit()
+        await self._checkpoint_bulk_operation(
+            operation_id, log_buffer, progress, status="completed"
+        )
 
         # Send completion message
         try:
@@ -1136,7 +1361,7 @@ Generate ONLY the message text, no explanations or notes."""
             completion_embed.add_field(
                 name="📊 Results",
                 value=(
-                    f"**Total Processed:** {len(users):,}\n"
+                    f"**Total Processed:** {total_users:,}\n"
                     f"**✅ Successful:** {successful:,}\n"
                     f"**❌ Failed:** {failed:,}\n"
                     f"**🚫 DMs Disabled:** {dms_disabled:,}"
@@ -1144,7 +1369,7 @@ Generate ONLY the message text, no explanations or notes."""
                 inline=False,
             )
 
-            success_rate = (successful / len(users) * 100) if len(users) > 0 else 0
+            success_rate = (successful / total_users * 100) if total_users > 0 else 0
             completion_embed.add_field(
                 name="📈 Success Rate", value=f"**{success_rate:.1f}%**", inline=True
             )
@@ -1166,9 +1391,8 @@ Generate ONLY the message text, no explanations or notes."""
         except Exception as e:
             logger.error(f"Could not send completion message: {e}")
 
-        self.bulk_operation_running = False
         logger.info(
-            f"✅ Bulk operation {operation_id} completed - {successful}/{len(users)} successful"
+            f"✅ Bulk operation {operation_id} completed - {successful}/{total_users} successful"
         )
 
     def cog_unload(self):
@@ -0,0 +1,226 @@
+"""
+Write-Behind Configuration Store for Astra Bot
+Dirty tracking, debounced flushes, atomic writes and per-guild sharded storage
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger("astra.config_store")
+
+
+def atomic_write_json(path: Path, data: Any):
+    """Write JSON to a temp file in the same directory, then rename over the target"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehindConfigStore:
+    """Coalesces configuration changes and persists them off the caller's thread.
+
+    The core config (bot/ai/database/...) lives in the main config file and
+    each guild lives in its own shard (``<guild_dir>/<guild_id>.json``), so a
+    guild change only rewrites that guild's file. Changes are marked dirty and
+    flushed together after ``flush_delay`` seconds on a background timer.
+
+    Callers must hold ``lock`` while mutating the data the snapshot callbacks
+    read, so a flush never serializes a half-applied change.
+    """
+
+    def __init__(
+        self,
+        config_file: Path,
+        guild_dir: Path,
+        core_snapshot: Callable[[], Dict[str, Any]],
+        guild_snapshot: Callable[[int], Optional[Dict[str, Any]]],
+        flush_delay: float = 2.0,
+    ):
+        self.config_file = Path(config_file)
+        self.guild_dir = Path(guild_dir)
+        self.flush_delay = flush_delay
+        self._core_snapshot = core_snapshot
+        self._guild_snapshot = guild_snapshot
+
+        self.lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._dirty_guilds: Set[int] = set()
+        self._core_dirty = False
+        self._timer: Optional[threading.Timer] = None
+
+        self.stats = {
+            "changes": 0,
+            "flushes": 0,
+            "core_writes": 0,
+            "guild_writes": 0,
+            "write_errors": 0,
+            "last_flush_ms": 0.0,
+        }
+
+        # Never lose pending changes on interpreter shutdown
+        atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Dirty tracking
+    # ------------------------------------------------------------------
+
+    def mark_guild_dirty(self, guild_id: int):
+        """Schedule a write of one guild's shard"""
+        with self.lock:
+            self._dirty_guilds.add(int(guild_id))
+            self.stats["changes"] += 1
+            self._schedule_flush()
+
+    def mark_core_dirty(self):
+        """Schedule a write of the main config file"""
+        with self.lock:
+            self._core_dirty = True
+            self.stats["changes"] += 1
+            self._schedule_flush()
+
+    @property
+    def pending(self) -> int:
+        """Number of files waiting to be written"""
+        with self.lock:
+            return len(self._dirty_guilds) + (1 if self._core_dirty else 0)
+
+    def _schedule_flush(self):
+        # Debounce: the first change arms the timer, later ones ride along
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self):
+        """Write every dirty file now (safe to call from any thread)"""
+        with self._flush_lock:
+            start = time.perf_counter()
+
+            # Snapshot under the data lock, write outside it
+            with self.lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+                dirty_guilds, self._dirty_guilds = self._dirty_guilds, set()
+                core_dirty, self._core_dirty = self._core_dirty, False
+
+                core_payload = (
+                    json.dumps(self._core_snapshot(), indent=2) if core_dirty else None
+                )
+                guild_payloads = {}
+                for guild_id in dirty_guilds:
+                    snapshot = self._guild_snapshot(guild_id)
+                    guild_payloads[guild_id] = (
+                        json.dumps(snapshot, indent=2) if snapshot is not None else None
+                    )
+
+            if core_payload is None and not guild_payloads:
+                return
+
+            # Shards go first: migrating inline guilds drops them from the core
+            # file, so it is only rewritten once every shard is safely on disk
+            shards_ok = True
+            for guild_id, payload in guild_payloads.items():
+                shard_path = self._shard_path(guild_id)
+                try:
+                    if payload is None:
+                        # Guild config was removed
+                        if shard_path.exists():
+                            shard_path.unlink()
+                    else:
+                        atomic_write_json(shard_path, payload)
+                        if shard_path.read_text() != payload:
+                            raise IOError(f"{shard_path} did not read back intact")
+                    self.stats["guild_writes"] += 1
+                except Exception as e:
+                    shards_ok = False
+                    self.stats["write_errors"] += 1
+                    logger.error(f"Error saving guild config {guild_id}: {e}")
+                    self.mark_guild_dirty(guild_id)
+
+            if core_payload is not None:
+                if not shards_ok:
+                    logger.warning(
+                        "Guild shards not saved, keeping the previous config"
+                    )
+                    self.mark_core_dirty()
+                else:
+                    try:
+                        atomic_write_json(self.config_file, core_payload)
+                        self.stats["core_writes"] += 1
+                    except Exception as e:
+                        self.stats["write_errors"] += 1
+                        logger.error(f"Error saving config: {e}")
+                        self.mark_core_dirty()
+
+            self.stats["flushes"] += 1
+            self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+            logger.debug(
+                f"Configuration flushed: core={core_payload is not None}, "
+                f"guilds={len(guild_payloads)} ({self.stats['last_flush_ms']:.1f}ms)"
+            )
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _shard_path(self, guild_id: int) -> Path:
+        return self.guild_dir / f"{guild_id}.json"
+
+    def load_guilds(self) -> Dict[int, Dict[str, Any]]:
+        """Load every guild shard from disk"""
+        guilds: Dict[int, Dict[str, Any]] = {}
+        if not self.guild_dir.exists():
+            return guilds
+
+        for shard_path in self.guild_dir.glob("*.json"):
+            try:
+                guild_id = int(shard_path.stem)
+            except ValueError:
+                continue
+            try:
+                with open(shard_path, "r") as f:
+                    guilds[guild_id] = json.load(f)
+            except Exception as e:
+                logger.error(f"Error loading guild config {shard_path.name}: {e}")
+
+        return guilds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get persistence statistics"""
+        pending = self.pending
+        writes = self.stats["core_writes"] + self.stats["guild_writes"]
+        return {
+            **self.stats,
+            "pending": pending,
+            "coalesced_changes": max(0, self.stats["changes"] - writes - pending),
+        }
+
+
+__all__ = ["WriteBehindConfigStore", "atomic_write_json"]
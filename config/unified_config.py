@@ -11,6 +11,9 @@ from dataclasses import dataclass, asdict, field
 from pathlib import Path
 import discord
 from datetime import datetime
+from functools import lru_cache
+
+from config.config_store import WriteBehindConfigStore
 
 # Load environment variables early
 try:
@@ -23,6 +26,26 @@ except ImportError:
 logger = logging.getLogger("astra.unified_config")
 
 
+@lru_cache(maxsize=1024)
+def _normalize_feature_key(feature_name: str) -> str:
+    """Normalize feature keys for consistent lookups."""
+    lowered = (feature_name or "").strip().lower()
+
+    # Allow callers to omit common prefixes like ``enable_``
+    if lowered.startswith("enable_"):
+        lowered = lowered[len("enable_") :]
+
+    return lowered
+
+
+def _build_feature_index(features: Optional[Dict[str, Any]]) -> Dict[str, bool]:
+    """Map normalized feature keys to their flag (first matching key wins)"""
+    index: Dict[str, bool] = {}
+    for key, value in (features or {}).items():
+        index.setdefault(_normalize_feature_key(str(key)), bool(value))
+    return index
+
+
 @dataclass
 class AIProviderConfig:
     """Configuration for AI providers"""
@@ -56,6 +79,9 @@ class BotConfig:
     # Server management settings
     cleanup_on_leave: bool = True
 
+    # Gateway settings (privileged, must also be enabled in the Developer Portal)
+    presence_intent: bool = False
+
     # Bot features
     features: Dict[str, bool] = field(
         default_factory=lambda: {
@@ -100,6 +126,9 @@ class LoggingConfig:
     console_enabled: bool = True
     max_file_size: int = 10485760  # 10MB
     backup_count: int = 5
+    json_format: bool = False
+    rate_limit_per_second: float = 50.0  # per logger, below WARNING
+    rate_limit_burst: int = 200
 
 
 class UnifiedConfigManager:
@@ -120,8 +149,22 @@ class UnifiedConfigManager:
         # Guild-specific configs
         self.guild_configs: Dict[int, Dict[str, Any]] = {}
 
+        # Normalized feature flag lookup tables, rebuilt lazily after changes
+        self._global_feature_index: Optional[Dict[str, bool]] = None
+        self._guild_feature_index: Dict[int, Dict[str, bool]] = {}
+
+        # Write-behind persistence: core config in config_file, one shard per guild
+        self._store = WriteBehindConfigStore(
+            self.config_file,
+            self.config_dir / "guilds",
+            core_snapshot=self._core_config_data,
+            guild_snapshot=self.guild_configs.get,
+            flush_delay=float(os.getenv("CONFIG_FLUSH_DELAY", "2.0")),
+        )
+
         # Load configuration
         self._load_config()
+        self.guild_configs.update(self._store.load_guilds())
         self._load_environment_variables()
 
         # Railway deployment support
@@ -129,6 +172,7 @@ class UnifiedConfigManager:
 
     def _load_config(self):
         """Load configuration from JSON file"""
+        self._invalidate_feature_index()
         try:
             if self.config_file.exists():
                 with open(self.config_file, "r") as f:
@@ -187,9 +231,13 @@ class UnifiedConfigManager:
                         }
                     )
 
-                # Load guild configs
-                if "guilds" in data:
-                    self.guild_configs = data["guilds"]
+                # Migrate guild configs stored inline by older versions to shards
+                if data.get("guilds"):
+                    for guild_id, guild_config in data["guilds"].items():
+                        guild_id = int(guild_id)
+                        self.guild_configs[guild_id] = guild_config
+                        self._store.mark_guild_dirty(guild_id)
+                    self._store.mark_core_dirty()
 
         except Exception as e:
             logger.error(f"Error loading config: {e}")
@@ -252,26 +300,30 @@ class UnifiedConfigManager:
             self.logging_config.level = "INFO"
             self.logging_config.console_enabled = True
 
-    def save_config(self):
-        """Save current configuration to file"""
-        try:
-            config_data = {
-                "bot": asdict(self.bot_config),
-                "ai": asdict(self.ai_config),
-                "database": asdict(self.db_config),
-                "cache": asdict(self.cache_config),
-                "logging": asdict(self.logging_config),
-                "guilds": self.guild_configs,
-                "updated_at": datetime.now().isoformat(),
-            }
+    def _core_config_data(self) -> Dict[str, Any]:
+        """Snapshot of the global config sections (guilds are sharded separately)"""
+        return {
+            "bot": asdict(self.bot_config),
+            "ai": asdict(self.ai_config),
+            "database": asdict(self.db_config),
+            "cache": asdict(self.cache_config),
+            "logging": asdict(self.logging_config),
+            "updated_at": datetime.now().isoformat(),
+        }
 
-            with open(self.config_file, "w") as f:
-                json.dump(config_data, f, indent=2)
+    def save_config(self):
+        """Save current configuration to file immediately"""
+        self._store.mark_core_dirty()
+        self.flush()
+        logger.info(f"Configuration saved to {self.config_file}")
 
-            logger.info(f"Configuration saved to {self.config_file}")
+    def flush(self):
+        """Write all pending configuration changes now (call on shutdown)"""
+        self._store.flush()
 
-        except Exception as e:
-            logger.error(f"Error saving config: {e}")
+    def get_persistence_stats(self) -> Dict[str, Any]:
+        """Get write-behind persistence statistics"""
+        return self._store.get_stats()
 
     def get_bot_token(self) -> str:
         """Get bot token from environment or config"""
@@ -303,16 +355,23 @@ class UnifiedConfigManager:
 
     def set_guild_config(self, guild_id: int, config: Dict[str, Any]):
         """Set guild-specific configuration"""
-        self.guild_configs[guild_id] = config
-        self.save_config()
+        with self._store.lock:
+            self.guild_configs[guild_id] = config
+            self._invalidate_feature_index(guild_id)
+            self._store.mark_guild_dirty(guild_id)
 
     def update_guild_setting(self, guild_id: int, key: str, value: Any):
         """Update a specific guild setting"""
-        if guild_id not in self.guild_configs:
-            self.guild_configs[guild_id] = {}
+        with self._store.lock:
+            self.guild_configs.setdefault(guild_id, {})[key] = value
+            if key == "features":
+                self._invalidate_feature_index(guild_id)
+            self._store.mark_guild_dirty(guild_id)
 
-        self.guild_configs[guild_id][key] = value
-        self.save_config()
+    def set_guild_setting(self, guild_id: int, key: str, value: Any) -> bool:
+        """Update a guild setting (alias used by the setup modal and admin cog)"""
+        self.update_guild_setting(guild_id, key, value)
+        return True
 
     def get_guild_setting(self, guild_id: int, key: str, default: Any = None) -> Any:
         """Get a specific guild setting"""
@@ -384,8 +443,11 @@ class UnifiedConfigManager:
             self.logging_config,
         ]:
             if hasattr(config, key):
-                setattr(config, key, value)
-                self.save_config()
+                with self._store.lock:
+                    setattr(config, key, value)
+                    if key == "features":
+                        self._invalidate_feature_index()
+                    self._store.mark_core_dirty()
                 return True
 
         return False
@@ -396,15 +458,30 @@ class UnifiedConfigManager:
 
     def _normalize_feature_key(self, feature_name: str) -> str:
         """Normalize feature keys for consistent lookups."""
-        feature_name = feature_name or ""
-        feature_name = feature_name.strip()
-
-        # Allow callers to omit common prefixes like ``enable_``
-        lowered = feature_name.lower()
-        if lowered.startswith("enable_"):
-            lowered = lowered[len("enable_") :]
+        return _normalize_feature_key(feature_name)
 
-        return lowered
+    def _invalidate_feature_index(self, guild_id: Optional[int] = None):
+        """Drop cached flag lookups (one guild, or everything when guild_id is None)"""
+        if guild_id is None:
+            self._global_feature_index = None
+            self._guild_feature_index.clear()
+        else:
+            self._guild_feature_index.pop(guild_id, None)
+
+    def _global_features(self) -> Dict[str, bool]:
+        if self._global_feature_index is None:
+            self._global_feature_index = _build_feature_index(
+                getattr(self.bot_config, "features", None)
+            )
+        return self._global_feature_index
+
+    def _guild_features(self, guild_id: int) -> Dict[str, bool]:
+        index = self._guild_feature_index.get(guild_id)
+        if index is None:
+            guild_config = self.guild_configs.get(guild_id, {})
+            index = _build_feature_index(guild_config.get("features"))
+            self._guild_feature_index[guild_id] = index
+        return index
 
     def is_feature_enabled(
         self, feature_name: str, default: bool = False, guild_id: Optional[int] = None
@@ -417,26 +494,40 @@ class UnifiedConfigManager:
         lookups like ``notion_integration`` or ``enable_notion_integration``
         transparently and falls back to the provided default when the flag is
         not explicitly set.
+
+        Lookups go through prebuilt normalized indexes, which are invalidated
+        by ``set_feature_flag``, guild config updates and config reloads.
         """
 
-        normalized_key = self._normalize_feature_key(feature_name)
+        normalized_key = _normalize_feature_key(feature_name)
 
         # 1) Guild-specific overrides take precedence
         if guild_id is not None:
-            guild_config = self.guild_configs.get(guild_id, {})
-            guild_features = guild_config.get("features", {}) or {}
-            for key, value in guild_features.items():
-                if self._normalize_feature_key(str(key)) == normalized_key:
-                    return bool(value)
+            value = self._guild_features(guild_id).get(normalized_key)
+            if value is not None:
+                return value
 
         # 2) Global bot features
-        bot_features = getattr(self.bot_config, "features", {}) or {}
-        for key, value in bot_features.items():
-            if self._normalize_feature_key(str(key)) == normalized_key:
-                return bool(value)
+        value = self._global_features().get(normalized_key)
+        if value is not None:
+            return value
 
         return bool(default)
 
+    def get_guild_feature_flags(
+        self, guild_id: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """Resolve every known feature flag for a guild in one call.
+
+        Returns normalized feature keys mapped to their effective value (guild
+        overrides applied over the global flags). The result is a copy, so
+        callers can keep it for the duration of an event.
+        """
+        flags = dict(self._global_features())
+        if guild_id is not None:
+            flags.update(self._guild_features(guild_id))
+        return flags
+
     def set_feature_flag(
         self,
         feature_name: str,
@@ -446,19 +537,24 @@ class UnifiedConfigManager:
     ):
         """Set a feature flag on the bot or for a specific guild."""
 
-        normalized_key = self._normalize_feature_key(feature_name)
-
-        if guild_id is not None:
-            guild_config = self.guild_configs.setdefault(guild_id, {})
-            guild_features = guild_config.setdefault("features", {})
-            guild_features[normalized_key] = bool(enabled)
-        else:
-            bot_features = getattr(self.bot_config, "features", {})
-            bot_features[normalized_key] = bool(enabled)
-            self.bot_config.features = bot_features
-
-        if persist:
-            self.save_config()
+        normalized_key = _normalize_feature_key(feature_name)
+
+        with self._store.lock:
+            if guild_id is not None:
+                guild_config = self.guild_configs.setdefault(guild_id, {})
+                guild_features = guild_config.setdefault("features", {})
+                guild_features[normalized_key] = bool(enabled)
+            else:
+                bot_features = getattr(self.bot_config, "features", {})
+                bot_features[normalized_key] = bool(enabled)
+                self.bot_config.features = bot_features
+            self._invalidate_feature_index(guild_id)
+
+            if persist:
+                if guild_id is not None:
+                    self._store.mark_guild_dirty(guild_id)
+                else:
+                    self._store.mark_core_dirty()
 
 
 # Global unified config manager instance
@@ -1,20 +1,49 @@
 """
 Core System Module - Streamlined bot functionality
 All essential systems in one place - NO BLOAT
+Components load on first access (PEP 562) to keep startup fast
 """
 
-# Import all core components
-from .ai_handler import AIHandler
-from .interactive_menus import InteractiveMenus
-from .welcome_system import WelcomeSystem
-from .event_manager import EventManager
-from .concurrent_message_processor import (
-    ConcurrentMessageProcessor,
-    MessagePriority,
-    initialize_processor,
-)
-from .personality_integration import IntegratedPersonalityEngine
-from .security_integration import SecuritySystemIntegration
+from typing import TYPE_CHECKING
+
+from utils.lazy_loader import lazy_exports
+
+if TYPE_CHECKING:
+    from .ai_handler import AIHandler
+    from .interactive_menus import InteractiveMenus
+    from .welcome_system import WelcomeSystem
+    from .event_manager import EventManager
+    from .concurrent_message_processor import (
+        ConcurrentMessageProcessor,
+        MessagePriority,
+        initialize_processor,
+    )
+    from .personality_integration import IntegratedPersonalityEngine
+    from .security_integration import SecuritySystemIntegration
+
+# Public name -> (submodule, attribute)
+_EXPORTS = {
+    "AIHandler": (".ai_handler", "AIHandler"),
+    "InteractiveMenus": (".interactive_menus", "InteractiveMenus"),
+    "WelcomeSystem": (".welcome_system", "WelcomeSystem"),
+    "EventManager": (".event_manager", "EventManager"),
+    "ConcurrentMessageProcessor": (
+        ".concurrent_message_processor",
+        "ConcurrentMessageProcessor",
+    ),
+    "MessagePriority": (".concurrent_message_processor", "MessagePriority"),
+    "initialize_processor": (".concurrent_message_processor", "initialize_processor"),
+    "IntegratedPersonalityEngine": (
+        ".personality_integration",
+        "IntegratedPersonalityEngine",
+    ),
+    "SecuritySystemIntegration": (
+        ".security_integration",
+        "SecuritySystemIntegration",
+    ),
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
 
 __all__ = [
     "AIHandler",
@@ -24,6 +24,15 @@ from dataclasses import dataclass, asdict
 from functools import lru_cache
 import weakref
 import hashlib
+import re
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.retention import RetentionJob, retention_scheduler
+
+
+# Worker threads for blocking sqlite calls; also the cap on in-flight queries
+DB_WORKERS = 4
 
 
 @dataclass
@@ -103,17 +112,33 @@ class ConnectionPool:
             self.metrics["pool_exhausted_count"] += 1
             raise Exception("Connection pool exhausted")
 
-    async def return_connection(self, conn: sqlite3.Connection):
-        """🔄 Return a connection to the pool"""
+    @staticmethod
+    def is_healthy(conn: sqlite3.Connection) -> bool:
+        """Blocking validity check; run it off the event loop"""
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def return_connection(
+        self, conn: sqlite3.Connection, healthy: Optional[bool] = None
+    ):
+        """🔄 Return a connection to the pool
+
+        ``healthy`` is the result of ``is_healthy`` when the caller already
+        checked the connection on a worker thread.
+        """
+        if healthy is None:
+            healthy = await asyncio.to_thread(self.is_healthy, conn)
+
         async with self._lock:
             if conn in self._active_connections:
                 self._active_connections.remove(conn)
 
-                # Check if connection is still valid
-                try:
-                    conn.execute("SELECT 1")
+                if healthy:
                     self._pool.append(conn)
-                except:
+                else:
                     # Connection is broken, close it
                     try:
                         conn.close()
@@ -140,8 +165,44 @@ class ConnectionPool:
                     pass
 
 
+_READ_TABLES_RE = re.compile(r"\b(?:FROM|JOIN)\s+[\"`\[]?([A-Za-z_]\w*)", re.IGNORECASE)
+_WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?"
+    r"|DELETE\s+FROM)\s+[\"`\[]?([A-Za-z_]\w*)",
+    re.IGNORECASE,
+)
+_READ_ONLY_PREFIXES = ("SELECT", "WITH", "PRAGMA", "EXPLAIN")
+
+
+@lru_cache(maxsize=1024)
+def read_tables(query: str) -> frozenset:
+    """🔍 Tables a query reads from (FROM/JOIN clauses)"""
+    return frozenset(name.lower() for name in _READ_TABLES_RE.findall(query))
+
+
+@lru_cache(maxsize=1024)
+def write_tables(query: str) -> Optional[frozenset]:
+    """✏️ Tables a statement modifies.
+
+    Returns an empty set for read-only statements and None for statements
+    whose effect can't be pinned to tables (DDL, VACUUM, ...), which callers
+    treat as "invalidate everything".
+    """
+    match = _WRITE_TABLE_RE.match(query)
+    if match:
+        return frozenset((match.group(1).lower(),))
+    if query.lstrip().upper().startswith(_READ_ONLY_PREFIXES):
+        return frozenset()
+    return None
+
+
 class QueryCache:
-    """📦 Advanced query result caching system"""
+    """📦 Advanced query result caching system
+
+    Entries record the tables their query read, and writes invalidate every
+    entry that depends on a written table. Per-table versions guard against a
+    read that started before a write caching its (now stale) result after it.
+    """
 
     def __init__(self, max_size: int = 1000, ttl: int = 300):
         self.max_size = max_size
@@ -151,8 +212,21 @@ class QueryCache:
         self._access_times = {}
         self._creation_times = {}
 
+        # 🔗 Table dependency tracking
+        self._key_tables: Dict[str, frozenset] = {}
+        self._table_keys: Dict[str, set] = defaultdict(set)
+        self._table_versions: Dict[str, int] = defaultdict(int)
+        self._generation = 0
+
         # Performance metrics
-        self.metrics = {"hits": 0, "misses": 0, "evictions": 0, "expired_entries": 0}
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired_entries": 0,
+            "invalidations": 0,
+            "stale_sets_skipped": 0,
+        }
 
     def _generate_key(self, query: str, params: Tuple = ()) -> str:
         """🔑 Generate cache key for query"""
@@ -180,8 +254,31 @@ class QueryCache:
         self.metrics["misses"] += 1
         return None
 
-    def set(self, query: str, params: Tuple, result: Any):
-        """💾 Cache query result"""
+    def version(self, tables: frozenset) -> Tuple[int, ...]:
+        """🏷️ Snapshot of the write versions of a set of tables"""
+        return (self._generation,) + tuple(
+            self._table_versions[table] for table in sorted(tables)
+        )
+
+    def set(
+        self,
+        query: str,
+        params: Tuple,
+        result: Any,
+        tables: Optional[frozenset] = None,
+        version: Optional[Tuple[int, ...]] = None,
+    ):
+        """💾 Cache query result
+
+        ``version`` is the snapshot taken before the query ran; if any of its
+        tables were written since, the result is dropped instead of cached.
+        """
+        if tables is None:
+            tables = read_tables(query)
+        if version is not None and version != self.version(tables):
+            self.metrics["stale_sets_skipped"] += 1
+            return
+
         key = self._generate_key(query, params)
         current_time = time.time()
 
@@ -193,12 +290,39 @@ class QueryCache:
         self._access_times[key] = current_time
         self._creation_times[key] = current_time
 
+        self._key_tables[key] = tables
+        for table in tables:
+            self._table_keys[table].add(key)
+
+    def invalidate_tables(self, tables: Optional[frozenset]):
+        """🧨 Drop every entry that read from any of the given tables
+
+        ``None`` means the affected tables are unknown, so everything goes.
+        """
+        if tables is None:
+            self._generation += 1
+            self.clear()
+            return
+
+        for table in tables:
+            self._table_versions[table] += 1
+            for key in list(self._table_keys.pop(table, ())):
+                self._remove_key(key)
+                self.metrics["invalidations"] += 1
+
     def _remove_key(self, key: str):
         """🗑️ Remove key from cache"""
         self._cache.pop(key, None)
         self._access_times.pop(key, None)
         self._creation_times.pop(key, None)
 
+        for table in self._key_tables.pop(key, ()):
+            keys = self._table_keys.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._table_keys[table]
+
     def _evict_oldest(self):
         """⏰ Evict least recently used entry"""
         if not self._access_times:
@@ -214,6 +338,8 @@ class QueryCache:
         self._cache.clear()
         self._access_times.clear()
         self._creation_times.clear()
+        self._key_tables.clear()
+        self._table_keys.clear()
         self.metrics["evictions"] += evicted
 
     def get_hit_rate(self) -> float:
@@ -222,6 +348,76 @@ class QueryCache:
         return (self.metrics["hits"] / total * 100) if total > 0 else 0.0
 
 
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_query(query: str) -> str:
+    """🧬 Normalize a query so statements differing only in literals group together"""
+    normalized = _STRING_LITERAL_RE.sub("?", query)
+    normalized = _NUMBER_LITERAL_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(?)", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class QueryFingerprintStats:
+    """📈 O(1) rolling statistics and a latency histogram for one query shape"""
+
+    # Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    __slots__ = ("fingerprint", "count", "errors", "total_ms", "max_ms", "histogram")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float, success: bool = True):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        if not success:
+            self.errors += 1
+        self.histogram[bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket containing the given percentile"""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.histogram):
+            seen += bucket_count
+            if seen >= target:
+                return (
+                    float(self.BUCKETS_MS[index])
+                    if index < len(self.BUCKETS_MS)
+                    else self.max_ms
+                )
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
 class UltraHighPerformanceDatabase:
     """🚀 Ultra-high-performance database system"""
 
@@ -233,7 +429,8 @@ class UltraHighPerformanceDatabase:
         self.connection_pool = ConnectionPool(database_path, max_connections=20)
 
         # 📦 MULTI-LAYER CACHING
-        self.query_cache = QueryCache(max_size=2000, ttl=600)  # 10 minute TTL
+        # Writes invalidate dependent entries, so the TTL is only a backstop
+        self.query_cache = QueryCache(max_size=2000, ttl=3600)
         self.result_cache = QueryCache(max_size=1000, ttl=300)  # 5 minute TTL
         self.metadata_cache = {}
 
@@ -268,6 +465,15 @@ class UltraHighPerformanceDatabase:
             "error_log": deque(maxlen=100),
             "optimization_history": deque(maxlen=50),
         }
+        self._query_time_window_sum = 0.0
+        self.query_stats: Dict[str, QueryFingerprintStats] = {}
+
+        # 🧵 Dedicated executor so sqlite calls never run on the event loop
+        self._db_executor = ThreadPoolExecutor(
+            max_workers=DB_WORKERS, thread_name_prefix="astra-db"
+        )
+        # A query holds a pooled connection only while it has a worker
+        self._db_slots = asyncio.Semaphore(DB_WORKERS)
 
         self._monitoring_active = False
         self._last_optimization = time.time()
@@ -449,43 +655,35 @@ class UltraHighPerformanceDatabase:
 
         start_time = time.time()
 
+        use_cache = fetch and self.optimization_settings["query_optimization"]
+        if use_cache:
+            tables = read_tables(query)
+            cache_version = self.query_cache.version(tables)
+
         try:
             # Check cache first
-            if fetch and self.optimization_settings["query_optimization"]:
+            if use_cache:
                 cached_result = self.query_cache.get(query, params)
                 if cached_result is not None:
                     return cached_result
 
-            # Get connection and execute query
-            conn = await self.connection_pool.get_connection()
-
-            try:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-
-                result = None
-                if fetch == "one":
-                    result = cursor.fetchone()
-                elif fetch == "all":
-                    result = cursor.fetchall()
-                elif fetch == "many":
-                    result = cursor.fetchmany(self.optimization_settings["batch_size"])
-                else:
-                    conn.commit()
-                    result = cursor.rowcount
+            result = await self._run_with_connection(
+                self._execute_sync, query, params, fetch
+            )
+            if not fetch:
+                self.query_cache.invalidate_tables(write_tables(query))
 
-                # Cache result if appropriate
-                if fetch and result is not None:
-                    self.query_cache.set(query, params, result)
+            # Cache result if appropriate
+            if use_cache and result is not None:
+                self.query_cache.set(
+                    query, params, result, tables=tables, version=cache_version
+                )
 
-                # Update metrics
-                execution_time = time.time() - start_time
-                self._update_query_metrics(query, execution_time, success=True)
+            # Update metrics
+            execution_time = time.time() - start_time
+            self._update_query_metrics(query, execution_time, success=True)
 
-                return result
-
-            finally:
-                await self.connection_pool.return_connection(conn)
+            return result
 
         except Exception as e:
             execution_time = time.time() - start_time
@@ -495,26 +693,82 @@ class UltraHighPerformanceDatabase:
             self.logger.error(f"❌ Query execution failed: {e}")
             raise
 
+    async def _run_on_db(self, fn, *args) -> Any:
+        """🧵 Run blocking sqlite work on the dedicated DB executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, fn, *args)
+
+    async def _run_with_connection(self, fn, *args) -> Any:
+        """🧵 Run fn(conn, *args) on the DB executor with a pooled connection.
+
+        In-flight jobs are capped at the executor size, so nothing waits for
+        a worker while holding a connection. The health check runs on the
+        worker right after the job.
+        """
+        async with self._db_slots:
+            conn = await self.connection_pool.get_connection()
+            healthy = [False]
+
+            def job():
+                try:
+                    return fn(conn, *args)
+                finally:
+                    healthy[0] = self.connection_pool.is_healthy(conn)
+
+            future = asyncio.get_running_loop().run_in_executor(self._db_executor, job)
+            try:
+                return await asyncio.shield(future)
+            finally:
+                if not future.done():
+                    # Cancelled mid-query: the worker still owns the connection
+                    await asyncio.wait([future])
+                await self.connection_pool.return_connection(conn, healthy[0])
+
+    def _execute_sync(
+        self, conn: sqlite3.Connection, query: str, params: Tuple, fetch: str
+    ) -> Any:
+        """Executor-side body of execute_query"""
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+
+        if fetch == "one":
+            return cursor.fetchone()
+        if fetch == "all":
+            return cursor.fetchall()
+        if fetch == "many":
+            return cursor.fetchmany(self.optimization_settings["batch_size"])
+
+        conn.commit()
+        return cursor.rowcount
+
     def _update_query_metrics(
         self, query: str, execution_time: float, success: bool, error: str = None
     ):
-        """📊 Update query performance metrics"""
+        """📊 Update query performance metrics (O(1) per query)"""
 
         # Update general metrics
         self.metrics.queries_executed += 1
 
-        # Update average query time
-        self.analytics["query_times"].append(execution_time)
-        if self.analytics["query_times"]:
-            self.metrics.avg_query_time = sum(self.analytics["query_times"]) / len(
-                self.analytics["query_times"]
-            )
+        # Rolling average over the query_times window, kept as a running sum
+        query_times = self.analytics["query_times"]
+        if len(query_times) == query_times.maxlen:
+            self._query_time_window_sum -= query_times[0]
+        query_times.append(execution_time)
+        self._query_time_window_sum += execution_time
+        self.metrics.avg_query_time = self._query_time_window_sum / len(query_times)
 
         # Update cache hit rate
         self.metrics.cache_hit_rate = self.query_cache.get_hit_rate()
 
+        # Per-fingerprint rolling counters and latency histogram
+        fingerprint = fingerprint_query(query)
+        stats = self.query_stats.get(fingerprint)
+        if stats is None:
+            stats = self.query_stats[fingerprint] = QueryFingerprintStats(fingerprint)
+        stats.record(execution_time * 1000, success)
+
         # Track query types
-        query_type = query.strip().split()[0].upper()
+        query_type = fingerprint.split(" ", 1)[0].upper()
         self.analytics["queries_by_type"][query_type] += 1
 
         # Track errors
@@ -536,38 +790,44 @@ class UltraHighPerformanceDatabase:
             return []
 
         start_time = time.time()
-        results = []
 
         try:
-            conn = await self.connection_pool.get_connection()
+            results = await self._run_with_connection(self._batch_execute_sync, queries)
 
-            try:
-                # Execute all queries in a single transaction
-                conn.execute("BEGIN TRANSACTION")
+            for query, _ in queries:
+                self.query_cache.invalidate_tables(write_tables(query))
 
-                for query, params in queries:
-                    cursor = conn.cursor()
-                    cursor.execute(query, params)
-                    results.append(cursor.rowcount)
+            # Update metrics
+            execution_time = time.time() - start_time
+            self.logger.debug(
+                f"📦 Batch executed {len(queries)} queries in {execution_time:.3f}s"
+            )
 
-                conn.commit()
+            return results
 
-                # Update metrics
-                execution_time = time.time() - start_time
-                self.logger.debug(
-                    f"📦 Batch executed {len(queries)} queries in {execution_time:.3f}s"
-                )
+        except Exception as e:
+            self.logger.error(f"❌ Batch execution failed: {e}")
+            raise
 
-                return results
+    @staticmethod
+    def _batch_execute_sync(
+        conn: sqlite3.Connection, queries: List[Tuple[str, Tuple]]
+    ) -> List[int]:
+        """Executor-side body of batch_execute: one transaction for all queries"""
+        results = []
+        try:
+            # Execute all queries in a single transaction
+            conn.execute("BEGIN TRANSACTION")
 
-            except Exception as e:
-                conn.rollback()
-                raise
-            finally:
-                await self.connection_pool.return_connection(conn)
+            for query, params in queries:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                results.append(cursor.rowcount)
 
-        except Exception as e:
-            self.logger.error(f"❌ Batch execution failed: {e}")
+            conn.commit()
+            return results
+        except Exception:
+            conn.rollback()
             raise
 
     async def get_user_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -664,7 +924,8 @@ class UltraHighPerformanceDatabase:
     ) -> List[Dict[str, Any]]:
         """📊 Get user violations with time filter"""
 
-        cutoff_time = time.time() - (days * 86400)
+        # Minute-aligned cutoff keeps the cache key stable between calls
+        cutoff_time = (int(time.time()) // 60 * 60) - (days * 86400)
 
         query = """
         SELECT violation_type, severity, message_content, channel_id, guild_id,
@@ -729,14 +990,13 @@ class UltraHighPerformanceDatabase:
 
         # Calculate database size
         try:
-            conn = await self.connection_pool.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA page_count")
-            page_count = cursor.fetchone()[0]
-            cursor.execute("PRAGMA page_size")
-            page_size = cursor.fetchone()[0]
+            page_count, page_size = await self._run_with_connection(
+                lambda conn: (
+                    conn.execute("PRAGMA page_count").fetchone()[0],
+                    conn.execute("PRAGMA page_size").fetchone()[0],
+                )
+            )
             self.metrics.data_size_mb = (page_count * page_size) / (1024 * 1024)
-            await self.connection_pool.return_connection(conn)
         except Exception as e:
             self.logger.debug(f"Failed to calculate database size: {e}")
 
@@ -757,8 +1017,16 @@ class UltraHighPerformanceDatabase:
             },
             "connection_pool_stats": self.connection_pool.metrics.copy(),
             "optimization_settings": self.optimization_settings.copy(),
+            "slow_queries": self.slow_queries(),
         }
 
+    def slow_queries(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """🐢 Worst query fingerprints by total time spent"""
+        worst = sorted(
+            self.query_stats.values(), key=lambda stats: stats.total_ms, reverse=True
+        )
+        return [stats.to_dict() for stats in worst[:limit]]
+
     async def start_monitoring(self):
         """📊 Start database performance monitoring"""
         if self._monitoring_active:
@@ -814,44 +1082,48 @@ class UltraHighPerformanceDatabase:
         optimization_start = time.time()
 
         try:
-            conn = await self.connection_pool.get_connection()
-
-            # Analyze tables for query optimization
-            conn.execute("ANALYZE")
-
-            # Vacuum if enabled
-            if self.optimization_settings["auto_vacuum"]:
-                conn.execute("PRAGMA incremental_vacuum")
-
-            # Optimize database
-            conn.execute("PRAGMA optimize")
-
-            # Clear old data (older than 90 days)
+            # Clear old data (older than 90 days) in bounded, throttled batches
             cutoff_time = time.time() - (90 * 86400)
-
-            # Clean old violations
-            cursor = conn.cursor()
-            cursor.execute(
-                "DELETE FROM violations WHERE timestamp < ? AND resolved = 1",
-                (cutoff_time,),
+            reports = await retention_scheduler.run_jobs(
+                [
+                    RetentionJob(
+                        name="security.violations",
+                        db_path=self.database_path,
+                        table="violations",
+                        where="timestamp < ? AND resolved = 1",
+                        params=(cutoff_time,),
+                    ),
+                    RetentionJob(
+                        name="security.security_events",
+                        db_path=self.database_path,
+                        table="security_events",
+                        where="timestamp < ? AND resolved = 1",
+                        params=(cutoff_time,),
+                    ),
+                    RetentionJob(
+                        name="security.performance_metrics",
+                        db_path=self.database_path,
+                        table="performance_metrics",
+                        where="timestamp < ?",
+                        params=(cutoff_time,),
+                        incremental_vacuum_pages=(
+                            1000 if self.optimization_settings["auto_vacuum"] else 0
+                        ),
+                    ),
+                ]
             )
-            violations_cleaned = cursor.rowcount
-
-            # Clean old security events
-            cursor.execute(
-                "DELETE FROM security_events WHERE timestamp < ? AND resolved = 1",
-                (cutoff_time,),
+            violations_cleaned, events_cleaned, metrics_cleaned = (
+                report.rows_affected for report in reports
             )
-            events_cleaned = cursor.rowcount
 
-            # Clean old performance metrics
-            cursor.execute(
-                "DELETE FROM performance_metrics WHERE timestamp < ?", (cutoff_time,)
+            self.query_cache.invalidate_tables(
+                frozenset(("violations", "security_events", "performance_metrics"))
             )
-            metrics_cleaned = cursor.rowcount
 
-            conn.commit()
-            await self.connection_pool.return_connection(conn)
+            # Refresh planner statistics where SQLite thinks they are stale
+            await self._run_with_connection(
+                lambda conn: conn.execute("PRAGMA optimize")
+            )
 
             optimization_time = time.time() - optimization_start
 
@@ -885,6 +1157,7 @@ class UltraHighPerformanceDatabase:
 
         # Close connection pool
         await self.connection_pool.close_all()
+        self._db_executor.shutdown(wait=False)
 
         self.logger.info("🚪 Database closed successfully")
 
@@ -22,6 +22,8 @@ from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
 from functools import lru_cache
 
+from utils.member_stats import member_stats
+
 # Optional performance monitoring imports
 try:
     import psutil
@@ -248,10 +250,7 @@ class UltraPerformanceMonitor:
 
                 # Active users (rough estimate from guild members)
                 if self.bot.guilds:
-                    metrics["active_users"] = sum(
-                        len([m for m in guild.members if not m.bot])
-                        for guild in self.bot.guilds
-                    )
+                    metrics["active_users"] = member_stats.total_humans(self.bot.guilds)
 
         except Exception as e:
             self.logger.debug(f"Failed to collect bot metrics: {e}")
@@ -13,15 +13,25 @@ Features:
 
 import asyncio
 import json
+import math
 import time
 import logging
 from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
+from pathlib import Path
 import statistics
 import weakref
 
+from utils.time_series import TimeSeriesStore
+
+# Histogram bounds: severity <= 2 is low, <= 4 medium, above that high
+SEVERITY_BOUNDS = (2, 4)
+# Trust impact below -5 is a risk indicator, below 0 negative, above 0 positive.
+# Bins are "<= bound", so the risk edge sits just under -5 to keep -5 out of it.
+TRUST_IMPACT_BOUNDS = (math.nextafter(-5.0, -math.inf), 0)
+
 
 @dataclass
 class SecurityMetrics:
@@ -89,6 +99,12 @@ class RealTimeAnalytics:
 
         # 📈 METRICS AGGREGATION
         self.metrics_aggregator = MetricsAggregator()
+        self.metrics = TimeSeriesStore(
+            persist_path=Path("data/analytics_timeseries.npz")
+        )
+        self._flagged_users: "OrderedDict[int, float]" = OrderedDict()
+        self._active_users: "OrderedDict[int, float]" = OrderedDict()
+        self._last_persist = time.time()
 
         # 🚨 ALERT SYSTEM
         self.alert_system = AlertSystem()
@@ -114,8 +130,8 @@ class RealTimeAnalytics:
                 "memory_usage": 85.0,  # percentage
             },
             "retention_hours": 24,
+            "persist_interval": 300,  # seconds between time-series saves
             "analytics_enabled": True,
-            "real_time_updates": True,
         }
 
         self._monitoring_active = False
@@ -147,6 +163,7 @@ class RealTimeAnalytics:
             task.cancel()
 
         self._update_tasks.clear()
+        await self._persist_metrics()
         self.logger.info("🛑 Real-time analytics stopped")
 
     async def record_security_event(self, event_data: Dict[str, Any]):
@@ -164,6 +181,7 @@ class RealTimeAnalytics:
         }
 
         self.security_stream.append(event)
+        self._record_security_metrics(event)
 
         # Real-time pattern detection
         await self.pattern_detector.analyze_event(event)
@@ -171,9 +189,25 @@ class RealTimeAnalytics:
         # Anomaly detection
         await self.anomaly_detector.check_anomaly(event)
 
-        # Update dashboard
-        if self.config["real_time_updates"]:
-            await self._update_security_dashboard()
+    def _record_security_metrics(self, event: Dict[str, Any]):
+        """📈 Roll a security event into the time series"""
+        timestamp = event["timestamp"]
+        self.metrics.record(
+            "security.events", event["severity"], timestamp, bounds=SEVERITY_BOUNDS
+        )
+        if event["severity"] >= 3:
+            self.metrics.record("security.threats", 1, timestamp)
+        if event["action_taken"] != "none":
+            self.metrics.record("security.blocked", 1, timestamp)
+        if event["action_taken"] == "active":
+            self.metrics.record("security.active_moderations", 1, timestamp)
+        if event["response_time"] > 0:
+            self.metrics.record(
+                "security.response_time", event["response_time"], timestamp
+            )
+        if event["user_id"]:
+            self._flagged_users[event["user_id"]] = timestamp
+            self._flagged_users.move_to_end(event["user_id"])
 
     async def record_performance_metric(self, metric_data: Dict[str, Any]):
         """⚡ Record performance metric"""
@@ -188,6 +222,9 @@ class RealTimeAnalytics:
         }
 
         self.performance_stream.append(metric)
+        self.metrics.record(
+            f"performance.{metric['metric_type']}", metric["value"], timestamp
+        )
 
         # Performance analysis
         await self.performance_analyzer.analyze_metric(metric)
@@ -207,92 +244,104 @@ class RealTimeAnalytics:
 
         self.user_activity_stream.append(activity)
 
+        self.metrics.record("activity.all", 1, timestamp)
+        self.metrics.record(f"activity.type.{activity['activity_type']}", 1, timestamp)
+        if activity["trust_impact"]:
+            self.metrics.record(
+                "activity.trust_impact",
+                activity["trust_impact"],
+                timestamp,
+                bounds=TRUST_IMPACT_BOUNDS,
+            )
+        if activity["user_id"]:
+            self._active_users[activity["user_id"]] = timestamp
+            self._active_users.move_to_end(activity["user_id"])
+
     async def get_security_dashboard(self) -> Dict[str, Any]:
         """🔐 Get real-time security dashboard data"""
 
         current_time = time.time()
         cutoff_time = current_time - 3600  # Last hour
 
-        # Filter recent security events
-        recent_events = [
-            event for event in self.security_stream if event["timestamp"] > cutoff_time
-        ]
+        events = self.metrics.get("security.events", SEVERITY_BOUNDS).summary(
+            cutoff_time
+        )
 
-        # Calculate security metrics
-        threats_detected = len([e for e in recent_events if e["severity"] >= 3])
-        threats_blocked = len([e for e in recent_events if e["action_taken"] != "none"])
-        users_flagged = len(set(e["user_id"] for e in recent_events if e["user_id"]))
+        def event_count(name: str) -> int:
+            return self.metrics.get(name).summary(cutoff_time)["count"]
 
         # Calculate violations per minute
-        if recent_events:
-            time_span = (current_time - min(e["timestamp"] for e in recent_events)) / 60
-            violations_per_minute = len(recent_events) / max(time_span, 1)
+        if events["count"]:
+            first_seen = max(events["first_timestamp"], cutoff_time)
+            time_span = (current_time - first_seen) / 60
+            violations_per_minute = events["count"] / max(time_span, 1)
         else:
             violations_per_minute = 0.0
 
-        # Calculate average response time
-        response_times = [
-            e["response_time"] for e in recent_events if e["response_time"] > 0
-        ]
-        avg_response_time = statistics.mean(response_times) if response_times else 0.0
-
         # Risk distribution
-        risk_distribution = defaultdict(int)
-        for event in recent_events:
-            if event["severity"] <= 2:
-                risk_distribution["low"] += 1
-            elif event["severity"] <= 4:
-                risk_distribution["medium"] += 1
-            else:
-                risk_distribution["high"] += 1
+        risk_distribution = {
+            level: count
+            for level, count in zip(("low", "medium", "high"), events["histogram"])
+            if count
+        }
+
+        # Last 20 events of the hour
+        recent_events = []
+        for event in reversed(self.security_stream):
+            if event["timestamp"] <= cutoff_time or len(recent_events) == 20:
+                break
+            recent_events.append(event)
+        recent_events.reverse()
 
         return {
             "timestamp": current_time,
             "metrics": {
-                "threats_detected": threats_detected,
-                "threats_blocked": threats_blocked,
-                "users_flagged": users_flagged,
+                "threats_detected": event_count("security.threats"),
+                "threats_blocked": event_count("security.blocked"),
+                "users_flagged": self._count_recent(self._flagged_users, cutoff_time),
                 "violations_per_minute": round(violations_per_minute, 2),
-                "avg_response_time": round(avg_response_time, 2),
-                "active_moderations": len(
-                    [e for e in recent_events if e["action_taken"] == "active"]
+                "avg_response_time": round(
+                    self.metrics.get("security.response_time").summary(cutoff_time)[
+                        "mean"
+                    ],
+                    2,
                 ),
+                "active_moderations": event_count("security.active_moderations"),
             },
-            "risk_distribution": dict(risk_distribution),
-            "recent_events": recent_events[-20:],  # Last 20 events
+            "risk_distribution": risk_distribution,
+            "recent_events": recent_events,
             "patterns": await self.pattern_detector.get_detected_patterns(),
             "anomalies": await self.anomaly_detector.get_recent_anomalies(),
             "trends": await self._calculate_security_trends(recent_events),
         }
 
+    def _count_recent(self, last_seen: "OrderedDict[int, float]", cutoff: float) -> int:
+        """Drop users last seen before ``cutoff`` and count the rest"""
+        while last_seen:
+            user_id, seen_at = next(iter(last_seen.items()))
+            if seen_at > cutoff:
+                break
+            del last_seen[user_id]
+        return len(last_seen)
+
     async def get_performance_dashboard(self) -> Dict[str, Any]:
         """⚡ Get real-time performance dashboard data"""
 
         current_time = time.time()
         cutoff_time = current_time - 3600  # Last hour
 
-        # Filter recent performance metrics
-        recent_metrics = [
-            metric
-            for metric in self.performance_stream
-            if metric["timestamp"] > cutoff_time
-        ]
-
-        # Group metrics by type
-        metrics_by_type = defaultdict(list)
-        for metric in recent_metrics:
-            metrics_by_type[metric["metric_type"]].append(metric["value"])
-
-        # Calculate aggregated metrics
+        # Aggregate each metric type from its rollups
         performance_data = {}
-        for metric_type, values in metrics_by_type.items():
-            if values:
-                performance_data[metric_type] = {
-                    "current": values[-1],
-                    "average": statistics.mean(values),
-                    "min": min(values),
-                    "max": max(values),
-                    "trend": self._calculate_trend(values[-10:]),  # Last 10 values
+        for name in self.metrics.names("performance."):
+            series = self.metrics.get(name)
+            summary = series.summary(cutoff_time)
+            if summary["count"]:
+                performance_data[name[len("performance.") :]] = {
+                    "current": series.last_value,
+                    "average": summary["mean"],
+                    "min": summary["min"],
+                    "max": summary["max"],
+                    "trend": self._calculate_trend(list(series.recent)),
                 }
 
         return {
@@ -332,38 +381,31 @@ class RealTimeAnalytics:
         current_time = time.time()
         cutoff_time = current_time - 86400  # Last 24 hours
 
-        # Filter recent user activities
-        recent_activities = [
-            activity
-            for activity in self.user_activity_stream
-            if activity["timestamp"] > cutoff_time
-        ]
-
-        # Calculate user metrics
-        active_users = len(set(a["user_id"] for a in recent_activities if a["user_id"]))
-
         # Activity distribution
-        activity_distribution = defaultdict(int)
-        for activity in recent_activities:
-            activity_distribution[activity["activity_type"]] += 1
+        activity_distribution = {}
+        for name in self.metrics.names("activity.type."):
+            count = self.metrics.get(name).summary(cutoff_time)["count"]
+            if count:
+                activity_distribution[name[len("activity.type.") :]] = count
 
         # Trust impact analysis
-        trust_impacts = [
-            a["trust_impact"] for a in recent_activities if a["trust_impact"] != 0
-        ]
-        avg_trust_impact = statistics.mean(trust_impacts) if trust_impacts else 0.0
+        trust = self.metrics.get("activity.trust_impact", TRUST_IMPACT_BOUNDS).summary(
+            cutoff_time
+        )
+        risk, negative, positive = trust["histogram"]
 
         # Behavioral patterns
-        behavioral_patterns = await self._analyze_behavioral_patterns(recent_activities)
+        behavioral_patterns = await self._analyze_behavioral_patterns(cutoff_time)
+        behavioral_patterns["risk_indicators"] = risk
 
         return {
             "timestamp": current_time,
-            "active_users": active_users,
-            "activity_distribution": dict(activity_distribution),
+            "active_users": self._count_recent(self._active_users, cutoff_time),
+            "activity_distribution": activity_distribution,
             "trust_metrics": {
-                "average_impact": round(avg_trust_impact, 2),
-                "positive_interactions": len([i for i in trust_impacts if i > 0]),
-                "negative_interactions": len([i for i in trust_impacts if i < 0]),
+                "average_impact": round(trust["mean"], 2),
+                "positive_interactions": positive,
+                "negative_interactions": risk + negative,
             },
             "behavioral_patterns": behavioral_patterns,
             "user_risk_levels": await self._calculate_user_risk_levels(),
@@ -403,18 +445,15 @@ class RealTimeAnalytics:
         """📊 Dashboard state update loop"""
         while self._monitoring_active:
             try:
-                # Update all dashboard components
-                self.dashboard_state["security_overview"] = (
-                    await self.get_security_dashboard()
-                )
-                self.dashboard_state["performance_overview"] = (
-                    await self.get_performance_dashboard()
-                )
+                # Security and performance snapshots have their own loops
                 self.dashboard_state["threat_intelligence"] = (
                     await self.get_threat_intelligence()
                 )
                 self.dashboard_state["user_analytics"] = await self.get_user_analytics()
 
+                if time.time() - self._last_persist >= self.config["persist_interval"]:
+                    await self._persist_metrics()
+
                 await asyncio.sleep(self.config["update_interval"])
             except Exception as e:
                 self.logger.error(f"❌ Dashboard update error: {e}")
@@ -431,14 +470,24 @@ class RealTimeAnalytics:
                 await asyncio.sleep(60)
 
     async def _update_security_dashboard(self):
-        """🔐 Update security dashboard components"""
-        # This would update the live security dashboard
-        pass
+        """🔐 Refresh the security dashboard snapshot"""
+        self.dashboard_state["security_overview"] = await self.get_security_dashboard()
 
     async def _update_performance_dashboard(self):
-        """⚡ Update performance dashboard components"""
-        # This would update the live performance dashboard
-        pass
+        """⚡ Refresh the performance dashboard snapshot"""
+        self.dashboard_state["performance_overview"] = (
+            await self.get_performance_dashboard()
+        )
+
+    async def _persist_metrics(self):
+        """💾 Save time-series rollups to disk"""
+        self._last_persist = time.time()
+        try:
+            # Copy on the loop, compress and write off it
+            snapshot = self.metrics.snapshot()
+            await asyncio.to_thread(self.metrics.write_snapshot, snapshot)
+        except Exception as e:
+            self.logger.error(f"❌ Failed to persist analytics time series: {e}")
 
     async def _calculate_security_trends(self, events: List[Dict]) -> Dict[str, Any]:
         """📈 Calculate security trends"""
@@ -498,23 +547,16 @@ class RealTimeAnalytics:
             health_score -= len(critical_alerts) * 20
             issues.extend([f"Critical alert: {a['message']}" for a in critical_alerts])
 
-        # Check performance metrics
-        recent_performance = (
-            list(self.performance_stream)[-10:] if self.performance_stream else []
-        )
-        if recent_performance:
-            error_rates = [
-                m["value"]
-                for m in recent_performance
-                if m["metric_type"] == "error_rate"
-            ]
-            if (
-                error_rates
-                and max(error_rates)
-                > self.config["alert_thresholds"]["high_error_rate"]
-            ):
-                health_score -= 15
-                issues.append("High error rate detected")
+        # Check recent error rates
+        error_rates = self.metrics.series.get("performance.error_rate")
+        if (
+            error_rates
+            and error_rates.recent
+            and max(error_rates.recent)
+            > self.config["alert_thresholds"]["high_error_rate"]
+        ):
+            health_score -= 15
+            issues.append("High error rate detected")
 
         # Determine health status
         if health_score >= 90:
@@ -536,65 +578,25 @@ class RealTimeAnalytics:
     async def _get_performance_history(self) -> Dict[str, List]:
         """📊 Get performance history for charts"""
 
-        # Get last 24 hours of data points for charting
-        current_time = time.time()
-        cutoff_time = current_time - 86400
-
-        recent_metrics = [
-            m for m in self.performance_stream if m["timestamp"] > cutoff_time
-        ]
-
-        # Group by hour for trend visualization
-        hourly_data = defaultdict(list)
-        for metric in recent_metrics:
-            hour = int(metric["timestamp"] // 3600) * 3600
-            hourly_data[hour].append(metric)
-
-        # Aggregate hourly data
-        history = {
-            "timestamps": [],
-            "cpu_usage": [],
-            "memory_usage": [],
-            "response_time": [],
-            "error_rate": [],
-        }
+        # Hourly rollups of the last 24 hours
+        cutoff_time = time.time() - 86400
 
-        for hour in sorted(hourly_data.keys()):
-            hour_metrics = hourly_data[hour]
-            history["timestamps"].append(hour)
-
-            # Calculate averages for the hour
-            cpu_values = [
-                m["value"] for m in hour_metrics if m["metric_type"] == "cpu_usage"
-            ]
-            memory_values = [
-                m["value"] for m in hour_metrics if m["metric_type"] == "memory_usage"
-            ]
-            response_values = [
-                m["value"] for m in hour_metrics if m["metric_type"] == "response_time"
-            ]
-            error_values = [
-                m["value"] for m in hour_metrics if m["metric_type"] == "error_rate"
-            ]
-
-            history["cpu_usage"].append(
-                statistics.mean(cpu_values) if cpu_values else 0
-            )
-            history["memory_usage"].append(
-                statistics.mean(memory_values) if memory_values else 0
-            )
-            history["response_time"].append(
-                statistics.mean(response_values) if response_values else 0
-            )
-            history["error_rate"].append(
-                statistics.mean(error_values) if error_values else 0
+        hourly_means = {}
+        for name in self.metrics.names("performance."):
+            buckets = self.metrics.get(name).query(cutoff_time, resolution="1h")
+            hourly_means[name] = dict(
+                zip(buckets.timestamps.tolist(), buckets.mean.tolist())
             )
 
+        hours = sorted(set().union(*hourly_means.values()))
+        history = {"timestamps": hours}
+        for column in ("cpu_usage", "memory_usage", "response_time", "error_rate"):
+            means = hourly_means.get(f"performance.{column}", {})
+            history[column] = [means.get(hour, 0) for hour in hours]
+
         return history
 
-    async def _analyze_behavioral_patterns(
-        self, activities: List[Dict]
-    ) -> Dict[str, Any]:
+    async def _analyze_behavioral_patterns(self, cutoff_time: float) -> Dict[str, Any]:
         """🧠 Analyze user behavioral patterns"""
 
         patterns = {
@@ -604,28 +606,24 @@ class RealTimeAnalytics:
             "anomalous_behavior": [],
         }
 
-        if not activities:
+        buckets = self.metrics.get("activity.all").query(cutoff_time, resolution="1h")
+        if not len(buckets):
             return patterns
 
         # Activity distribution by hour
         hourly_activity = defaultdict(int)
-        for activity in activities:
-            hour = datetime.fromtimestamp(activity["timestamp"]).hour
-            hourly_activity[hour] += 1
+        for hour_start, count in zip(
+            buckets.timestamps.tolist(), buckets.count.tolist()
+        ):
+            hourly_activity[datetime.fromtimestamp(hour_start).hour] += count
 
         # Find peak activity hours
-        if hourly_activity:
-            max_activity = max(hourly_activity.values())
-            peak_hours = [
-                hour
-                for hour, count in hourly_activity.items()
-                if count > max_activity * 0.8
-            ]
-            patterns["activity_peaks"] = peak_hours
-
-        # Risk indicators
-        risk_activities = [a for a in activities if a["trust_impact"] < -5]
-        patterns["risk_indicators"] = len(risk_activities)
+        max_activity = max(hourly_activity.values())
+        patterns["activity_peaks"] = [
+            hour
+            for hour, count in hourly_activity.items()
+            if count > max_activity * 0.8
+        ]
 
         return patterns
 
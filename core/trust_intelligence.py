@@ -22,6 +22,8 @@ from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, asdict
 from functools import lru_cache
 
+from utils.bounded_store import BoundedStore
+
 # Optional ML imports
 try:
     import numpy as np
@@ -31,7 +33,7 @@ except ImportError:
     NUMPY_AVAILABLE = False
 
 
-@dataclass
+@dataclass(slots=True)
 class TrustMetrics:
     """📊 Comprehensive trust metrics"""
 
@@ -77,7 +79,14 @@ class UltraIntelligentTrustSystem:
         self.logger = logging.getLogger("astra.trust_system")
 
         # 🎯 TRUST DATA STRUCTURES
-        self.user_trust_profiles = {}  # user_id -> TrustMetrics
+        # user_id -> TrustMetrics; users idle for a week are dropped along
+        # with their patterns and predictions
+        self.user_trust_profiles = BoundedStore(
+            "trust.profiles",
+            max_entries=20000,
+            ttl=7 * 86400,
+            on_evict=self._forget_user,
+        )
         self.behavioral_patterns = defaultdict(
             lambda: defaultdict(list)
         )  # user_id -> pattern_type -> [data]
@@ -145,6 +154,11 @@ class UltraIntelligentTrustSystem:
         self._monitoring_active = False
         self._last_cleanup = time.time()
 
+    def _forget_user(self, user_id: int, profile: TrustMetrics):
+        """Drop per-user side data when a trust profile is evicted"""
+        self.behavioral_patterns.pop(user_id, None)
+        self.trust_predictions.pop(user_id, None)
+
     async def start_trust_system(self):
         """🚀 Start the ultra-intelligent trust system"""
         if self._monitoring_active:
@@ -701,12 +715,13 @@ class UltraIntelligentTrustSystem:
     async def _update_behavioral_patterns(self, user_id: int, current_time: float):
         """🔄 Update behavioral patterns for a user"""
 
-        patterns = self.behavioral_patterns[user_id]
-        profile = self.user_trust_profiles.get(user_id)
+        profile = self.user_trust_profiles.peek(user_id)
 
         if not profile:
             return
 
+        patterns = self.behavioral_patterns[user_id]
+
         # Store trust history
         if "trust_history" not in patterns:
             patterns["trust_history"] = []
@@ -760,8 +775,9 @@ class UltraIntelligentTrustSystem:
 
         current_time = time.time()
 
-        for user_id, prediction in self.trust_predictions.items():
-            profile = self.user_trust_profiles.get(user_id)
+        # peek() may expire a profile, whose eviction drops its prediction
+        for user_id, prediction in list(self.trust_predictions.items()):
+            profile = self.user_trust_profiles.peek(user_id)
 
             if not profile:
                 continue
@@ -855,16 +871,16 @@ class UltraIntelligentTrustSystem:
         # Clean old predictions
         old_predictions = [
             user_id
-            for user_id, pred in self.trust_predictions.items()
+            for user_id, pred in list(self.trust_predictions.items())
             if current_time
-            - self.user_trust_profiles.get(
+            - self.user_trust_profiles.peek(
                 user_id, type("", (), {"last_updated": 0})
             ).last_updated
             > pred.time_horizon * 2
         ]
 
         for user_id in old_predictions:
-            del self.trust_predictions[user_id]
+            self.trust_predictions.pop(user_id, None)
 
     async def _optimize_trust_recovery(self):
         """✨ Optimize trust recovery for improving users"""
@@ -922,6 +938,7 @@ class UltraIntelligentTrustSystem:
             "monitoring_active": self._monitoring_active,
             # User statistics
             "total_users": len(self.user_trust_profiles),
+            "profile_store": self.user_trust_profiles.get_stats(),
             "trust_distribution": trust_distribution,
             "risk_distribution": risk_distribution,
             # System statistics
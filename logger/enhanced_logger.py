@@ -4,15 +4,20 @@ Provides structured logging with file rotation and performance monitoring
 """
 
 import asyncio
+import atexit
+import json
 import logging
 import logging.handlers
+import queue
 import sys
+import threading
 import time
 import traceback
 import functools
+from collections import defaultdict, deque
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
 try:
     import colorlog
@@ -55,27 +60,213 @@ class AstraFormatter(logging.Formatter):
             return super().format(record)
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """Compact one-object-per-line format for log shippers"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+class RateLimitFilter(logging.Filter):
+    """Per-logger token bucket and sampling for records below WARNING.
+
+    Each logger may emit ``rate`` records per second with bursts of up to
+    ``burst``. High-volume call sites can additionally be sampled, either
+    per logger prefix (``sample_rates``) or per call with
+    ``extra={"sample_rate": 0.1}``; sampling keeps every Nth record of a
+    message template. Warnings and errors always pass.
+    """
+
+    def __init__(
+        self,
+        rate: float = 50.0,
+        burst: int = 200,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_rates = dict(sample_rates or {})
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self._buckets: Dict[str, List[float]] = {}
+        self._sample_counts: Dict[tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _sample_rate(self, record) -> float:
+        rate = getattr(record, "sample_rate", None)
+        if rate is not None:
+            return rate
+        name = record.name
+        while name:
+            if name in self.sample_rates:
+                return self.sample_rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        with self._lock:
+            sample_rate = self._sample_rate(record)
+            if sample_rate < 1.0:
+                key = (record.name, record.msg)
+                count = self._sample_counts[key]
+                self._sample_counts[key] = count + 1
+                if sample_rate <= 0 or count % round(1 / sample_rate):
+                    self.dropped[record.name] += 1
+                    return False
+
+            now = time.monotonic()
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                self.dropped[record.name] += 1
+                return False
+            bucket[0] = tokens - 1
+            return True
+
+
+class AstraQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting them.
+
+    Message arguments are merged on the writer thread, so pass immutable
+    values (or pre-formatted strings) as logging arguments. When the queue
+    is full the record is dropped instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.queue_full_drops = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.queue_full_drops += 1
+
+
+class AstraQueueListener(logging.handlers.QueueListener):
+    """Queue listener whose stop waits for room instead of failing on a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class RecentRecordsHandler(logging.Handler):
+    """Keeps the last ``capacity`` formatted records in memory"""
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__()
+        self.records: deque = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.records.append((record.levelno, record.name, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+
+# Running writer threads by logger name
+_listeners: Dict[str, AstraQueueListener] = {}
+_queue_handlers: Dict[str, AstraQueueHandler] = {}
+_rate_limiters: Dict[str, RateLimitFilter] = {}
+_recent_handlers: Dict[str, RecentRecordsHandler] = {}
+
+
+def stop_logging():
+    """Drain every queued record and stop the writer threads"""
+    for name in list(_listeners):
+        listener = _listeners.pop(name)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_logging)
+
+
+def get_recent_records(name: str = "Astra") -> Optional[deque]:
+    """(level, logger, text) of the latest records written by a pipeline"""
+    handler = _recent_handlers.get(name)
+    return handler.records if handler is not None else None
+
+
+def get_logging_stats() -> Dict[str, Dict[str, int]]:
+    """Queue depth and dropped-record counts per pipeline"""
+    stats = {}
+    for name, handler in _queue_handlers.items():
+        limiter = _rate_limiters[name]
+        stats[name] = {
+            "queued": handler.queue.qsize(),
+            "queue_full_drops": handler.queue_full_drops,
+            "rate_limited": sum(limiter.dropped.values()),
+            "rate_limited_by_logger": dict(limiter.dropped),
+        }
+    return stats
+
+
 def setup_enhanced_logger(
     name: str = "Astra",
     log_level: str = "INFO",
     log_file: Optional[str] = None,
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
     backup_count: int = 5,
+    json_format: bool = False,
+    rate_limit: float = 50.0,
+    rate_limit_burst: int = 200,
+    sample_rates: Optional[Dict[str, float]] = None,
+    route_loggers: Iterable[str] = (),
+    queue_size: int = 10000,
+    recent_capacity: int = 1000,
 ) -> logging.Logger:
-    """Set up enhanced logger with file rotation and console output"""
+    """Set up enhanced logger with file rotation and console output.
+
+    Records are put on a bounded queue and written by a background
+    ``QueueListener`` thread, so logging never does file or console I/O on
+    the caller's thread. ``route_loggers`` names other logger trees (e.g.
+    ``"astra"``) to send through the same pipeline instead of propagating
+    to the root logger.
+    """
 
     # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, log_level.upper()))
+    level = getattr(logging, log_level.upper())
+    logger.setLevel(level)
 
     # Clear existing handlers to prevent duplicates
     logger.handlers.clear()
+    previous = _listeners.pop(name, None)
+    if previous is not None:
+        previous.stop()
+        for handler in previous.handlers:
+            handler.close()
+
+    file_formatter = (
+        JsonLinesFormatter() if json_format else AstraFormatter(include_colors=False)
+    )
 
     # Console handler with colors
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(AstraFormatter(include_colors=True))
-    logger.addHandler(console_handler)
 
     # File handler with rotation
     if log_file is None:
@@ -88,8 +279,7 @@ def setup_enhanced_logger(
         log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(AstraFormatter(include_colors=False))
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(file_formatter)
 
     # Error file handler (errors only)
     error_file = log_path.parent / f"{log_path.stem}_errors.log"
@@ -97,13 +287,51 @@ def setup_enhanced_logger(
         error_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
     )
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(AstraFormatter(include_colors=False))
-    logger.addHandler(error_handler)
+    error_handler.setFormatter(file_formatter)
+
+    # Latest records for instant /admin logs lookups
+    recent_handler = RecentRecordsHandler(recent_capacity)
+    recent_handler.setLevel(logging.DEBUG)
+    recent_handler.setFormatter(AstraFormatter(include_colors=False))
+
+    # Writer thread owns the real handlers; loggers only enqueue
+    queue_handler = AstraQueueHandler(queue.Queue(maxsize=queue_size))
+    rate_limiter = RateLimitFilter(rate_limit, rate_limit_burst, sample_rates)
+    queue_handler.addFilter(rate_limiter)
+    listener = AstraQueueListener(
+        queue_handler.queue,
+        console_handler,
+        file_handler,
+        error_handler,
+        recent_handler,
+        respect_handler_level=True,
+    )
+    listener.start()
+    _listeners[name] = listener
+    _queue_handlers[name] = queue_handler
+    _rate_limiters[name] = rate_limiter
+    _recent_handlers[name] = recent_handler
+
+    logger.addHandler(queue_handler)
+    # Root handlers would write synchronously (and duplicate every line)
+    logger.propagate = False
+    for routed_name in route_loggers:
+        routed = logging.getLogger(routed_name)
+        routed.setLevel(level)
+        routed.handlers = [
+            handler
+            for handler in routed.handlers
+            if not isinstance(handler, AstraQueueHandler)
+        ]
+        routed.addHandler(queue_handler)
+        routed.propagate = False
 
     # Log startup info
     logger.info(f"Enhanced logger initialized for {name}")
     logger.info(f"Log level: {log_level}")
     logger.info(f"Log file: {log_path}")
+    if json_format:
+        logger.info("Log file format: JSON lines")
 
     return logger
 
@@ -127,7 +355,8 @@ def log_performance(logger: logging.Logger):
                 )
                 logger.debug(traceback.format_exc())
                 raise
-## for a new 
+
+        ## for a new
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
             start_time = time.time()
@@ -0,0 +1,196 @@
+"""
+Log reader for Astra Bot
+Tails and searches rotated log files by reading backwards in blocks, off the event loop
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from logger.enhanced_logger import get_recent_records
+
+# "2025-01-01 12:00:00 | INFO     | astra.x | func:12 | message"
+_TEXT_HEADER = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \| ")
+
+
+def _reverse_lines(path: Path, block_size: int) -> Iterator[str]:
+    """Lines of a file from last to first, reading ``block_size`` bytes at a time"""
+    with open(path, "rb") as handle:
+        position = handle.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            handle.seek(position)
+            lines = (handle.read(size) + remainder).split(b"\n")
+            # The first piece may continue in the previous block
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line.decode("utf-8", "replace").rstrip("\r")
+        if remainder:
+            yield remainder.decode("utf-8", "replace").rstrip("\r")
+
+
+def _parse_header(line: str) -> Optional[Tuple[int, str]]:
+    """(level number, logger name) of a record's first line, None for continuations"""
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+            return logging.getLevelName(entry["level"]), entry["logger"]
+        except (ValueError, KeyError):
+            return None
+    if _TEXT_HEADER.match(line):
+        parts = line.split(" | ", 3)
+        if len(parts) >= 3:
+            level = logging.getLevelName(parts[1].strip())
+            return (level if isinstance(level, int) else 0), parts[2].strip()
+    return None
+
+
+def _matches(
+    level: int,
+    name: str,
+    text: str,
+    min_level: int,
+    logger_prefix: Optional[str],
+    contains: Optional[str],
+) -> bool:
+    if level < min_level:
+        return False
+    if logger_prefix and not (
+        name == logger_prefix or name.startswith(logger_prefix + ".")
+    ):
+        return False
+    return not contains or contains in text.lower()
+
+
+class LogReader:
+    """Tail and search over a log file and its rotated backups.
+
+    Files are read from the end in blocks, so the cost of a tail or a
+    search that finds ``limit`` matches depends on how far back the results
+    are, not on the size of the files. All file work runs in a thread.
+    """
+
+    def __init__(
+        self,
+        log_file: Union[str, Path] = "logs/astra.log",
+        logger_name: str = "Astra",
+        block_size: int = 64 * 1024,
+    ):
+        self.log_file = Path(log_file)
+        self.logger_name = logger_name
+        self.block_size = block_size
+
+    def files(self) -> List[Path]:
+        """Current file first, then ``.1``, ``.2``... backups that exist"""
+        files = [self.log_file] if self.log_file.exists() else []
+        index = 1
+        while True:
+            rotated = self.log_file.with_name(f"{self.log_file.name}.{index}")
+            if not rotated.exists():
+                break
+            files.append(rotated)
+            index += 1
+        return files
+
+    # ------------------------------------------------------------------
+    # Tail
+    # ------------------------------------------------------------------
+
+    def tail_sync(self, count: int) -> List[str]:
+        """Last ``count`` lines across rotated files, oldest first"""
+        lines: List[str] = []
+        for path in self.files():
+            for line in _reverse_lines(path, self.block_size):
+                lines.append(line)
+                if len(lines) >= count:
+                    return lines[::-1]
+        return lines[::-1]
+
+    async def tail(self, count: int) -> List[str]:
+        return await asyncio.to_thread(self.tail_sync, count)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _reverse_records(self) -> Iterator[Tuple[int, str, str]]:
+        """(level, logger, text) of every record, newest first"""
+        continuation: List[str] = []
+        for path in self.files():
+            for line in _reverse_lines(path, self.block_size):
+                header = _parse_header(line)
+                if header is None:
+                    continuation.append(line)
+                    continue
+                text = "\n".join([line, *reversed(continuation)])
+                continuation.clear()
+                yield header[0], header[1], text
+
+    def search_sync(
+        self,
+        level: Optional[str] = None,
+        logger_name: Optional[str] = None,
+        contains: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[str]:
+        """Newest ``limit`` records matching every filter, oldest first.
+
+        ``level`` is a minimum (``"WARNING"`` includes errors),
+        ``logger_name`` matches that logger and its children, and
+        ``contains`` is a case-insensitive substring.
+        """
+        min_level = logging.getLevelName(level.upper()) if level else 0
+        needle = contains.lower() if contains else None
+        results: List[str] = []
+        for record_level, name, text in self._reverse_records():
+            if _matches(record_level, name, text, min_level, logger_name, needle):
+                results.append(text)
+                if len(results) >= limit:
+                    break
+        return results[::-1]
+
+    def recent(
+        self,
+        level: Optional[str] = None,
+        logger_name: Optional[str] = None,
+        contains: Optional[str] = None,
+        limit: int = 50,
+    ) -> Optional[List[str]]:
+        """Matches from the in-memory ring, or None if it holds fewer than ``limit``"""
+        ring = get_recent_records(self.logger_name)
+        if ring is None:
+            return None
+        min_level = logging.getLevelName(level.upper()) if level else 0
+        needle = contains.lower() if contains else None
+        results: List[str] = []
+        for record_level, name, text in reversed(list(ring)):
+            if _matches(record_level, name, text, min_level, logger_name, needle):
+                results.append(text)
+                if len(results) >= limit:
+                    return results[::-1]
+        return None
+
+    async def search(
+        self,
+        level: Optional[str] = None,
+        logger_name: Optional[str] = None,
+        contains: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[str]:
+        """Matching records from the recent ring when it has enough, else from disk"""
+        recent = self.recent(level, logger_name, contains, limit)
+        if recent is not None:
+            return recent
+        return await asyncio.to_thread(
+            self.search_sync, level, logger_name, contains, limit
+        )
+
+
+__all__ = ["LogReader"]
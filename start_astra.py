@@ -41,15 +41,31 @@ def main():
     # Configure environment FIRST
     setup_environment()
 
+    # Startup profiling: record per-module import and init times
+    profile_startup = "--profile-startup" in sys.argv[1:]
+    if profile_startup:
+        os.environ["ASTRA_PROFILE_STARTUP"] = "1"
+        from utils.startup_profiler import startup_profiler
+
+        startup_profiler.install()
+        print("⏱️ Startup profiling enabled - report written after setup completes")
+
     # Now import and run the main bot
     try:
         # Import the main bot module
         import importlib.util
+        import time
 
+        import_start = time.perf_counter()
         spec = importlib.util.spec_from_file_location("bot", "bot.1.0.py")
         bot_module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(bot_module)
 
+        if profile_startup:
+            startup_profiler.record_init(
+                "import:bot.1.0.py", time.perf_counter() - import_start
+            )
+
         # Run the bot's main function if it exists
         if hasattr(bot_module, "main"):
             import asyncio
@@ -0,0 +1,40 @@
+"""
+Tests for the buffered row writer
+"""
+
+import asyncio
+
+from utils.write_buffer import BufferedWriter
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.batches = []
+
+    async def execute_many(self, sql, rows):
+        self.batches.append(list(rows))
+
+
+def test_trickle_below_batch_size_is_flushed_on_timer():
+    async def scenario():
+        storage = RecordingStorage()
+        writer = BufferedWriter(
+            storage, "INSERT INTO t VALUES (?)", batch_size=10, flush_interval=0.05
+        )
+
+        # A full batch flushes on size
+        for value in range(10):
+            await writer.add((value,))
+        await asyncio.sleep(0.02)
+        assert writer.pending == 0
+
+        # A few rows after that flush must still go out on the timer
+        for value in range(3):
+            await writer.add((value,))
+        await asyncio.sleep(0.2)
+        assert writer.pending == 0
+        assert storage.batches[-1] == [(0,), (1,), (2,)]
+
+        await writer.close()
+
+    asyncio.run(scenario())
@@ -1,24 +1,50 @@
 """
 Utility modules for Astra Bot
-Provides database, error handling, permissions, and HTTP utilities
+Provides database, storage engine, error handling, permissions, and HTTP utilities
+Names are resolved lazily on first access, so importing one utility module
+doesn't import (or initialize) all the others
 """
 
-# Import all utility modules to ensure they're available
-from utils.database import db, SimpleDatabaseManager as DatabaseManager
-from utils.enhanced_error_handler import ErrorHandler
-from utils.permissions import (
-    PermissionLevel,
-    PermissionManager,
-    has_permission,
-    setup_permissions,
-)
-from utils.http_manager import (
-    HTTPClient,
-    get_session,
-    get_json,
-    post_json,
-    cleanup_http,
-)
+from typing import TYPE_CHECKING
+
+from utils.lazy_loader import lazy_exports
+
+if TYPE_CHECKING:
+    from utils.database import db, SimpleDatabaseManager as DatabaseManager
+    from utils.enhanced_error_handler import ErrorHandler
+    from utils.permissions import (
+        PermissionLevel,
+        PermissionManager,
+        has_permission,
+        setup_permissions,
+    )
+    from utils.http_manager import (
+        HTTPClient,
+        get_session,
+        get_json,
+        post_json,
+        cleanup_http,
+    )
+    from utils.storage_engine import storage_engine, get_storage
+
+_EXPORTS = {
+    "db": ("utils.database", "db"),
+    "DatabaseManager": ("utils.database", "SimpleDatabaseManager"),
+    "ErrorHandler": ("utils.enhanced_error_handler", "ErrorHandler"),
+    "PermissionLevel": ("utils.permissions", "PermissionLevel"),
+    "PermissionManager": ("utils.permissions", "PermissionManager"),
+    "has_permission": ("utils.permissions", "has_permission"),
+    "setup_permissions": ("utils.permissions", "setup_permissions"),
+    "HTTPClient": ("utils.http_manager", "HTTPClient"),
+    "get_session": ("utils.http_manager", "get_session"),
+    "get_json": ("utils.http_manager", "get_json"),
+    "post_json": ("utils.http_manager", "post_json"),
+    "cleanup_http": ("utils.http_manager", "cleanup_http"),
+    "storage_engine": ("utils.storage_engine", "storage_engine"),
+    "get_storage": ("utils.storage_engine", "get_storage"),
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
 
 __all__ = [
     "db",
@@ -35,4 +61,6 @@ __all__ = [
     "get_json",
     "post_json",
     "cleanup_http",
+    "storage_engine",
+    "get_storage",
 ]
@@ -0,0 +1,316 @@
+"""
+Bounded State Store for Astra Bot
+Dict-like LRU/TTL store for per-user state with write-back of dirty entries on eviction
+"""
+
+import asyncio
+import inspect
+import logging
+import sys
+import time
+import weakref
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("astra.bounded_store")
+
+# Callbacks receive (key, value); write-backs may return an awaitable, which is
+# scheduled on the running event loop
+EvictionCallback = Callable[[Hashable, Any], Any]
+
+
+class _Entry:
+    __slots__ = ("value", "touched", "dirty")
+
+    def __init__(self, value: Any, touched: float, dirty: bool):
+        self.value = value
+        self.touched = touched
+        self.dirty = dirty
+
+
+def deep_sizeof(obj: Any, limit: int = 10000) -> int:
+    """Approximate resident size of an object graph in bytes.
+
+    Follows containers, ``__dict__`` and ``__slots__``; each object is
+    counted once and at most ``limit`` objects are visited.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < limit:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+
+        if isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(vars(current))
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if slot not in ("__dict__", "__weakref__") and hasattr(
+                        current, slot
+                    ):
+                        stack.append(getattr(current, slot))
+    return total
+
+
+class BoundedStore(MutableMapping):
+    """Per-key state bounded by entry count and idle time.
+
+    Behaves like a dict, so it can replace ``Dict[int, State]`` attributes
+    directly. Reading an entry (``store[key]``/``get``) marks it recently
+    used; ``peek``, ``in``, ``len`` and ``items()``/``values()`` snapshots
+    do not.
+
+    Entries beyond ``max_entries`` are evicted least recently used first,
+    and entries idle for more than ``ttl`` seconds expire. Evicted entries
+    that are dirty are handed to ``write_back`` first; ``on_evict`` runs for
+    every evicted entry (e.g. to drop side tables keyed the same way).
+    Assignment marks an entry dirty; use ``put(key, value, dirty=False)``
+    for values just loaded from storage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+        write_back: Optional[EvictionCallback] = None,
+        on_evict: Optional[EvictionCallback] = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.write_back = write_back
+        self.on_evict = on_evict
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._pending_writes: set = set()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "write_backs": 0,
+            "write_back_errors": 0,
+        }
+
+        _stores[name] = self
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+
+    def _live_entry(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and time.monotonic() - entry.touched > self.ttl:
+            self._evict(key, expired=True)
+            return None
+        return entry
+
+    def __getitem__(self, key: Hashable) -> Any:
+        entry = self._live_entry(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            raise KeyError(key)
+        self.stats["hits"] += 1
+        entry.touched = time.monotonic()
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.put(key, value)
+
+    def __delitem__(self, key: Hashable):
+        # Explicit removal: the caller owns the value, so no write-back
+        del self._entries[key]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Read an entry without marking it used (for background sweeps)"""
+        entry = self._live_entry(key)
+        return default if entry is None else entry.value
+
+    def __contains__(self, key: object) -> bool:
+        return self._live_entry(key) is not None
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._entries)
+
+    def values(self) -> List[Any]:
+        return [entry.value for entry in self._entries.values()]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        return [(key, entry.value) for key, entry in self._entries.items()]
+
+    # ------------------------------------------------------------------
+    # State tracking
+    # ------------------------------------------------------------------
+
+    def put(self, key: Hashable, value: Any, dirty: bool = True):
+        """Insert or replace an entry, evicting the oldest when over capacity"""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None:
+            self._entries[key] = _Entry(value, now, dirty)
+            self.expire()
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+        else:
+            entry.value = value
+            entry.touched = now
+            entry.dirty = entry.dirty or dirty
+            self._entries.move_to_end(key)
+
+    def mark_dirty(self, key: Hashable):
+        """Flag an entry as changed since it was last persisted"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.dirty = True
+
+    def mark_clean(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.dirty = False
+
+    def dirty_items(self) -> List[Tuple[Hashable, Any]]:
+        """Entries changed since they were last persisted"""
+        return [
+            (key, entry.value) for key, entry in self._entries.items() if entry.dirty
+        ]
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def expire(self) -> int:
+        """Evict entries idle for longer than ``ttl``; returns how many"""
+        if self.ttl is None:
+            return 0
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        # Entries are kept in access order, so stop at the first fresh one
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.touched > cutoff:
+                break
+            self._evict(key, expired=True)
+            expired += 1
+        return expired
+
+    def _evict(self, key: Hashable, expired: bool = False):
+        entry = self._entries.pop(key)
+        self.stats["expirations" if expired else "evictions"] += 1
+        if entry.dirty and self.write_back is not None:
+            self._run_callback(self.write_back, key, entry.value, write_back=True)
+        if self.on_evict is not None:
+            self._run_callback(self.on_evict, key, entry.value)
+
+    def _run_callback(
+        self,
+        callback: EvictionCallback,
+        key: Hashable,
+        value: Any,
+        write_back: bool = False,
+    ):
+        try:
+            result = callback(key, value)
+            if inspect.isawaitable(result):
+                task = asyncio.get_running_loop().create_task(
+                    self._await_callback(result, key)
+                )
+                self._pending_writes.add(task)
+                task.add_done_callback(self._pending_writes.discard)
+            elif write_back:
+                self.stats["write_backs"] += 1
+        except Exception as e:
+            self.stats["write_back_errors"] += 1
+            logger.error(f"❌ {self.name}: eviction callback failed for {key}: {e}")
+
+    async def _await_callback(self, awaitable, key: Hashable):
+        try:
+            await awaitable
+            self.stats["write_backs"] += 1
+        except Exception as e:
+            self.stats["write_back_errors"] += 1
+            logger.error(f"❌ {self.name}: write-back failed for {key}: {e}")
+
+    async def flush(self):
+        """Write back every dirty entry without evicting it"""
+        if self.write_back is None:
+            return
+        for key, value in self.dirty_items():
+            self.mark_clean(key)
+            try:
+                result = self.write_back(key, value)
+                if inspect.isawaitable(result):
+                    await result
+                self.stats["write_backs"] += 1
+            except Exception as e:
+                self.mark_dirty(key)
+                self.stats["write_back_errors"] += 1
+                logger.error(f"❌ {self.name}: write-back failed for {key}: {e}")
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def approx_bytes(self, sample_size: int = 64) -> int:
+        """Resident size estimate from a sample of entries"""
+        count = len(self._entries)
+        if count == 0:
+            return 0
+        step = max(1, count // sample_size)
+        sample = [
+            entry.value for entry in list(self._entries.values())[::step][:sample_size]
+        ]
+        per_entry = sum(deep_sizeof(value) for value in sample) / len(sample)
+        return int(per_entry * count)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+            "hit_rate": (
+                round(self.stats["hits"] / lookups * 100, 2) if lookups else 0.0
+            ),
+            "approx_bytes": self.approx_bytes(),
+        }
+
+
+# Every live store by name, for memory reporting
+_stores: "weakref.WeakValueDictionary[str, BoundedStore]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def get_store_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every bounded store currently alive"""
+    return {name: store.get_stats() for name, store in list(_stores.items())}
+
+
+__all__ = ["BoundedStore", "deep_sizeof", "get_store_stats"]
@@ -29,7 +29,9 @@ def feature_enabled(feature_path: str):
     """
 
     async def predicate(interaction) -> bool:
-        if not config_manager.is_feature_enabled(feature_path):
+        if not config_manager.is_feature_enabled(
+            feature_path, guild_id=getattr(interaction, "guild_id", None)
+        ):
             # Check if the user is an admin and in development mode
             if (
                 config_manager.get("development.debug_mode", False)
@@ -524,29 +524,38 @@ class SimpleDatabaseManager:
 
     async def cleanup_old_data(self, days: int = 30):
         """Clean up old data to maintain performance"""
-        async with self.pool.get_connection() as db:
-            cutoff_date = datetime.utcnow().timestamp() - (days * 24 * 3600)
-
-            # Clean old analytics
-            await db.execute(
-                "DELETE FROM analytics WHERE timestamp < datetime(?, 'unixepoch')",
-                (cutoff_date,),
-            )
-
-            # Clean old AI conversations
-            await db.execute(
-                "DELETE FROM ai_conversations WHERE timestamp < datetime(?, 'unixepoch')",
-                (cutoff_date,),
-            )
-
-            # Clean resolved errors older than 7 days
-            week_cutoff = datetime.utcnow().timestamp() - (7 * 24 * 3600)
-            await db.execute(
-                "DELETE FROM error_logs WHERE resolved = TRUE AND timestamp < datetime(?, 'unixepoch')",
-                (week_cutoff,),
-            )
-
-            await db.commit()
+        from utils.retention import RetentionJob, retention_scheduler
+
+        cutoff_date = datetime.utcnow().timestamp() - (days * 24 * 3600)
+        week_cutoff = datetime.utcnow().timestamp() - (7 * 24 * 3600)
+
+        # Bounded batches so the file is never locked for long
+        await retention_scheduler.run_jobs(
+            [
+                RetentionJob(
+                    name="astra.analytics",
+                    db_path=self.db_path,
+                    table="analytics",
+                    where="timestamp < datetime(?, 'unixepoch')",
+                    params=(cutoff_date,),
+                ),
+                RetentionJob(
+                    name="astra.ai_conversations",
+                    db_path=self.db_path,
+                    table="ai_conversations",
+                    where="timestamp < datetime(?, 'unixepoch')",
+                    params=(cutoff_date,),
+                ),
+                # Resolved errors older than 7 days
+                RetentionJob(
+                    name="astra.error_logs",
+                    db_path=self.db_path,
+                    table="error_logs",
+                    where="resolved = TRUE AND timestamp < datetime(?, 'unixepoch')",
+                    params=(week_cutoff,),
+                ),
+            ]
+        )
 
         # Clear expired cache entries
         now = datetime.utcnow().timestamp()
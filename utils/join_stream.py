@@ -0,0 +1,354 @@
+"""
+Join Stream Analyzer for Astra Bot
+Per-guild sliding-window join rates, account-age histograms and similar-name clustering
+"""
+
+import bisect
+import logging
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import discord
+
+logger = logging.getLogger("astra.join_stream")
+
+# Account-age histogram bins: bin ``i`` holds ages below ``AGE_BOUNDS[i]``
+AGE_BOUNDS: Tuple[int, ...] = (3600, 86400, 7 * 86400, 30 * 86400, 365 * 86400)
+AGE_LABELS: Tuple[str, ...] = ("<1h", "<1d", "<7d", "<30d", "<1y", "1y+")
+YOUNG_BINS = 2  # Accounts younger than a day
+
+# Names of two accounts are "similar" above this estimated Jaccard similarity
+SIMILARITY_THRESHOLD = 0.5
+MINHASH_BANDS = 8
+MINHASH_ROWS = 2
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_HASH_PARAMS: Tuple[Tuple[int, int], ...] = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_BANDS * MINHASH_ROWS)
+)
+_DIGITS = re.compile(r"\d+")
+
+
+def _shingles(name: str) -> Set[int]:
+    """Hashed character trigrams of a normalised name (digit runs collapse to ``#``)"""
+    text = f"^{_DIGITS.sub('#', name.lower())}$"
+    if len(text) < 3:
+        return {zlib.crc32(text.encode())}
+    return {zlib.crc32(text[i : i + 3].encode()) for i in range(len(text) - 2)}
+
+
+def minhash(name: str) -> Tuple[int, ...]:
+    """MinHash signature of a name's trigram set"""
+    shingles = _shingles(name)
+    return tuple(
+        min((a * shingle + b) % _MERSENNE_PRIME for shingle in shingles)
+        for a, b in _HASH_PARAMS
+    )
+
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class SlidingWindowHistogram:
+    """Counts per bin over the last ``window`` seconds, in 1 second buckets.
+
+    Adding and reading are O(1) amortised: a running total per bin is kept,
+    and buckets that fall out of the window are subtracted once as time
+    moves past them.
+    """
+
+    __slots__ = ("window", "bins", "_slots", "_totals", "_count", "_second")
+
+    def __init__(self, window: int, bins: int = 1):
+        self.window = window
+        self.bins = bins
+        self._slots = [[0] * bins for _ in range(window)]
+        self._totals = [0] * bins
+        self._count = 0
+        self._second: Optional[int] = None
+
+    def _advance(self, now: float):
+        second = int(now)
+        if self._second is None:
+            self._second = second
+            return
+        if second <= self._second:
+            return
+        # Only the buckets skipped since the last call expire
+        for step in range(1, min(second - self._second, self.window) + 1):
+            bucket = self._slots[(self._second + step) % self.window]
+            for index, value in enumerate(bucket):
+                if value:
+                    self._totals[index] -= value
+                    self._count -= value
+                    bucket[index] = 0
+        self._second = second
+
+    def add(self, now: float, bin_index: int = 0):
+        self._advance(now)
+        # A timestamp slightly behind the clock counts in the current second
+        self._slots[self._second % self.window][bin_index] += 1
+        self._totals[bin_index] += 1
+        self._count += 1
+
+    def count(self, now: float) -> int:
+        self._advance(now)
+        return self._count
+
+    def totals(self, now: float) -> List[int]:
+        self._advance(now)
+        return list(self._totals)
+
+
+class NameClusterIndex:
+    """Recently joined names indexed by MinHash bands (locality-sensitive hashing).
+
+    A new name is compared only with names that share at least one band,
+    so finding its similar-name group does not scan every recent join.
+    """
+
+    def __init__(self, window: int, max_entries: int = 2000):
+        self.window = window
+        self.max_entries = max_entries
+        self._entries: Deque[Tuple[float, int, str, Tuple[int, ...]]] = deque()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._signatures: Dict[int, Tuple[str, Tuple[int, ...]]] = {}
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]):
+        for band in range(MINHASH_BANDS):
+            start = band * MINHASH_ROWS
+            yield band, signature[start : start + MINHASH_ROWS]
+
+    def _unindex(self, member_id: int, signature: Tuple[int, ...]):
+        self._signatures.pop(member_id, None)
+        for key in self._bands(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(member_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _evict(self, now: float):
+        entries = self._entries
+        while entries and (
+            now - entries[0][0] > self.window or len(entries) > self.max_entries
+        ):
+            _, member_id, _, signature = entries.popleft()
+            self._unindex(member_id, signature)
+
+    def add(self, now: float, member_id: int, name: str) -> List[str]:
+        """Index a name; returns the recent names similar to it"""
+        self._evict(now)
+        previous = self._signatures.get(member_id)
+        if previous is not None:
+            # Rejoined within the window: replace the older entry
+            self._unindex(member_id, previous[1])
+            self._entries = deque(e for e in self._entries if e[1] != member_id)
+
+        signature = minhash(name)
+        candidates: Set[int] = set()
+        for key in self._bands(signature):
+            bucket = self._buckets.setdefault(key, set())
+            candidates.update(bucket)
+            bucket.add(member_id)
+
+        similar = []
+        for candidate in candidates:
+            other_name, other_signature = self._signatures[candidate]
+            if similarity(signature, other_signature) >= SIMILARITY_THRESHOLD:
+                similar.append(other_name)
+
+        self._entries.append((now, member_id, name, signature))
+        self._signatures[member_id] = (name, signature)
+        return similar
+
+
+@dataclass
+class SuspiciousJoin:
+    """A join flagged by a cog, waiting for the burst's aggregated alert"""
+
+    member: discord.Member
+    reasons: List[str]
+    trust_penalty: int = 0
+
+
+@dataclass
+class JoinBurst:
+    """Consecutive joins of a guild with no gap longer than the quiet period"""
+
+    guild_id: int
+    started_at: float
+    last_join: float
+    joins: int = 0
+    peak_rate: int = 0
+    age_histogram: List[int] = field(default_factory=lambda: [0] * len(AGE_LABELS))
+    largest_group: List[str] = field(default_factory=list)
+    suspicious: List[SuspiciousJoin] = field(default_factory=list)
+    actions: Set[str] = field(default_factory=set)
+
+    def claim(self, action: str) -> bool:
+        """True only the first time ``action`` is claimed during this burst"""
+        if action in self.actions:
+            return False
+        self.actions.add(action)
+        return True
+
+    def is_quiet(self, now: float, quiet_period: float) -> bool:
+        return now - self.last_join >= quiet_period
+
+    @property
+    def young_accounts(self) -> int:
+        return sum(self.age_histogram[:YOUNG_BINS])
+
+    def take_suspicious(self) -> List[SuspiciousJoin]:
+        pending, self.suspicious = self.suspicious, []
+        return pending
+
+
+@dataclass(slots=True)
+class JoinSignal:
+    """One join seen against the guild's recent join stream"""
+
+    guild_id: int
+    member_id: int
+    account_age: float
+    joins: int  # In the rate window, this one included
+    young_accounts: int  # Under a day old, in the rate window
+    similar_names: List[str]  # Recent joins with a similar name
+    burst: JoinBurst
+
+    @property
+    def is_young(self) -> bool:
+        return self.account_age < AGE_BOUNDS[YOUNG_BINS - 1]
+
+    def looks_like_raid(self, threshold: int) -> bool:
+        """Many joins, or fewer that are mostly new accounts or share a name pattern"""
+        if self.joins >= threshold * 2:
+            return True
+        return self.joins >= threshold and (
+            self.young_accounts * 2 >= self.joins or len(self.similar_names) >= 2
+        )
+
+
+class JoinStreamAnalyzer:
+    """Shared analysis of every guild's member joins.
+
+    Several cogs listen to ``on_member_join``; the first one to observe a
+    join records it and the others get the same ``JoinSignal`` back, so
+    the windows count each join once whatever the listener order.
+    """
+
+    def __init__(
+        self,
+        window: int = 60,
+        name_window: int = 300,
+        quiet_period: float = 30.0,
+    ):
+        self.window = window
+        self.name_window = name_window
+        self.quiet_period = quiet_period
+        self._ages: Dict[int, SlidingWindowHistogram] = {}
+        self._names: Dict[int, NameClusterIndex] = {}
+        self._bursts: Dict[int, JoinBurst] = {}
+        self._seen: "OrderedDict[Tuple[int, int, float], JoinSignal]" = OrderedDict()
+
+    def observe(
+        self, member: discord.Member, now: Optional[float] = None
+    ) -> JoinSignal:
+        joined_at = member.joined_at.timestamp() if member.joined_at else 0.0
+        key = (member.guild.id, member.id, joined_at)
+        signal = self._seen.get(key)
+        if signal is not None:
+            return signal
+
+        now = time.time() if now is None else now
+        guild_id = member.guild.id
+        account_age = max(
+            0.0, (datetime.now(timezone.utc) - member.created_at).total_seconds()
+        )
+        bin_index = bisect.bisect_right(AGE_BOUNDS, account_age)
+
+        ages = self._ages.get(guild_id)
+        if ages is None:
+            ages = self._ages[guild_id] = SlidingWindowHistogram(
+                self.window, len(AGE_LABELS)
+            )
+        ages.add(now, bin_index)
+        totals = ages.totals(now)
+        joins = sum(totals)
+
+        names = self._names.get(guild_id)
+        if names is None:
+            names = self._names[guild_id] = NameClusterIndex(self.name_window)
+        similar = names.add(now, member.id, member.name)
+
+        burst = self._bursts.get(guild_id)
+        if burst is None or burst.is_quiet(now, self.quiet_period):
+            burst = self._bursts[guild_id] = JoinBurst(guild_id, now, now)
+        burst.last_join = now
+        burst.joins += 1
+        burst.peak_rate = max(burst.peak_rate, joins)
+        burst.age_histogram[bin_index] += 1
+        if len(similar) + 1 > len(burst.largest_group):
+            burst.largest_group = [member.name, *similar[:9]]
+
+        signal = JoinSignal(
+            guild_id=guild_id,
+            member_id=member.id,
+            account_age=account_age,
+            joins=joins,
+            young_accounts=sum(totals[:YOUNG_BINS]),
+            similar_names=similar,
+            burst=burst,
+        )
+        self._seen[key] = signal
+        while len(self._seen) > 1024:
+            self._seen.popitem(last=False)
+        return signal
+
+    def current_burst(self, guild_id: int) -> Optional[JoinBurst]:
+        return self._bursts.get(guild_id)
+
+    def join_rate(self, guild_id: int, now: Optional[float] = None) -> int:
+        """Joins in the last ``window`` seconds"""
+        ages = self._ages.get(guild_id)
+        return ages.count(time.time() if now is None else now) if ages else 0
+
+    def forget_guild(self, guild_id: int):
+        self._ages.pop(guild_id, None)
+        self._names.pop(guild_id, None)
+        self._bursts.pop(guild_id, None)
+
+
+# Global analyzer shared by every cog that reacts to joins
+join_stream = JoinStreamAnalyzer()
+
+
+def get_join_stream() -> JoinStreamAnalyzer:
+    return join_stream
+
+
+__all__ = [
+    "AGE_LABELS",
+    "JoinBurst",
+    "JoinSignal",
+    "JoinStreamAnalyzer",
+    "NameClusterIndex",
+    "SlidingWindowHistogram",
+    "SuspiciousJoin",
+    "get_join_stream",
+    "join_stream",
+    "minhash",
+    "similarity",
+]
@@ -0,0 +1,44 @@
+"""
+Lazy attribute loading for Astra Bot packages (PEP 562)
+Package __init__ modules export names without importing the heavy submodules behind them
+"""
+
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, Tuple[str, str]], namespace: dict
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Build module-level __getattr__/__dir__ for a package.
+
+    Args:
+        package: The package's __name__, used to resolve relative module paths
+        exports: Public name -> (module path, attribute name)
+        namespace: The package's globals(); resolved values are cached there so
+            the import cost is paid once and later lookups are plain dict hits
+
+    Usage in a package __init__:
+        __getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
+    """
+
+    def __getattr__(name: str):
+        try:
+            module_path, attribute = exports[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            ) from None
+
+        module = importlib.import_module(module_path, package)
+        value = getattr(module, attribute)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
+
+
+__all__ = ["lazy_exports"]
@@ -0,0 +1,330 @@
+"""
+Lockdown Executor for Astra Bot
+Plans channel permission overwrite changes, applies them concurrently and undoes them exactly
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import discord
+
+from utils.dm_fanout import AdaptiveTokenBucket
+
+logger = logging.getLogger("astra.lockdown_executor")
+
+Target = Union[discord.Role, discord.Member]
+
+
+@dataclass(slots=True)
+class OverwriteChange:
+    """New values for some permission keys of one (channel, target) overwrite.
+
+    ``previous`` holds the values those keys had before, which is all
+    an exact undo needs. ``created`` is set when the target had no
+    overwrite at all; the undo then deletes the overwrite again instead of
+    leaving an empty one behind.
+    """
+
+    channel: discord.abc.GuildChannel
+    target: Target
+    updates: Dict[str, Optional[bool]]
+    previous: Dict[str, Optional[bool]]
+    created: bool = False
+    delete_if_empty: bool = False
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.channel.id, self.target.id
+
+    def inverse(self) -> "OverwriteChange":
+        return OverwriteChange(
+            channel=self.channel,
+            target=self.target,
+            updates=dict(self.previous),
+            previous=dict(self.updates),
+            delete_if_empty=self.created,
+        )
+
+    async def apply(self, reason: str):
+        # Start from the live overwrite so unrelated edits made meanwhile survive
+        overwrite = self.channel.overwrites_for(self.target)
+        for name, value in self.updates.items():
+            setattr(overwrite, name, value)
+        if self.delete_if_empty and overwrite.is_empty():
+            await self.channel.set_permissions(
+                self.target, overwrite=None, reason=reason
+            )
+        else:
+            await self.channel.set_permissions(
+                self.target, overwrite=overwrite, reason=reason
+            )
+
+
+@dataclass
+class LockdownRecord:
+    """Every overwrite change applied to a guild, merged per (channel, target)"""
+
+    guild_id: int
+    changes: Dict[Tuple[int, int], OverwriteChange] = field(default_factory=dict)
+
+    def add(self, change: OverwriteChange):
+        existing = self.changes.get(change.key)
+        if existing is None:
+            self.changes[change.key] = change
+            return
+        # Keep the oldest value of each key so the undo restores pre-lockdown state
+        for name, value in change.previous.items():
+            existing.previous.setdefault(name, value)
+        existing.updates.update(change.updates)
+
+    @property
+    def channel_ids(self) -> List[int]:
+        return sorted({channel_id for channel_id, _ in self.changes})
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+
+@dataclass
+class LockdownResult:
+    """Outcome of one apply: what changed, what failed and how long it took"""
+
+    applied: List[OverwriteChange] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    def count(self, channel_type: type) -> int:
+        return sum(isinstance(change.channel, channel_type) for change in self.applied)
+
+    @property
+    def channels(self) -> int:
+        return len(self.applied) - self.count(discord.CategoryChannel)
+
+    @property
+    def categories(self) -> int:
+        return self.count(discord.CategoryChannel)
+
+
+def _retry_after(error: discord.HTTPException) -> float:
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None and getattr(error, "response", None) is not None:
+        retry_after = error.response.headers.get("Retry-After")
+    return float(retry_after or 1.0)
+
+
+class LockdownExecutor:
+    """Applies overwrite changes with bounded concurrency and global pacing.
+
+    Permission edits use the route ``PUT /channels/{channel_id}/permissions``,
+    whose rate limit bucket is per channel, so edits to different channels
+    can run side by side. ``concurrency`` caps how many are in flight and a
+    shared ``AdaptiveTokenBucket`` keeps the total under Discord's global
+    limit, backing off when a 429 gets through.
+    """
+
+    def __init__(self, concurrency: int = 10, rate: float = 40.0, max_retries: int = 3):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.bucket = AdaptiveTokenBucket(rate, burst=concurrency)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _change_for(
+        channel: discord.abc.GuildChannel,
+        target: Target,
+        updates: Dict[str, Optional[bool]],
+        only_unset: bool,
+    ) -> Optional[OverwriteChange]:
+        current = channel.overwrites_for(target)
+        previous = {}
+        for name, value in updates.items():
+            old = getattr(current, name)
+            if only_unset and old is not None:
+                continue
+            if old != value:
+                previous[name] = old
+        if not previous:
+            return None
+        return OverwriteChange(
+            channel=channel,
+            target=target,
+            updates={name: updates[name] for name in previous},
+            previous=previous,
+            created=target not in channel.overwrites,
+        )
+
+    def plan(
+        self,
+        channels: Iterable[discord.abc.GuildChannel],
+        target: Target,
+        updates: Dict[str, Optional[bool]],
+        only_unset: bool = False,
+    ) -> Tuple[List[OverwriteChange], int]:
+        """Changes needed to give ``target`` the ``updates`` in ``channels``.
+
+        Channels already in that state are skipped. With ``only_unset``,
+        keys with an explicit allow or deny are left alone. A category whose
+        children are all in scope and synced to it gets the same change,
+        which keeps them synced and makes channels created under it during
+        the lockdown inherit the lock.
+
+        Returns (changes, number of channels skipped).
+        """
+        channels = list(channels)
+        changes: List[OverwriteChange] = []
+        skipped = 0
+        for channel in channels:
+            change = self._change_for(channel, target, updates, only_unset)
+            if change is None:
+                skipped += 1
+            else:
+                changes.append(change)
+
+        in_scope = {channel.id for channel in channels}
+        categories = {
+            channel.category.id: channel.category
+            for channel in channels
+            if channel.category is not None
+        }
+        for category in categories.values():
+            if category.id in in_scope:
+                continue
+            if all(
+                child.id in in_scope and child.permissions_synced
+                for child in category.channels
+            ):
+                change = self._change_for(category, target, updates, only_unset)
+                if change is not None:
+                    changes.append(change)
+
+        return changes, skipped
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def run(
+        self, call: Callable[[], Awaitable[Any]], label: str
+    ) -> Optional[str]:
+        """Await ``call()`` within the concurrency and rate limits, retrying 429s.
+
+        Returns None on success or an error message prefixed with ``label``.
+        """
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.bucket.acquire()
+                try:
+                    await call()
+                    self.bucket.on_success()
+                    return None
+                except discord.HTTPException as e:
+                    if e.status == 429 and attempt < self.max_retries:
+                        self.bucket.on_rate_limited(_retry_after(e))
+                        continue
+                    return f"{label}: {e}"
+                except Exception as e:
+                    return f"{label}: {e}"
+        return f"{label}: rate limited"
+
+    async def apply(
+        self, changes: List[OverwriteChange], reason: str
+    ) -> LockdownResult:
+        """Run every change concurrently; the result's ``elapsed`` is time to fully applied"""
+        start = time.perf_counter()
+        errors = await asyncio.gather(
+            *(
+                self.run(
+                    lambda change=change: change.apply(reason), change.channel.name
+                )
+                for change in changes
+            )
+        )
+
+        result = LockdownResult(elapsed=time.perf_counter() - start)
+        for change, error in zip(changes, errors):
+            if error is None:
+                result.applied.append(change)
+            else:
+                result.errors.append(error)
+        if result.errors:
+            logger.warning(
+                f"⚠️ {len(result.errors)} permission change(s) failed: "
+                f"{'; '.join(result.errors[:5])}"
+            )
+        return result
+
+    async def lock(
+        self,
+        channels: Iterable[discord.abc.GuildChannel],
+        target: Target,
+        updates: Dict[str, Optional[bool]],
+        reason: str,
+        record: Optional[LockdownRecord] = None,
+        only_unset: bool = False,
+    ) -> LockdownResult:
+        """Plan and apply ``updates``, adding what was applied to ``record``"""
+        changes, skipped = self.plan(channels, target, updates, only_unset)
+        result = await self.apply(changes, reason)
+        result.skipped = skipped
+        if record is not None:
+            for change in result.applied:
+                record.add(change)
+        logger.info(
+            f"🔒 Applied {len(result.applied)}/{len(changes)} overwrite change(s) "
+            f"in {result.elapsed:.2f}s ({skipped} already in place)"
+        )
+        return result
+
+    async def unlock(
+        self, guild: discord.Guild, record: LockdownRecord, reason: str
+    ) -> LockdownResult:
+        """Restore every key ``record`` changed to its pre-lockdown value.
+
+        Reverted changes are removed from ``record``; failed ones stay.
+        """
+        changes = []
+        for change in record.changes.values():
+            channel = guild.get_channel(change.channel.id)
+            if channel is None:
+                continue  # Deleted during the lockdown
+            change.channel = channel
+            changes.append(change.inverse())
+
+        result = await self.apply(changes, reason)
+        result.skipped = len(record) - len(changes)
+        # Whatever failed stays in the record so unlock can be retried
+        for change in result.applied:
+            record.changes.pop(change.key, None)
+        for key in [key for key in record.changes if guild.get_channel(key[0]) is None]:
+            del record.changes[key]
+        logger.info(
+            f"🔓 Reverted {len(result.applied)}/{len(changes)} overwrite change(s) "
+            f"in {result.elapsed:.2f}s"
+        )
+        return result
+
+
+__all__ = [
+    "LockdownExecutor",
+    "LockdownRecord",
+    "LockdownResult",
+    "OverwriteChange",
+]
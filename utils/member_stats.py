@@ -0,0 +1,218 @@
+"""
+Member Statistics Index for Astra Bot
+Per-guild online, bot and human counts maintained from gateway events
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set
+
+import discord
+
+logger = logging.getLogger("astra.member_stats")
+
+# Shown in place of online counts when the presences intent is off
+ONLINE_UNAVAILABLE = "unavailable"
+
+
+@dataclass(slots=True)
+class GuildMemberStats:
+    """Member counts of one guild"""
+
+    member_count: int
+    bots: int
+    online: Optional[int]  # None without the presences intent
+    online_humans: Optional[int]
+
+    @property
+    def humans(self) -> int:
+        return max(0, self.member_count - self.bots)
+
+    @property
+    def online_ratio(self) -> Optional[float]:
+        if self.online is None:
+            return None
+        return self.online / self.member_count if self.member_count else 0.0
+
+    @property
+    def online_human_ratio(self) -> Optional[float]:
+        if self.online_humans is None:
+            return None
+        return self.online_humans / self.member_count if self.member_count else 0.0
+
+
+def format_online(value: Optional[int]) -> str:
+    """An online count for display, or ``ONLINE_UNAVAILABLE``"""
+    return ONLINE_UNAVAILABLE if value is None else f"{value:,}"
+
+
+def _is_online(member: discord.Member) -> bool:
+    return member.status != discord.Status.offline
+
+
+class MemberStatsIndex:
+    """Online/bot membership per guild, updated incrementally.
+
+    A guild's member cache is scanned once, when its stats are first
+    needed (and once more after member chunking completes); after that
+    ``on_member_join``, ``on_member_remove`` and ``on_presence_update``
+    keep it current and reads are O(1). Member, bot and online member ids
+    are stored per guild, plus how many guilds each user is in so the
+    unique member count across guilds needs no scan either.
+
+    Online counts need the (privileged) presences intent: without it the
+    gateway sends no statuses and ``stats`` reports them as None.
+    """
+
+    def __init__(self):
+        self.presences_enabled = False
+        self._members: Dict[int, Set[int]] = {}
+        self._bots: Dict[int, Set[int]] = {}
+        self._online_humans: Dict[int, Set[int]] = {}
+        self._online_bots: Dict[int, Set[int]] = {}
+        self._indexed_chunked: Dict[int, bool] = {}
+        self._guilds_per_user: Dict[int, int] = {}
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def index_guild(self, guild: discord.Guild):
+        """Build a guild's entry from its member cache"""
+        self._drop_members(guild.id)
+        members, bots, online_humans, online_bots = set(), set(), set(), set()
+        for member in guild.members:
+            members.add(member.id)
+            if member.bot:
+                bots.add(member.id)
+                if _is_online(member):
+                    online_bots.add(member.id)
+            elif _is_online(member):
+                online_humans.add(member.id)
+
+        for user_id in members:
+            self._add_user(user_id)
+        self._members[guild.id] = members
+        self._bots[guild.id] = bots
+        self._online_humans[guild.id] = online_humans
+        self._online_bots[guild.id] = online_bots
+        self._indexed_chunked[guild.id] = bool(guild.chunked)
+        logger.debug(
+            f"📇 Indexed {guild.name}: {len(bots)} bots, "
+            f"{len(online_humans) + len(online_bots)} online"
+        )
+
+    def forget_guild(self, guild_id: int):
+        self._drop_members(guild_id)
+        self._bots.pop(guild_id, None)
+        self._online_humans.pop(guild_id, None)
+        self._online_bots.pop(guild_id, None)
+        self._indexed_chunked.pop(guild_id, None)
+
+    def _add_user(self, user_id: int):
+        self._guilds_per_user[user_id] = self._guilds_per_user.get(user_id, 0) + 1
+
+    def _remove_user(self, user_id: int):
+        remaining = self._guilds_per_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self._guilds_per_user[user_id] = remaining
+        else:
+            self._guilds_per_user.pop(user_id, None)
+
+    def _drop_members(self, guild_id: int):
+        for user_id in self._members.pop(guild_id, ()):
+            self._remove_user(user_id)
+
+    def _ensure_indexed(self, guild: discord.Guild) -> bool:
+        chunked = self._indexed_chunked.get(guild.id)
+        # Members loaded by chunking arrive without join events
+        if chunked is None or (not chunked and guild.chunked):
+            self.index_guild(guild)
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Gateway events
+    # ------------------------------------------------------------------
+
+    def member_joined(self, member: discord.Member):
+        if self._ensure_indexed(member.guild):
+            return
+        guild_id = member.guild.id
+        if member.id not in self._members[guild_id]:
+            self._members[guild_id].add(member.id)
+            self._add_user(member.id)
+        if member.bot:
+            self._bots[guild_id].add(member.id)
+        self._set_online(guild_id, member, _is_online(member))
+
+    def member_left(self, member: discord.Member):
+        guild_id = member.guild.id
+        if guild_id not in self._indexed_chunked:
+            return
+        if member.id in self._members[guild_id]:
+            self._members[guild_id].discard(member.id)
+            self._remove_user(member.id)
+        self._bots[guild_id].discard(member.id)
+        self._online_humans[guild_id].discard(member.id)
+        self._online_bots[guild_id].discard(member.id)
+
+    def presence_updated(self, before: discord.Member, after: discord.Member):
+        if after.guild.id not in self._indexed_chunked:
+            return
+        if _is_online(before) != _is_online(after):
+            self._set_online(after.guild.id, after, _is_online(after))
+
+    def _set_online(self, guild_id: int, member: discord.Member, online: bool):
+        target = (self._online_bots if member.bot else self._online_humans)[guild_id]
+        if online:
+            target.add(member.id)
+        else:
+            target.discard(member.id)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def stats(self, guild: discord.Guild) -> GuildMemberStats:
+        """Current counts for a guild (indexes it on first use)"""
+        self._ensure_indexed(guild)
+        if not self.presences_enabled:
+            online = online_humans = None
+        else:
+            online_humans = len(self._online_humans[guild.id])
+            online = online_humans + len(self._online_bots[guild.id])
+        return GuildMemberStats(
+            member_count=guild.member_count or 0,
+            bots=len(self._bots[guild.id]),
+            online=online,
+            online_humans=online_humans,
+        )
+
+    def total_humans(self, guilds) -> int:
+        """Human members summed over guilds"""
+        return sum(self.stats(guild).humans for guild in guilds)
+
+    def unique_members(self, guilds: Iterable[discord.Guild]) -> int:
+        """Distinct cached members across guilds (indexes new guilds once)"""
+        for guild in guilds:
+            self._ensure_indexed(guild)
+        return len(self._guilds_per_user)
+
+
+# Global index shared by the bot's event handlers and every cog
+member_stats = MemberStatsIndex()
+
+
+def get_member_stats() -> MemberStatsIndex:
+    return member_stats
+
+
+__all__ = [
+    "GuildMemberStats",
+    "MemberStatsIndex",
+    "ONLINE_UNAVAILABLE",
+    "format_online",
+    "get_member_stats",
+    "member_stats",
+]
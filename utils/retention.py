@@ -0,0 +1,241 @@
+"""
+Retention Scheduler for Astra Bot
+Chunked, throttled data-cleanup jobs that never hold the database for long
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Union
+
+from utils.storage_engine import get_storage
+
+logger = logging.getLogger("astra.retention")
+
+
+@dataclass
+class RetentionJob:
+    """A bounded DELETE (or UPDATE) over rows matching ``where``.
+
+    Rows are processed in rowid order, ``batch_size`` at a time, each batch in
+    its own short write transaction. ``params`` may be a callable so cutoffs
+    are computed when the job runs rather than when it is defined.
+    """
+
+    name: str
+    db_path: Union[str, Path]
+    table: str
+    where: str
+    params: Union[Sequence[Any], Callable[[], Sequence[Any]]] = ()
+    # When set, run UPDATE <table> SET <set_clause> instead of DELETE
+    set_clause: Optional[str] = None
+    batch_size: int = 500
+    time_budget: float = 5.0  # seconds per run; the rest resumes next run
+    pause: float = 0.05  # seconds yielded between batches
+    # PRAGMA incremental_vacuum(N) after the run; the database is converted
+    # to auto_vacuum=INCREMENTAL (one full VACUUM) the first time
+    incremental_vacuum_pages: int = 0
+
+    def resolve_params(self) -> tuple:
+        return tuple(self.params() if callable(self.params) else self.params)
+
+
+@dataclass
+class RetentionReport:
+    """Progress and throughput of one job run"""
+
+    job: str
+    rows_affected: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    completed: bool = False
+    resume_rowid: int = 0
+    vacuumed_pages: int = 0  # Pages actually released (drop in freelist_count)
+    error: Optional[str] = None
+    finished_at: float = field(default_factory=time.time)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_affected / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job": self.job,
+            "rows_affected": self.rows_affected,
+            "batches": self.batches,
+            "elapsed_s": round(self.elapsed, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "completed": self.completed,
+            "resume_rowid": self.resume_rowid,
+            "vacuumed_pages": self.vacuumed_pages,
+            "error": self.error,
+        }
+
+
+class RetentionScheduler:
+    """Runs retention jobs in bounded batches, resuming where a budget ran out"""
+
+    def __init__(self):
+        self._cursors: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._incremental: Set[Path] = set()
+        self.last_reports: Dict[str, RetentionReport] = {}
+
+    @staticmethod
+    def _enable_incremental_vacuum(db_path: Path) -> Optional[int]:
+        """Switch a database to auto_vacuum=INCREMENTAL.
+
+        Returns the free pages the conversion released, or None if the
+        database already was in that mode.
+
+        incremental_vacuum is a no-op in any other mode, and the mode only
+        takes effect after a full VACUUM, which must run outside a
+        transaction (so not on the storage writer).
+        """
+        conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return None
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            return free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+
+    async def _ensure_incremental_vacuum(self, db_path: Union[str, Path]) -> int:
+        """Convert the database once per process; returns the pages that freed"""
+        path = Path(db_path).resolve()
+        if path in self._incremental:
+            return 0
+        freed = await asyncio.to_thread(self._enable_incremental_vacuum, path)
+        self._incremental.add(path)
+        if freed is None:
+            return 0
+        logger.info(
+            f"🧹 Enabled incremental auto-vacuum for {path.name} ({freed} pages freed)"
+        )
+        return freed
+
+    @staticmethod
+    def _incremental_vacuum(pages: int) -> Callable[[Any], int]:
+        def run(conn) -> int:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # The pragma frees one page per step and the sqlite3 module steps
+            # a row-less statement only once, so release pages one at a time
+            for _ in range(min(pages, before)):
+                conn.execute("PRAGMA incremental_vacuum(1)")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return before - after
+
+        return run
+
+    @staticmethod
+    def _process_batch(
+        job: RetentionJob, params: tuple, after_rowid: int
+    ) -> Callable[[Any], tuple]:
+        # Select the next rowid window, then touch only that range
+        select_sql = (
+            f"SELECT rowid FROM {job.table} WHERE rowid > ? AND ({job.where}) "
+            f"ORDER BY rowid LIMIT ?"
+        )
+        if job.set_clause:
+            write_sql = (
+                f"UPDATE {job.table} SET {job.set_clause} "
+                f"WHERE rowid BETWEEN ? AND ? AND ({job.where})"
+            )
+        else:
+            write_sql = (
+                f"DELETE FROM {job.table} WHERE rowid BETWEEN ? AND ? AND ({job.where})"
+            )
+
+        def run(conn) -> tuple:
+            rowids = conn.execute(
+                select_sql, (after_rowid, *params, job.batch_size)
+            ).fetchall()
+            if not rowids:
+                return 0, None
+            first, last = rowids[0][0], rowids[-1][0]
+            cursor = conn.execute(write_sql, (first, last, *params))
+            return cursor.rowcount, last
+
+        return run
+
+    async def run_job(self, job: RetentionJob) -> RetentionReport:
+        """Run one job until it finishes or its time budget is spent"""
+        lock = self._locks.setdefault(job.name, asyncio.Lock())
+        report = RetentionReport(job=job.name)
+
+        async with lock:
+            storage = get_storage(job.db_path)
+            params = job.resolve_params()
+            after_rowid = self._cursors.get(job.name, 0)
+            start = time.perf_counter()
+
+            try:
+                while True:
+                    affected, last_rowid = await storage.transaction(
+                        self._process_batch(job, params, after_rowid)
+                    )
+                    if last_rowid is None:
+                        report.completed = True
+                        after_rowid = 0
+                        break
+
+                    report.rows_affected += affected
+                    report.batches += 1
+                    after_rowid = last_rowid
+
+                    if time.perf_counter() - start >= job.time_budget:
+                        break
+
+                    # Let other writers and the event loop in between batches
+                    await asyncio.sleep(job.pause)
+
+                if job.incremental_vacuum_pages and report.completed:
+                    await storage.flush()
+                    freed = await self._ensure_incremental_vacuum(job.db_path)
+                    report.vacuumed_pages = freed + await storage.transaction(
+                        self._incremental_vacuum(job.incremental_vacuum_pages)
+                    )
+
+            except Exception as e:
+                report.error = str(e)
+                logger.error(f"❌ Retention job '{job.name}' failed: {e}")
+
+            self._cursors[job.name] = after_rowid
+            report.resume_rowid = after_rowid
+            report.elapsed = time.perf_counter() - start
+            report.finished_at = time.time()
+            self.last_reports[job.name] = report
+
+        if report.rows_affected or not report.completed:
+            logger.info(
+                f"🧹 Retention '{job.name}': {report.rows_affected} rows in "
+                f"{report.batches} batches, {report.elapsed:.2f}s "
+                f"({report.rows_per_sec:.0f} rows/s)"
+                + ("" if report.completed else ", resuming next run")
+            )
+        return report
+
+    async def run_jobs(self, jobs: List[RetentionJob]) -> List[RetentionReport]:
+        """Run jobs one after another (they usually share a database file)"""
+        return [await self.run_job(job) for job in jobs]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latest report of every job that has run"""
+        return {name: report.to_dict() for name, report in self.last_reports.items()}
+
+
+# Global retention scheduler instance
+retention_scheduler = RetentionScheduler()
+
+__all__ = [
+    "RetentionJob",
+    "RetentionReport",
+    "RetentionScheduler",
+    "retention_scheduler",
+]
@@ -0,0 +1,331 @@
+"""
+Startup Profiler for Astra Bot
+Records per-module import time and per-component init time, plus a cold-import
+regression benchmark
+
+Profiling:    python start_astra.py --profile-startup
+Benchmark:    python -m utils.startup_profiler --benchmark [--update-baseline]
+"""
+
+import argparse
+import importlib.abc
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("astra.startup_profiler")
+
+PROFILE_ENV_VAR = "ASTRA_PROFILE_STARTUP"
+DEFAULT_REPORT_PATH = Path("logs/startup_profile.json")
+DEFAULT_BASELINE_PATH = Path("data/startup_import_baseline.json")
+
+# Packages whose cold import time is guarded by the benchmark
+BENCHMARK_MODULES = [
+    "ai",
+    "core",
+    "utils",
+    "config.unified_config",
+    "logger.enhanced_logger",
+]
+
+# Stdlib imports timed alongside the modules to gauge how fast the host is;
+# the baseline stores each module's time as a multiple of this reference
+REFERENCE_IMPORT = "asyncio, json, logging, sqlite3, email.message, http.client"
+
+
+class _TimingLoader:
+    """Loader proxy that times exec_module and forwards everything else"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_import(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps the loaders found by the remaining finders"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """Collects import and init timings during bot startup"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at: Optional[float] = None
+        self.import_times: Dict[str, Dict[str, float]] = {}
+        self.init_times: Dict[str, float] = {}
+        self._import_stack: List[List[Any]] = []
+        self._finder: Optional[_TimingFinder] = None
+
+    def install(self):
+        """Start recording imports from now on"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """Stop recording imports (init timings are still accepted)"""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def _enter_import(self, name: str):
+        # [name, start, time spent in nested imports]
+        self._import_stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit_import(self, name: str):
+        entry_name, start, children = self._import_stack.pop()
+        cumulative = time.perf_counter() - start
+        self.import_times[entry_name] = {
+            "cumulative_ms": cumulative * 1000,
+            "self_ms": (cumulative - children) * 1000,
+        }
+        if self._import_stack:
+            self._import_stack[-1][2] += cumulative
+
+    def record_init(self, name: str, seconds: float):
+        """Record the init time of a component"""
+        if self.enabled:
+            self.init_times[name] = self.init_times.get(name, 0.0) + seconds * 1000
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as an init phase (no-op overhead when disabled)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_init(name, time.perf_counter() - start)
+
+    def report(self, top: int = 25) -> Dict[str, Any]:
+        """Build a report of the slowest imports and init phases"""
+        by_self = sorted(
+            self.import_times.items(), key=lambda item: item[1]["self_ms"], reverse=True
+        )
+        return {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "elapsed_ms": (
+                (time.perf_counter() - self.started_at) * 1000
+                if self.started_at
+                else 0.0
+            ),
+            "modules_imported": len(self.import_times),
+            "total_import_self_ms": sum(
+                t["self_ms"] for t in self.import_times.values()
+            ),
+            "slowest_imports": [
+                {"module": name, **times} for name, times in by_self[:top]
+            ],
+            "init_times_ms": dict(
+                sorted(self.init_times.items(), key=lambda item: item[1], reverse=True)
+            ),
+        }
+
+    def write_report(self, path: Path = DEFAULT_REPORT_PATH) -> Dict[str, Any]:
+        """Write the report as JSON and log a summary"""
+        report = self.report()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+
+        logger.info("=" * 60)
+        logger.info(
+            f"⏱️ Startup profile: {report['elapsed_ms']:.0f}ms total, "
+            f"{report['modules_imported']} modules imported"
+        )
+        for entry in report["slowest_imports"][:10]:
+            logger.info(
+                f"   📦 {entry['module']}: {entry['self_ms']:.1f}ms self "
+                f"({entry['cumulative_ms']:.1f}ms cumulative)"
+            )
+        for name, elapsed_ms in list(report["init_times_ms"].items())[:10]:
+            logger.info(f"   🔧 {name}: {elapsed_ms:.1f}ms")
+        logger.info(f"📝 Startup profile written to {path}")
+        logger.info("=" * 60)
+        return report
+
+
+# Global profiler instance - enabled by start_astra.py --profile-startup
+startup_profiler = StartupProfiler()
+
+
+def enable_from_environment() -> bool:
+    """Install the profiler if ASTRA_PROFILE_STARTUP is set"""
+    if os.getenv(PROFILE_ENV_VAR, "").lower() in ("1", "true", "yes"):
+        startup_profiler.install()
+    return startup_profiler.enabled
+
+
+# ===== Cold import regression benchmark =====
+
+
+def measure_cold_import(module: str, runs: int = 5) -> float:
+    """Median cold import time of a module in ms, each run in a fresh interpreter"""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print((time.perf_counter() - start) * 1000)"
+    )
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}"
+            )
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def run_import_benchmark(
+    modules: List[str] = None,
+    baseline_path: Path = DEFAULT_BASELINE_PATH,
+    tolerance: float = 0.5,
+    slack_ms: float = 25.0,
+    runs: int = 5,
+    update_baseline: bool = False,
+) -> int:
+    """Compare cold import times against the stored baseline.
+
+    The baseline holds each module's time relative to ``REFERENCE_IMPORT``,
+    which is re-measured on every run, so it carries across faster and
+    slower hosts. A module regresses when it is slower than its relative
+    budget * (1 + tolerance) plus an absolute slack (to absorb noise on tiny
+    imports). A module with no baseline entry, or one that fails to import,
+    fails the check too unless the baseline is being updated. Returns a
+    process exit code: 0 when within budget, 1 on regression.
+    """
+    modules = modules or BENCHMARK_MODULES
+    baseline_path = Path(baseline_path)
+    if not baseline_path.exists() and not update_baseline:
+        print(
+            f"❌ No baseline at {baseline_path} - "
+            "run with --update-baseline and commit it"
+        )
+        return 1
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    budgets: Dict[str, float] = baseline.get("relative_budgets", {})
+
+    reference_ms = measure_cold_import(REFERENCE_IMPORT, runs=runs)
+    print(f"📏 Reference stdlib imports: {reference_ms:.1f}ms")
+
+    results: Dict[str, float] = {}
+    regressions = []
+    failures = []
+    for module in modules:
+        try:
+            elapsed_ms = measure_cold_import(module, runs=runs)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            failures.append(module)
+            continue
+        results[module] = elapsed_ms / reference_ms
+
+        budget = budgets.get(module)
+        if budget is None:
+            print(f"🆕 {module}: {elapsed_ms:.1f}ms (no baseline)")
+            if not update_baseline:
+                failures.append(module)
+            continue
+
+        limit = budget * reference_ms * (1 + tolerance) + slack_ms
+        status = "✅" if elapsed_ms <= limit else "❌"
+        print(
+            f"{status} {module}: {elapsed_ms:.1f}ms "
+            f"(budget {budget:.2f}x reference, limit {limit:.1f}ms)"
+        )
+        if elapsed_ms > limit:
+            regressions.append(module)
+
+    if update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        merged = {
+            "reference_import": REFERENCE_IMPORT,
+            "relative_budgets": {
+                **budgets,
+                **{m: round(v, 3) for m, v in results.items()},
+            },
+        }
+        baseline_path.write_text(json.dumps(merged, indent=2) + "\n")
+        print(f"📝 Baseline written to {baseline_path}")
+
+    if regressions:
+        print(f"❌ Cold import time regressed: {', '.join(regressions)}")
+        return 1
+    if failures:
+        print(f"❌ Not checked against the baseline: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Astra startup profiling tools")
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Run the cold import benchmark"
+    )
+    parser.add_argument("--modules", nargs="*", help="Modules to benchmark")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE_PATH))
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+
+    return run_import_benchmark(
+        modules=args.modules,
+        baseline_path=Path(args.baseline),
+        tolerance=args.tolerance,
+        runs=args.runs,
+        update_baseline=args.update_baseline,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+Time-Series Store for Astra Bot
+Typed ring buffers at 1s/1m/1h resolution with count/sum/min/max/histogram rollups
+"""
+
+import bisect
+import logging
+import os
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger("astra.time_series")
+
+# (name, bucket width in seconds, number of buckets kept)
+RESOLUTIONS: Tuple[Tuple[str, int, int], ...] = (
+    ("1s", 1, 600),  # 10 minutes
+    ("1m", 60, 1440),  # 24 hours
+    ("1h", 3600, 720),  # 30 days
+)
+
+
+class _Ring:
+    """Fixed-size ring of buckets for one resolution"""
+
+    # Typed per-bucket arrays, in persistence order
+    FIELDS = ("starts", "count", "total", "low", "high", "hist")
+    __slots__ = ("step", "size", "bins") + FIELDS
+
+    def __init__(self, step: int, size: int, bins: int):
+        self.step = step
+        self.size = size
+        self.bins = bins
+        self.starts = array("q", [-1]) * size
+        self.count = array("q", [0]) * size
+        self.total = array("d", [0.0]) * size
+        self.low = array("d", [0.0]) * size
+        self.high = array("d", [0.0]) * size
+        self.hist = array("q", [0]) * (size * bins)
+
+    def add(self, timestamp: float, value: float, bin_index: int):
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.size
+        start = bucket * self.step
+        current = self.starts[slot]
+        if current != start:
+            if current > start:
+                # Older than anything this ring still holds
+                return
+            self.starts[slot] = start
+            self.count[slot] = 0
+            self.total[slot] = 0.0
+            self.low[slot] = value
+            self.high[slot] = value
+            if self.bins:
+                base = slot * self.bins
+                self.hist[base : base + self.bins] = array("q", [0]) * self.bins
+
+        self.count[slot] += 1
+        self.total[slot] += value
+        if value < self.low[slot]:
+            self.low[slot] = value
+        if value > self.high[slot]:
+            self.high[slot] = value
+        if self.bins:
+            self.hist[slot * self.bins + bin_index] += 1
+
+    @property
+    def span(self) -> int:
+        return self.step * self.size
+
+
+@dataclass
+class BucketRange:
+    """Buckets of one series in time order"""
+
+    resolution: str
+    timestamps: np.ndarray
+    count: np.ndarray
+    sum: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    histogram: np.ndarray  # shape (buckets, bins); empty without bounds
+
+    @property
+    def mean(self) -> np.ndarray:
+        return np.divide(
+            self.sum, self.count, out=np.zeros(len(self.sum)), where=self.count > 0
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class TimeSeries:
+    """One metric recorded into every resolution at once.
+
+    ``bounds`` enables a histogram with Prometheus-style ``le`` bins: bin
+    ``i`` counts values ``<= bounds[i]`` (and above the previous bound),
+    the last bin counts values above every bound.
+    """
+
+    def __init__(self, name: str, bounds: Optional[Sequence[float]] = None):
+        self.name = name
+        self.bounds: List[float] = sorted(bounds) if bounds else []
+        bins = len(self.bounds) + 1 if self.bounds else 0
+        self.rings: Dict[str, _Ring] = {
+            resolution: _Ring(step, size, bins)
+            for resolution, step, size in RESOLUTIONS
+        }
+        self.recent: deque = deque(maxlen=10)
+        self.last_value: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+
+    def record(self, value: float = 1.0, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        value = float(value)
+        bin_index = bisect.bisect_left(self.bounds, value) if self.bounds else 0
+        for ring in self.rings.values():
+            ring.add(timestamp, value, bin_index)
+        self.recent.append(value)
+        self.last_value = value
+        self.last_timestamp = timestamp
+
+    def _ring_for(self, start: float, resolution: Optional[str]) -> Tuple[str, _Ring]:
+        if resolution is not None:
+            return resolution, self.rings[resolution]
+        # Finest resolution that still reaches back to ``start``
+        age = time.time() - start
+        for name, ring in self.rings.items():
+            if ring.span >= age:
+                return name, ring
+        return name, ring
+
+    def query(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        resolution: Optional[str] = None,
+    ) -> BucketRange:
+        """Non-empty buckets overlapping [start, end]"""
+        resolution, ring = self._ring_for(start, resolution)
+        end = time.time() if end is None else end
+
+        starts = np.frombuffer(ring.starts, dtype=np.int64)
+        first = int(start // ring.step) * ring.step
+        slots = np.flatnonzero((starts >= first) & (starts <= end))
+        slots = slots[np.argsort(starts[slots], kind="stable")]
+
+        histogram = (
+            np.frombuffer(ring.hist, dtype=np.int64).reshape(ring.size, ring.bins)[
+                slots
+            ]
+            if ring.bins
+            else np.zeros((len(slots), 0), dtype=np.int64)
+        )
+        return BucketRange(
+            resolution=resolution,
+            timestamps=starts[slots],
+            count=np.frombuffer(ring.count, dtype=np.int64)[slots],
+            sum=np.frombuffer(ring.total)[slots],
+            min=np.frombuffer(ring.low)[slots],
+            max=np.frombuffer(ring.high)[slots],
+            histogram=histogram,
+        )
+
+    def summary(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        resolution: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Totals over [start, end]: count, sum, mean, min, max and histogram"""
+        buckets = self.query(start, end, resolution)
+        count = int(buckets.count.sum())
+        total = float(buckets.sum.sum())
+        result: Dict[str, Any] = {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "min": float(buckets.min.min()) if count else 0.0,
+            "max": float(buckets.max.max()) if count else 0.0,
+            "first_timestamp": int(buckets.timestamps[0]) if count else None,
+        }
+        if self.bounds:
+            histogram = buckets.histogram.sum(axis=0)
+            result["histogram"] = histogram.tolist()
+            result["p50"] = self._quantile(histogram, 0.5, result["max"])
+            result["p95"] = self._quantile(histogram, 0.95, result["max"])
+        return result
+
+    def _quantile(self, histogram: np.ndarray, q: float, maximum: float) -> float:
+        """Upper bound of the bin holding the q-quantile"""
+        total = histogram.sum()
+        if not total:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(histogram), q * total))
+        return self.bounds[index] if index < len(self.bounds) else maximum
+
+
+class TimeSeriesStore:
+    """Named time series with optional persistence to a compressed ``.npz``"""
+
+    def __init__(self, persist_path: Union[None, str, Path] = None):
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.series: Dict[str, TimeSeries] = {}
+        if self.persist_path and self.persist_path.exists():
+            self.load()
+
+    def get(self, name: str, bounds: Optional[Sequence[float]] = None) -> TimeSeries:
+        """Series by name, created on first use"""
+        series = self.series.get(name)
+        if series is None or (bounds and series.bounds != sorted(bounds)):
+            # A series restored with other histogram bins starts over
+            series = self.series[name] = TimeSeries(name, bounds)
+        return series
+
+    def record(
+        self,
+        name: str,
+        value: float = 1.0,
+        timestamp: Optional[float] = None,
+        bounds: Optional[Sequence[float]] = None,
+    ):
+        self.get(name, bounds).record(value, timestamp)
+
+    def names(self, prefix: str = "") -> List[str]:
+        return [name for name in self.series if name.startswith(prefix)]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self):
+        """Write every ring to ``persist_path`` (atomically replaced)"""
+        self.write_snapshot(self.snapshot())
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Copy of every ring's arrays, safe to write from another thread"""
+        arrays: Dict[str, np.ndarray] = {}
+        for name, series in self.series.items():
+            arrays[f"{name}|bounds"] = np.asarray(series.bounds, dtype=np.float64)
+            for resolution, ring in series.rings.items():
+                for field in _Ring.FIELDS:
+                    arrays[f"{name}|{resolution}|{field}"] = np.array(
+                        getattr(ring, field), dtype=getattr(ring, field).typecode
+                    )
+        return arrays
+
+    def write_snapshot(self, arrays: Dict[str, np.ndarray]):
+        """Compress a ``snapshot`` to ``persist_path`` (atomically replaced)"""
+        if self.persist_path is None:
+            return
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.persist_path.with_name(self.persist_path.name + ".tmp")
+        with open(temp_path, "wb") as handle:
+            np.savez_compressed(handle, **arrays)
+        os.replace(temp_path, self.persist_path)
+
+    def load(self):
+        """Restore rings saved by ``save``; series with another layout are skipped"""
+        try:
+            data = np.load(self.persist_path)
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Could not load time series from {self.persist_path}: {e}"
+            )
+            return
+
+        with data:
+            for name in {key.split("|", 1)[0] for key in data.files}:
+                try:
+                    self.series[name] = self._restore(name, data)
+                except Exception as e:
+                    logger.warning(f"⚠️ Skipping stored time series {name}: {e}")
+
+    def _restore(self, name: str, data: Any) -> TimeSeries:
+        series = TimeSeries(name, data[f"{name}|bounds"].tolist())
+        for resolution, ring in series.rings.items():
+            for field in _Ring.FIELDS:
+                saved = data[f"{name}|{resolution}|{field}"]
+                target = getattr(ring, field)
+                if len(saved) != len(target):
+                    raise ValueError(f"{resolution} {field} has a different size")
+                setattr(ring, field, array(target.typecode, saved.tobytes()))
+        return series
+
+
+__all__ = ["BucketRange", "RESOLUTIONS", "TimeSeries", "TimeSeriesStore"]
@@ -0,0 +1,149 @@
+"""
+Buffered Row Writer for Astra Bot
+Bounded in-memory insert buffer flushed with executemany on a timer or size threshold
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("astra.write_buffer")
+
+
+class BufferedWriter:
+    """Collects rows for one INSERT statement and writes them in batches.
+
+    ``add`` only appends to memory; a background task flushes the buffer
+    through the storage engine's ``execute_many`` every ``flush_interval``
+    seconds, or as soon as ``batch_size`` rows are waiting. When
+    ``max_pending`` rows are buffered, ``add`` waits for the next flush
+    (backpressure) instead of growing without bound.
+
+    Readers that must see buffered rows (e.g. an UPDATE of a row that may
+    still be pending) should ``await flush()`` first.
+    """
+
+    def __init__(
+        self,
+        storage: Any,
+        sql: str,
+        name: str = "rows",
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_pending: int = 5000,
+    ):
+        self.storage = storage
+        self.sql = sql
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, batch_size)
+
+        self._rows: List[Sequence[Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._has_space: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+        self.stats = {
+            "rows_added": 0,
+            "rows_written": 0,
+            "rows_dropped": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "backpressure_waits": 0,
+            "write_errors": 0,
+            "flush_time_ms": 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Rows waiting to be written"""
+        return len(self._rows)
+
+    def _ensure_started(self):
+        # Created lazily so the writer binds to the loop that first uses it
+        if self._wake is None:
+            self._wake = asyncio.Event()
+            self._has_space = asyncio.Event()
+            self._has_space.set()
+            self._flush_lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, row: Sequence[Any]):
+        """Buffer one row, waiting only while the buffer is full"""
+        if self._closed:
+            raise RuntimeError(f"Buffered writer '{self.name}' is closed")
+        self._ensure_started()
+
+        while len(self._rows) >= self.max_pending:
+            self.stats["backpressure_waits"] += 1
+            self._has_space.clear()
+            self._wake.set()
+            await self._has_space.wait()
+
+        self._rows.append(row)
+        self.stats["rows_added"] += 1
+        if len(self._rows) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            # Always time out: rows below batch_size never set _wake, so an
+            # untimed wait would hold a trickle of them until shutdown
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every buffered row now"""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            while self._rows:
+                batch = self._rows[: self.batch_size]
+                del self._rows[: len(batch)]
+                self._has_space.set()
+
+                start = time.perf_counter()
+                try:
+                    await self.storage.execute_many(self.sql, batch)
+                    self.stats["rows_written"] += len(batch)
+                except Exception as e:
+                    self.stats["write_errors"] += 1
+                    self.stats["rows_dropped"] += len(batch)
+                    logger.error(
+                        f"❌ Failed to write {len(batch)} buffered {self.name}: {e}"
+                    )
+                self.stats["batches"] += 1
+                self.stats["max_batch_size"] = max(
+                    self.stats["max_batch_size"], len(batch)
+                )
+                self.stats["flush_time_ms"] += (time.perf_counter() - start) * 1000
+
+    async def close(self):
+        """Flush what is left and stop the background task"""
+        self._closed = True
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["pending"] = self.pending
+        stats["flush_time_ms"] = round(stats["flush_time_ms"], 2)
+        return stats
+
+
+__all__ = ["BufferedWriter"]